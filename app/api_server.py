@@ -1,12 +1,37 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from datetime import datetime
+from typing import Optional, Dict, Any, List
+import pymongo
 import requests
 import os
+import re
+import uuid
+
+from stylos.livestats import read_snapshots, render_prometheus
+from stylos.planner import CapacityPlanner, parse_targets
+from stylos.runs import RunLedger
 
 # Lee la URL de Scrapyd desde las variables de entorno para mayor flexibilidad
 SCRAPYD_URL = os.getenv('SCRAPYD_URL', 'http://scrapyd:6800')
 PROJECT_NAME = 'stylos'
+# Directorio (en el contenedor de Scrapyd) donde se guardan los rastreos reanudables
+JOBDIR_ROOT = os.getenv('JOBDIR_ROOT', '/var/lib/scrapyd/crawls')
+# Separador entre el ID del grupo y el número de shard/worker en los IDs de trabajo
+GROUP_JOB_SEPARATOR = '-'
+FRONTIER_SCHEDULER = 'stylos.frontier.MongoFrontierScheduler'
+# Directorio compartido con Scrapyd donde los trabajos publican sus métricas en vivo
+# (STAGE_METRICS_LIVE_DIR de las arañas)
+LIVE_STATS_DIR = os.getenv('LIVE_STATS_DIR', '.stylos_cache/live')
+# Segundos que se siguen exponiendo las métricas de un trabajo terminado
+LIVE_STATS_MAX_AGE = float(os.getenv('LIVE_STATS_MAX_AGE', 3600))
+# Historial de corridas que escriben las arañas (RunLedgerExtension)
+MONGO_URI = os.getenv('MONGO_URI')
+MONGO_DATABASE = os.getenv('MONGO_DATABASE', 'stylos_scrapers')
+RUN_LEDGER_COLLECTION = os.getenv('RUN_LEDGER_COLLECTION', 'crawl_runs')
+
+_run_ledger: Optional[RunLedger] = None
 
 app = FastAPI(
     title="API de Control de Scrapers",
@@ -16,12 +41,100 @@ app = FastAPI(
 class ScheduleRequest(BaseModel):
     spider_name: str
     spider_args: Optional[Dict[str, Any]] = None
+    # Si es True, el trabajo usa un JOBDIR estable y continúa el rastreo interrumpido
+    resume: bool = False
+    # Número de trabajos en que se reparte el rastreo (ver stylos/sharding.py)
+    shards: int = 1
+    # Número de workers que vacían juntos una frontier compartida en MongoDB (ver stylos/frontier.py)
+    workers: int = 1
+
+class PlanRequest(BaseModel):
+    spiders: List[str]
+    # Países del lote; cada uno puede llevar su idioma, ej. 'us:en'
+    countries: List[str]
+    # Nodos de Chrome disponibles (un slot por nodo) para predecir la duración
+    nodes: Optional[int] = None
+    # Plazo en minutos para recomendar nodos y shards
+    deadline_minutes: Optional[float] = None
+    shards: int = 1
+    # Sesiones de navegador por trabajo (SELENIUM_POOL_SIZE de las arañas)
+    slots_per_job: int = 4
+
+def crawl_jobdir(spider_name: str, spider_args: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Devuelve el JOBDIR de un rastreo reanudable.
+
+    Es estable para la misma araña y los mismos argumentos (país, idioma, modo...),
+    de modo que volver a agendarlo retoma el trabajo que quedó interrumpido.
+    """
+    parts = [spider_name] + [f"{key}_{value}" for key, value in sorted((spider_args or {}).items())]
+    name = re.sub(r'[^\w.-]+', '_', '-'.join(parts))
+    return f"{JOBDIR_ROOT}/{name}"
 
 @app.get("/", summary="Verificar estado de la API")
 def read_root():
     """Endpoint de bienvenida y verificación de estado."""
     return {"message": "Servidor de API para Scrapers está activo."}
 
+def _schedule_on_scrapyd(spider_name: str, spider_args: Optional[Dict[str, Any]], resume: bool,
+                         job_id: Optional[str] = None, settings: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Agenda un trabajo en Scrapyd y devuelve su ID y su JOBDIR (si es reanudable).
+
+    Raises:
+        HTTPException: Si Scrapyd rechaza el trabajo.
+        requests.exceptions.RequestException: Si no se puede conectar a Scrapyd.
+    """
+    # Preparar datos base para Scrapyd
+    scrapyd_data = {
+        'project': PROJECT_NAME, 
+        'spider': spider_name
+    }
+    if job_id:
+        scrapyd_data['_job'] = job_id
+    
+    # Agregar argumentos del spider si se proporcionan
+    if spider_args:
+        for key, value in spider_args.items():
+            # Scrapyd espera argumentos del spider como parámetros directos
+            scrapyd_data[key] = str(value)
+
+    settings = list(settings or [])
+    jobdir = None
+    if resume:
+        jobdir = crawl_jobdir(spider_name, spider_args)
+        settings.append(f"JOBDIR={jobdir}")
+    if settings:
+        # Scrapyd acepta el parámetro 'setting' repetido, uno por ajuste
+        scrapyd_data['setting'] = settings
+    
+    response = requests.post(
+        f"{SCRAPYD_URL}/schedule.json",
+        data=scrapyd_data
+    )
+    response.raise_for_status()
+    data = response.json()
+    
+    if data.get('status') != 'ok':
+        raise HTTPException(status_code=500, detail=data.get('message', 'Error desconocido de Scrapyd'))
+    return {"job_id": data['jobid'], "jobdir": jobdir}
+
+def get_run_ledger() -> RunLedger:
+    """Devuelve el historial de corridas, conectando a MongoDB en el primer uso."""
+    global _run_ledger
+    if _run_ledger is None:
+        if not MONGO_URI:
+            raise HTTPException(status_code=503, detail="MONGO_URI no está configurado.")
+        client = pymongo.MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
+        _run_ledger = RunLedger(client[MONGO_DATABASE][RUN_LEDGER_COLLECTION])
+    return _run_ledger
+
+def _list_jobs(timeout: Optional[float] = None) -> Dict[str, Any]:
+    """Lista los trabajos del proyecto en Scrapyd (pending, running, finished)."""
+    response = requests.get(f"{SCRAPYD_URL}/listjobs.json?project={PROJECT_NAME}", timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
 @app.post("/schedule", summary="Lanzar un nuevo trabajo de scraping")
 def schedule_spider(request: ScheduleRequest):
     """
@@ -30,39 +143,111 @@ def schedule_spider(request: ScheduleRequest):
     Recibe el nombre de la araña y opcionalmente argumentos adicionales
     como country, lang, url, etc. Le pide a Scrapyd que la ejecute.
     Retorna el ID del trabajo para poder consultar su estado.
+
+    Con `resume=True` el trabajo persiste su cola y su estado en un JOBDIR
+    estable: si se interrumpe, volver a agendarlo continúa donde quedó.
+
+    Con `shards > 1` se lanza un trabajo por shard (`shard=i`, `shards=n`) y se
+    retorna un `group_id` para consultar el estado agregado en `/groups/{group_id}`.
+
+    Con `workers > 1` se lanzan varios trabajos que comparten una frontier en
+    MongoDB (`crawl_id` = `group_id`) y se reparten el trabajo dinámicamente.
+    El rastreo continúa si se vuelve a agendar con el mismo `crawl_id`.
     """
+    if request.shards < 1 or request.workers < 1:
+        raise HTTPException(status_code=422, detail="'shards' y 'workers' deben ser mayores o iguales a 1.")
+    if request.shards > 1 and request.workers > 1:
+        raise HTTPException(status_code=422, detail="'shards' y 'workers' no se pueden combinar.")
     try:
-        # Preparar datos base para Scrapyd
-        scrapyd_data = {
-            'project': PROJECT_NAME, 
-            'spider': request.spider_name
-        }
-        
-        # Agregar argumentos del spider si se proporcionan
-        if request.spider_args:
-            for key, value in request.spider_args.items():
-                # Scrapyd espera argumentos del spider como parámetros directos
-                scrapyd_data[key] = str(value)
-        
-        response = requests.post(
-            f"{SCRAPYD_URL}/schedule.json",
-            data=scrapyd_data
-        )
-        response.raise_for_status()
-        data = response.json()
-        
-        if data.get('status') == 'ok':
+        if request.workers > 1:
+            group_id = uuid.uuid4().hex
+            # Un crawl_id recibido en los argumentos retoma una frontier existente
+            worker_args = dict(request.spider_args or {})
+            worker_args.setdefault('crawl_id', group_id)
+            job_ids = [
+                _schedule_on_scrapyd(request.spider_name, worker_args, resume=False,
+                                     job_id=f"{group_id}{GROUP_JOB_SEPARATOR}worker{worker}",
+                                     settings=[f"SCHEDULER={FRONTIER_SCHEDULER}"])['job_id']
+                for worker in range(request.workers)
+            ]
             return {
-                "job_id": data['jobid'], 
+                "group_id": group_id,
+                "job_ids": job_ids,
+                "spider": request.spider_name,
+                "status": "scheduled",
+                "spider_args": worker_args,
+                "workers": request.workers
+            }
+
+        if request.shards == 1:
+            job = _schedule_on_scrapyd(request.spider_name, request.spider_args, request.resume)
+            return {
+                "job_id": job['job_id'], 
                 "spider": request.spider_name, 
                 "status": "scheduled",
-                "spider_args": request.spider_args or {}
+                "spider_args": request.spider_args or {},
+                "jobdir": job['jobdir']
             }
-        else:
-            raise HTTPException(status_code=500, detail=data.get('message', 'Error desconocido de Scrapyd'))
+
+        # Los IDs de los trabajos llevan el ID del grupo como prefijo: el estado
+        # del grupo se reconstruye desde Scrapyd, sin guardar nada en la API.
+        group_id = uuid.uuid4().hex
+        job_ids = []
+        for shard in range(request.shards):
+            shard_args = dict(request.spider_args or {}, shard=shard, shards=request.shards)
+            job = _schedule_on_scrapyd(request.spider_name, shard_args, request.resume,
+                                       job_id=f"{group_id}{GROUP_JOB_SEPARATOR}shard{shard}")
+            job_ids.append(job['job_id'])
+        return {
+            "group_id": group_id,
+            "job_ids": job_ids,
+            "spider": request.spider_name,
+            "status": "scheduled",
+            "spider_args": request.spider_args or {},
+            "shards": request.shards
+        }
     except requests.exceptions.RequestException as e:
         raise HTTPException(status_code=503, detail=f"No se pudo conectar a Scrapyd: {e}")
 
+@app.get("/groups/{group_id}", summary="Consultar el estado agregado de un grupo de shards")
+def get_group_status(group_id: str):
+    """
+    Consulta el estado de todos los trabajos (shards o workers) de un grupo.
+
+    El estado del grupo es 'finished' cuando todos los shards terminaron,
+    'running' si alguno está en ejecución y 'pending' en otro caso.
+    """
+    try:
+        jobs = _list_jobs()
+    except requests.exceptions.RequestException as e:
+        raise HTTPException(status_code=503, detail=f"No se pudo conectar a Scrapyd: {e}")
+
+    prefix = f"{group_id}{GROUP_JOB_SEPARATOR}"
+    shards = {}
+    for state in ['pending', 'running', 'finished']:
+        for job in jobs.get(state, []):
+            if job['id'].startswith(prefix):
+                shards[job['id']] = state
+
+    if not shards:
+        raise HTTPException(status_code=404, detail="Grupo no encontrado.")
+
+    states = set(shards.values())
+    if states == {'finished'}:
+        group_state = 'finished'
+    elif 'running' in states:
+        group_state = 'running'
+    else:
+        group_state = 'pending'
+
+    return {
+        "group_id": group_id,
+        "state": group_state,
+        "jobs": shards,
+        "finished": sum(1 for state in shards.values() if state == 'finished'),
+        "total": len(shards)
+    }
+
 @app.get("/status/{job_id}", summary="Consultar el estado de un trabajo")
 def get_job_status(job_id: str):
     """
@@ -73,9 +258,7 @@ def get_job_status(job_id: str):
     try:
         # Scrapyd tiene diferentes endpoints para trabajos en diferente estado
         # Este es un enfoque simplificado para consultar
-        response = requests.get(f"{SCRAPYD_URL}/listjobs.json?project={PROJECT_NAME}")
-        response.raise_for_status()
-        jobs = response.json()
+        jobs = _list_jobs()
 
         for state in ['pending', 'running', 'finished']:
             for job in jobs.get(state, []):
@@ -84,4 +267,73 @@ def get_job_status(job_id: str):
         
         raise HTTPException(status_code=404, detail="Trabajo no encontrado.")
     except requests.exceptions.RequestException as e:
-        raise HTTPException(status_code=503, detail=f"No se pudo conectar a Scrapyd: {e}")
\ No newline at end of file
+        raise HTTPException(status_code=503, detail=f"No se pudo conectar a Scrapyd: {e}")
+
+@app.get("/metrics", summary="Métricas de los trabajos en formato Prometheus", response_class=PlainTextResponse)
+def get_metrics():
+    """
+    Expone las métricas en vivo de cada trabajo (items por minuto, renders en
+    curso, cola pendiente, latencias por etapa, errores) con las etiquetas
+    `job`, `spider` y `country`.
+
+    Scrapyd decide qué trabajos siguen en ejecución; si no responde, se usa el
+    estado de la última instantánea de cada trabajo y `stylos_scrapyd_up` es 0.
+    """
+    try:
+        jobs = _list_jobs(timeout=5)
+    except requests.exceptions.RequestException:
+        jobs = None
+    snapshots = read_snapshots(LIVE_STATS_DIR, max_age=LIVE_STATS_MAX_AGE)
+    return PlainTextResponse(render_prometheus(snapshots, jobs), media_type="text/plain; version=0.0.4")
+
+@app.get("/runs", summary="Consultar el historial de corridas")
+def list_runs(spider: Optional[str] = None, country: Optional[str] = None, lang: Optional[str] = None,
+              since: Optional[datetime] = None, until: Optional[datetime] = None, limit: int = 20):
+    """
+    Devuelve las corridas registradas, de la más reciente a la más antigua,
+    con su duración, throughput, latencias por etapa y conteos de items.
+
+    `since` y `until` filtran por fecha de fin (ISO 8601).
+    """
+    try:
+        return {"runs": get_run_ledger().find(spider, country, lang, since=since, until=until, limit=limit)}
+    except pymongo.errors.PyMongoError as e:
+        raise HTTPException(status_code=503, detail=f"No se pudo consultar el historial de corridas: {e}")
+
+@app.get("/runs/compare", summary="Comparar la última corrida con las anteriores")
+def compare_runs(spider: str, country: Optional[str] = None, lang: Optional[str] = None,
+                 window: int = 5, threshold: float = 0.2):
+    """
+    Compara la última corrida exitosa de una araña (y país/idioma) con la
+    mediana de las corridas de la versión anterior.
+
+    `regressions` lista las métricas (items por minuto, segundos de navegador
+    y renders por item, p95 del render) que empeoraron más de `threshold`.
+    """
+    try:
+        return get_run_ledger().compare(spider, country, lang, window=window, threshold=threshold)
+    except pymongo.errors.PyMongoError as e:
+        raise HTTPException(status_code=503, detail=f"No se pudo consultar el historial de corridas: {e}")
+
+@app.post("/plan", summary="Estimar duración y capacidad de un lote de rastreos")
+def plan_batch(request: PlanRequest):
+    """
+    Estima un lote de rastreos (cada araña en cada país) con el historial de corridas.
+
+    Con `nodes` predice la duración del lote; con `deadline_minutes` recomienda
+    la menor cantidad de nodos y los shards por rastreo que terminan a tiempo.
+    Los rastreos sin corridas previas se listan en `unknown` y no cuentan.
+    """
+    if not request.nodes and not request.deadline_minutes:
+        raise HTTPException(status_code=422, detail="Indique 'nodes', 'deadline_minutes' o ambos.")
+    planner = CapacityPlanner(get_run_ledger(), slots_per_job=request.slots_per_job)
+    try:
+        result = planner.plan(
+            parse_targets(request.spiders, request.countries),
+            nodes=request.nodes,
+            deadline_seconds=request.deadline_minutes * 60 if request.deadline_minutes else None,
+            shards=request.shards
+        )
+    except pymongo.errors.PyMongoError as e:
+        raise HTTPException(status_code=503, detail=f"No se pudo consultar el historial de corridas: {e}")
+    return result
@@ -0,0 +1,87 @@
+from contextlib import asynccontextmanager
+from typing import Optional
+import logging
+import os
+import threading
+
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+
+from stylos.broker import SessionBroker, create_warm_driver
+
+# Grid donde el broker crea las sesiones (el mismo que usan las arañas)
+SELENIUM_HUB_URL = os.getenv('SELENIUM_HUB_URL', 'http://selenium-hub:4444/wd/hub')
+# Idiomas a calentar al arrancar, como 'sitio:país:idioma' separados por comas
+BROKER_LOCALES = os.getenv('BROKER_LOCALES', 'zara:co:es')
+BROKER_WARM_PER_LOCALE = int(os.getenv('BROKER_WARM_PER_LOCALE', 1))
+BROKER_LEASE_TTL = float(os.getenv('BROKER_LEASE_TTL', 3600))
+BROKER_MAX_SESSION_AGE = float(os.getenv('BROKER_MAX_SESSION_AGE', 2 * 3600))
+# Cada cuántos segundos se tocan las sesiones libres y se reponen las que faltan
+BROKER_KEEPALIVE_INTERVAL = float(os.getenv('BROKER_KEEPALIVE_INTERVAL', 60))
+
+logger = logging.getLogger('session_broker')
+
+broker = SessionBroker(
+    factory=lambda site, country, lang: create_warm_driver(SELENIUM_HUB_URL, site, country, lang, logger),
+    warm_per_locale=BROKER_WARM_PER_LOCALE,
+    lease_ttl=BROKER_LEASE_TTL,
+    max_session_age=BROKER_MAX_SESSION_AGE,
+    logger=logger
+)
+
+def _maintenance_loop(stop: threading.Event):
+    """Repone y mantiene vivas las sesiones calentadas hasta que se detiene el servidor."""
+    while not stop.is_set():
+        try:
+            broker.keepalive()
+            broker.refill()
+        except Exception as e:
+            logger.warning(f"Error en el mantenimiento del broker: {e}")
+        stop.wait(BROKER_KEEPALIVE_INTERVAL)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    for locale in filter(None, (item.strip() for item in BROKER_LOCALES.split(','))):
+        broker.add_locale(*locale.split(':'))
+    stop = threading.Event()
+    worker = threading.Thread(target=_maintenance_loop, args=(stop,), daemon=True)
+    worker.start()
+    yield
+    stop.set()
+    broker.close()
+
+app = FastAPI(
+    title="Broker de Sesiones de Navegador",
+    description="Presta sesiones de Selenium Grid ya calentadas por país e idioma a los trabajos de Scrapyd.",
+    lifespan=lifespan
+)
+
+class LeaseRequest(BaseModel):
+    site: str
+    country: str = 'co'
+    lang: str = 'es'
+
+@app.get("/", summary="Estado del broker")
+def read_status():
+    """Sesiones libres y prestadas por idioma, y contadores de préstamos."""
+    return broker.status()
+
+@app.post("/leases", summary="Pedir prestada una sesión")
+def lease_session(request: LeaseRequest):
+    """
+    Presta una sesión calentada para el sitio, país e idioma indicados.
+
+    Si no hay una libre, se crea y calienta en el momento (`warm=False`).
+    La respuesta incluye el `session_id` del Grid al que se adjunta la araña.
+    """
+    try:
+        return broker.lease(request.site, request.country, request.lang)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"No se pudo crear una sesión: {e}")
+
+@app.delete("/leases/{lease_id}", summary="Devolver una sesión prestada")
+def release_session(lease_id: str, reusable: Optional[bool] = True):
+    """Devuelve una sesión. Con `reusable=false` el broker la cierra en lugar de guardarla."""
+    if not broker.release(lease_id, reusable=bool(reusable)):
+        raise HTTPException(status_code=404, detail="Préstamo no encontrado.")
+    return {"status": "released"}
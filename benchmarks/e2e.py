@@ -0,0 +1,393 @@
+"""
+Benchmark de extremo a extremo sin sitios ni Selenium Grid.
+
+Reproduce un corpus de renders grabados (menú, categorías y productos) a
+través de la araña real, los ItemLoaders y toda la cadena de `ITEM_PIPELINES`,
+contra `mongomock` o un mongod local. El corpus es la caché de páginas de
+`SeleniumMiddleware` (`stylos.cache.RenderedPageCache`), grabada con:
+
+    scrapy crawl zara -s PAGE_CACHE_MODE=record -s PAGE_CACHE_PATH=corpus.sqlite3
+
+Cada corrida se hace en un proceso limpio con `PAGE_CACHE_MODE=replay` (no se
+abre ningún navegador) y reporta:
+
+- Items por segundo y tiempo de CPU por item.
+- RSS máximo del proceso.
+- Memoria máxima asignada por Python (`tracemalloc`, en una corrida aparte para
+  no distorsionar los tiempos) y los sitios que más memoria asignan.
+
+Sin un corpus grabado, `--synthetic` genera uno con la forma de las páginas
+reales (útil en CI y para comparar cambios en parseo y pipelines).
+
+Con `--mock-site`, en cambio, se rastrea de verdad con Chrome sin ventana
+(`SELENIUM_MODE=local`) la tienda falsa de `benchmarks/mock_retailer.py`,
+servida localmente con la latencia de `--latency-ms`: mide el camino completo
+de Selenium y los extractors sin acceso a la red.
+
+Uso:
+    python benchmarks/e2e.py --corpus corpus.sqlite3 [--spider zara] [--runs 3]
+    python benchmarks/e2e.py --synthetic 20x50 [--save-baseline benchmarks/baseline.json]
+    python benchmarks/e2e.py --synthetic 20x50 --baseline benchmarks/baseline.json [--tolerance 0.1]
+    python benchmarks/e2e.py --mock-site 4x24 [--latency-ms 80] [--sessions 4] --no-allocations
+    python benchmarks/e2e.py --mock-site 4x24 --color-fanout  # compara el reparto de colores
+
+Con `--baseline`, termina con código 1 si alguna métrica empeora más que
+`--tolerance` respecto de la línea base guardada con `--save-baseline`.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+from contextlib import ExitStack
+from functools import partial
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks.mock_retailer import MockRetailer  # noqa: E402
+
+# Métricas comparadas con la línea base: `{métrica: True si más alto es mejor}`
+COMPARED_METRICS = {
+    'items_per_second': True,
+    'cpu_ms_per_item': False,
+    'peak_rss_mb': False,
+    'alloc_peak_mb': False,
+}
+
+# Corre un rastreo completo en modo replay y devuelve sus métricas como JSON
+CHILD_SCRIPT = """
+import json, resource, sys, time, tracemalloc
+options = json.loads(sys.argv[1])
+import pymongo
+if options['mongo_uri']:
+    pymongo.MongoClient(options['mongo_uri']).drop_database(options['settings']['MONGO_DATABASE'])
+else:
+    import mongomock
+    pymongo.MongoClient = mongomock.MongoClient
+
+from scrapy.crawler import CrawlerProcess
+from scrapy.settings import Settings
+import stylos.settings as project_settings
+
+settings = Settings()
+settings.setmodule(project_settings, priority='project')
+settings.setdict(options['settings'], priority='cmdline')
+process = CrawlerProcess(settings, install_root_handler=False)
+crawler = process.create_crawler(options['spider'])
+process.crawl(crawler, **options['spider_args'])
+
+# Solo se trazan las asignaciones del rastreo, no las importaciones
+if options['allocations']:
+    tracemalloc.start()
+before = resource.getrusage(resource.RUSAGE_SELF)
+started = time.perf_counter()
+process.start()
+elapsed = time.perf_counter() - started
+after = resource.getrusage(resource.RUSAGE_SELF)
+
+report = {
+    'elapsed': elapsed,
+    'cpu': (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime),
+    'peak_rss_kb': after.ru_maxrss,
+    'stats': {key: value for key, value in crawler.stats.get_stats().items() if isinstance(value, (int, float))},
+}
+if options['allocations']:
+    report['alloc_peak'] = tracemalloc.get_traced_memory()[1]
+    top = tracemalloc.take_snapshot().statistics('lineno')[:options['top']]
+    report['alloc_top'] = [[str(stat.traceback[0]), stat.size] for stat in top]
+print(json.dumps(report))
+"""
+
+
+def replay_settings(corpus: str, workdir: str, mongo_uri=None) -> dict:
+    """Settings del rastreo reproducido: sin navegador, red, esperas ni servicios externos."""
+    return {
+        'PAGE_CACHE_MODE': 'replay',
+        'PAGE_CACHE_PATH': os.path.abspath(corpus),
+        'PAGE_CACHE_TTL': 0,
+        **isolated_settings(workdir, mongo_uri),
+    }
+
+
+def browser_settings(workdir: str, mongo_uri=None, sessions: int = 4) -> dict:
+    """Settings del rastreo con Chrome local sin ventana contra la tienda falsa."""
+    return {
+        'PAGE_CACHE_MODE': 'off',
+        'SELENIUM_MODE': 'local',
+        'SELENIUM_HEADLESS': True,
+        'SELENIUM_POOL_SIZE': sessions,
+        'BROWSER_DISK_CACHE_DIR': None,
+        **isolated_settings(workdir, mongo_uri),
+        'CONCURRENT_REQUESTS': sessions,
+        'CONCURRENT_REQUESTS_PER_DOMAIN': sessions,
+    }
+
+
+def isolated_settings(workdir: str, mongo_uri=None) -> dict:
+    """Settings comunes: sin cachés persistentes, esperas ni servicios externos."""
+    return {
+        'MENU_CACHE_ENABLED': False,
+        'IMAGE_CACHE_ENABLED': False,
+        'BROWSER_PROFILE_ENABLED': False,
+        'SELENIUM_GRID_AUTOSCALE': False,
+        'SLOT_THROTTLE_ENABLED': False,
+        'DOWNLOAD_DELAY': 0,
+        'CONCURRENT_REQUESTS': 16,
+        'CONCURRENT_REQUESTS_PER_DOMAIN': 16,
+        'RUN_LEDGER_ENABLED': False,
+        'SENTRY_DSN': '',
+        'TELNETCONSOLE_ENABLED': False,
+        'STAGE_METRICS_DIR': os.path.join(workdir, 'metrics'),
+        'STAGE_METRICS_LIVE_DIR': os.path.join(workdir, 'live'),
+        'MONGO_URI': mongo_uri or 'mongodb://mongomock',
+        'MONGO_DATABASE': 'stylos_benchmark',
+        'LOG_LEVEL': 'ERROR',
+    }
+
+
+def run_once(spider: str, corpus=None, spider_args=None, mongo_uri=None, allocations=False, top=10,
+             base_url=None, sessions=4, settings=None) -> dict:
+    """
+    Rastrea en un proceso limpio y devuelve sus tiempos, memoria y estadísticas.
+
+    Reproduce el `corpus` grabado o, con `base_url`, rastrea con Chrome la
+    tienda falsa que se sirve en esa URL con `sessions` sesiones. `settings`
+    se aplica sobre los del modo elegido (ej. `{'COLOR_FANOUT_ENABLED': True}`).
+    """
+    with tempfile.TemporaryDirectory() as workdir:
+        if base_url:
+            crawl_settings = browser_settings(workdir, mongo_uri, sessions)
+            spider_args = dict(spider_args or {}, base_url=base_url)
+        else:
+            crawl_settings = replay_settings(corpus, workdir, mongo_uri)
+        options = {
+            'spider': spider,
+            'spider_args': spider_args or {},
+            'settings': {**crawl_settings, **(settings or {})},
+            'mongo_uri': mongo_uri,
+            'allocations': allocations,
+            'top': top,
+        }
+        env = dict(os.environ, PYTHONPATH=str(PROJECT_ROOT), SENTRY_DSN='')
+        result = subprocess.run(
+            [sys.executable, '-c', CHILD_SCRIPT, json.dumps(options)],
+            cwd=workdir, env=env, capture_output=True, text=True
+        )
+    if result.returncode != 0:
+        raise RuntimeError(f"El rastreo de '{spider}' falló:\n{result.stderr[-2000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def summarize(reports, allocation_report=None) -> dict:
+    """Métricas de un conjunto de corridas (medianas de tiempos, máximos de memoria)."""
+    items = reports[0]['stats'].get('item_scraped_count', 0)
+    summary = {
+        'items': items,
+        'runs': len(reports),
+        'items_per_second': round(statistics.median(items / r['elapsed'] for r in reports), 1) if items else 0.0,
+        'cpu_ms_per_item': round(statistics.median(r['cpu'] * 1000 / items for r in reports), 3) if items else None,
+        'peak_rss_mb': round(max(r['peak_rss_kb'] for r in reports) / 1024, 1),
+        'dropped': reports[0]['stats'].get('item_dropped_count', 0),
+        'errors': reports[0]['stats'].get('log_count/ERROR', 0),
+    }
+    stages = {}
+    for key, value in reports[-1]['stats'].items():
+        if key.startswith('latency/') and key.endswith(('/p50_ms', '/p95_ms')):
+            stages[key[len('latency/'):]] = value
+    summary['stages'] = stages
+    if allocation_report is not None:
+        summary['alloc_peak_mb'] = round(allocation_report['alloc_peak'] / 1024 / 1024, 1)
+        summary['alloc_top'] = allocation_report['alloc_top']
+    return summary
+
+
+def compare(current: dict, baseline: dict, tolerance: float = 0.1) -> list:
+    """
+    Compara las métricas de cada araña con la línea base.
+
+    Returns:
+        Lista de `(araña, métrica, base, actual, cambio, regresión)`.
+    """
+    rows = []
+    for spider, metrics in current.items():
+        reference = baseline.get('spiders', {}).get(spider)
+        if not reference:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            value, base = metrics.get(metric), reference.get(metric)
+            if value is None or not base:
+                continue
+            change = (value - base) / base
+            regressed = change < -tolerance if higher_is_better else change > tolerance
+            rows.append((spider, metric, base, value, round(change, 3), regressed))
+    return rows
+
+
+def synthesize_corpus(path: str, spider: str, categories: int = 10, products: int = 50, page_kb: int = 100) -> int:
+    """
+    Genera un corpus con la forma de las páginas reales de `spider` ('co'/'es').
+
+    El menú enlaza `categories` categorías y cada una `products` productos
+    distintos; cada página lleva ~`page_kb` KB de HTML de relleno, del orden de
+    lo que devuelve `page_source`. Devuelve la cantidad de renders guardados.
+    """
+    from scrapy import Request
+    from scrapy.utils.request import fingerprint
+
+    from stylos.cache import RenderedPageCache
+
+    cache = RenderedPageCache(path, ttl=0)
+    padding = '<div class="filler">' + 'x' * 1000 + '</div>'
+    filler = padding * page_kb
+    stored = 0
+
+    def store(url, extraction_type, meta, body='', variant=None):
+        nonlocal stored
+        html = f'<html><body>{body}{filler}</body></html>'
+        cache.store(fingerprint(Request(url)).hex(), extraction_type, url, html, meta, variant=variant)
+        stored += 1
+
+    if spider == 'zara':
+        menu_urls = ['https://www.zara.com/co/es/']
+        category = lambda c: f'/co/es/categoria-{c}-l{1000 + c}.html'
+        product = lambda c, p: f'/co/es/producto-{c}-{p}-p{c * 100000 + p:08d}.html'
+        grid = lambda links: ''.join(f'<li class="products-category-grid-block"><a href="{href}">p</a></li>' for href in links)
+        base = 'https://www.zara.com'
+    else:
+        menu_urls = ['https://shop.mango.com/co/es/h/mujer', 'https://shop.mango.com/co/es/h/hombre']
+        category = lambda c: f'/co/es/c/mujer/categoria-{c}'
+        product = lambda c, p: f'/co/es/p/mujer/producto-{c}-{p}_{c * 100000 + p:08d}'
+        grid = lambda links: ('<ul class="Grid_grid__fLhp5 Grid_standard__xt7_3">'
+                              + ''.join(f'<li><a href="{href}">p</a></li>' for href in links) + '</ul>')
+        base = 'https://shop.mango.com'
+
+    for index, menu_url in enumerate(menu_urls):
+        # Cada URL del menú enlaza su parte de las categorías
+        own = [category(c) for c in range(categories) if c % len(menu_urls) == index]
+        store(menu_url, 'menu', {'extracted_urls': own})
+    for c in range(categories):
+        links = [product(c, p) for p in range(products)]
+        store(base + category(c), 'category', {}, grid(links))
+        for p, href in enumerate(links):
+            images = {
+                color: [{'src': f'https://static.example.com/{c}/{p}/{color}/{i}.jpg', 'alt': color,
+                         'type': 'product_image'} for i in range(6)]
+                for color in ('NEGRO', 'BLANCO')
+            }
+            meta = {
+                'product_data': {
+                    'name': f'PRODUCTO {c}-{p}', 'description': 'Prenda de algodón. ' * 10,
+                    'prices': ['199.900 COP', '139.900 COP'] if p % 3 == 0 else ['139.900 COP'],
+                    'currency': 'COP', 'current_color': 'NEGRO',
+                },
+                'extracted_images': images,
+            }
+            for extraction_type in ('product', 'price'):
+                store(base + href, extraction_type, meta)
+            # Un producto de cada dos reparte sus colores en peticiones sobre la misma URL
+            variants = [{'index': i, 'color': color, 'url': None} for i, color in enumerate(images)] if p % 2 else []
+            store(base + href, 'variants', {**meta, 'color_variants': variants})
+            for variant in variants:
+                store(base + href, 'color', {'extracted_images': {variant['color']: images[variant['color']]}},
+                      variant=str(variant['index']))
+    cache.close()
+    return stored
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reproduce un corpus grabado a través de la araña y las pipelines.")
+    parser.add_argument('--spider', action='append', choices=('zara', 'mango'), help="Araña a medir (repetible)")
+    parser.add_argument('--corpus', default='.stylos_cache/pages.sqlite3', help="Caché de páginas grabada")
+    parser.add_argument('--synthetic', metavar='CATEGORÍASxPRODUCTOS', help="Genera un corpus sintético (ej. 20x50)")
+    parser.add_argument('--page-kb', type=int, default=100, help="KB de HTML por página del corpus sintético")
+    parser.add_argument('--mock-site', metavar='CATEGORÍASxPRODUCTOS',
+                        help="Rastrea con Chrome sin ventana una tienda falsa local (ej. 4x24)")
+    parser.add_argument('--latency-ms', type=float, default=80, help="Demora de cada página de la tienda falsa")
+    parser.add_argument('--sessions', type=int, default=4, help="Sesiones de Chrome contra la tienda falsa")
+    parser.add_argument('--color-fanout', action='store_true', help="Reparte los colores en peticiones (COLOR_FANOUT_ENABLED)")
+    parser.add_argument('--country', default=None, help="País con que se grabó el corpus (-a country)")
+    parser.add_argument('--lang', default=None, help="Idioma con que se grabó el corpus (-a lang)")
+    parser.add_argument('--mongo-uri', default=None, help="mongod local; sin él se usa mongomock")
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--no-allocations', action='store_true', help="Omite la corrida con tracemalloc")
+    parser.add_argument('--top', type=int, default=5, help="Sitios de asignación a mostrar")
+    parser.add_argument('--save-baseline', metavar='ARCHIVO')
+    parser.add_argument('--baseline', metavar='ARCHIVO')
+    parser.add_argument('--tolerance', type=float, default=0.1, help="Empeoramiento tolerado frente a la línea base")
+    args = parser.parse_args()
+
+    spiders = args.spider or ['zara', 'mango']
+    spider_args = {name: value for name, value in (('country', args.country), ('lang', args.lang)) if value}
+
+    with tempfile.TemporaryDirectory() as workdir:
+        corpus = args.corpus
+        if args.mock_site:
+            corpus = None
+        elif args.synthetic:
+            categories, _, products = args.synthetic.partition('x')
+            corpus = os.path.join(workdir, 'corpus.sqlite3')
+            for spider in spiders:
+                synthesize_corpus(corpus, spider, int(categories), int(products or 50), args.page_kb)
+        elif not os.path.exists(corpus):
+            parser.error(f"No existe el corpus {corpus}; grábalo con PAGE_CACHE_MODE=record o usa --synthetic")
+
+        results = {}
+        for spider in spiders:
+            with ExitStack() as stack:
+                base_url = None
+                if args.mock_site:
+                    categories, _, products = args.mock_site.partition('x')
+                    base_url = stack.enter_context(MockRetailer(
+                        site=spider, latency=args.latency_ms / 1000, categories=int(categories),
+                        products=int(products or 24))).base_url
+                run = partial(run_once, spider, corpus, spider_args, args.mongo_uri, base_url=base_url, sessions=args.sessions,
+                              settings={'COLOR_FANOUT_ENABLED': args.color_fanout})
+                reports = [run() for _ in range(args.runs)]
+                allocation_report = None if args.no_allocations else run(allocations=True, top=args.top)
+            results[spider] = summarize(reports, allocation_report)
+
+    if args.mock_site:
+        source = f"tienda falsa {args.mock_site} ({args.latency_ms:g} ms por página, {args.sessions} sesiones de Chrome)"
+    else:
+        source = 'sintético ' + args.synthetic if args.synthetic else corpus
+    print(f"Corpus: {source} — MongoDB: {args.mongo_uri or 'mongomock'}")
+    for spider, summary in results.items():
+        print(f"\n{spider}: {summary['items']} items ({summary['dropped']} descartados, {summary['errors']} errores), {summary['runs']} corridas")
+        print(f"  {summary['items_per_second']:10.1f} items/s")
+        if summary['cpu_ms_per_item'] is not None:
+            print(f"  {summary['cpu_ms_per_item']:10.3f} ms de CPU por item")
+        print(f"  {summary['peak_rss_mb']:10.1f} MB de RSS máximo")
+        if 'alloc_peak_mb' in summary:
+            print(f"  {summary['alloc_peak_mb']:10.1f} MB asignados como máximo (tracemalloc)")
+            for site, size in summary['alloc_top']:
+                print(f"  {size / 1024:10.1f} KB  {site}")
+        for stage, value in sorted(summary['stages'].items()):
+            print(f"  {value:10.2f} ms  {stage}")
+
+    if args.save_baseline:
+        corpus_name = f"mock {args.mock_site}" if args.mock_site else args.synthetic or os.path.basename(corpus)
+        baseline = {'python': platform.python_version(), 'corpus': corpus_name,
+                    'spiders': {spider: {metric: summary.get(metric) for metric in COMPARED_METRICS}
+                                for spider, summary in results.items()}}
+        Path(args.save_baseline).write_text(json.dumps(baseline, indent=2) + '\n')
+        print(f"\nLínea base guardada en {args.save_baseline}")
+
+    if args.baseline:
+        rows = compare(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        print(f"\nComparación con {args.baseline} (tolerancia {args.tolerance:.0%}):")
+        for spider, metric, base, value, change, regressed in rows:
+            flag = '❌ REGRESIÓN' if regressed else ''
+            print(f"  {spider:<6} {metric:<18} {base:>10} → {value:>10} ({change:+.1%}) {flag}")
+        if any(row[-1] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
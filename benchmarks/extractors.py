@@ -0,0 +1,140 @@
+"""
+Benchmark de viajes de ida y vuelta y tiempo de los extractors.
+
+Ejecuta los métodos públicos de los extractors (`extract_menu_data`,
+`extract_category_data`, `extract_product_data`) contra páginas guardadas en
+`tests/samples/` mediante `FakeWebDriver` (ver `benchmarks/fake_webdriver.py`):
+sin navegador y sin dormir de verdad. Cada comando de WebDriver cuesta
+`--latency` segundos virtuales, como la latencia de red hacia un Selenium Grid
+remoto, y las pausas de los extractors se suman al mismo reloj.
+
+Para cada escenario informa los viajes de ida y vuelta (comandos de WebDriver),
+los segundos virtuales (latencia + pausas) y los comandos por método del
+extractor, y los compara con `BUDGETS`. Un extractor que agrega un
+`find_elements` dentro de un bucle o una pausa de más se nota aquí antes que
+en el Grid.
+
+Uso:
+    python benchmarks/extractors.py [--scenario zara/product] [--latency 0.02] [--verbose]
+
+Termina con código 1 si algún escenario supera su presupuesto.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks.fake_webdriver import FakeWebDriver, VirtualClock  # noqa: E402
+from stylos.extractors import ExtractorRegistry  # noqa: E402
+from stylos.instrumentation import CommandTrace, instrument_driver  # noqa: E402
+
+SAMPLES_DIR = PROJECT_ROOT / 'tests' / 'samples'
+# Latencia por comando hacia un Grid en otra zona de la nube
+DEFAULT_LATENCY = 0.02
+
+
+def zara_select_color(driver: FakeWebDriver, node) -> None:
+    """Al hacer clic en un botón de color de Zara, el nombre del color seleccionado cambia."""
+    code = node.get('data-color-code')
+    if code is None:
+        return
+    for name_node in driver.document.find_class('product-color-extended-name'):
+        name_node.text = f"{node.get('aria-label')} | {code}"
+
+
+SCENARIOS: Dict[str, Dict[str, Any]] = {
+    'zara/menu': {
+        'spider': 'zara', 'method': 'extract_menu_data', 'sample': 'zara_menu.html',
+        'url': 'https://www.zara.com/co/es/',
+    },
+    'zara/category': {
+        'spider': 'zara', 'method': 'extract_category_data', 'sample': 'zara_category.html',
+        'url': 'https://www.zara.com/co/es/mujer-vestidos-l1066.html',
+        # Dos tandas más de productos antes de llegar al final
+        'page_heights': (4000, 8000, 12000),
+    },
+    'zara/product': {
+        'spider': 'zara', 'method': 'extract_product_data', 'sample': 'zara_pdp.html',
+        'url': 'https://www.zara.com/co/es/camisa-oversize-p02495111.html',
+        'on_click': zara_select_color,
+    },
+}
+
+# Presupuestos por escenario con la latencia por defecto
+BUDGETS: Dict[str, Dict[str, float]] = {
+    'zara/menu': {'round_trips': 2, 'virtual_seconds': 0.05},
+    'zara/category': {'round_trips': 7, 'virtual_seconds': 6.2},
+    'zara/product': {'round_trips': 186, 'virtual_seconds': 15.5},
+}
+
+
+def run_scenario(name: str, latency: float = DEFAULT_LATENCY) -> Dict[str, Any]:
+    """
+    Ejecuta un escenario sobre `FakeWebDriver` y mide sus comandos y su tiempo virtual.
+
+    Returns:
+        dict: 'result' (lo que devolvió el extractor), 'round_trips', 'virtual_seconds',
+        'slept' (segundos de pausa) y el detalle de la traza en 'commands' y 'methods'.
+    """
+    scenario = SCENARIOS[name]
+    clock = VirtualClock()
+    driver = FakeWebDriver(
+        (SAMPLES_DIR / scenario['sample']).read_text(encoding='utf-8'), scenario['url'], clock=clock,
+        latency=latency, page_heights=scenario.get('page_heights', (3000,)), on_click=scenario.get('on_click'),
+    )
+    trace = instrument_driver(driver).trace = CommandTrace()
+    spider = type('Spider', (), {'name': scenario['spider'], 'lang': 'es', 'log': lambda self, message: None})()
+    extractor = ExtractorRegistry.get_extractor(scenario['spider'], driver, spider)
+
+    with clock.patched():
+        result = getattr(extractor, scenario['method'])()
+
+    summary = trace.to_dict()
+    return {
+        'scenario': name,
+        'result': result,
+        'round_trips': trace.total_count,
+        'virtual_seconds': round(clock.now, 3),
+        'slept': round(clock.slept, 3),
+        'commands': summary['commands'],
+        'methods': summary['methods'],
+    }
+
+
+def over_budget(report: Dict[str, Any], budget: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    """Métricas del informe que superan el presupuesto del escenario: `{métrica: exceso}`."""
+    budget = budget if budget is not None else BUDGETS.get(report['scenario'], {})
+    return {metric: report[metric] - limit for metric, limit in budget.items() if report[metric] > limit + 1e-9}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mide los comandos de WebDriver y el tiempo virtual de los extractors.")
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help="Escenario a medir (por defecto, todos); se puede repetir")
+    parser.add_argument('--latency', type=float, default=DEFAULT_LATENCY, help="Segundos virtuales por comando")
+    parser.add_argument('--verbose', action='store_true', help="Muestra los comandos por método del extractor")
+    args = parser.parse_args()
+
+    failures = 0
+    for name in args.scenario or sorted(SCENARIOS):
+        report = run_scenario(name, args.latency)
+        budget = BUDGETS.get(name, {})
+        exceeded = over_budget(report, budget) if args.latency == DEFAULT_LATENCY else {}
+        failures += bool(exceeded)
+        print(f"{'❌' if exceeded else '✅'} {name:<15} {report['round_trips']:4d} comandos "
+              f"(máx. {budget.get('round_trips', '-')})  {report['virtual_seconds']:7.2f} s virtuales "
+              f"(máx. {budget.get('virtual_seconds', '-')}, {report['slept']:.2f} s en pausas)")
+        if args.verbose:
+            for method, entry in sorted(report['methods'].items(), key=lambda item: -item[1]['count']):
+                print(f"      {method:<50} {entry['count']:4d}  {entry['time_ms'] / 1000:7.2f} s")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,301 @@
+"""
+WebDriver falso respaldado por un HTML guardado, con latencia y tiempo virtuales.
+
+Los mocks de `tests/test_zara_extractor.py` verifican la lógica de un
+extractor, pero no cuántos viajes de ida y vuelta al navegador hace ni cuánto
+duerme. `FakeWebDriver` interpreta el documento con lxml e implementa lo que
+usan los extractors: `get`, `find_element(s)` (CSS y XPath), `page_source`,
+`current_url`, `execute_script` para los scripts de scroll y clic, y los
+elementos con `text`, `get_attribute`, `click`, `is_displayed`...
+
+Cada comando pasa por `command_executor.execute`, igual que en Selenium, así
+que `stylos.instrumentation` lo cuenta y lo atribuye al método del extractor.
+Cada comando suma su latencia configurada a un `VirtualClock`; con el reloj
+parcheado, `time.sleep` (de `BaseExtractor.sleep` y de `WebDriverWait`) solo
+avanza el tiempo virtual y no bloquea.
+
+Uso:
+    clock = VirtualClock()
+    driver = FakeWebDriver(html, url, clock=clock, latency=0.02)
+    with clock.patched():
+        ZaraExtractor(driver, spider).extract_product_data()
+    clock.now  # segundos virtuales: latencia de los comandos + pausas
+"""
+
+import re
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence
+from urllib.parse import urljoin
+
+from lxml import html as lxml_html
+from lxml.cssselect import CSSSelector
+from selenium.common.exceptions import NoSuchElementException, WebDriverException
+from selenium.webdriver.common.by import By
+
+# Scripts anotados con los que Selenium implementa algunos comandos de elemento
+GET_ATTRIBUTE_SCRIPT = '/* getAttribute */return (function(element, name) { /* átomo de Selenium */ }).apply(null, arguments);'
+IS_DISPLAYED_SCRIPT = '/* isDisplayed */return (function(element) { /* átomo de Selenium */ }).apply(null, arguments);'
+
+SCROLL_TO = re.compile(r'window\.scrollTo\(\s*0\s*,\s*(.+?)\s*\)\s*;?\s*$')
+# Atributos que Selenium devuelve como propiedad, es decir, como URL absoluta
+URL_ATTRIBUTES = ('href', 'src')
+
+
+class VirtualClock:
+    """
+    Reloj que solo avanza con la latencia de los comandos y con `sleep`.
+
+    `patched()` reemplaza `time.sleep`, `time.monotonic` y `time.perf_counter`
+    mientras está activo, de modo que las esperas de los extractors y de
+    `WebDriverWait` no bloquean y la instrumentación mide tiempo virtual.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+        self.slept = 0.0
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+    def sleep(self, seconds: float) -> None:
+        self.slept += seconds
+        self.advance(seconds)
+
+    def monotonic(self) -> float:
+        return self.now
+
+    @contextmanager
+    def patched(self):
+        """Parchea el módulo `time` con este reloj mientras dura el bloque."""
+        originals = {name: getattr(time, name) for name in ('sleep', 'monotonic', 'perf_counter')}
+        time.sleep = self.sleep
+        time.monotonic = time.perf_counter = self.monotonic
+        try:
+            yield self
+        finally:
+            for name, function in originals.items():
+                setattr(time, name, function)
+
+
+class FakeExecutor:
+    """`command_executor` que cobra la latencia de cada comando y lo resuelve contra el documento."""
+
+    def __init__(self, driver: 'FakeWebDriver'):
+        self.driver = driver
+
+    def execute(self, command, params):
+        driver = self.driver
+        driver.clock.advance(driver.command_latency.get(command, driver.latency))
+        return {'value': driver.respond(command, params)}
+
+
+class FakeWebElement:
+    """Elemento de `FakeWebDriver`: un nodo de lxml cuyas lecturas son comandos."""
+
+    def __init__(self, driver: 'FakeWebDriver', node):
+        self._driver = driver
+        self.node = node
+
+    def __eq__(self, other):
+        return isinstance(other, FakeWebElement) and other.node is self.node
+
+    def __hash__(self):
+        return id(self.node)
+
+    def __repr__(self):
+        return f"<FakeWebElement {self.node.tag} {dict(self.node.attrib)}>"
+
+    def _execute(self, command, params=None):
+        return self._driver.execute(command, {'id': self, **(params or {})})
+
+    @property
+    def tag_name(self) -> str:
+        return self._execute('getElementTagName')
+
+    @property
+    def text(self) -> str:
+        return self._execute('getElementText')
+
+    def get_attribute(self, name: str) -> Optional[str]:
+        return self._driver.execute('executeScript', {'script': GET_ATTRIBUTE_SCRIPT, 'args': [self, name]})
+
+    def is_displayed(self) -> bool:
+        return self._driver.execute('executeScript', {'script': IS_DISPLAYED_SCRIPT, 'args': [self]})
+
+    def is_enabled(self) -> bool:
+        return self._execute('isElementEnabled')
+
+    def click(self) -> None:
+        self._execute('clickElement')
+
+    def find_element(self, by=By.ID, value=None) -> 'FakeWebElement':
+        return self._execute('findChildElement', {'using': by, 'value': value})
+
+    def find_elements(self, by=By.ID, value=None) -> List['FakeWebElement']:
+        return self._execute('findChildElements', {'using': by, 'value': value})
+
+
+class FakeWebDriver:
+    """
+    WebDriver sobre un HTML guardado.
+
+    Args:
+        page_html (str): HTML de la página que se "renderiza".
+        url (str): URL actual; resuelve los `href`/`src` relativos.
+        clock (VirtualClock): Reloj virtual compartido (uno nuevo por defecto).
+        latency (float): Segundos virtuales de cada comando.
+        command_latency (dict): Latencia por comando (ej. `{'get': 1.5}`).
+        page_heights (Sequence[int]): Alturas sucesivas de `document.body.scrollHeight`;
+            cada scroll hasta el final pasa a la siguiente (scroll infinito).
+        pages (dict): HTML por URL para `get()`; las URLs ausentes conservan el documento.
+        on_click (Callable): `on_click(driver, node)` tras cada clic, para simular
+            cambios del DOM (ej. seleccionar un color).
+    """
+
+    VIEWPORT_HEIGHT = 900
+
+    def __init__(self, page_html: str, url: str = 'about:blank', clock: Optional[VirtualClock] = None,
+                 latency: float = 0.0, command_latency: Optional[Dict[str, float]] = None,
+                 page_heights: Sequence[int] = (3000,), pages: Optional[Dict[str, str]] = None,
+                 on_click: Optional[Callable] = None):
+        self.clock = clock or VirtualClock()
+        self.latency = latency
+        self.command_latency = command_latency or {}
+        self.page_heights = list(page_heights)
+        self.pages = pages or {}
+        self.on_click = on_click
+        self.command_executor = FakeExecutor(self)
+        self._url = url
+        self._load(page_html)
+
+    def _load(self, page_html: str) -> None:
+        self.document = lxml_html.document_fromstring(page_html)
+        self.scroll_y = 0
+        self._height_index = 0
+
+    # --- API de WebDriver ---
+
+    def execute(self, command, params=None):
+        return self.command_executor.execute(command, params or {})['value']
+
+    def get(self, url: str) -> None:
+        self.execute('get', {'url': url})
+
+    @property
+    def current_url(self) -> str:
+        return self.execute('getCurrentUrl')
+
+    @property
+    def page_source(self) -> str:
+        return self.execute('getPageSource')
+
+    def find_element(self, by=By.ID, value=None) -> FakeWebElement:
+        return self.execute('findElement', {'using': by, 'value': value})
+
+    def find_elements(self, by=By.ID, value=None) -> List[FakeWebElement]:
+        return self.execute('findElements', {'using': by, 'value': value})
+
+    def execute_script(self, script: str, *args):
+        return self.execute('executeScript', {'script': script, 'args': list(args)})
+
+    # --- Respuestas del "navegador" ---
+
+    def respond(self, command: str, params: dict):
+        """Resuelve un comando contra el documento, como lo haría el navegador."""
+        element = params.get('id')
+        if command == 'get':
+            self._url = params['url']
+            if self._url in self.pages:
+                self._load(self.pages[self._url])
+            return None
+        if command == 'getCurrentUrl':
+            return self._url
+        if command == 'getPageSource':
+            return lxml_html.tostring(self.document, encoding='unicode')
+        if command in ('findElement', 'findElements'):
+            return self._find(self.document, params, single=command == 'findElement')
+        if command in ('findChildElement', 'findChildElements'):
+            return self._find(element.node, params, single=command == 'findChildElement')
+        if command == 'getElementText':
+            return self._text(element.node) if self._displayed(element.node) else ''
+        if command == 'getElementTagName':
+            return element.node.tag
+        if command == 'isElementEnabled':
+            return element.node.get('disabled') is None
+        if command == 'clickElement':
+            return self._click(element.node)
+        if command == 'executeScript':
+            return self._script(params['script'], params.get('args') or [])
+        raise WebDriverException(f"Comando no soportado por FakeWebDriver: {command}")
+
+    def _find(self, root, params, single: bool):
+        nodes = self._select(root, params['using'], params['value'])
+        elements = [FakeWebElement(self, node) for node in nodes]
+        if not single:
+            return elements
+        if not elements:
+            raise NoSuchElementException(f"Sin elementos para {params['using']}={params['value']!r}")
+        return elements[0]
+
+    @staticmethod
+    def _select(root, by: str, value: str) -> list:
+        if by == By.XPATH:
+            return [node for node in root.xpath(value) if isinstance(node, lxml_html.HtmlElement)]
+        if by == By.ID:
+            value = f'[id="{value}"]'
+        elif by == By.NAME:
+            value = f'[name="{value}"]'
+        elif by == By.CLASS_NAME:
+            value = f'.{value}'
+        elif by != By.CSS_SELECTOR and by != By.TAG_NAME:
+            raise WebDriverException(f"Estrategia de búsqueda no soportada por FakeWebDriver: {by}")
+        return CSSSelector(value)(root)
+
+    def _script(self, script: str, args: list):
+        if script == GET_ATTRIBUTE_SCRIPT:
+            node, name = args[0].node, args[1]
+            value = node.get(name)
+            if value is not None and name in URL_ATTRIBUTES:
+                value = urljoin(self._url, value)
+            return value
+        if script == IS_DISPLAYED_SCRIPT:
+            return self._displayed(args[0].node)
+        script = script.strip()
+        if script == 'return document.body.scrollHeight':
+            return self.page_heights[self._height_index]
+        if script == 'arguments[0].click();':
+            return self._click(args[0].node)
+        if script.startswith('arguments[0].scrollIntoView('):
+            return None
+        match = SCROLL_TO.match(script)
+        if match:
+            return self._scroll_to(match.group(1))
+        raise WebDriverException(f"Script no soportado por FakeWebDriver: {script[:80]}")
+
+    def _scroll_to(self, target: str) -> None:
+        height = self.page_heights[self._height_index]
+        self.scroll_y = height if target == 'document.body.scrollHeight' else int(float(target))
+        # Llegar al final de la página carga la siguiente tanda (scroll infinito)
+        if self.scroll_y + self.VIEWPORT_HEIGHT >= height and self._height_index < len(self.page_heights) - 1:
+            self._height_index += 1
+
+    def _click(self, node) -> None:
+        if self.on_click is not None:
+            self.on_click(self, node)
+
+    @staticmethod
+    def _displayed(node) -> bool:
+        for ancestor in node.iterancestors():
+            if not FakeWebDriver._visible(ancestor):
+                return False
+        return FakeWebDriver._visible(node)
+
+    @staticmethod
+    def _visible(node) -> bool:
+        style = (node.get('style') or '').replace(' ', '').lower()
+        return node.get('hidden') is None and 'display:none' not in style and 'visibility:hidden' not in style
+
+    @staticmethod
+    def _text(node) -> str:
+        return ' '.join(node.text_content().split())
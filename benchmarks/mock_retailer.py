@@ -0,0 +1,455 @@
+"""
+Tienda falsa local con la forma de Zara y Mango, para benchmarks con navegador.
+
+Sirve por HTTP, sin red, páginas generadas de forma determinista que se
+comportan como las reales en lo que importa a los extractors:
+
+- Zara: página de inicio con el diálogo de geolocalización y el menú
+  hamburguesa (los enlaces ya están en el DOM oculto), categorías con scroll
+  infinito, y productos con galería de carga diferida (`srcset` solo al entrar
+  en el viewport) y botones de color que cambian la galería.
+- Mango: secciones con los enlaces de categorías en el footer, categorías con
+  scroll infinito y productos con un enlace por color (`?c=<código>`).
+
+El catálogo tiene `categories` categorías de `products` productos cada una, y
+cada página HTML se demora `latency` segundos (las imágenes, `asset_latency`).
+Las arañas se apuntan a la tienda con `-a base_url=<URL>` (ver `BaseUrlMixin`):
+
+    python benchmarks/mock_retailer.py --site zara --categories 4 --products 48 --latency-ms 80
+    scrapy crawl zara -a base_url=http://127.0.0.1:8765 -s SELENIUM_MODE=local -s SELENIUM_HEADLESS=true
+
+`benchmarks/e2e.py --mock-site` levanta la tienda y mide el rastreo completo
+con Chrome sin ventana.
+"""
+
+import argparse
+import html
+import json
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+SITES = ('zara', 'mango')
+GARMENTS = ['CAMISA', 'VESTIDO', 'PANTALÓN', 'CHAQUETA', 'FALDA', 'JERSEY', 'BLAZER', 'CAMISETA']
+STYLES = ['OVERSIZE', 'MIDI', 'DE LINO', 'ESTAMPADO', 'SATINADO', 'RECTO', 'CROP', 'DE PUNTO']
+COLORS = [('NEGRO', '800'), ('BLANCO ROTO', '111'), ('AZUL MARINO', '401'), ('BEIGE', '710'), ('VERDE', '500')]
+# Textos del menú de Zara por idioma (los mismos que busca `ZaraExtractor`)
+ZARA_LABELS = {
+    'es': {'woman': 'MUJER', 'man': 'HOMBRE', 'open_menu': 'Abrir Menú', 'menu': 'Menú de categorías'},
+    'en': {'woman': 'WOMAN', 'man': 'MAN', 'open_menu': 'Open Menu', 'menu': 'Category Menu'},
+    'fr': {'woman': 'FEMME', 'man': 'HOMME', 'open_menu': 'Ouvrir le Menu', 'menu': 'Menu des catégories'},
+}
+MANGO_SECTIONS = ('mujer', 'hombre')
+PLACEHOLDER_PATH = '/stdstatic/transparent-background.png'
+# GIF de 1x1; los navegadores detectan el formato por el contenido
+PIXEL = b'GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!\xf9\x04\x01\x00\x00\x00\x00,\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;'
+
+STYLE = """<style>
+body{margin:0;font-family:sans-serif}
+.grid-item{height:420px}
+.gallery img{display:block;width:375px;height:560px}
+.zds-dialog__focus-trap{position:fixed;inset:0;background:rgba(0,0,0,.4)}
+</style>"""
+
+# Muestra las imágenes diferidas al acercarse al viewport
+LAZY_IMAGES_JS = """<script>
+function revealImages(){
+  document.querySelectorAll('img[data-lazy-srcset]').forEach(function(img){
+    var rect = img.getBoundingClientRect();
+    if (rect.top < window.innerHeight + 200 && rect.bottom > -200) {
+      img.srcset = img.dataset.lazySrcset;
+      img.src = img.dataset.lazySrc;
+      img.removeAttribute('data-lazy-srcset');
+    }
+  });
+}
+window.addEventListener('scroll', revealImages);
+document.addEventListener('DOMContentLoaded', revealImages);
+</script>"""
+
+# Agrega la siguiente tanda de productos al llegar al final de la grilla
+INFINITE_SCROLL_JS = """<script>
+(function(){
+  var config = JSON.parse(document.getElementById('grid-rest').textContent);
+  var grid = document.getElementById('grid'), loading = false;
+  window.addEventListener('scroll', function(){
+    if (loading || !config.items.length) return;
+    if (window.innerHeight + window.scrollY >= document.body.scrollHeight - 300) {
+      loading = true;
+      setTimeout(function(){
+        config.items.splice(0, config.page_size).forEach(function(item){ grid.insertAdjacentHTML('beforeend', item); });
+        loading = false;
+      }, config.delay_ms);
+    }
+  });
+})();
+</script>"""
+
+# Zara: botones de color que cambian el nombre y la galería; cierre del diálogo y del menú
+ZARA_PRODUCT_JS = """<script>
+(function(){
+  var colors = JSON.parse(document.getElementById('colors').textContent);
+  document.querySelectorAll('[data-color-index]').forEach(function(button){
+    button.addEventListener('click', function(){
+      var color = colors[button.dataset.colorIndex];
+      document.querySelectorAll('.product-color-extended-name').forEach(function(label){ label.textContent = color.label; });
+      document.getElementById('gallery').innerHTML = color.gallery;
+      revealImages();
+    });
+  });
+})();
+</script>"""
+
+ZARA_CHROME_JS = """<script>
+document.querySelectorAll("[data-qa-action='stay-in-store']").forEach(function(button){
+  button.addEventListener('click', function(){ document.querySelector('.zds-dialog__focus-trap').remove(); });
+});
+document.querySelectorAll('.layout-header-icon').forEach(function(button){
+  button.addEventListener('click', function(){
+    var panel = document.querySelector('.layout-menu');
+    panel.style.display = panel.style.display === 'none' ? 'block' : 'none';
+  });
+});
+document.querySelectorAll('.layout-categories-category__name').forEach(function(name){
+  name.addEventListener('click', function(){ name.parentNode.classList.toggle('is-open'); });
+});
+</script>"""
+
+
+class MockCatalog:
+    """
+    Catálogo determinista de la tienda falsa: mismo tamaño, mismos productos.
+
+    Las categorías pares son de mujer y las impares de hombre; el ID de cada
+    producto es `categoría * 100000 + posición`.
+    """
+
+    def __init__(self, site: str = 'zara', categories: int = 4, products: int = 24, colors: int = 3,
+                 images: int = 4, page_size: int = 12, scroll_delay: float = 0.3):
+        if site not in SITES:
+            raise ValueError(f"Sitio desconocido: '{site}' (opciones: {', '.join(SITES)})")
+        self.site = site
+        self.categories = categories
+        self.products = products
+        self.colors = min(colors, len(COLORS))
+        self.images = images
+        self.page_size = page_size
+        self.scroll_delay = scroll_delay
+
+    @property
+    def total_products(self) -> int:
+        return self.categories * self.products
+
+    def section(self, category: int) -> str:
+        return MANGO_SECTIONS[category % 2] if self.site == 'mango' else ('woman', 'man')[category % 2]
+
+    def category_path(self, category: int, country: str = 'co', lang: str = 'es') -> str:
+        if self.site == 'zara':
+            return f"/{country}/{lang}/categoria-{category}-l{1000 + category}.html"
+        return f"/{country}/{lang}/c/{self.section(category)}/categoria-{category}"
+
+    def product_path(self, category: int, position: int, country: str = 'co', lang: str = 'es') -> str:
+        product_id = category * 100000 + position
+        if self.site == 'zara':
+            return f"/{country}/{lang}/producto-{category}-{position}-p{product_id:08d}.html"
+        return f"/{country}/{lang}/p/{self.section(category)}/producto-{category}-{position}_{product_id:08d}"
+
+    def product(self, category: int, position: int) -> Dict:
+        """Datos del producto: nombre, precios, descripción y colores con sus imágenes."""
+        product_id = category * 100000 + position
+        price = 79_900 + (product_id * 7919 % 40) * 10_000
+        prices = [price]
+        if position % 3 == 0:
+            prices = [price, price * 6 // 10 // 100 * 100]
+        colors = [COLORS[(product_id + index) % len(COLORS)] for index in range(self.colors)]
+        return {
+            'id': product_id,
+            'name': f"{GARMENTS[product_id % len(GARMENTS)]} {STYLES[(product_id // 7) % len(STYLES)]}",
+            'prices': [f"{value:,}".replace(',', '.') + ' COP' for value in prices],
+            'description': f"Prenda de la colección {category}. Tejido de algodón. Referencia {product_id:08d}.",
+            'colors': [{'name': name, 'code': code} for name, code in colors],
+        }
+
+    def image_urls(self, origin: str, product_id: int, code: str) -> List[Tuple[str, str]]:
+        """URLs `(375w, 750w)` de cada imagen de un color."""
+        return [(f"{origin}/photos/{self.site}/{product_id}/{code}/w375/{index}.jpg",
+                 f"{origin}/photos/{self.site}/{product_id}/{code}/w750/{index}.jpg") for index in range(self.images)]
+
+    def parse(self, path: str) -> Optional[Tuple[str, dict]]:
+        """Identifica la página de `path`: `(tipo, parámetros)`, o `None` si no existe."""
+        if self.site == 'zara':
+            patterns = [
+                ('home', r'^/(?P<country>\w+)/(?P<lang>\w+)/?$'),
+                ('category', r'^/(?P<country>\w+)/(?P<lang>\w+)/categoria-(?P<category>\d+)-l\d+\.html$'),
+                ('product', r'^/(?P<country>\w+)/(?P<lang>\w+)/producto-(?P<category>\d+)-(?P<position>\d+)-p\d+\.html$'),
+            ]
+        else:
+            patterns = [
+                ('home', r'^/(?P<country>\w+)/(?P<lang>\w+)/?$'),
+                ('section', r'^/(?P<country>\w+)/(?P<lang>\w+)/h/(?P<section>\w+)$'),
+                ('category', r'^/(?P<country>\w+)/(?P<lang>\w+)/c/\w+/categoria-(?P<category>\d+)$'),
+                ('product', r'^/(?P<country>\w+)/(?P<lang>\w+)/p/\w+/producto-(?P<category>\d+)-(?P<position>\d+)_\d+$'),
+            ]
+        for kind, pattern in patterns:
+            match = re.match(pattern, path)
+            if match:
+                params = {key: int(value) if value.isdigit() else value for key, value in match.groupdict().items()}
+                if params.get('category', 0) >= self.categories or params.get('position', 0) >= self.products:
+                    return None
+                if kind == 'section' and params['section'] not in MANGO_SECTIONS:
+                    return None
+                return kind, params
+        return None
+
+    # --- Páginas ---
+
+    def render(self, path: str, query: dict, origin: str) -> Optional[str]:
+        """HTML de la página de `path`, o `None` si no existe."""
+        parsed = self.parse(path)
+        if parsed is None:
+            return None
+        kind, params = parsed
+        renderer = getattr(self, f"_{self.site}_{kind}")
+        return renderer(origin=origin, query=query, **params)
+
+    def _page(self, title: str, body: str, scripts: str = '') -> str:
+        return (f'<!DOCTYPE html>\n<html lang="es">\n<head><meta charset="utf-8"><title>{html.escape(title)}</title>'
+                f'{STYLE}</head>\n<body>\n{body}\n{LAZY_IMAGES_JS}{scripts}\n</body>\n</html>\n')
+
+    def _grid(self, items: List[str], list_html: str) -> str:
+        rest = json.dumps({'items': items[self.page_size:], 'page_size': self.page_size,
+                           'delay_ms': int(self.scroll_delay * 1000)})
+        return (list_html.format(items=''.join(items[:self.page_size]))
+                + f'<script type="application/json" id="grid-rest">{html.escape(rest, quote=False)}</script>')
+
+    def _gallery(self, origin: str, product_id: int, code: str, alt: str) -> str:
+        # La primera imagen llega cargada; el resto solo con scroll
+        images = []
+        for index, (small, large) in enumerate(self.image_urls(origin, product_id, code)):
+            srcset = f"{small} 375w, {large} 750w"
+            if index == 0:
+                images.append(f'<li><img alt="{alt} - {index + 1}" src="{large}" srcset="{srcset}"></li>')
+            else:
+                images.append(f'<li><img alt="{alt} - {index + 1}" src="{origin}{PLACEHOLDER_PATH}" '
+                              f'data-lazy-src="{large}" data-lazy-srcset="{srcset}"></li>')
+        return ''.join(images)
+
+    def _zara_home(self, origin, query, country, lang):
+        labels = ZARA_LABELS.get(lang, ZARA_LABELS['en'])
+        categories = []
+        for section in ('woman', 'man'):
+            links = ''.join(f'<li><a href="{self.category_path(c, country, lang)}">CATEGORÍA {c}</a></li>'
+                            for c in range(self.categories) if self.section(c) == section)
+            categories.append(f'<li class="layout-categories-category"><span class="layout-categories-category__name">'
+                              f'{labels[section]}</span><ul class="layout-categories-category__subcategory-main">{links}</ul></li>')
+        body = (f'<header class="layout-header"><button class="layout-header-icon" aria-label="{labels["open_menu"]}">'
+                f'<svg></svg></button></header>\n'
+                f'<div aria-label="{labels["menu"]}" class="layout-menu" style="display: none">'
+                f'<ul class="layout-categories">{"".join(categories)}</ul></div>\n'
+                '<div class="zds-dialog__focus-trap"><div class="geolocation-modal">'
+                '<button class="geolocation-modal__button" data-qa-action="stay-in-store">Seguir en esta tienda</button>'
+                '</div></div>')
+        return self._page('ZARA', body, ZARA_CHROME_JS)
+
+    def _zara_category(self, origin, query, country, lang, category):
+        items = []
+        for position in range(self.products):
+            product = self.product(category, position)
+            small, _ = self.image_urls(origin, product['id'], product['colors'][0]['code'])[0]
+            items.append(f'<li class="product-grid-product products-category-grid-block grid-item">'
+                         f'<a href="{self.product_path(category, position, country, lang)}">'
+                         f'<img alt="{product["name"]}" src="{small}"></a>'
+                         f'<span class="product-grid-product-info__name">{product["name"]}</span></li>')
+        body = self._grid(items, '<main class="product-groups"><ul class="product-grid" id="grid">{items}</ul></main>')
+        return self._page(f'CATEGORÍA {category} | ZARA', body, INFINITE_SCROLL_JS)
+
+    def _zara_product(self, origin, query, country, lang, category, position):
+        product = self.product(category, position)
+        colors = [dict(color, label=f"{color['name']} | {product['id'] % 10000:04d}/{color['code']}",
+                       gallery=self._gallery(origin, product['id'], color['code'], f"{product['name']} - {color['name']}"))
+                  for color in product['colors']]
+        selected = colors[0]
+        prices = ''.join(f'<span class="money-amount__main">{price}</span>' for price in product['prices'])
+        buttons = ''.join(f'<li><button aria-label="{color["name"]}" data-color-index="{index}"></button></li>'
+                          for index, color in enumerate(colors))
+        colors_json = json.dumps([{'label': color['label'], 'gallery': color['gallery']} for color in colors])
+        body = (f'<main class="product-detail-view">'
+                f'<ul class="product-detail-view__extra-images gallery" id="gallery">{selected["gallery"]}</ul>'
+                f'<div class="product-detail-info"><h1 class="product-detail-info__header-name">{product["name"]}</h1>'
+                f'<div class="product-detail-info__price-amount price">{prices}</div>'
+                f'<p class="product-color-extended-name product-detail-info__color">{selected["label"]}</p></div>'
+                f'<div class="product-detail-color-selector"><p class="product-color-extended-name '
+                f'product-detail-color-selector__selected-color-name">{selected["label"]}</p>'
+                f'<ul class="product-detail-color-selector__colors">{buttons}</ul></div>'
+                f'<div class="expandable-text__inner-content"><p>{product["description"]}</p></div></main>'
+                f'<script type="application/json" id="colors">{html.escape(colors_json, quote=False)}</script>')
+        return self._page(f'{product["name"]} | ZARA', body, ZARA_PRODUCT_JS)
+
+    def _mango_home(self, origin, query, country, lang):
+        return self._mango_section(origin, query, country, lang, MANGO_SECTIONS[0])
+
+    def _mango_section(self, origin, query, country, lang, section):
+        links = ''.join(f'<a href="{self.category_path(c, country, lang)}">Categoría {c}</a>'
+                        for c in range(self.categories) if self.section(c) == section)
+        body = f'<main style="height:2400px"></main><footer><div class="SeoBanner_root__8AHkS">{links}</div></footer>'
+        return self._page(f'{section.capitalize()} | MANGO', body)
+
+    def _mango_category(self, origin, query, country, lang, category):
+        items = []
+        for position in range(self.products):
+            product = self.product(category, position)
+            small, _ = self.image_urls(origin, product['id'], product['colors'][0]['code'])[0]
+            items.append(f'<li class="grid-item"><a href="{self.product_path(category, position, country, lang)}">'
+                         f'<img alt="{product["name"]}" src="{small}"></a></li>')
+        body = self._grid(items, '<ul class="Grid_grid__fLhp5 Grid_standard__xt7_3" id="grid">{items}</ul>')
+        return self._page(f'Categoría {category} | MANGO', body, INFINITE_SCROLL_JS)
+
+    def _mango_product(self, origin, query, country, lang, category, position):
+        product = self.product(category, position)
+        codes = [color['code'] for color in product['colors']]
+        code = query.get('c', [codes[0]])[0]
+        selected = product['colors'][codes.index(code)] if code in codes else product['colors'][0]
+        path = self.product_path(category, position, country, lang)
+        old_price = (f'<span class="SinglePrice_crossed__Pb9qF">{product["prices"][0]}</span>'
+                     if len(product['prices']) > 1 else '')
+        price = product['prices'][-1].split()[0].replace('.', '')
+        links = ''.join(f'<li><a href="{path}?c={color["code"]}" aria-label="{color["name"]}"></a></li>'
+                        for color in product['colors'])
+        body = (f'<section class="ProductDetail_pdp__WwWDn"><article>'
+                f'<ul class="ImageGrid_imageGrid__0lrrn gallery">'
+                f'{self._gallery(origin, product["id"], selected["code"], product["name"])}</ul>'
+                f'<h1 class="ProductDetail_title___WrC_ texts_titleL__7qeP6">{product["name"]}</h1>'
+                f'{old_price}<meta itemprop="price" content="{price}"><meta itemprop="priceCurrency" content="COP">'
+                f'<p class="ColorsSelector_label__ZeAk4">{selected["name"]}</p>'
+                f'<ul class="ColorList_list__9wB3E">{links}</ul>'
+                f'<div id="truncate-text"><p>{product["description"]}</p></div></article></section>')
+        return self._page(f'{product["name"]} | MANGO', body)
+
+
+class MockRetailer:
+    """
+    Servidor HTTP de la tienda falsa, en un hilo propio.
+
+    Uso:
+        with MockRetailer(site='zara', categories=2, products=30, latency=0.05) as shop:
+            scrapy ... -a base_url={shop.base_url}
+
+    Attributes:
+        hits (Counter): Respuestas servidas por tipo ('home', 'category', 'product', 'image'...).
+    """
+
+    def __init__(self, site: str = 'zara', host: str = '127.0.0.1', port: int = 0, latency: float = 0.0,
+                 asset_latency: float = 0.0, **catalog):
+        self.catalog = MockCatalog(site, **catalog)
+        self.latency = latency
+        self.asset_latency = asset_latency
+        self.hits: Counter = Counter()
+        self._hits_lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'MockRetailer':
+        self._thread = threading.Thread(target=self._server.serve_forever, name='mock-retailer', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> 'MockRetailer':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _count(self, kind: str) -> None:
+        with self._hits_lock:
+            self.hits[kind] += 1
+
+    def _handler_class(self):
+        retailer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                if parts.path.startswith('/photos/') or parts.path == PLACEHOLDER_PATH:
+                    time.sleep(retailer.asset_latency)
+                    retailer._count('image')
+                    return self._send(200, PIXEL, 'image/gif', cache=True)
+                time.sleep(retailer.latency)
+                origin = f"http://{self.headers.get('Host') or '%s:%s' % self.server.server_address[:2]}"
+                page = retailer.catalog.render(parts.path, parse_qs(parts.query), origin)
+                if page is None:
+                    retailer._count('not_found')
+                    return self._send(404, b'Not found', 'text/plain')
+                retailer._count(retailer.catalog.parse(parts.path)[0])
+                self._send(200, page.encode('utf-8'), 'text/html; charset=utf-8')
+
+            def _send(self, status, body, content_type, cache=False):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('Cache-Control', 'max-age=3600' if cache else 'no-store')
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sirve una tienda falsa con la forma de Zara o Mango.")
+    parser.add_argument('--site', choices=SITES, default='zara')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--categories', type=int, default=4)
+    parser.add_argument('--products', type=int, default=24, help="Productos por categoría")
+    parser.add_argument('--colors', type=int, default=3, help="Colores por producto")
+    parser.add_argument('--images', type=int, default=4, help="Imágenes por color")
+    parser.add_argument('--page-size', type=int, default=12, help="Productos por tanda del scroll infinito")
+    parser.add_argument('--latency-ms', type=float, default=0, help="Demora de cada página HTML")
+    parser.add_argument('--asset-latency-ms', type=float, default=0, help="Demora de cada imagen")
+    args = parser.parse_args()
+
+    retailer = MockRetailer(
+        site=args.site, host=args.host, port=args.port, latency=args.latency_ms / 1000,
+        asset_latency=args.asset_latency_ms / 1000, categories=args.categories, products=args.products,
+        colors=args.colors, images=args.images, page_size=args.page_size,
+    )
+    with retailer:
+        print(f"🛍️ Tienda falsa de {args.site} en {retailer.base_url} "
+              f"({retailer.catalog.total_products} productos). Ctrl+C para salir.")
+        print(f"   scrapy crawl {args.site} -a base_url={retailer.base_url} -s SELENIUM_MODE=local -s SELENIUM_HEADLESS=true")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+    print(f"Respuestas servidas: {dict(retailer.hits)}")
+
+
+if __name__ == '__main__':
+    main()
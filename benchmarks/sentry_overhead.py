@@ -0,0 +1,151 @@
+"""
+Benchmark del costo de Sentry por petición.
+
+Reproduce, sin navegador ni red, lo que Sentry agrega a cada petición de un
+rastreo: el breadcrumb de `SentryContextMiddleware`, la transacción del render
+con sus spans de navegación y extracción, el span de MongoDB del item y, cada
+tantas peticiones, una excepción con el contexto de la petición. Los eventos
+se entregan a un transporte en memoria que cuenta envíos y bytes.
+
+Compara tres modos:
+
+- `off`: sin `SENTRY_DSN` (los spans no hacen nada).
+- `sampled`: la configuración de `stylos/settings.py`.
+- `full`: todo al 100 % (trazas y breadcrumbs), como antes del muestreo.
+
+Uso:
+    python benchmarks/sentry_overhead.py [--requests 5000] [--error-every 200] [--max-overhead-us 50]
+
+Con `--max-overhead-us`, termina con código 1 si el modo `sampled` agrega más
+que ese número de microsegundos de CPU por petición respecto de `off`.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from scrapy.http import Request  # noqa: E402
+
+import stylos.settings as project_settings  # noqa: E402
+from stylos import tracing  # noqa: E402
+from stylos.middlewares import SentryContextMiddleware  # noqa: E402
+
+# DSN con formato válido; los eventos nunca salen del proceso
+FAKE_DSN = 'https://public@sentry.invalid/1'
+
+
+def make_transport():
+    """Transporte de `sentry_sdk` que solo cuenta envelopes y bytes."""
+    from sentry_sdk.transport import Transport
+
+    class CountingTransport(Transport):
+        def __init__(self, options=None):
+            super().__init__(options)
+            self.envelopes = 0
+            self.bytes = 0
+
+        def capture_envelope(self, envelope):
+            self.envelopes += 1
+            self.bytes += len(envelope.serialize())
+
+        def flush(self, timeout, callback=None):
+            pass
+
+    return CountingTransport()
+
+
+def make_request(index: int) -> Request:
+    """Petición de producto con un `meta` y cabeceras del tamaño de los reales."""
+    return Request(
+        f'https://www.zara.com/co/es/producto-p{index:08d}.html',
+        headers={'Cookie': 'session=' + 'x' * 512, 'Accept-Language': 'es-CO'},
+        meta={
+            'extraction_type': 'product', 'depth': 2, 'download_slot': 'www.zara.com',
+            'category_url': 'https://www.zara.com/co/es/mujer-vestidos-l1066.html',
+            'webdriver_trace': [{'command': 'findElement', 'ms': 3.2}] * 200,
+            'page_html': '<div>' * 20000,
+            '_sharding': {'shard': 0, 'shards': 4},
+        },
+    )
+
+
+def simulate(requests: int, error_every: int, middleware=None) -> float:
+    """Recorre el camino de Sentry de `requests` peticiones; devuelve segundos de CPU."""
+    spider = type('Spider', (), {'name': 'zara'})()
+    pending = [make_request(index) for index in range(requests)]
+    started = time.process_time()
+    for index, request in enumerate(pending):
+        if middleware is not None:
+            middleware.process_request(request, spider)
+        with tracing.span('browser.render', 'zara product', url=request.url):
+            with tracing.span('browser.navigation', request.url):
+                pass
+            with tracing.span('browser.extraction', 'product'):
+                pass
+        with tracing.span('db.mongodb', 'products upsert', url=request.url):
+            pass
+        if middleware is not None and error_every and index % error_every == 0:
+            middleware.process_exception(request, TimeoutError(f"Timeout al renderizar {request.url}"), spider)
+    return time.process_time() - started
+
+
+def run_mode(mode: str, requests: int, error_every: int) -> dict:
+    """Mide un modo y devuelve CPU por petición y tráfico enviado a Sentry."""
+    if mode == 'off':
+        seconds = simulate(requests, error_every)
+        return {'mode': mode, 'us_per_request': seconds / requests * 1e6, 'envelopes': 0, 'bytes': 0}
+
+    full = mode == 'full'
+    transport = make_transport()
+    tracing.configure(
+        FAKE_DSN,
+        traces_sample_rate=1.0 if full else project_settings.SENTRY_TRACES_SAMPLE_RATE,
+        max_breadcrumbs=100 if full else project_settings.SENTRY_MAX_BREADCRUMBS,
+        log_breadcrumb_level='INFO' if full else project_settings.SENTRY_LOG_BREADCRUMB_LEVEL,
+        max_value_length=project_settings.SENTRY_MAX_VALUE_LENGTH,
+        max_event_bytes=10 ** 9 if full else project_settings.SENTRY_MAX_EVENT_BYTES,
+        transport=transport,
+    )
+    middleware = SentryContextMiddleware(
+        breadcrumb_sample_rate=1.0 if full else project_settings.SENTRY_BREADCRUMB_SAMPLE_RATE,
+        max_meta_keys=project_settings.SENTRY_MAX_META_KEYS,
+        max_value_length=project_settings.SENTRY_MAX_VALUE_LENGTH,
+    )
+    try:
+        seconds = simulate(requests, error_every, middleware)
+    finally:
+        tracing.shutdown()
+    return {'mode': mode, 'us_per_request': seconds / requests * 1e6,
+            'envelopes': transport.envelopes, 'bytes': transport.bytes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mide el costo de Sentry por petición.")
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--error-every', type=int, default=200, help="Una excepción cada N peticiones (0 = ninguna)")
+    parser.add_argument('--max-overhead-us', type=float, default=None,
+                        help="Microsegundos de CPU máximos que puede agregar el modo 'sampled'")
+    args = parser.parse_args()
+
+    results = {mode: run_mode(mode, args.requests, args.error_every) for mode in ('off', 'sampled', 'full')}
+    baseline = results['off']['us_per_request']
+
+    print(f"Peticiones: {args.requests} — una excepción cada {args.error_every}")
+    for result in results.values():
+        overhead = result['us_per_request'] - baseline
+        print(f"  {result['mode']:<8} {result['us_per_request']:8.1f} µs/petición (+{overhead:.1f})  "
+              f"{result['envelopes']:6d} envíos  {result['bytes'] / 1024:9.1f} KiB")
+
+    overhead = results['sampled']['us_per_request'] - baseline
+    if args.max_overhead_us is not None and overhead > args.max_overhead_us:
+        print(f"\n❌ Sentry agrega {overhead:.1f} µs por petición (máximo {args.max_overhead_us:.1f})")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmark del arranque de un proceso de rastreo.
+
+Scrapyd lanza un proceso nuevo por trabajo, así que cada rastreo paga el
+costo de importar el proyecto antes de emitir su primera petición. Este script
+mide, en un proceso limpio (`python -X importtime`):
+
+- El tiempo hasta la primera petición: importar settings, araña, extensiones,
+  middlewares y pipelines, instanciarlos como lo hace Scrapy y obtener la
+  primera petición de `start_requests`.
+- Los módulos que más tardan en importarse.
+- Las dependencias pesadas que deberían importarse bajo demanda y se cargaron
+  de todos modos.
+
+Uso:
+    python benchmarks/startup.py [--spider zara] [--runs 5] [--top 15] [--budget 2.0]
+
+Con `--budget`, termina con código 1 si la mediana supera ese número de segundos
+o si alguna dependencia perezosa se importó al arrancar.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Dependencias que solo deben importarse al usarse (primer render, DSN de Sentry, etc.)
+LAZY_MODULES = ('selenium.webdriver', 'sentry_sdk', 'webdriver_manager', 'fake_useragent', 'stylos.extractors.zara_extractor',
+                'stylos.extractors.mango_extractor')
+
+# Reproduce lo que hace Scrapy al iniciar un rastreo, sin arrancar el reactor
+CHILD_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+from scrapy.core.downloader.middleware import DownloaderMiddlewareManager
+from scrapy.core.spidermw import SpiderMiddlewareManager
+from scrapy.crawler import Crawler
+from scrapy.extension import ExtensionManager
+from scrapy.pipelines import ItemPipelineManager
+from scrapy.settings import Settings
+from scrapy.spiderloader import SpiderLoader
+from scrapy.utils.misc import load_object
+import stylos.settings as project_settings
+
+settings = Settings()
+settings.setmodule(project_settings, priority='project')
+spidercls = SpiderLoader.from_settings(settings).load(sys.argv[1])
+crawler = Crawler(spidercls, settings)
+crawler.stats = load_object(settings['STATS_CLASS'])(crawler)
+crawler.spider = spidercls.from_crawler(crawler)
+for manager in (ExtensionManager, DownloaderMiddlewareManager, SpiderMiddlewareManager, ItemPipelineManager):
+    manager.from_crawler(crawler)
+request = next(iter(crawler.spider.start_requests()))
+print(json.dumps({
+    'first_request': time.perf_counter() - started,
+    'url': request.url,
+    'modules': sorted(sys.modules),
+}))
+"""
+
+
+def run_once(spider: str) -> dict:
+    """Arranca un proceso limpio y devuelve sus tiempos e importaciones."""
+    env = dict(os.environ, PYTHONPATH=str(PROJECT_ROOT), SENTRY_DSN='')
+    # Directorio temporal: las cachés locales no se comparten entre corridas
+    with tempfile.TemporaryDirectory() as workdir:
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', CHILD_SCRIPT, spider],
+            cwd=workdir, env=env, capture_output=True, text=True, check=True
+        )
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report['imports'] = parse_importtime(result.stderr)
+    return report
+
+
+def parse_importtime(stderr: str) -> dict:
+    """Convierte la salida de `-X importtime` en `{módulo: microsegundos acumulados}`."""
+    imports = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len('import time:'):].split('|'))
+        imports[name] = int(cumulative)
+    return imports
+
+
+def eager_lazy_modules(modules) -> list:
+    """Dependencias perezosas que el arranque importó igualmente."""
+    return sorted({lazy for lazy in LAZY_MODULES for module in modules if module == lazy or module.startswith(lazy + '.')})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mide el tiempo hasta la primera petición de una araña.")
+    parser.add_argument('--spider', default='zara')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15, help="Módulos de primer nivel a mostrar")
+    parser.add_argument('--budget', type=float, default=None, help="Segundos máximos (mediana) hasta la primera petición")
+    args = parser.parse_args()
+
+    reports = [run_once(args.spider) for _ in range(args.runs)]
+    times = [report['first_request'] for report in reports]
+    median = statistics.median(times)
+
+    print(f"Araña: {args.spider} — primera petición: {reports[0]['url']}")
+    print(f"Tiempo hasta la primera petición: mediana {median:.3f}s, mín {min(times):.3f}s, máx {max(times):.3f}s ({args.runs} corridas)")
+
+    # Solo los módulos de primer nivel, con el tiempo acumulado de la última corrida
+    top_level = {name: micros for name, micros in reports[-1]['imports'].items() if '.' not in name}
+    print("\nMódulos de primer nivel más lentos:")
+    for name, micros in sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {micros / 1000:8.1f} ms  {name}")
+
+    eager = eager_lazy_modules(reports[-1]['modules'])
+    if eager:
+        print(f"\n⚠️ Dependencias perezosas importadas al arrancar: {', '.join(eager)}")
+
+    if args.budget is not None and (median > args.budget or eager):
+        print(f"\n❌ Fuera de presupuesto ({args.budget:.3f}s)")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
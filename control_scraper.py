@@ -3,7 +3,7 @@
 import argparse
 import sys
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 import requests
 
@@ -12,7 +12,9 @@ import requests
 API_BASE_URL = "http://localhost:8000"
 PROJECT_NAME = "stylos"  # El nombre de tu proyecto en Scrapyd
 
-def schedule_job(spider_name: str, url: Optional[str] = None, country: Optional[str] = None, lang: Optional[str] = None) -> Optional[Dict[str, Any]]:
+def schedule_job(spider_name: str, url: Optional[str] = None, country: Optional[str] = None, lang: Optional[str] = None,
+                 mode: Optional[str] = None, resume: bool = False, shards: int = 1,
+                 workers: int = 1) -> Optional[Dict[str, Any]]:
     """
     Envía una petición a la API para agendar la ejecución de una araña.
 
@@ -21,6 +23,10 @@ def schedule_job(spider_name: str, url: Optional[str] = None, country: Optional[
         url: Opcional. La URL específica de un producto para ejecutar en modo de prueba.
         country: Opcional. Código de país para spiders multi-región (ej. 'us', 'es', 'fr').
         lang: Opcional. Código de idioma para spiders multi-región (ej. 'en', 'es', 'fr').
+        mode: Opcional. Modo de extracción de producto ('full' o 'price').
+        resume: Si es True, el rastreo es reanudable y continúa uno interrumpido.
+        shards: Número de trabajos de Scrapyd en que se reparte el rastreo.
+        workers: Número de trabajos que vacían juntos una frontier compartida en MongoDB.
 
     Returns:
         Un diccionario con la información del trabajo si fue exitoso, o None si falló.
@@ -36,9 +42,17 @@ def schedule_job(spider_name: str, url: Optional[str] = None, country: Optional[
         spider_args["country"] = country
     if lang:
         spider_args["lang"] = lang
+    if mode:
+        spider_args["mode"] = mode
     
     if spider_args:
         payload["spider_args"] = spider_args
+    if resume:
+        payload["resume"] = True
+    if shards > 1:
+        payload["shards"] = shards
+    if workers > 1:
+        payload["workers"] = workers
 
     # Mostrar información de lo que se va a ejecutar
     if url:
@@ -56,7 +70,12 @@ def schedule_job(spider_name: str, url: Optional[str] = None, country: Optional[
         response.raise_for_status()
         
         job_info = response.json()
-        print(f"✅ Trabajo agendado con éxito. ID del trabajo: {job_info.get('job_id')}")
+        if job_info.get('group_id'):
+            print(f"✅ {len(job_info.get('job_ids', []))} trabajos agendados con éxito. ID del grupo: {job_info['group_id']}")
+        else:
+            print(f"✅ Trabajo agendado con éxito. ID del trabajo: {job_info.get('job_id')}")
+        if job_info.get('jobdir'):
+            print(f"♻️  Rastreo reanudable en: {job_info['jobdir']}")
         
         # Mostrar argumentos usados si los hay
         used_args = job_info.get('spider_args', {})
@@ -75,18 +94,19 @@ def schedule_job(spider_name: str, url: Optional[str] = None, country: Optional[
         return None
 
 
-def monitor_job(job_id: str, poll_interval: int = 10) -> bool:
+def monitor_job(job_id: str, poll_interval: int = 10, group: bool = False) -> bool:
     """
     Monitorea el estado de un trabajo de Scrapyd hasta que finalice.
 
     Args:
-        job_id: El ID del trabajo a monitorear.
+        job_id: El ID del trabajo (o del grupo de shards) a monitorear.
         poll_interval: Segundos a esperar entre cada verificación de estado.
+        group: Si es True, `job_id` es un grupo de shards y se consulta su estado agregado.
 
     Returns:
         True si el trabajo finalizó con éxito, False en caso contrario.
     """
-    endpoint = f"{API_BASE_URL}/status/{job_id}"
+    endpoint = f"{API_BASE_URL}/groups/{job_id}" if group else f"{API_BASE_URL}/status/{job_id}"
     print(f"\n🕵️  Monitoreando el trabajo {job_id}. Verificando estado cada {poll_interval} segundos...")
     
     start_time = time.time()
@@ -104,7 +124,10 @@ def monitor_job(job_id: str, poll_interval: int = 10) -> bool:
             current_state = status_data.get('state', 'unknown')
             
             elapsed_time = round(time.time() - start_time)
-            print(f"   [+{elapsed_time}s] Estado actual: {current_state.upper()}")
+            if group:
+                print(f"   [+{elapsed_time}s] Estado actual: {current_state.upper()} ({status_data.get('finished', 0)}/{status_data.get('total', 0)} trabajos terminados)")
+            else:
+                print(f"   [+{elapsed_time}s] Estado actual: {current_state.upper()}")
 
             if current_state == 'finished':
                 print("🎉 ¡Trabajo finalizado con éxito!")
@@ -120,10 +143,166 @@ def monitor_job(job_id: str, poll_interval: int = 10) -> bool:
             return False
 
 
+def show_runs(spider_name: str, country: Optional[str] = None, lang: Optional[str] = None, limit: int = 10,
+              compare: bool = False, window: int = 5, threshold: float = 0.2) -> Optional[Dict[str, Any]]:
+    """
+    Muestra el historial de corridas de una araña y, opcionalmente, la compara
+    con las corridas de la versión anterior.
+
+    Returns:
+        El resultado de la comparación (o `{}` sin `compare`), o None si falló la consulta.
+    """
+    filters = {"spider": spider_name, "country": country, "lang": lang}
+    filters = {key: value for key, value in filters.items() if value}
+    try:
+        response = requests.get(f"{API_BASE_URL}/runs", params=dict(filters, limit=limit), timeout=10)
+        response.raise_for_status()
+        runs = response.json().get("runs", [])
+
+        print(f"📒 Últimas {len(runs)} corridas de '{spider_name}':")
+        print(f"   {'Fin':<20} {'Versión':<9} {'Duración':>9} {'Items':>7} {'Items/min':>10} {'Nav·s/item':>11} {'p95 render':>11}")
+        for run in runs:
+            throughput = run.get("throughput", {})
+            duration = run.get("duration_seconds")
+            print(
+                f"   {str(run.get('finished_at', ''))[:19]:<20} {str(run.get('release', '')):<9} "
+                f"{_format(duration and duration / 60, '{:.1f}m'):>9} {run.get('items', {}).get('scraped', 0):>7} "
+                f"{_format(throughput.get('items_per_minute')):>10} {_format(throughput.get('browser_seconds_per_item')):>11} "
+                f"{_format(throughput.get('render_p95_ms'), '{:.0f}ms'):>11}"
+            )
+        if not compare:
+            return {}
+
+        response = requests.get(f"{API_BASE_URL}/runs/compare",
+                                params=dict(filters, window=window, threshold=threshold), timeout=10)
+        response.raise_for_status()
+        comparison = response.json()
+        print(f"\n📊 Corrida {comparison['latest']['job_id']} ({comparison['latest']['release']}) "
+              f"contra {len(comparison['baseline'])} corridas de referencia:")
+        for metric, data in comparison["metrics"].items():
+            flag = "❌ REGRESIÓN" if data["regression"] else "✅"
+            print(f"   {metric:<26} {data['latest']:>10} vs {data['baseline']:>10} ({data['change']:+.0%}) {flag}")
+        if not comparison["metrics"]:
+            print("   No hay corridas de referencia suficientes para comparar.")
+        return comparison
+
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Error de conexión: No se pudo consultar el historial en {API_BASE_URL}/runs.", file=sys.stderr)
+        print(f"   Error original: {e}", file=sys.stderr)
+        return None
+
+
+def _format(value: Optional[float], pattern: str = "{:.1f}") -> str:
+    return pattern.format(value) if value is not None else "-"
+
+
+def runs_command(argv: List[str]) -> int:
+    """Subcomando `runs`: historial de corridas y detección de regresiones tras un despliegue."""
+    parser = argparse.ArgumentParser(
+        prog="control_scraper.py runs",
+        description="Historial de corridas y comparación con la versión anterior."
+    )
+    parser.add_argument("--spider", required=True, help="El nombre de la araña (ej: zara, mango).")
+    parser.add_argument("--country", help="Opcional: Código de país de las corridas.")
+    parser.add_argument("--lang", help="Opcional: Código de idioma de las corridas.")
+    parser.add_argument("--limit", type=int, default=10, help="Número de corridas a listar (por defecto 10).")
+    parser.add_argument("--compare", action="store_true",
+                        help="Compara la última corrida con la versión anterior; sale con código 2 si hay regresiones.")
+    parser.add_argument("--window", type=int, default=5, help="Corridas de referencia a comparar (por defecto 5).")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Empeoramiento relativo que se considera regresión (por defecto 0.2 = 20%%).")
+    args = parser.parse_args(argv)
+
+    comparison = show_runs(args.spider, args.country, args.lang, limit=args.limit, compare=args.compare,
+                           window=args.window, threshold=args.threshold)
+    if comparison is None:
+        return 1
+    return 2 if comparison.get("regressions") else 0
+
+
+def plan_batch(spiders: List[str], countries: List[str], nodes: Optional[int] = None,
+               deadline_minutes: Optional[float] = None, shards: int = 1,
+               slots_per_job: int = 4) -> Optional[Dict[str, Any]]:
+    """
+    Pide a la API una estimación de duración y capacidad para un lote de rastreos.
+
+    Returns:
+        El plan devuelto por la API, o None si falló la consulta.
+    """
+    payload = {"spiders": spiders, "countries": countries, "shards": shards, "slots_per_job": slots_per_job}
+    if nodes:
+        payload["nodes"] = nodes
+    if deadline_minutes:
+        payload["deadline_minutes"] = deadline_minutes
+    try:
+        response = requests.post(f"{API_BASE_URL}/plan", json=payload, timeout=10)
+        response.raise_for_status()
+        plan = response.json()
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Error de conexión: No se pudo consultar el planificador en {API_BASE_URL}/plan.", file=sys.stderr)
+        print(f"   Error original: {e}", file=sys.stderr)
+        return None
+
+    print("🧮 Estimación por rastreo:")
+    for target in plan["targets"]:
+        locale = f"{target['country']}/{target['lang']}" if target.get("lang") else target["country"]
+        print(f"   {target['spider']:<8} {locale:<7} {target['products']:>7} productos, "
+              f"{target['browser_seconds'] / 3600:.1f} h de navegador ({target['runs']} corridas de referencia)")
+    for target in plan["unknown"]:
+        print(f"   ⚠️  {target['spider']} {target['country']}: sin corridas previas, no se incluye en la estimación")
+
+    if plan.get("predicted_seconds") is not None:
+        print(f"\n⏱️  Con {plan['nodes']} nodos y {plan['shards']} shard(s) por rastreo: "
+              f"~{plan['predicted_seconds'] / 60:.0f} minutos")
+    if "recommendation" in plan:
+        recommendation = plan["recommendation"]
+        if recommendation:
+            print(f"🎯 Para terminar en {deadline_minutes:.0f} minutos: {recommendation['nodes']} nodos y "
+                  f"{recommendation['shards']} shard(s) por rastreo (~{recommendation['predicted_seconds'] / 60:.0f} minutos)")
+        else:
+            print(f"❌ No se llega a {deadline_minutes:.0f} minutos con los nodos máximos considerados.")
+    return plan
+
+
+def plan_command(argv: List[str]) -> int:
+    """Subcomando `plan`: duración y capacidad estimadas de un lote de rastreos."""
+    parser = argparse.ArgumentParser(
+        prog="control_scraper.py plan",
+        description="Estima la duración de un lote de rastreos y los nodos necesarios para un plazo."
+    )
+    parser.add_argument("--spiders", nargs="+", required=True, help="Arañas del lote (ej: zara mango).")
+    parser.add_argument("--countries", nargs="+", required=True,
+                        help="Países del lote, con idioma opcional (ej: co:es us:en es).")
+    parser.add_argument("--nodes", type=int, help="Nodos de Chrome disponibles, para predecir la duración.")
+    parser.add_argument("--deadline", type=float, help="Plazo en minutos, para recomendar nodos y shards.")
+    parser.add_argument("--shards", type=int, default=1, help="Shards por rastreo con --nodes (por defecto 1).")
+    parser.add_argument("--slots-per-job", type=int, default=4,
+                        help="Sesiones de navegador por trabajo, SELENIUM_POOL_SIZE (por defecto 4).")
+    args = parser.parse_args(argv)
+    if not args.nodes and not args.deadline:
+        parser.error("indique --nodes, --deadline o ambos")
+
+    plan = plan_batch(args.spiders, args.countries, nodes=args.nodes, deadline_minutes=args.deadline,
+                      shards=args.shards, slots_per_job=args.slots_per_job)
+    if plan is None:
+        return 1
+    return 0 if plan.get("feasible", True) else 2
+
+
+# Subcomandos disponibles además de agendar un trabajo (el uso por defecto)
+SUBCOMMANDS = {
+    "runs": runs_command,
+    "plan": plan_command,
+}
+
+
 def main():
     """
     Función principal para parsear argumentos y orquestar la ejecución.
     """
+    if len(sys.argv) > 1 and sys.argv[1] in SUBCOMMANDS:
+        sys.exit(SUBCOMMANDS[sys.argv[1]](sys.argv[2:]))
+
     parser = argparse.ArgumentParser(
         description="Cliente de línea de comandos para controlar el Scraper de Stylos.",
         formatter_class=argparse.RawTextHelpFormatter,
@@ -144,6 +323,24 @@ Ejemplos de uso:
 
   # Ejecutar Mango (no requiere country/lang)
   python control_scraper.py --spider mango
+
+  # Refrescar solo los precios de Zara España (sin imágenes, mucho más rápido)
+  python control_scraper.py --spider zara --country es --lang es --mode price
+
+  # Rastreo reanudable: si el trabajo se interrumpe, repetir el comando continúa donde quedó
+  python control_scraper.py --spider zara --country us --lang en --resume
+
+  # Repartir el rastreo de Zara España en 4 trabajos paralelos
+  python control_scraper.py --spider zara --country es --lang es --shards 4
+
+  # Vaciar un rastreo entre 4 workers con una frontier compartida en MongoDB
+  python control_scraper.py --spider zara --country es --lang es --workers 4
+
+  # Historial de corridas de Zara Estados Unidos y regresiones tras el último despliegue
+  python control_scraper.py runs --spider zara --country us --lang en --compare
+
+  # Cuánto tarda un lote con 8 nodos, y cuántos hacen falta para terminar en 2 horas
+  python control_scraper.py plan --spiders zara mango --countries co:es us:en --nodes 8 --deadline 120
         """
     )
     parser.add_argument(
@@ -166,6 +363,29 @@ Ejemplos de uso:
         required=False,
         help="Opcional: Código de idioma para spiders multi-región (ej: en, es, fr, de)."
     )
+    parser.add_argument(
+        "--mode",
+        required=False,
+        choices=["full", "price"],
+        help="Opcional: 'full' extrae el producto completo (por defecto), 'price' solo refresca los precios."
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Opcional: Rastreo reanudable. Guarda la cola y el estado en disco y continúa un rastreo interrumpido."
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=1,
+        help="Opcional: Número de trabajos paralelos en que se reparte el rastreo (por defecto 1)."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Opcional: Número de workers que comparten una frontier en MongoDB (balanceo automático)."
+    )
     args = parser.parse_args()
 
     # Validaciones específicas para Zara
@@ -180,20 +400,26 @@ Ejemplos de uso:
         print(f"🗣️  Idioma: {lang}")
         if args.url:
             print(f"🔗 URL específica: {args.url}")
+        if args.mode:
+            print(f"⚙️  Modo: {args.mode}")
         print()
         
         # Agenda el trabajo con parámetros regionales
-        job = schedule_job(args.spider, args.url, country, lang)
+        job = schedule_job(args.spider, args.url, country, lang, mode=args.mode, resume=args.resume,
+                           shards=args.shards, workers=args.workers)
     else:
         # Para otros spiders (mango, etc.), usar configuración simple
         if args.country or args.lang:
             print(f"⚠️  Nota: Los parámetros --country y --lang son específicos para Zara.")
             print(f"   Se ignorarán para el spider '{args.spider}'.")
         
-        job = schedule_job(args.spider, args.url)
+        job = schedule_job(args.spider, args.url, mode=args.mode, resume=args.resume,
+                           shards=args.shards, workers=args.workers)
 
     # Si el trabajo se agendó correctamente, lo monitorea
-    if job and job.get("job_id"):
+    if job and job.get("group_id"):
+        monitor_job(job.get("group_id"), group=True)
+    elif job and job.get("job_id"):
         monitor_job(job.get("job_id"))
     else:
         print("\nNo se pudo iniciar el monitoreo porque el trabajo no fue agendado.", file=sys.stderr)
@@ -0,0 +1,119 @@
+"""
+Agregación de resultados parciales por variante de color.
+
+Cuando un producto se reparte en una petición por color, cada respuesta trae
+solo las imágenes de ese color. `ColorAggregator` las reúne por producto hasta
+que llegan todas (o hasta que vence el tiempo de espera) para que la araña
+emita un único `ProductItem` completo.
+
+El estado es un diccionario de tipos simples, de modo que puede guardarse en
+`spider.state` y sobrevivir a un reinicio del rastreo.
+"""
+
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class ColorAggregator:
+    """
+    Reúne las imágenes por color de cada producto repartido.
+
+    Las imágenes se guardan por clave de color y no por nombre: dos variantes
+    con el mismo nombre (ej. dos "NEGRO" de distinto tejido) no se pisan.
+
+    Cada entrada pendiente tiene la forma:
+        {
+            'product_url': str,
+            'product_data': dict,
+            'expected': [clave_color, ...],
+            'images': {clave_color: [imagen, ...]},
+            'colors': {clave_color: nombre_color},
+            'done': [clave_color, ...],
+            'failed': [clave_color, ...],
+            'started_at': float,
+        }
+    """
+
+    def __init__(self, timeout: float, state: Optional[Dict[str, Dict[str, Any]]] = None):
+        """
+        Args:
+            timeout (float): Segundos máximos de espera por los colores de un producto.
+            state (dict): Opcional. Estado previo de entradas pendientes a reanudar.
+        """
+        self.timeout = timeout
+        self.pending: Dict[str, Dict[str, Any]] = state if state is not None else {}
+        # Los productos reanudados tras un reinicio vuelven a esperar un plazo completo
+        now = time.time()
+        for entry in self.pending.values():
+            entry['started_at'] = now
+
+    def start(self, product_url: str, product_data: Dict[str, Any], color_keys: List[str]) -> None:
+        """Registra un producto y las claves de los colores que se esperan."""
+        self.pending[product_url] = {
+            'product_url': product_url,
+            'product_data': product_data,
+            'expected': list(color_keys),
+            'images': {},
+            'colors': {},
+            'done': [],
+            'failed': [],
+            'started_at': time.time(),
+        }
+
+    def add(self, product_url: str, color_key: str, images_by_color: Dict[str, List[Dict[str, str]]]) -> Optional[Dict[str, Any]]:
+        """
+        Añade las imágenes de un color (`{nombre_color: imágenes}`, como las
+        devuelve el extractor para una sola variante).
+
+        Returns:
+            Optional[Dict]: La entrada completa si era el último color pendiente,
+            o `None` si aún faltan colores (o el producto ya no está pendiente).
+        """
+        entry = self.pending.get(product_url)
+        if entry is None:
+            return None
+        for color_name, images in (images_by_color or {}).items():
+            if images:
+                entry['images'][color_key] = images
+                entry.setdefault('colors', {})[color_key] = color_name
+        return self._mark(entry, color_key, 'done')
+
+    def fail(self, product_url: str, color_key: str) -> Optional[Dict[str, Any]]:
+        """Marca un color como fallido. Devuelve la entrada si ya no falta ninguno."""
+        entry = self.pending.get(product_url)
+        if entry is None:
+            return None
+        return self._mark(entry, color_key, 'failed')
+
+    def has_expired(self, now: Optional[float] = None) -> bool:
+        """Indica si alguna entrada superó el tiempo de espera, sin retirarla."""
+        return bool(self._expired_urls(now))
+
+    def pop_expired(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Retira y devuelve las entradas que superaron el tiempo de espera."""
+        return [self.pending.pop(url) for url in self._expired_urls(now)]
+
+    def pop_all(self) -> List[Dict[str, Any]]:
+        """Retira y devuelve todas las entradas pendientes."""
+        entries = list(self.pending.values())
+        self.pending.clear()
+        return entries
+
+    def _expired_urls(self, now: Optional[float] = None) -> List[str]:
+        now = time.time() if now is None else now
+        return [url for url, entry in self.pending.items() if now - entry['started_at'] > self.timeout]
+
+    def _mark(self, entry: Dict[str, Any], color_key: str, status: str) -> Optional[Dict[str, Any]]:
+        if color_key not in entry['done'] and color_key not in entry['failed']:
+            entry[status].append(color_key)
+        if len(entry['done']) + len(entry['failed']) >= len(entry['expected']):
+            return self.pending.pop(entry['product_url'])
+        return None
+
+
+def color_images(entry: Dict[str, Any]) -> List[Tuple[str, List[Dict[str, str]]]]:
+    """Pares `(nombre_color, imágenes)` de una entrada, en el orden de sus variantes."""
+    colors = entry.get('colors', {})
+    keys = [key for key in entry['expected'] if key in entry['images']]
+    keys += [key for key in entry['images'] if key not in keys]
+    return [(colors.get(key, key), entry['images'][key]) for key in keys]
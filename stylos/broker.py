@@ -0,0 +1,309 @@
+"""
+Broker de sesiones de navegador precalentadas, compartido entre trabajos.
+
+Cada trabajo de Scrapyd que arranca en frío paga la creación de la sesión en
+el Grid, el arranque de Chrome, la configuración regional y el diálogo de
+geolocalización de la tienda antes de la primera página. El broker es un
+proceso de larga duración (`app/session_broker.py`) que mantiene sesiones ya
+localizadas por `(sitio, país, idioma)` y las presta a las arañas:
+
+- `SessionBroker`: el inventario de sesiones libres y prestadas (sin HTTP).
+- `BrokerClient`: el cliente que usa `SeleniumMiddleware` para pedir y
+  devolver sesiones a través de la API local del broker.
+- `attach_remote_session`: adjunta un WebDriver a una sesión del Grid ya
+  existente, sin crear una nueva.
+"""
+
+import functools
+import logging
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+LocaleKey = Tuple[str, str, str]
+
+
+@functools.lru_cache(maxsize=None)
+def _attached_remote_class():
+    """Clase `AttachedRemote`, creada al primer uso para no importar Selenium al cargar el módulo."""
+    from selenium import webdriver
+
+    class AttachedRemote(webdriver.Remote):
+        """WebDriver remoto que reutiliza una sesión existente del Grid en lugar de crear otra."""
+
+        def __init__(self, command_executor: str, session_id: str, options):
+            self._attach_session_id = session_id
+            super().__init__(command_executor=command_executor, options=options)
+
+        def start_session(self, capabilities: dict) -> None:
+            self.session_id = self._attach_session_id
+            self.caps = dict(capabilities.get('alwaysMatch', capabilities)) if capabilities else {}
+
+    return AttachedRemote
+
+
+def attach_remote_session(hub_url: str, session_id: str, country: str, lang: str):
+    """Devuelve un WebDriver conectado a la sesión `session_id` del Grid en `hub_url`."""
+    from stylos.middlewares import build_chrome_options
+    attached_remote = _attached_remote_class()
+    return attached_remote(command_executor=hub_url, session_id=session_id, options=build_chrome_options(country, lang))
+
+
+def create_warm_driver(hub_url: str, site: str, country: str, lang: str, logger: Optional[logging.Logger] = None):
+    """
+    Crea una sesión en el Grid y la deja lista para rastrear el sitio.
+
+    La sesión usa las mismas opciones de Chrome que `SeleniumMiddleware` y se
+    calienta con `warm_up` del extractor del sitio (página de inicio, cookies,
+    diálogos de geolocalización).
+    """
+    from selenium import webdriver
+
+    from stylos.extractors import ExtractorRegistry
+    from stylos.middlewares import build_chrome_options
+
+    logger = logger or logging.getLogger(__name__)
+    driver = webdriver.Remote(command_executor=hub_url, options=build_chrome_options(country, lang))
+    try:
+        # Los extractors solo necesitan el idioma, el país y un `log` de la araña
+        spider = SimpleNamespace(name=site, country=country, lang=lang, log=logger.info, logger=logger)
+        ExtractorRegistry.get_extractor(site, driver, spider).warm_up(country, lang)
+    except Exception:
+        driver.quit()
+        raise
+    return driver
+
+
+class WarmSession:
+    """
+    Una sesión del broker.
+
+    Attributes:
+        driver: El WebDriver que la controla desde el broker.
+        key (tuple): `(sitio, país, idioma)` para el que se calentó.
+        created_at (float): Momento de creación (epoch).
+        leases (int): Número de veces que se prestó.
+    """
+
+    def __init__(self, driver, key: LocaleKey):
+        self.driver = driver
+        self.key = key
+        self.created_at = time.time()
+        self.leases = 0
+
+    @property
+    def session_id(self) -> str:
+        return self.driver.session_id
+
+
+class SessionBroker:
+    """
+    Inventario thread-safe de sesiones calentadas por `(sitio, país, idioma)`.
+
+    Mantiene hasta `warm_per_locale` sesiones libres por cada idioma conocido
+    (los configurados al arrancar y los que se piden después). Un préstamo que
+    no se devuelve en `lease_ttl` segundos se da por perdido (el trabajo murió)
+    y su sesión se cierra.
+    """
+
+    def __init__(self, factory: Callable[[str, str, str], Any], warm_per_locale: int = 1, lease_ttl: float = 3600,
+                 max_session_age: float = 0, logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            factory (Callable): Función `(sitio, país, idioma)` que crea un WebDriver calentado.
+            warm_per_locale (int): Sesiones libres que se mantienen listas por idioma.
+            lease_ttl (float): Segundos máximos de un préstamo. Debe superar
+                `SELENIUM_SESSION_MAX_AGE`, tras el cual la araña devuelve la sesión.
+            max_session_age (float): Segundos tras los que una sesión libre se
+                reemplaza por una nueva (`0` = sin límite).
+            logger: Opcional. Logger para los eventos del broker.
+        """
+        self.factory = factory
+        self.warm_per_locale = warm_per_locale
+        self.lease_ttl = lease_ttl
+        self.max_session_age = max_session_age
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+        self.locales: List[LocaleKey] = []
+        self.stats: Dict[str, int] = {'warm_leases': 0, 'cold_leases': 0, 'released': 0, 'retired': 0, 'expired': 0}
+        self._idle: Dict[LocaleKey, List[WarmSession]] = {}
+        self._leases: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def add_locale(self, site: str, country: str, lang: str) -> LocaleKey:
+        """Registra un idioma para mantenerle sesiones calentadas."""
+        key = (site, country, lang)
+        with self._lock:
+            if key not in self.locales:
+                self.locales.append(key)
+                self._idle.setdefault(key, [])
+        return key
+
+    def lease(self, site: str, country: str, lang: str) -> Dict[str, Any]:
+        """
+        Presta una sesión para el idioma dado.
+
+        Si no hay una libre y calentada se crea en el momento (préstamo en frío).
+
+        Returns:
+            Dict: `{'lease_id', 'session_id', 'warm'}`.
+        """
+        key = self.add_locale(site, country, lang)
+        with self._lock:
+            idle = self._idle[key]
+            session = idle.pop(0) if idle else None
+        warm = session is not None
+        if session is None:
+            session = WarmSession(self.factory(site, country, lang), key)
+
+        lease_id = uuid.uuid4().hex
+        session.leases += 1
+        with self._lock:
+            self._leases[lease_id] = {'session': session, 'expires_at': time.time() + self.lease_ttl}
+            self.stats['warm_leases' if warm else 'cold_leases'] += 1
+        self.logger.info(f"Sesión {session.session_id} prestada para {'/'.join(key)} ({'caliente' if warm else 'en frío'})")
+        return {'lease_id': lease_id, 'session_id': session.session_id, 'warm': warm}
+
+    def release(self, lease_id: str, reusable: bool = True) -> bool:
+        """
+        Recibe una sesión prestada.
+
+        Vuelve al inventario solo si la araña la marcó como reutilizable y
+        sigue respondiendo; en otro caso se cierra.
+
+        Returns:
+            bool: `False` si el préstamo no existe (ya se devolvió o expiró).
+        """
+        with self._lock:
+            lease = self._leases.pop(lease_id, None)
+        if lease is None:
+            return False
+        session = lease['session']
+        if reusable and self._is_alive(session) and not self._is_too_old(session):
+            with self._lock:
+                self._idle.setdefault(session.key, []).append(session)
+                self.stats['released'] += 1
+        else:
+            self._retire(session)
+        return True
+
+    def refill(self) -> int:
+        """Crea las sesiones que falten para tener `warm_per_locale` libres por idioma. Devuelve cuántas creó."""
+        created = 0
+        for key in list(self.locales):
+            with self._lock:
+                missing = self.warm_per_locale - len(self._idle.get(key, []))
+            for _ in range(max(0, missing)):
+                try:
+                    session = WarmSession(self.factory(*key), key)
+                except Exception as e:
+                    self.logger.warning(f"No se pudo calentar una sesión para {'/'.join(key)}: {e}")
+                    break
+                with self._lock:
+                    self._idle[key].append(session)
+                created += 1
+        return created
+
+    def keepalive(self, now: Optional[float] = None) -> None:
+        """
+        Mantiene el inventario sano.
+
+        Toca cada sesión libre (el Grid cierra las sesiones inactivas), retira
+        las que murieron o envejecieron y cierra los préstamos vencidos.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            expired = [lease_id for lease_id, lease in self._leases.items() if lease['expires_at'] <= now]
+            expired_sessions = [self._leases.pop(lease_id)['session'] for lease_id in expired]
+            self.stats['expired'] += len(expired)
+            idle = [session for sessions in self._idle.values() for session in sessions]
+
+        for session in expired_sessions:
+            self.logger.warning(f"Préstamo vencido de la sesión {session.session_id}, se cierra")
+            self._retire(session)
+
+        for session in idle:
+            if not self._is_alive(session) or self._is_too_old(session, now):
+                with self._lock:
+                    if session in self._idle.get(session.key, []):
+                        self._idle[session.key].remove(session)
+                self._retire(session)
+
+    def status(self) -> Dict[str, Any]:
+        """Resumen del inventario por idioma y contadores de préstamos."""
+        with self._lock:
+            locales = {
+                '/'.join(key): {
+                    'idle': len(self._idle.get(key, [])),
+                    'leased': sum(1 for lease in self._leases.values() if lease['session'].key == key),
+                }
+                for key in self.locales
+            }
+            return {'locales': locales, 'stats': dict(self.stats)}
+
+    def close(self) -> None:
+        """Cierra todas las sesiones, libres y prestadas."""
+        with self._lock:
+            sessions = [session for sessions in self._idle.values() for session in sessions]
+            sessions += [lease['session'] for lease in self._leases.values()]
+            self._idle = {key: [] for key in self._idle}
+            self._leases.clear()
+        for session in sessions:
+            self._retire(session)
+
+    def _is_alive(self, session: WarmSession) -> bool:
+        try:
+            session.driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def _is_too_old(self, session: WarmSession, now: Optional[float] = None) -> bool:
+        now = time.time() if now is None else now
+        return bool(self.max_session_age) and now - session.created_at >= self.max_session_age
+
+    def _retire(self, session: WarmSession) -> None:
+        with self._lock:
+            self.stats['retired'] += 1
+        try:
+            session.driver.quit()
+        except Exception as e:
+            self.logger.debug(f"Error cerrando la sesión {session.session_id}: {e}")
+
+
+class BrokerClient:
+    """Cliente HTTP de la API local del broker de sesiones."""
+
+    def __init__(self, url: str, timeout: float = 120):
+        """
+        Args:
+            url (str): URL base del broker (ej. 'http://session-broker:8100').
+            timeout (float): Segundos máximos de espera por respuesta. Un préstamo
+                en frío incluye crear y calentar la sesión.
+        """
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+
+    def lease(self, site: str, country: str, lang: str) -> Dict[str, Any]:
+        """Pide una sesión. Devuelve `{'lease_id', 'session_id', 'warm'}`."""
+        import requests
+
+        response = requests.post(
+            f"{self.url}/leases",
+            json={'site': site, 'country': country, 'lang': lang},
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def release(self, lease_id: str, reusable: bool = True) -> None:
+        """Devuelve una sesión al broker."""
+        import requests
+
+        response = requests.delete(
+            f"{self.url}/leases/{lease_id}",
+            params={'reusable': str(reusable).lower()},
+            timeout=self.timeout
+        )
+        response.raise_for_status()
@@ -0,0 +1,248 @@
+"""
+Cachés locales persistentes entre ejecuciones.
+
+Este módulo contiene cachés clave→valor respaldadas por SQLite (librería
+estándar, sin servicios externos) con expiración por TTL. Se usan para evitar
+trabajo de navegador que casi nunca cambia entre un rastreo y el siguiente,
+como las imágenes de cada variante de color de un producto o las URLs del
+menú de categorías, o todo el render de una página durante el desarrollo.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+class SqliteCache:
+    """
+    Caché clave→valor persistida en una tabla SQLite, con TTL.
+
+    Los valores se serializan como JSON. Cada entrada guarda la fecha en que se
+    almacenó; al leerla, si supera el TTL se considera expirada y se ignora.
+    Es segura para usarse desde varios hilos (un único lock protege la conexión).
+
+    Lleva un conteo de aciertos, fallos y expiraciones en `self.stats` y, si se
+    le pasa el `StatsCollector` de Scrapy, también lo publica con el prefijo dado.
+    """
+
+    def __init__(self, path: str, table: str, ttl: float, stats=None, stats_prefix: Optional[str] = None):
+        """
+        Args:
+            path (str): Ruta del archivo SQLite. Se crean los directorios necesarios.
+            table (str): Nombre de la tabla (un archivo puede alojar varias cachés).
+            ttl (float): Segundos de validez de cada entrada. `0` o negativo = sin expiración.
+            stats: Opcional. `StatsCollector` de Scrapy donde publicar los contadores.
+            stats_prefix (str): Opcional. Prefijo de las claves de estadísticas (ej. 'image_cache').
+        """
+        self.path = path
+        self.table = table
+        self.ttl = ttl
+        self.crawler_stats = stats
+        self.stats_prefix = stats_prefix or table
+        self.stats: Dict[str, int] = {'hits': 0, 'misses': 0, 'expired': 0, 'stores': 0}
+        self._lock = threading.Lock()
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Devuelve el valor de `key` si existe y no ha expirado, o `None`."""
+        status, value = self._fetch(key)
+        if status == 'expired':
+            self._count('expired')
+        self._count('hits' if status == 'hit' else 'misses')
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Guarda (o reemplaza) el valor de `key` con la fecha actual."""
+        stored = self._encode(value)
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, stored_at) VALUES (?, ?, ?)",
+                (key, stored, time.time())
+            )
+            self._conn.commit()
+        self._count('stores')
+
+    def delete(self, key: str) -> None:
+        """Elimina la entrada `key` si existe."""
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        """Elimina las entradas expiradas y devuelve cuántas eran."""
+        if self.ttl <= 0:
+            return 0
+        with self._lock:
+            cursor = self._conn.execute(f"DELETE FROM {self.table} WHERE stored_at < ?", (time.time() - self.ttl,))
+            self._conn.commit()
+        return cursor.rowcount
+
+    def close(self) -> None:
+        """Cierra la conexión con el archivo SQLite."""
+        with self._lock:
+            self._conn.close()
+
+    def _fetch(self, key: str):
+        """Lee `key` sin contar estadísticas. Devuelve `(estado, valor)`."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, stored_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+
+        if row is None:
+            return 'miss', None
+
+        value, stored_at = row
+        if self.ttl > 0 and time.time() - stored_at > self.ttl:
+            return 'expired', None
+        return 'hit', self._decode(value)
+
+    def _encode(self, value: Any):
+        """Serializa un valor para guardarlo en la tabla."""
+        return json.dumps(value)
+
+    def _decode(self, stored) -> Any:
+        return json.loads(stored)
+
+    def _count(self, name: str) -> None:
+        # Los extractores usan la caché desde varios hilos a la vez
+        with self._lock:
+            self.stats[name] = self.stats.get(name, 0) + 1
+            if self.crawler_stats is not None:
+                self.crawler_stats.inc_value(f"{self.stats_prefix}/{name}")
+
+
+class ImageSetCache(SqliteCache):
+    """
+    Caché de imágenes por variante de color de un producto.
+
+    La clave es `(product_key, color_name)`. Cada entrada guarda, además de la
+    lista de imágenes, una huella barata del estado de la galería (por ejemplo,
+    la URL de la primera imagen y el número de miniaturas). Si al volver a
+    visitar el producto la huella coincide, se reutiliza la lista guardada y el
+    extractor se ahorra el scroll y la recolección completa de ese color.
+    """
+
+    def __init__(self, path: str, ttl: float, stats=None):
+        super().__init__(path, table='image_sets', ttl=ttl, stats=stats, stats_prefix='image_cache')
+
+    def lookup(self, product_key: str, color_name: str, fingerprint: Optional[str]) -> Optional[List[Dict[str, str]]]:
+        """
+        Devuelve las imágenes guardadas si la huella coincide con la actual.
+
+        Un cambio de huella cuenta como fallo (`image_cache/fingerprint_mismatch`).
+        """
+        if not fingerprint:
+            self._count('misses')
+            return None
+
+        status, entry = self._fetch(self._key(product_key, color_name))
+        if status == 'expired':
+            self._count('expired')
+        if entry is None:
+            self._count('misses')
+            return None
+        if entry.get('fingerprint') != fingerprint:
+            # La galería cambió desde la última visita: hay que recolectarla de nuevo.
+            self._count('fingerprint_mismatch')
+            self._count('misses')
+            return None
+
+        self._count('hits')
+        return entry.get('images') or None
+
+    def store(self, product_key: str, color_name: str, fingerprint: Optional[str], images: List[Dict[str, str]]) -> None:
+        """Guarda las imágenes de un color junto con su huella."""
+        if not fingerprint or not images:
+            return
+        self.set(self._key(product_key, color_name), {'fingerprint': fingerprint, 'images': images})
+
+    @staticmethod
+    def _key(product_key: str, color_name: str) -> str:
+        return f"{product_key}|{color_name}"
+
+
+class MenuCache(SqliteCache):
+    """
+    Caché de las URLs de subcategorías descubiertas en el menú de un sitio.
+
+    La clave es `(site, country, lang, menu_url)`: cada URL inicial de la araña
+    guarda su propia lista. El menú cambia rara vez, así que reutilizarlo evita
+    repetir la navegación por el menú hamburguesa en cada rastreo.
+    """
+
+    def __init__(self, path: str, ttl: float, stats=None):
+        super().__init__(path, table='menus', ttl=ttl, stats=stats, stats_prefix='menu_cache')
+
+    def lookup(self, site: str, country: str, lang: str, menu_url: str) -> Optional[List[str]]:
+        """Devuelve las URLs guardadas para el menú, o `None` si no hay o expiraron."""
+        return self.get(self._key(site, country, lang, menu_url))
+
+    def store(self, site: str, country: str, lang: str, menu_url: str, urls: List[str]) -> None:
+        """Guarda las URLs del menú. Una lista vacía no se guarda (extracción fallida)."""
+        if not urls:
+            return
+        self.set(self._key(site, country, lang, menu_url), sorted(set(urls)))
+
+    @staticmethod
+    def _key(site: str, country: str, lang: str, menu_url: str) -> str:
+        return f"{site}|{country}|{lang}|{menu_url}"
+
+
+class RenderedPageCache(SqliteCache):
+    """
+    Caché de renders completos de Selenium, para grabar y reproducir rastreos.
+
+    El `HTTPCACHE_*` de Scrapy no ve las respuestas que arma `SeleniumMiddleware`;
+    esta caché guarda por cada petición el resultado final del render: el HTML
+    (`page_source`), la URL tras redirecciones (`current_url`) y los datos del
+    extractor que se copian al `meta` de la respuesta. La clave es la huella de
+    la petición más su `extraction_type` y, si la hay, su variante: las
+    peticiones por color de un producto comparten URL, así que cada color se
+    guarda aparte. Cada entrada se guarda comprimida con zlib (un HTML de
+    producto ocupa ~10 veces menos).
+    """
+
+    def __init__(self, path: str, ttl: float, stats=None, compression_level: int = 6):
+        self.compression_level = compression_level
+        super().__init__(path, table='rendered_pages', ttl=ttl, stats=stats, stats_prefix='page_cache')
+
+    def lookup(self, fingerprint: str, extraction_type: str, variant: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Devuelve `{'url', 'body', 'meta'}` del render guardado, o `None` si no hay o expiró."""
+        return self.get(self._key(fingerprint, extraction_type, variant))
+
+    def store(self, fingerprint: str, extraction_type: str, url: str, body: str, meta: Dict[str, Any],
+              variant: Optional[str] = None) -> bool:
+        """
+        Guarda un render. Devuelve `False` (y no guarda nada) si los datos
+        extraídos no se pueden serializar como JSON.
+        """
+        entry = {'url': url, 'body': body, 'meta': meta}
+        try:
+            self.set(self._key(fingerprint, extraction_type, variant), entry)
+        except (TypeError, ValueError):
+            self._count('unserializable')
+            return False
+        return True
+
+    def _encode(self, value: Any) -> bytes:
+        return zlib.compress(json.dumps(value).encode('utf-8'), self.compression_level)
+
+    def _decode(self, stored) -> Any:
+        return json.loads(zlib.decompress(stored).decode('utf-8'))
+
+    @staticmethod
+    def _key(fingerprint: str, extraction_type: str, variant: Optional[str] = None) -> str:
+        key = f"{fingerprint}|{extraction_type}"
+        return key if variant is None else f"{key}|{variant}"
@@ -0,0 +1,149 @@
+"""
+Caché local de binarios de chromedriver para el modo local.
+
+`ChromeDriverManager().install()` consulta la red en cada llamada para resolver
+la versión, lo que retrasa el arranque de cada sesión y falla en máquinas sin
+conexión. `DriverCache` detecta la versión de Chrome instalada y guarda un
+chromedriver por versión mayor en un directorio local; solo descarga cuando
+falta el de la versión necesaria, y en modo offline nunca toca la red.
+"""
+
+import logging
+import os
+import re
+import shutil
+import stat
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from typing import Optional
+
+# Ejecutables de Chrome a probar, en orden, si no se indica uno
+CHROME_BINARIES = (
+    'google-chrome',
+    'google-chrome-stable',
+    'chromium',
+    'chromium-browser',
+    'chrome',
+    '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
+)
+VERSION_PATTERN = re.compile(r'(\d+)\.(\d+)\.(\d+)\.(\d+)')
+DRIVER_NAME = 'chromedriver.exe' if sys.platform.startswith('win') else 'chromedriver'
+
+
+def read_binary_version(path: str) -> Optional[str]:
+    """Ejecuta `<binario> --version` y devuelve la versión completa (ej. '126.0.6478.126')."""
+    try:
+        output = subprocess.run([path, '--version'], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = VERSION_PATTERN.search(output or '')
+    return match.group(0) if match else None
+
+
+def detect_chrome_version(binary: Optional[str] = None) -> Optional[str]:
+    """Devuelve la versión del Chrome instalado, o `None` si no se encuentra."""
+    for candidate in ([binary] if binary else CHROME_BINARIES):
+        path = shutil.which(candidate) or (candidate if os.path.isfile(candidate) else None)
+        if not path:
+            continue
+        version = read_binary_version(path)
+        if version:
+            return version
+    return None
+
+
+def major_version(version: str) -> str:
+    return version.split('.')[0]
+
+
+class DriverCache:
+    """
+    Resuelve la ruta de chromedriver para el Chrome local, con caché en disco.
+
+    Los binarios se guardan en `<root>/chromedriver-<mayor>/`: chromedriver es
+    compatible con cualquier Chrome de la misma versión mayor. La ruta resuelta
+    se memoriza durante el proceso, así que la detección se hace una sola vez.
+    """
+
+    def __init__(self, root: str, offline: bool = False, pinned_version: Optional[str] = None,
+                 chrome_binary: Optional[str] = None, logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            root (str): Directorio de la caché de binarios.
+            offline (bool): Si es True, nunca descarga; falla si falta el binario.
+            pinned_version (str): Opcional. Versión de chromedriver fija (ej. '126.0.6478.126')
+                en lugar de la del Chrome instalado.
+            chrome_binary (str): Opcional. Ejecutable de Chrome a consultar.
+            logger: Opcional. Logger para los eventos de la caché.
+        """
+        self.root = Path(root)
+        self.offline = offline
+        self.pinned_version = pinned_version
+        self.chrome_binary = chrome_binary
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+        self.downloaded = False
+        self._resolved: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def resolve(self) -> str:
+        """
+        Devuelve la ruta de un chromedriver compatible con el Chrome local.
+
+        Raises:
+            RuntimeError: En modo offline, si no hay un binario compatible en caché.
+        """
+        with self._lock:
+            if self._resolved is None:
+                self._resolved = self._resolve()
+            return self._resolved
+
+    def _resolve(self) -> str:
+        version = self.pinned_version or detect_chrome_version(self.chrome_binary)
+        if version:
+            cached = self._cached_driver(major_version(version))
+            if cached:
+                self.logger.info(f"chromedriver {major_version(version)} encontrado en caché: {cached}")
+                return cached
+        elif self.offline:
+            # Sin poder detectar Chrome, se usa el binario más reciente de la caché
+            cached = self._latest_cached_driver()
+            if cached:
+                self.logger.warning(f"No se detectó la versión de Chrome; se usa {cached}")
+                return cached
+
+        if self.offline:
+            raise RuntimeError(
+                f"Modo offline: no hay chromedriver en caché para Chrome {version or 'desconocido'} "
+                f"en {self.root}. Ejecútelo una vez con conexión o copie el binario a "
+                f"{self.root}/chromedriver-<versión mayor>/{DRIVER_NAME}."
+            )
+        return self._download(version)
+
+    def _download(self, version: Optional[str]) -> str:
+        """Descarga chromedriver con webdriver-manager y lo copia a la caché."""
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        self.logger.info(f"Descargando chromedriver para Chrome {version or '(versión detectada por webdriver-manager)'}...")
+        installed = ChromeDriverManager(driver_version=self.pinned_version).install()
+        self.downloaded = True
+        driver_version = version or read_binary_version(installed)
+        if not driver_version:
+            return installed
+
+        target_dir = self.root / f"chromedriver-{major_version(driver_version)}"
+        target_dir.mkdir(parents=True, exist_ok=True)
+        target = target_dir / DRIVER_NAME
+        shutil.copy2(installed, target)
+        target.chmod(target.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+        return str(target)
+
+    def _cached_driver(self, major: str) -> Optional[str]:
+        path = self.root / f"chromedriver-{major}" / DRIVER_NAME
+        return str(path) if path.is_file() else None
+
+    def _latest_cached_driver(self) -> Optional[str]:
+        candidates = [path for path in self.root.glob(f"chromedriver-*/{DRIVER_NAME}") if path.is_file()]
+        candidates.sort(key=lambda path: int(path.parent.name.split('-')[-1]) if path.parent.name.split('-')[-1].isdigit() else 0)
+        return str(candidates[-1]) if candidates else None
@@ -1,24 +1,42 @@
 # stylos/extensions.py
-import sentry_sdk
+import os
+import shutil
+
 from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.job import job_dir
 
 class SentryLoggingExtension:
     """
     Inicializa Sentry al abrir un spider y establece el contexto global.
+
+    Sin `SENTRY_DSN` la extensión se desactiva y `sentry_sdk` no se importa.
+    El muestreo y los límites de tamaño se configuran en `stylos.tracing`.
     """
-    def __init__(self, dsn, environment, release):
+    def __init__(self, dsn, environment, release, options=None):
         self.dsn = dsn
         self.environment = environment
         self.release = release
+        self.options = options or {}
 
     @classmethod
     def from_crawler(cls, crawler):
         # Lee la configuración desde settings.py
-        dsn = crawler.settings.get('SENTRY_DSN')
-        environment = crawler.settings.get('SENTRY_ENVIRONMENT')
-        release = crawler.settings.get('SENTRY_RELEASE')
-        
-        ext = cls(dsn, environment, release)
+        settings = crawler.settings
+        dsn = settings.get('SENTRY_DSN')
+        environment = settings.get('SENTRY_ENVIRONMENT')
+        release = settings.get('SENTRY_RELEASE')
+        if not dsn:
+            raise NotConfigured("SENTRY_DSN no está definido")
+
+        options = {
+            'traces_sample_rate': settings.getfloat('SENTRY_TRACES_SAMPLE_RATE', 0.0),
+            'max_breadcrumbs': settings.getint('SENTRY_MAX_BREADCRUMBS', 30),
+            'log_breadcrumb_level': settings.get('SENTRY_LOG_BREADCRUMB_LEVEL', 'WARNING'),
+            'max_value_length': settings.getint('SENTRY_MAX_VALUE_LENGTH', 256),
+            'max_event_bytes': settings.getint('SENTRY_MAX_EVENT_BYTES', 64 * 1024),
+        }
+        ext = cls(dsn, environment, release, options)
 
         # Conecta los métodos de la extensión a las señales de Scrapy
         crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
@@ -28,17 +46,75 @@ class SentryLoggingExtension:
 
     def spider_opened(self, spider):
         # El mejor lugar para inicializar Sentry. Se ejecuta una vez por spider.
-        if self.dsn:
-            sentry_sdk.init(
-                dsn=self.dsn,
-                environment=self.environment,
-                release=self.release,
-                traces_sample_rate=1.0 # Opcional: para performance monitoring
-            )
-            # Configura el scope global para esta ejecución con tags útiles
-            with sentry_sdk.configure_scope() as scope:
-                scope.set_tag("spider_name", spider.name)
+        import sentry_sdk
+        from stylos import tracing
+        tracing.configure(self.dsn, self.environment, self.release, **self.options)
+        # Tags útiles para todos los eventos de esta ejecución
+        sentry_sdk.set_tag("spider_name", spider.name)
+        for name in ('country', 'lang', 'mode'):
+            if getattr(spider, name, None):
+                sentry_sdk.set_tag(name, getattr(spider, name))
 
     def spider_closed(self, spider, reason):
         # Asegura que todos los eventos pendientes se envíen antes de que el spider se cierre
-        sentry_sdk.flush()
\ No newline at end of file
+        import sentry_sdk
+        sentry_sdk.flush()
+
+
+class ResumableCrawlExtension:
+    """
+    Gestiona el ciclo de vida de los rastreos reanudables (`JOBDIR`).
+
+    Scrapy ya persiste en `JOBDIR` la cola de peticiones, el filtro de duplicados
+    y `spider.state` cuando la araña se detiene de forma ordenada (por ejemplo al
+    cancelar el trabajo en Scrapyd). Esta extensión completa ese comportamiento:
+    - Si el rastreo anterior terminó con éxito, vacía `JOBDIR` antes de empezar,
+      para que el mismo directorio sirva para la siguiente corrida completa.
+    - Si no, el rastreo continúa donde quedó y se registra en las estadísticas.
+    """
+    FINISHED_MARKER = 'finished.marker'
+
+    def __init__(self, jobdir, stats):
+        self.jobdir = jobdir
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        jobdir = job_dir(crawler.settings)
+        if not jobdir:
+            raise NotConfigured("Rastreo no reanudable: JOBDIR no está definido")
+
+        ext = cls(jobdir, crawler.stats)
+        # Se ejecuta antes de que el scheduler cargue la cola desde JOBDIR
+        ext.reset_if_finished()
+
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        return ext
+
+    def reset_if_finished(self):
+        """Vacía `JOBDIR` si el rastreo anterior terminó con éxito."""
+        if not os.path.exists(os.path.join(self.jobdir, self.FINISHED_MARKER)):
+            return
+        for name in os.listdir(self.jobdir):
+            path = os.path.join(self.jobdir, name)
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+
+    def spider_opened(self, spider):
+        resumed = os.path.exists(os.path.join(self.jobdir, 'spider.state'))
+        self.stats.set_value('resume/resumed', resumed)
+        if resumed:
+            pending = len(getattr(spider, 'state', {}).get('pending_colors', {}))
+            spider.logger.info(f"♻️ Reanudando rastreo desde {self.jobdir} ({pending} productos con colores pendientes)")
+        else:
+            spider.logger.info(f"Rastreo reanudable iniciado en {self.jobdir}")
+
+    def spider_closed(self, spider, reason):
+        if reason == 'finished':
+            with open(os.path.join(self.jobdir, self.FINISHED_MARKER), 'w') as f:
+                f.write(reason)
+        else:
+            spider.logger.info(f"Rastreo detenido ({reason}); se puede reanudar con el mismo JOBDIR: {self.jobdir}")
@@ -4,20 +4,34 @@ Cada sitio tiene su propio extractor con lógica específica.
 """
 
 from abc import ABC, abstractmethod
-from typing import Optional
-from selenium.webdriver.remote.webelement import WebElement
+from importlib import import_module
+from typing import TYPE_CHECKING, Dict, List, Optional
+from urllib.parse import urlsplit, urlunsplit
 import logging
+import sys
 import time
 
+from stylos.instrumentation import current_trace
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webelement import WebElement
+
 class BaseExtractor(ABC):
     """
     Clase base abstracta para todos los extractors.
     Define la interfaz común que deben implementar todos los extractors específicos.
     """
+
+    # Página de inicio del sitio por país/idioma, usada por `warm_up`
+    HOME_URL: Optional[str] = None
     
-    def __init__(self, driver, spider):
+    def __init__(self, driver, spider, image_cache=None, meta=None):
         self.driver = driver
         self.spider = spider
+        # Caché opcional de imágenes por color (ver `stylos.cache.ImageSetCache`)
+        self.image_cache = image_cache
+        # Meta de la petición en curso (ej. 'color_index' en las peticiones por color)
+        self.meta = meta or {}
         self.logger = logging.getLogger(self.__class__.__name__)
     
     @abstractmethod
@@ -36,11 +50,44 @@ class BaseExtractor(ABC):
         pass
     
     # Métodos comunes que pueden ser sobrescritos
+    def warm_up(self, country: str, lang: str) -> None:
+        """
+        Deja la sesión lista para rastrear el país/idioma dado (ver `stylos.broker`).
+
+        Por defecto abre la página de inicio para que el navegador ya tenga las
+        cookies de la tienda. Los extractors pueden sobrescribirlo para cerrar
+        diálogos de geolocalización, banners de cookies, etc.
+        """
+        if self.HOME_URL:
+            self.driver.get(self.home_url(country, lang))
+
+    def home_url(self, country: str, lang: str) -> str:
+        """
+        Página de inicio del país/idioma. Si la araña apunta a otro origen
+        (`-a base_url=...`, ver `BaseUrlMixin`), se usa ese origen.
+        """
+        url = self.HOME_URL.format(country=country, lang=lang)
+        base_url = getattr(self.spider, 'base_url', None)
+        if not isinstance(base_url, str) or not base_url:
+            return url
+        base, parts = urlsplit(base_url), urlsplit(url)
+        return urlunsplit((base.scheme, base.netloc, base.path.rstrip('/') + parts.path, parts.query, parts.fragment))
+
     def log(self, message, level='info'):
         """Helper para logging consistente."""
         getattr(self.spider, 'log', print)(message)
         getattr(self.logger, level)(message)
     
+    def sleep(self, seconds):
+        """
+        Pausa el render. Queda registrada como el comando `sleep` en la traza
+        de WebDriver de la petición (ver `stylos.instrumentation`).
+        """
+        time.sleep(seconds)
+        trace = current_trace(self.driver)
+        if trace is not None:
+            trace.record('sleep', seconds, f"{type(self).__name__}.{sys._getframe(1).f_code.co_name}")
+
     def wait_for_element(self, selector, timeout=15, by_xpath=False):
         """Helper común para esperar elementos."""
         from selenium.webdriver.common.by import By
@@ -51,7 +98,7 @@ class BaseExtractor(ABC):
         by = By.XPATH if by_xpath else By.CSS_SELECTOR
         return wait.until(EC.presence_of_element_located((by, selector)))
     
-    def _get_best_image_url(self, element: WebElement) -> Optional[str]:
+    def _get_best_image_url(self, element: 'WebElement') -> Optional[str]:
         """
         Obtiene la mejor URL de imagen de un elemento, priorizando atributos
         de alta resolución o de carga diferida.
@@ -157,7 +204,57 @@ class BaseExtractor(ABC):
         
         return any(pattern in src_lower for pattern in product_image_patterns)
     
-    def _wait_for_image_load(self, img_element: WebElement, max_attempts: int = 10) -> Optional[str]:
+    def _product_cache_key(self) -> str:
+        """
+        Clave estable del producto actual para la caché de imágenes.
+
+        Usa el host y la ruta de la URL actual, sin query ni fragmento, para que
+        las variantes (`?v1=...`) del mismo producto compartan la clave.
+        """
+        parts = urlsplit(self.driver.current_url)
+        return f"{parts.netloc}{parts.path}"
+
+    def _image_set_fingerprint(self, image_selector: str) -> Optional[str]:
+        """
+        Calcula una huella barata de la galería visible, sin hacer scroll.
+
+        La huella combina el número de elementos `<img>` de la galería y la URL
+        de la primera imagen. Si la primera imagen aún no tiene una URL válida
+        (carga diferida), devuelve `None` para forzar la recolección completa.
+
+        Args:
+            image_selector (str): Selector CSS de las imágenes de la galería.
+
+        Returns:
+            Optional[str]: La huella, o `None` si no se puede calcular.
+        """
+        if not self.image_cache:
+            return None
+        try:
+            from selenium.webdriver.common.by import By
+            image_elements = self.driver.find_elements(By.CSS_SELECTOR, image_selector)
+            if not image_elements:
+                return None
+            first_url = self._get_best_image_url(image_elements[0])
+            if not first_url:
+                return None
+            return f"{len(image_elements)}|{first_url}"
+        except Exception as e:
+            self.log(f"No se pudo calcular la huella de la galería: {e}", 'debug')
+            return None
+
+    def _get_cached_color_images(self, color_name: str, fingerprint: Optional[str]) -> Optional[List[Dict[str, str]]]:
+        """Devuelve las imágenes en caché de un color si su huella no cambió."""
+        if not self.image_cache or not fingerprint:
+            return None
+        return self.image_cache.lookup(self._product_cache_key(), color_name, fingerprint)
+
+    def _store_color_images(self, color_name: str, fingerprint: Optional[str], images: List[Dict[str, str]]) -> None:
+        """Guarda en caché las imágenes recolectadas de un color."""
+        if self.image_cache:
+            self.image_cache.store(self._product_cache_key(), color_name, fingerprint, images)
+
+    def _wait_for_image_load(self, img_element: 'WebElement', max_attempts: int = 10) -> Optional[str]:
         """
         Espera a que una imagen se cargue completamente y devuelve su URL.
 
@@ -175,22 +272,32 @@ class BaseExtractor(ABC):
             try:
                 # Asegura que la imagen esté en el viewport para que se cargue.
                 self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", img_element)
-                time.sleep(0.1)
+                self.sleep(0.1)
                 
                 valid_url = self._get_best_image_url(img_element)
                 if valid_url:
                     return valid_url
             except Exception as e:
                 self.log(f"Intento {attempt + 1} de carga de imagen fallido: {e}", 'debug')
-                time.sleep(0.2)
+                self.sleep(0.2)
         return None
 
 
 class ExtractorRegistry:
     """
     Registry para mapear spiders a sus extractors correspondientes.
+
+    Los extractors se importan bajo demanda, la primera vez que se piden: los
+    del proyecto desde `BUILTIN_EXTRACTORS` y los de paquetes externos desde
+    el grupo de entry points `stylos.extractors` (nombre de la araña → clase).
     """
     _extractors = {}
+    # Araña → módulo del extractor incluido en el proyecto
+    BUILTIN_EXTRACTORS = {
+        'zara': 'stylos.extractors.zara_extractor',
+        'mango': 'stylos.extractors.mango_extractor',
+    }
+    ENTRY_POINT_GROUP = 'stylos.extractors'
     
     @classmethod
     def register(cls, spider_name, extractor_class):
@@ -198,18 +305,45 @@ class ExtractorRegistry:
         cls._extractors[spider_name] = extractor_class
     
     @classmethod
-    def get_extractor(cls, spider_name, driver, spider):
-        """Obtiene el extractor apropiado para un spider."""
-        extractor_class = cls._extractors.get(spider_name)
+    def get_extractor(cls, spider_name, driver, spider, **kwargs):
+        """
+        Obtiene el extractor apropiado para un spider.
+        Los argumentos adicionales (ej. `image_cache`, `meta`) se pasan al constructor.
+        """
+        extractor_class = cls._extractors.get(spider_name) or cls._load(spider_name)
         if not extractor_class:
             raise ValueError(f"No hay extractor registrado para el spider '{spider_name}'")
-        return extractor_class(driver, spider)
+        return extractor_class(driver, spider, **kwargs)
     
     @classmethod
     def list_registered(cls):
         """Lista todos los extractors registrados."""
         return list(cls._extractors.keys())
 
+    @classmethod
+    def load_all(cls):
+        """Importa todos los extractors conocidos (incluidos y de entry points)."""
+        from importlib.metadata import entry_points
+        names = set(cls.BUILTIN_EXTRACTORS) | {entry_point.name for entry_point in entry_points(group=cls.ENTRY_POINT_GROUP)}
+        for spider_name in names:
+            if spider_name not in cls._extractors:
+                cls._load(spider_name)
+        return cls.list_registered()
+
+    @classmethod
+    def _load(cls, spider_name):
+        """Importa el extractor de una araña; al importarse se registra con `@register_extractor`."""
+        module_path = cls.BUILTIN_EXTRACTORS.get(spider_name)
+        if module_path:
+            import_module(module_path)
+            return cls._extractors.get(spider_name)
+        from importlib.metadata import entry_points
+        for entry_point in entry_points(group=cls.ENTRY_POINT_GROUP, name=spider_name):
+            extractor_class = entry_point.load()
+            cls._extractors.setdefault(spider_name, extractor_class)
+            return cls._extractors[spider_name]
+        return None
+
 
 def register_extractor(spider_name):
     """
@@ -3,7 +3,6 @@ Extractor específico para el sitio web de Mango.
 Ejemplo de implementación para un sitio diferente con selectores y lógica distintos.
 """
 
-import time
 from typing import List, Dict, Any, Optional
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -35,6 +34,7 @@ class MangoExtractor(BaseExtractor):
     }
     
     SCROLL_TRIGGER_SELECTOR = ".load-more-products, .infinite-scroll-trigger"
+    HOME_URL = "https://shop.mango.com/{country}/{lang}/"
 
     def extract_menu_data(self):
         """
@@ -73,15 +73,15 @@ class MangoExtractor(BaseExtractor):
         max_attempts = 30  # Límite de seguridad para evitar bucles infinitos.
 
         while scroll_attempts < max_attempts:
-            time.sleep(0.5)
+            self.sleep(0.5)
             self.driver.execute_script(f"window.scrollTo(0, {last_height/2});")
-            time.sleep(1.6)
+            self.sleep(1.6)
             self.driver.execute_script(f"window.scrollTo(0, {last_height/1.4});")
-            time.sleep(1.5)
+            self.sleep(1.5)
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(0.8)
+            self.sleep(0.8)
             self.driver.execute_script(f"window.scrollTo(0, {last_height/2});")
-            time.sleep(0.5)
+            self.sleep(0.5)
             self.driver.execute_script(f"window.scrollTo(0, {last_height/1.2});")
 
             new_height = self.driver.execute_script("return document.body.scrollHeight")
@@ -105,7 +105,7 @@ class MangoExtractor(BaseExtractor):
         try:
             # Esperar carga específica de Mango
             wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, self.PRODUCT_SELECTORS['name'])))
-            time.sleep(2)
+            self.sleep(2)
             
             # Extraer datos básicos con selectores de Mango
             product_data = self._extract_mango_product_info()
@@ -125,6 +125,85 @@ class MangoExtractor(BaseExtractor):
             self.log(f"Error en extracción de producto de Mango: {e}", 'error')
             return {'product_data': {}, 'extracted_images': {}}
 
+    def extract_price_data(self):
+        """
+        Extrae solo nombre, precios y moneda de un producto de Mango ya conocido.
+        No recorre los colores ni las imágenes.
+        """
+        self.log("Iniciando extracción rápida de precios de Mango")
+        wait = WebDriverWait(self.driver, 15)
+
+        try:
+            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, self.PRODUCT_SELECTORS['name'])))
+            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, self.PRODUCT_SELECTORS['prices'])))
+
+            product_data = self._extract_mango_price_info()
+            self.log(f"Extracción de precios de Mango completada. Precios: {len(product_data['prices'])}")
+            return {'product_data': product_data}
+
+        except Exception as e:
+            self.log(f"Error en extracción de precios de Mango: {e}", 'error')
+            return {'product_data': {}}
+
+    def extract_variants_data(self):
+        """
+        Extrae los datos básicos y descubre las variantes de color (con su URL)
+        para que la araña reparta cada color como una petición independiente.
+        Si solo hay un color, extrae sus imágenes directamente.
+        """
+        self.log("Iniciando descubrimiento de variantes de color de Mango")
+        wait = WebDriverWait(self.driver, 15)
+        
+        try:
+            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, self.PRODUCT_SELECTORS['name'])))
+            self.sleep(2)
+            
+            product_data = self._extract_mango_product_info()
+            variants = self._discover_mango_color_variants()
+            self.log(f"Variantes de color descubiertas: {len(variants)}")
+            
+            extracted_data = {'product_data': product_data, 'color_variants': variants}
+            if len(variants) <= 1:
+                extracted_data['extracted_images'] = self._extract_mango_images_by_color()
+            return extracted_data
+            
+        except Exception as e:
+            self.log(f"Error descubriendo variantes de Mango: {e}", 'error')
+            return {'product_data': {}, 'color_variants': [], 'extracted_images': {}}
+
+    def extract_color_data(self):
+        """
+        Extrae las imágenes de una sola variante de color.
+        La petición normalmente ya apunta a la URL de la variante; si no, se hace
+        clic en la opción `meta['color_index']`.
+        """
+        index = self.meta.get('color_index', 0)
+        self.log(f"Iniciando extracción del color {index} de Mango")
+        wait = WebDriverWait(self.driver, 15)
+        
+        try:
+            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, self.PRODUCT_SELECTORS['name'])))
+            self.sleep(1.2)
+            
+            if not self.meta.get('variant_url'):
+                color_options = self.driver.find_elements(By.CSS_SELECTOR, self.PRODUCT_SELECTORS['color_options'])
+                if index < len(color_options):
+                    self.driver.execute_script("arguments[0].click();", color_options[index])
+                    self.sleep(1.2)
+            
+            try:
+                color_name_element = self.driver.find_element(By.CSS_SELECTOR, self.PRODUCT_SELECTORS['current_color'])
+                color_name = color_name_element.text.strip() or f"Color_{index+1}"
+            except Exception:
+                color_name = f"Color_{index+1}"
+            
+            images = self._get_color_images(color_name)
+            return {'extracted_images': {color_name: images} if images else {}}
+            
+        except Exception as e:
+            self.log(f"Error en extracción del color {index} de Mango: {e}", 'error')
+            return {'extracted_images': {}}
+
     # Métodos auxiliares específicos de Mango
 
     def _extract_mango_product_info(self) -> Dict[str, Any]:
@@ -181,6 +260,34 @@ class MangoExtractor(BaseExtractor):
             
         return product_data
 
+    def _extract_mango_price_info(self) -> Dict[str, Any]:
+        """Extrae nombre, precios y moneda con selectores de Mango."""
+        product_data: Dict[str, Any] = {
+            'name': None,
+            'prices': [],
+            'currency': None
+        }
+
+        try:
+            name_element = self.driver.find_element(By.CSS_SELECTOR, self.PRODUCT_SELECTORS['name'])
+            product_data['name'] = name_element.text.strip() if name_element else None
+        except Exception as e:
+            self.log(f"Error extrayendo nombre: {e}", 'error')
+
+        try:
+            price_elements = self.driver.find_elements(By.CSS_SELECTOR, self.PRODUCT_SELECTORS['prices'])
+            product_data['prices'] = [elem.text.strip() for elem in price_elements if elem.text.strip()]
+        except Exception as e:
+            self.log(f"Error extrayendo precios: {e}", 'error')
+
+        try:
+            currency_element = self.driver.find_element(By.CSS_SELECTOR, self.PRODUCT_SELECTORS['currency'])
+            product_data['currency'] = currency_element.text.strip() if currency_element else None
+        except Exception as e:
+            self.log(f"Error extrayendo moneda: {e}", 'error')
+
+        return product_data
+
     def _extract_mango_images_by_color(self):
         """Extrae imágenes por color específico para Mango."""
         images_by_color: Dict[str, List[Dict[str, str]]] = {}
@@ -209,12 +316,11 @@ class MangoExtractor(BaseExtractor):
                     self.log(f"Color '{color_name}' ya procesado, asignando nombre único", 'warning')
                     color_name = f"{color_name}_{i+1}"
                 
-                # Extraer imágenes para el color actual
-                images = self._get_current_product_images()
+                # Extraer imágenes para el color actual (o reutilizarlas de la caché)
+                images = self._get_color_images(color_name)
                 
                 if images:
                     images_by_color[color_name] = images
-                    self.log(f"Color '{color_name}': {len(images)} imágenes extraídas")
                 else:
                     self.log(f"No se encontraron imágenes válidas para el color '{color_name}'", 'warning')
                     
@@ -229,11 +335,11 @@ class MangoExtractor(BaseExtractor):
                             
                         current_color_button = current_color_buttons[i]
                         self.driver.execute_script("arguments[0].click();", current_color_button)
-                        time.sleep(1.2)
+                        self.sleep(1.2)
                         
                         height = self.driver.execute_script("return document.body.scrollHeight")
                         self.driver.execute_script(f"window.scrollTo(0, {height/2});")
-                        time.sleep(0.5)
+                        self.sleep(0.5)
                         self.driver.execute_script(f"window.scrollTo(0, 0);")
                     except Exception as e:
                         self.log(f"No se pudo hacer clic en el botón de color {i}: {e}", "warning")
@@ -244,6 +350,39 @@ class MangoExtractor(BaseExtractor):
             
         return images_by_color
 
+    def _get_color_images(self, color_name: str) -> List[Dict[str, str]]:
+        """
+        Obtiene las imágenes del color mostrado, reutilizando la caché si la
+        huella de la galería no cambió desde la última visita.
+        """
+        fingerprint = self._image_set_fingerprint(self.PRODUCT_SELECTORS['product_images'])
+        images = self._get_cached_color_images(color_name, fingerprint)
+        if images:
+            self.log(f"Color '{color_name}': {len(images)} imágenes reutilizadas de la caché")
+            return images
+
+        images = self._get_current_product_images()
+        if images:
+            self._store_color_images(color_name, fingerprint, images)
+            self.log(f"Color '{color_name}': {len(images)} imágenes extraídas")
+        return images
+
+    def _discover_mango_color_variants(self) -> List[Dict[str, Any]]:
+        """
+        Descubre las variantes de color a partir de los enlaces del selector de color.
+        En Mango cada color tiene su propia URL, así que no hace falta hacer clic.
+        """
+        variants: List[Dict[str, Any]] = []
+        color_links = self.driver.find_elements(By.CSS_SELECTOR, self.PRODUCT_SELECTORS['color_options'])
+        for i, link in enumerate(color_links):
+            try:
+                color = link.get_attribute('aria-label') or link.text.strip() or None
+                url = link.get_attribute('href')
+            except Exception:
+                color, url = None, None
+            variants.append({'index': i, 'color': color, 'url': url})
+        return variants
+
     def _get_current_product_images(self):
         """Obtiene las imágenes del producto actualmente mostradas en Mango."""
         self.log("Iniciando extracción de imágenes de Mango")
@@ -261,7 +400,7 @@ class MangoExtractor(BaseExtractor):
                 try:
                     # Hacer scroll hasta el elemento para asegurar que esté en viewport
                     self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", img)
-                    time.sleep(0.3)  # Espera más tiempo para la carga
+                    self.sleep(0.3)  # Espera más tiempo para la carga
                     
                     # Usar la lógica mejorada de obtención de URL
                     src = self._wait_for_image_load(img, max_attempts=3)
@@ -1,24 +1,23 @@
 """
-Archivo de registro automático de extractors.
-Importa todos los extractors para que se registren automáticamente.
-"""
+Acceso al registro de extractors.
 
-# Importar todos los extractors para registro automático
-from stylos.extractors.zara_extractor import ZaraExtractor
-from stylos.extractors.mango_extractor import MangoExtractor
+Los extractors ya no se importan al cargar este módulo: `ExtractorRegistry`
+los importa bajo demanda la primera vez que una araña los pide (ver
+`ExtractorRegistry.BUILTIN_EXTRACTORS` y el grupo de entry points
+`stylos.extractors`).
+"""
 
-# También re-exportar el registry para conveniencia
+# Re-exportar el registry para conveniencia
 from stylos.extractors import ExtractorRegistry
 
 # Función de utilidad para listar extractors registrados
 def list_available_extractors():
-    """Lista todos los extractors disponibles."""
-    registered = ExtractorRegistry.list_registered()
+    """Importa y lista todos los extractors disponibles."""
+    registered = ExtractorRegistry.load_all()
     print("🕷️ Extractors registrados:")
     for spider_name in registered:
         print(f"  - {spider_name}")
     return registered
 
-# Auto-registro al importar
 if __name__ == "__main__":
-    list_available_extractors() 
\ No newline at end of file
+    list_available_extractors()
@@ -8,8 +8,10 @@ de Zara. Hereda de `BaseExtractor` y se encarga de:
 - Extraer datos detallados de los productos, incluyendo imágenes por color.
 """
 
-import time
 from typing import List, Dict, Any, Optional
+from urllib.parse import urljoin
+
+from parsel import Selector
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.remote.webelement import WebElement
@@ -72,13 +74,14 @@ class ZaraExtractor(BaseExtractor):
     
     DIALOG_CHANGE_LANGUAGE_SELECTOR = "div.zds-dialog__focus-trap"
     DIALOG_CHANGE_LANGUAGE_CLOSE_BUTTON_SELECTOR = "button.geolocation-modal__button[data-qa-action='stay-in-store']"
+    HOME_URL = "https://www.zara.com/{country}/{lang}/"
     
-    def __init__(self, driver, spider):
+    def __init__(self, driver, spider, **kwargs):
         """
         Constructor que inicializa el extractor con selectores y configuraciones
         dinámicas basadas en el idioma proporcionado por la araña.
         """
-        super().__init__(driver, spider)
+        super().__init__(driver, spider, **kwargs)
         self.lang = getattr(spider, 'lang', 'es')
         
         # Usar inglés como fallback si el idioma no está en las traducciones
@@ -116,52 +119,66 @@ class ZaraExtractor(BaseExtractor):
         Extrae todas las URLs de las subcategorías desde el menú principal.
 
         El proceso consiste en:
-        1. Localizar y hacer clic en el botón del menú "hamburguesa".
-        2. Esperar a que el panel del menú sea visible.
-        3. Iterar sobre la configuración de categorías (HOMBRE, MUJER).
-        4. Para cada categoría, hacer clic, extraer las URLs de sus subcategorías
-           y luego cerrarla para proceder con la siguiente.
-        5. Agregar todas las URLs encontradas a una lista.
+        1. Leer de una sola vez (un `page_source`) los enlaces que ya están en el
+           DOM oculto del menú, junto con su ruta de categoría. No requiere clics
+           ni esperas, por lo que tarda milisegundos.
+        2. Solo para las categorías (HOMBRE, MUJER) cuyos enlaces no aparecen en
+           el DOM, abrir el menú "hamburguesa" y recorrerlas con clics.
 
         Returns:
             Dict[str, List[str]]: Un diccionario con la clave 'extracted_urls'
-            conteniendo una lista de las URLs de subcategorías encontradas.
+            conteniendo una lista de las URLs de subcategorías encontradas, y la
+            clave 'menu_links' con cada URL y su ruta de categoría.
         """
         self.log("Iniciando extracción de menú de Zara")
-        wait = WebDriverWait(self.driver, 15)
-        extracted_urls: List[str] = []
-        
-        time.sleep(1.3)
         
-        # Cerrar el diálogo de cambio de idioma si está abierto
-        if self.driver.find_elements(By.CSS_SELECTOR, self.DIALOG_CHANGE_LANGUAGE_SELECTOR):
-            self.log("Cerrando diálogo de cambio de idioma")
-            close_button = self.driver.find_element(By.CSS_SELECTOR, self.DIALOG_CHANGE_LANGUAGE_CLOSE_BUTTON_SELECTOR)
-            if close_button:
-                close_button.click()
-                time.sleep(0.8)
-
-        try:
-            hamburger_button = self._find_hamburger_button(wait)
-            if not hamburger_button:
-                self.log("No se pudo abrir el menú, finalizando extracción de URLs.", 'warning')
-                return {'extracted_urls': []}
-
-            hamburger_button.click()
-            self.log("Menú hamburguesa abierto exitosamente")
-
-            wait.until(EC.visibility_of_element_located((By.XPATH, self.MENU_PANEL_XPATH)))
-            time.sleep(1)  # Pausa breve para asegurar que las animaciones terminen.
+        menu_links = self._extract_menu_links_from_dom()
+        missing = [config for config in self.CATEGORIES_CONFIG if not menu_links.get(config['name'])]
+        if missing:
+            names = ', '.join(config['name'] for config in missing)
+            self.log(f"Enlaces de {names} no presentes en el DOM, usando navegación por clics", 'warning')
+            menu_links.update(self._extract_menu_links_by_click(missing))
+        else:
+            self.log("Menú extraído directamente del DOM, sin navegación por clics")
+
+        links = [link for category_links in menu_links.values() for link in category_links]
+        extracted_urls = [link['url'] for link in links]
+        self.log(f"Extracción de menú completada. Total URLs: {len(extracted_urls)}")
+        return {'extracted_urls': extracted_urls, 'menu_links': links}
 
-            for category_config in self.CATEGORIES_CONFIG:
-                urls = self._extract_category_urls(wait, category_config)
-                extracted_urls.extend(urls)
+    @staticmethod
+    def parse_menu_links(html: str, categories_config: List[Dict[str, str]], base_url: str = '') -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Obtiene los enlaces de subcategorías del menú a partir del HTML de la página.
 
-        except Exception as e:
-            self.log(f"Error crítico durante la extracción de menú de Zara: {e}", 'error')
+        Args:
+            html (str): HTML completo de la página (por ejemplo, `driver.page_source`).
+            categories_config (List[Dict[str, str]]): Configuración de categorías
+                (`CATEGORIES_CONFIG`), con el XPath de la lista de cada una.
+            base_url (str): URL para resolver enlaces relativos.
 
-        self.log(f"Extracción de menú completada. Total URLs: {len(extracted_urls)}")
-        return {'extracted_urls': extracted_urls}
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: Por nombre de categoría, la lista de
+            enlaces como `{'url': str, 'path': [categoría, subcategoría]}`.
+            Las categorías sin enlaces en el DOM no aparecen.
+        """
+        selector = Selector(text=html)
+        menu_links: Dict[str, List[Dict[str, Any]]] = {}
+
+        for category_config in categories_config:
+            links = []
+            for anchor in selector.xpath(category_config['subcategory_list']).xpath(".//a[@href]"):
+                href = anchor.xpath("@href").get('').strip()
+                if not href:
+                    continue
+                label = anchor.xpath("normalize-space(.)").get('')
+                links.append({
+                    'url': urljoin(base_url, href),
+                    'path': [category_config['name'], label] if label else [category_config['name']]
+                })
+            if links:
+                menu_links[category_config['name']] = links
+        return menu_links
 
     def extract_category_data(self) -> Dict[str, Any]:
         """
@@ -183,7 +200,7 @@ class ZaraExtractor(BaseExtractor):
 
         while scroll_attempts < max_attempts:
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)  # Espera a que los nuevos productos se carguen.
+            self.sleep(2)  # Espera a que los nuevos productos se carguen.
 
             new_height = self.driver.execute_script("return document.body.scrollHeight")
             if new_height == last_height:
@@ -233,7 +250,163 @@ class ZaraExtractor(BaseExtractor):
             return {'product_data': {}, 'extracted_images': {}}
 
 
+    def extract_price_data(self) -> Dict[str, Any]:
+        """
+        Extrae únicamente el nombre y los precios de un producto ya conocido.
+
+        Es el modo de refresco rápido: espera solo a los selectores de nombre y
+        precio y retorna de inmediato, sin scrolls ni clics en los colores.
+        Las imágenes quedan intactas en la base de datos.
+
+        Returns:
+            Dict[str, Any]: Un diccionario con 'product_data' (nombre y precios).
+            En caso de error, devuelve un diccionario vacío.
+        """
+        self.log("Iniciando extracción rápida de precios de Zara.")
+        wait = WebDriverWait(self.driver, 15)
+
+        try:
+            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, self.PRODUCT_SELECTORS['name'])))
+            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, self.PRODUCT_SELECTORS['prices'])))
+
+            product_data = self._extract_price_info()
+            self.log(f"Extracción de precios completada. Precios encontrados: {len(product_data.get('prices', []))}")
+            return {'product_data': product_data}
+
+        except Exception as e:
+            self.log(f"Error crítico en la extracción de precios de Zara: {e}", 'error')
+            return {'product_data': {}}
+
+
+    def extract_variants_data(self) -> Dict[str, Any]:
+        """
+        Extrae la información básica del producto y descubre sus variantes de color
+        sin recorrerlas, para que la araña reparta cada color como una petición
+        independiente entre las sesiones libres del pool.
+
+        Si el producto tiene un solo color (o ninguno), las imágenes se extraen
+        aquí mismo y no hace falta repartir nada.
+
+        Returns:
+            Dict[str, Any]: Un diccionario con 'product_data', 'color_variants'
+            (lista de variantes con 'index', 'color' y 'url') y, si el producto
+            tiene un solo color, 'extracted_images'.
+        """
+        self.log("Iniciando descubrimiento de variantes de color de Zara.")
+        wait = WebDriverWait(self.driver, 15)
+
+        try:
+            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, self.PRODUCT_SELECTORS['name'])))
+
+            product_data = self._extract_basic_product_info()
+            variants = self._discover_color_variants()
+            self.log(f"Variantes de color descubiertas: {len(variants)}")
+
+            extracted_data: Dict[str, Any] = {'product_data': product_data, 'color_variants': variants}
+            if len(variants) <= 1:
+                extracted_data['extracted_images'] = self._extract_images_by_color()
+            return extracted_data
+
+        except Exception as e:
+            self.log(f"Error crítico descubriendo variantes de Zara: {e}", 'error')
+            return {'product_data': {}, 'color_variants': [], 'extracted_images': {}}
+
+    def extract_color_data(self) -> Dict[str, Any]:
+        """
+        Extrae las imágenes de una sola variante de color del producto.
+
+        La variante viene en `meta['color_index']`. Si la petición ya apunta a la
+        URL propia de la variante (`meta['variant_url']`), no hace falta hacer clic.
+
+        Returns:
+            Dict[str, Any]: Un diccionario con 'extracted_images' ({color: imágenes}).
+        """
+        index = self.meta.get('color_index', 0)
+        self.log(f"Iniciando extracción del color {index} de Zara.")
+        wait = WebDriverWait(self.driver, 15)
+
+        try:
+            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, self.PRODUCT_SELECTORS['name'])))
+
+            if not self.meta.get('variant_url'):
+                self._force_systematic_scroll()
+                if not self._select_color(index):
+                    return {'extracted_images': {}}
+
+            color_name, images = self._extract_current_color_images(index)
+            return {'extracted_images': {color_name: images} if images else {}}
+
+        except Exception as e:
+            self.log(f"Error crítico en la extracción del color {index} de Zara: {e}", 'error')
+            return {'extracted_images': {}}
+
+
     # --- Métodos auxiliares específicos de Zara ---
+    def warm_up(self, country: str, lang: str) -> None:
+        """Abre la tienda del país y cierra el diálogo de geolocalización."""
+        super().warm_up(country, lang)
+        self.sleep(1.3)
+        self._dismiss_language_dialog()
+
+    def _dismiss_language_dialog(self) -> None:
+        """Cierra el diálogo de cambio de idioma/país si está abierto."""
+        if self.driver.find_elements(By.CSS_SELECTOR, self.DIALOG_CHANGE_LANGUAGE_SELECTOR):
+            self.log("Cerrando diálogo de cambio de idioma")
+            close_button = self.driver.find_element(By.CSS_SELECTOR, self.DIALOG_CHANGE_LANGUAGE_CLOSE_BUTTON_SELECTOR)
+            if close_button:
+                close_button.click()
+                self.sleep(0.8)
+
+    def _extract_menu_links_from_dom(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Lee los enlaces del menú presentes en el DOM con una sola llamada a `page_source`."""
+        try:
+            return self.parse_menu_links(self.driver.page_source, self.CATEGORIES_CONFIG, self.driver.current_url)
+        except Exception as e:
+            self.log(f"Error leyendo el menú desde el DOM: {e}", 'warning')
+            return {}
+
+    def _extract_menu_links_by_click(self, categories: List[Dict[str, str]]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Abre el menú hamburguesa y obtiene los enlaces de las categorías dadas.
+
+        Con el panel abierto se vuelve a leer el DOM; solo las categorías que
+        siguen sin enlaces se recorren haciendo clic en cada una.
+        """
+        wait = WebDriverWait(self.driver, 15)
+        menu_links: Dict[str, List[Dict[str, Any]]] = {}
+        
+        self.sleep(1.3)
+        
+        self._dismiss_language_dialog()
+
+        try:
+            hamburger_button = self._find_hamburger_button(wait)
+            if not hamburger_button:
+                self.log("No se pudo abrir el menú, finalizando extracción de URLs.", 'warning')
+                return menu_links
+
+            hamburger_button.click()
+            self.log("Menú hamburguesa abierto exitosamente")
+
+            wait.until(EC.visibility_of_element_located((By.XPATH, self.MENU_PANEL_XPATH)))
+            self.sleep(1)  # Pausa breve para asegurar que las animaciones terminen.
+
+            # Con el panel abierto, los enlaces suelen estar ya renderizados
+            dom_links = self._extract_menu_links_from_dom()
+            for category_config in categories:
+                name = category_config['name']
+                if dom_links.get(name):
+                    menu_links[name] = dom_links[name]
+                    continue
+                urls = self._extract_category_urls(wait, category_config)
+                if urls:
+                    menu_links[name] = [{'url': url, 'path': [name]} for url in urls]
+
+        except Exception as e:
+            self.log(f"Error crítico durante la extracción de menú de Zara: {e}", 'error')
+
+        return menu_links
+
     def _find_hamburger_button(self, wait: WebDriverWait) -> Optional[WebElement]:
         """
         Encuentra el botón del menú hamburguesa usando una lista de selectores.
@@ -279,7 +452,7 @@ class ZaraExtractor(BaseExtractor):
         try:
             category_element = wait.until(EC.element_to_be_clickable((By.XPATH, category_config['selector'])))
             category_element.click()
-            time.sleep(0.3)  # Pausa para la animación de despliegue.
+            self.sleep(0.3)  # Pausa para la animación de despliegue.
 
             subcategory_container = wait.until(EC.visibility_of_element_located((By.XPATH, category_config['subcategory_list'])))
             subcategory_links = subcategory_container.find_elements(By.XPATH, ".//a[@href]")
@@ -295,7 +468,7 @@ class ZaraExtractor(BaseExtractor):
             # y evitar interferencias con la siguiente.
             try:
                 category_element.click()
-                time.sleep(0.4)
+                self.sleep(0.4)
             except Exception:
                 pass  # Si falla, no es crítico.
 
@@ -333,6 +506,26 @@ class ZaraExtractor(BaseExtractor):
         
         return product_data
 
+    def _extract_price_info(self) -> Dict[str, Any]:
+        """
+        Extrae solo el nombre y la lista de precios del producto.
+
+        Returns:
+            Dict[str, Any]: Un diccionario con 'name' y 'prices'.
+        """
+        product_data: Dict[str, Any] = {}
+
+        try:
+            name_element = self.driver.find_element(By.CSS_SELECTOR, self.PRODUCT_SELECTORS['name'])
+            product_data['name'] = name_element.text.strip() if name_element else None
+
+            price_elements = self.driver.find_elements(By.CSS_SELECTOR, self.PRODUCT_SELECTORS['prices'])
+            product_data['prices'] = [elem.text.strip() for elem in price_elements if elem.text.strip()]
+        except Exception as e:
+            self.log(f"Error extrayendo precios del producto: {e}", 'error')
+
+        return product_data
+
     def _extract_images_by_color(self) -> Dict[str, List[Dict[str, str]]]:
         """
         Orquesta la extracción de imágenes para cada variante de color del producto.
@@ -341,10 +534,8 @@ class ZaraExtractor(BaseExtractor):
         1. Realizar un scroll sistemático para forzar la carga de todos los elementos (lazy-loading).
         2. Localizar los botones de selección de color.
         3. Iterar sobre cada botón, hacer clic para cambiar de color.
-        4. Obtener el nombre del color actual.
-        5. Forzar de nuevo el scroll para cargar las imágenes del nuevo color.
-        6. Recolectar todas las URLs de imagen únicas y válidas para ese color.
-        7. Agrupar las imágenes en un diccionario por nombre de color.
+        4. Extraer las imágenes del color seleccionado (ver `_extract_current_color_images`).
+        5. Agrupar las imágenes en un diccionario por nombre de color.
 
         Returns:
             Dict[str, List[Dict[str, str]]]: Un diccionario donde cada clave es
@@ -361,65 +552,125 @@ class ZaraExtractor(BaseExtractor):
             self.log(f"Encontrados {len(color_buttons)} colores disponibles.")
 
             for i in range(num_colors):
-                if len(color_buttons) > 0:
-                    try:
-                        # Se vuelven a buscar los botones en cada iteración para evitar StaleElementReferenceException
-                        current_color_button = self.driver.find_elements(By.CSS_SELECTOR, self.PRODUCT_SELECTORS['color_buttons'])[i]
-                        self.driver.execute_script("arguments[0].click();", current_color_button)
-                        time.sleep(1.8)  # Espera para que el DOM se actualice con las nuevas imágenes.
-                    except Exception as e:
-                        self.log(f"No se pudo hacer clic en el botón de color {i}: {e}", "warning")
-                        continue
-
-                color_name = self._get_current_color_name() or f"Color_{i+1}"
-                self._force_systematic_scroll()
-                
-                all_image_selectors = ", ".join(self.PRODUCT_SELECTORS['product_images'])
-                image_elements = self.driver.find_elements(By.CSS_SELECTOR, all_image_selectors)
-                
-                # Filtrar elementos duplicados que pueden ser capturados por múltiples selectores.
-                unique_elements: List[WebElement] = []
-                seen_elements = set()
-                for elem in image_elements:
-                    if elem not in seen_elements:
-                        unique_elements.append(elem)
-                        seen_elements.add(elem)
-                
-                image_elements = unique_elements[:20]  # Limitar a 20 imágenes por si acaso.
-                self.log(f"Procesando color '{color_name}'. Encontrados {len(image_elements)} elementos <img> únicos.")
-
-                images_for_color: List[Dict[str, str]] = []
-                seen_urls = set()
-
-                for img_index, img_element in enumerate(image_elements):
-                    try:
-                        valid_src = self._wait_for_image_load(img_element, max_attempts=5)
-                        
-                        if valid_src and valid_src not in seen_urls and self._is_valid_product_image(valid_src):
-                            alt_text = img_element.get_attribute("alt") or f"{color_name} - Imagen {img_index}"
-                            images_for_color.append({
-                                'src': valid_src,
-                                'alt': alt_text,
-                                'img_type': 'product_image'
-                            })
-                            seen_urls.add(valid_src)
-                            self.log(f"Imagen válida extraída para {color_name}: {valid_src[:80]}...", 'debug')
-                        else:
-                            reason = "duplicada" if valid_src in seen_urls else "inválida/placeholder" if valid_src else "no encontrada"
-                            self.log(f"Imagen ignorada ({reason}) para {color_name}: {str(valid_src)[:60] if valid_src else 'None'}...", 'debug')
-                    except Exception as e:
-                        self.log(f"Error procesando imagen {img_index} del color '{color_name}': {e}", 'warning')
-                
+                if len(color_buttons) > 0 and not self._select_color(i):
+                    continue
+
+                color_name, images_for_color = self._extract_current_color_images(i)
                 if images_for_color:
                     images_by_color[color_name] = images_for_color
-                    self.log(f"Color '{color_name}': {len(images_for_color)} imágenes válidas extraídas.")
-                else:
-                    self.log(f"No se encontraron imágenes válidas para el color '{color_name}'.", 'warning')
         except Exception as e:
             self.log(f"Error mayor en la extracción de imágenes por color: {e}", 'error')
             
         return images_by_color
 
+    def _discover_color_variants(self) -> List[Dict[str, Any]]:
+        """
+        Descubre las variantes de color del producto sin hacer clic en ellas.
+
+        Zara no expone una URL por color en los botones, así que cada variante se
+        identifica por su índice (y por la URL si algún atributo la contiene).
+
+        Returns:
+            List[Dict[str, Any]]: Una lista de variantes con 'index', 'color' y 'url'.
+        """
+        variants: List[Dict[str, Any]] = []
+        color_buttons = self.driver.find_elements(By.CSS_SELECTOR, self.PRODUCT_SELECTORS['color_buttons'])
+        for i, button in enumerate(color_buttons):
+            try:
+                color = button.get_attribute('aria-label') or button.text.strip() or None
+                url = button.get_attribute('href') or button.get_attribute('data-href')
+            except Exception:
+                color, url = None, None
+            variants.append({'index': i, 'color': color, 'url': url})
+        return variants
+
+    def _select_color(self, index: int) -> bool:
+        """
+        Hace clic en el botón de color `index` y espera a que cambie la galería.
+
+        Returns:
+            bool: `True` si el clic tuvo éxito, `False` en caso contrario.
+        """
+        try:
+            # Se vuelven a buscar los botones en cada llamada para evitar StaleElementReferenceException
+            current_color_button = self.driver.find_elements(By.CSS_SELECTOR, self.PRODUCT_SELECTORS['color_buttons'])[index]
+            self.driver.execute_script("arguments[0].click();", current_color_button)
+            self.sleep(1.8)  # Espera para que el DOM se actualice con las nuevas imágenes.
+            return True
+        except Exception as e:
+            self.log(f"No se pudo hacer clic en el botón de color {index}: {e}", "warning")
+            return False
+
+    def _extract_current_color_images(self, index: int):
+        """
+        Extrae las imágenes del color actualmente seleccionado.
+
+        1. Obtiene el nombre del color actual.
+        2. Si hay caché de imágenes y la huella de la galería no cambió, reutiliza
+           las imágenes guardadas.
+        3. Si no, fuerza el scroll para cargar las imágenes del color y recolecta
+           todas las URLs de imagen únicas y válidas.
+
+        Args:
+            index (int): Índice del color, usado para nombres por defecto.
+
+        Returns:
+            Tuple[str, List[Dict[str, str]]]: El nombre del color y sus imágenes.
+        """
+        all_image_selectors = ", ".join(self.PRODUCT_SELECTORS['product_images'])
+        color_name = self._get_current_color_name() or f"Color_{index+1}"
+
+        # Comprobar la caché antes del scroll y la recolección completa
+        fingerprint = self._image_set_fingerprint(all_image_selectors)
+        cached_images = self._get_cached_color_images(color_name, fingerprint)
+        if cached_images:
+            self.log(f"Color '{color_name}': {len(cached_images)} imágenes reutilizadas de la caché.")
+            return color_name, cached_images
+
+        self._force_systematic_scroll()
+        
+        image_elements = self.driver.find_elements(By.CSS_SELECTOR, all_image_selectors)
+        
+        # Filtrar elementos duplicados que pueden ser capturados por múltiples selectores.
+        unique_elements: List[WebElement] = []
+        seen_elements = set()
+        for elem in image_elements:
+            if elem not in seen_elements:
+                unique_elements.append(elem)
+                seen_elements.add(elem)
+        
+        image_elements = unique_elements[:20]  # Limitar a 20 imágenes por si acaso.
+        self.log(f"Procesando color '{color_name}'. Encontrados {len(image_elements)} elementos <img> únicos.")
+
+        images_for_color: List[Dict[str, str]] = []
+        seen_urls = set()
+
+        for img_index, img_element in enumerate(image_elements):
+            try:
+                valid_src = self._wait_for_image_load(img_element, max_attempts=5)
+                
+                if valid_src and valid_src not in seen_urls and self._is_valid_product_image(valid_src):
+                    alt_text = img_element.get_attribute("alt") or f"{color_name} - Imagen {img_index}"
+                    images_for_color.append({
+                        'src': valid_src,
+                        'alt': alt_text,
+                        'img_type': 'product_image'
+                    })
+                    seen_urls.add(valid_src)
+                    self.log(f"Imagen válida extraída para {color_name}: {valid_src[:80]}...", 'debug')
+                else:
+                    reason = "duplicada" if valid_src in seen_urls else "inválida/placeholder" if valid_src else "no encontrada"
+                    self.log(f"Imagen ignorada ({reason}) para {color_name}: {str(valid_src)[:60] if valid_src else 'None'}...", 'debug')
+            except Exception as e:
+                self.log(f"Error procesando imagen {img_index} del color '{color_name}': {e}", 'warning')
+        
+        if images_for_color:
+            self._store_color_images(color_name, fingerprint, images_for_color)
+            self.log(f"Color '{color_name}': {len(images_for_color)} imágenes válidas extraídas.")
+        else:
+            self.log(f"No se encontraron imágenes válidas para el color '{color_name}'.", 'warning')
+        return color_name, images_for_color
+
     def _force_systematic_scroll(self) -> None:
         """
         Realiza un scroll sistemático (mitad > final > inicio) para activar
@@ -429,11 +680,11 @@ class ZaraExtractor(BaseExtractor):
             self.log("Ejecutando scroll sistemático para forzar carga de imágenes...")
             total_height = self.driver.execute_script("return document.body.scrollHeight")
             self.driver.execute_script(f"window.scrollTo(0, {total_height // 2});")
-            time.sleep(0.2)
+            self.sleep(0.2)
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(0.5)
+            self.sleep(0.5)
             self.driver.execute_script("window.scrollTo(0, 0);")
-            time.sleep(0.2)
+            self.sleep(0.2)
         except Exception as e:
             self.log(f"Error durante el scroll sistemático: {e}", "warning")
 
@@ -0,0 +1,381 @@
+"""
+Frontier de rastreo compartida en MongoDB.
+
+Permite que varios workers (trabajos de Scrapyd en el mismo o en distintos
+hosts) vacíen juntos la cola de un mismo rastreo. Cada petición pendiente es
+un documento de la colección `FRONTIER_COLLECTION`; los workers la toman en
+préstamo (lease) de forma atómica con `find_one_and_update`, así que un worker
+rápido simplemente toma más trabajo que uno lento.
+
+Ciclo de vida de un documento:
+    pending → leased → done | failed
+Un lease que no se renueva (el worker murió) vence tras `FRONTIER_LEASE_TIMEOUT`
+y la petición vuelve a `pending`, hasta `FRONTIER_MAX_ATTEMPTS` intentos.
+
+Las peticiones con `meta['frontier_local'] = True` no pasan por MongoDB: se
+quedan en una cola en memoria del worker que las generó. Son las que dependen
+de estado que solo ese proceso tiene, como los colores de un producto
+repartido y su agregación (ver `ColorFanoutMixin`).
+
+Uso (en cada worker, con el mismo `crawl_id`):
+    scrapy crawl zara -s SCHEDULER=stylos.frontier.MongoFrontierScheduler -a crawl_id=zara-es-20261019
+"""
+
+import heapq
+import itertools
+import os
+import pickle
+import socket
+import time
+import uuid
+from typing import Any, Dict, Iterable, Optional
+
+import pymongo
+from pymongo.errors import DuplicateKeyError
+from scrapy import signals
+from scrapy.core.scheduler import BaseScheduler
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.misc import load_object
+from scrapy.utils.request import request_from_dict
+from twisted.internet import task
+
+from stylos.signals import frontier_request_done
+
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+# Clave de `meta` de las peticiones que se procesan en el worker que las generó
+LOCAL_META_KEY = 'frontier_local'
+
+
+class MongoFrontier:
+    """
+    Operaciones atómicas sobre la colección de la frontier para un rastreo.
+
+    Cada documento tiene la forma:
+        {
+            'crawl_id': str, 'fingerprint': str, 'state': str,
+            'url': str, 'callback': str, 'extraction_type': str, 'priority': int,
+            'request': bytes,  # petición serializada (como la cola en disco de Scrapy)
+            'attempts': int, 'worker': str, 'lease_expires': float,
+            'created_at': float, 'updated_at': float, 'error': str,
+        }
+    """
+
+    def __init__(self, collection, crawl_id: str, worker_id: str, lease_timeout: float = 600, max_attempts: int = 3):
+        """
+        Args:
+            collection: Colección de pymongo (o mongomock) donde vive la frontier.
+            crawl_id (str): Identificador del rastreo compartido por todos sus workers.
+            worker_id (str): Identificador de este worker.
+            lease_timeout (float): Segundos que dura un lease sin renovar.
+            max_attempts (int): Intentos máximos por petición antes de marcarla como fallida.
+        """
+        self.collection = collection
+        self.crawl_id = crawl_id
+        self.worker_id = worker_id
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+
+    def ensure_indexes(self) -> None:
+        """Crea los índices: unicidad por huella y orden de préstamo."""
+        self.collection.create_index(
+            [('crawl_id', pymongo.ASCENDING), ('fingerprint', pymongo.ASCENDING)], unique=True
+        )
+        self.collection.create_index([
+            ('crawl_id', pymongo.ASCENDING), ('state', pymongo.ASCENDING),
+            ('priority', pymongo.DESCENDING), ('created_at', pymongo.ASCENDING)
+        ])
+
+    def push(self, fingerprint: str, request_data: bytes, url: str, callback: Optional[str],
+             extraction_type: Optional[str], priority: int) -> bool:
+        """Agrega una petición pendiente. Devuelve `False` si ya existía (duplicada)."""
+        now = time.time()
+        try:
+            self.collection.insert_one({
+                'crawl_id': self.crawl_id,
+                'fingerprint': fingerprint,
+                'state': PENDING,
+                'url': url,
+                'callback': callback,
+                'extraction_type': extraction_type,
+                'priority': priority,
+                'request': request_data,
+                'attempts': 0,
+                'created_at': now,
+                'updated_at': now,
+            })
+        except DuplicateKeyError:
+            return False
+        return True
+
+    def lease(self) -> Optional[Dict[str, Any]]:
+        """Toma en préstamo la petición pendiente de mayor prioridad, o `None` si no hay."""
+        now = time.time()
+        return self.collection.find_one_and_update(
+            {'crawl_id': self.crawl_id, 'state': PENDING},
+            {
+                '$set': {'state': LEASED, 'worker': self.worker_id, 'lease_expires': now + self.lease_timeout, 'updated_at': now},
+                '$inc': {'attempts': 1},
+            },
+            sort=[('priority', pymongo.DESCENDING), ('created_at', pymongo.ASCENDING)],
+            return_document=pymongo.ReturnDocument.AFTER,
+        )
+
+    def ack(self, fingerprint: str, failed: bool = False, error: Optional[str] = None) -> None:
+        """Marca una petición prestada por este worker como terminada (o fallida)."""
+        update = {'state': FAILED if failed else DONE, 'updated_at': time.time()}
+        if error:
+            update['error'] = error
+        self.collection.update_one(
+            {'crawl_id': self.crawl_id, 'fingerprint': fingerprint, 'worker': self.worker_id},
+            {'$set': update, '$unset': {'lease_expires': ''}}
+        )
+
+    def heartbeat(self, fingerprints: Iterable[str]) -> int:
+        """Renueva los leases de las peticiones en curso de este worker."""
+        fingerprints = list(fingerprints)
+        if not fingerprints:
+            return 0
+        result = self.collection.update_many(
+            {'crawl_id': self.crawl_id, 'state': LEASED, 'worker': self.worker_id, 'fingerprint': {'$in': fingerprints}},
+            {'$set': {'lease_expires': time.time() + self.lease_timeout}}
+        )
+        return result.modified_count
+
+    def release(self, fingerprints: Iterable[str]) -> int:
+        """Devuelve a la cola las peticiones en curso de este worker (cierre ordenado)."""
+        fingerprints = list(fingerprints)
+        if not fingerprints:
+            return 0
+        result = self.collection.update_many(
+            {'crawl_id': self.crawl_id, 'state': LEASED, 'worker': self.worker_id, 'fingerprint': {'$in': fingerprints}},
+            {'$set': {'state': PENDING, 'updated_at': time.time()}, '$unset': {'lease_expires': '', 'worker': ''}, '$inc': {'attempts': -1}}
+        )
+        return result.modified_count
+
+    def requeue_expired(self) -> Dict[str, int]:
+        """
+        Recupera los leases vencidos de cualquier worker.
+
+        Las peticiones con intentos disponibles vuelven a `pending`; las demás
+        se marcan como fallidas.
+        """
+        now = time.time()
+        expired = {'crawl_id': self.crawl_id, 'state': LEASED, 'lease_expires': {'$lt': now}}
+        failed = self.collection.update_many(
+            dict(expired, attempts={'$gte': self.max_attempts}),
+            {'$set': {'state': FAILED, 'error': 'lease expirado', 'updated_at': now}, '$unset': {'lease_expires': ''}}
+        )
+        requeued = self.collection.update_many(
+            expired,
+            {'$set': {'state': PENDING, 'updated_at': now}, '$unset': {'lease_expires': '', 'worker': ''}}
+        )
+        return {'requeued': requeued.modified_count, 'failed': failed.modified_count}
+
+    def has_pending(self) -> bool:
+        """Indica si al rastreo le queda trabajo (pendiente o en curso en algún worker)."""
+        return self.collection.count_documents(
+            {'crawl_id': self.crawl_id, 'state': {'$in': [PENDING, LEASED]}}, limit=1
+        ) > 0
+
+    def counts(self) -> Dict[str, int]:
+        """Número de peticiones del rastreo por estado."""
+        return {
+            state: self.collection.count_documents({'crawl_id': self.crawl_id, 'state': state})
+            for state in (PENDING, LEASED, DONE, FAILED)
+        }
+
+
+class MongoFrontierScheduler(BaseScheduler):
+    """
+    Scheduler de Scrapy que guarda la cola en `MongoFrontier`.
+
+    Sustituye a la cola en memoria y al filtro de duplicados: una petición cuya
+    huella ya existe en el rastreo (en cualquier worker) se descarta. Mientras
+    quede trabajo en curso en otros workers, la araña no se cierra, de modo que
+    puede recuperar sus leases si alguno muere.
+
+    Las peticiones marcadas con `meta['frontier_local']` van a una cola en
+    memoria propia del worker, que se atiende antes que la frontier.
+
+    Necesita `FrontierAckMiddleware` para marcar las peticiones como terminadas.
+    """
+
+    def __init__(self, crawler, client, database: str, collection: str, crawl_id: Optional[str] = None,
+                 lease_timeout: float = 600, heartbeat_interval: float = 60, max_attempts: int = 3,
+                 poll_interval: float = 1.0):
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.client = client
+        self.database = database
+        self.collection_name = collection
+        self.crawl_id = crawl_id
+        self.lease_timeout = lease_timeout
+        self.heartbeat_interval = heartbeat_interval
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.frontier: Optional[MongoFrontier] = None
+        self.spider = None
+        self.in_flight = set()
+        self.local_queue = []
+        self._local_order = itertools.count()
+        self._empty_until = 0.0
+        self._heartbeat = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        uri = settings.get('FRONTIER_MONGO_URI') or settings.get('MONGO_URI')
+        if not uri:
+            raise ValueError("FRONTIER_MONGO_URI (o MONGO_URI) es obligatorio para MongoFrontierScheduler")
+        scheduler = cls(
+            crawler,
+            client=pymongo.MongoClient(uri),
+            database=settings.get('MONGO_DATABASE', 'stylos_scrapers'),
+            collection=settings.get('FRONTIER_COLLECTION', 'frontier'),
+            crawl_id=settings.get('FRONTIER_CRAWL_ID'),
+            lease_timeout=settings.getfloat('FRONTIER_LEASE_TIMEOUT', 600),
+            heartbeat_interval=settings.getfloat('FRONTIER_HEARTBEAT_INTERVAL', 60),
+            max_attempts=settings.getint('FRONTIER_MAX_ATTEMPTS', 3),
+        )
+        crawler.signals.connect(scheduler.request_done, signal=frontier_request_done)
+        return scheduler
+
+    def open(self, spider):
+        self.spider = spider
+        # Todos los workers del mismo rastreo comparten crawl_id (-a crawl_id=...).
+        # Sin él, el rastreo es privado de este proceso.
+        crawl_id = self.crawl_id or getattr(spider, 'crawl_id', None) or f"{spider.name}-{uuid.uuid4().hex}"
+        self.frontier = MongoFrontier(
+            self.client[self.database][self.collection_name],
+            crawl_id=crawl_id,
+            worker_id=self.worker_id,
+            lease_timeout=self.lease_timeout,
+            max_attempts=self.max_attempts
+        )
+        self.frontier.ensure_indexes()
+        spider.logger.info(f"🗃️ Frontier compartida en MongoDB: rastreo '{crawl_id}', worker '{self.worker_id}'")
+
+        self._heartbeat = task.LoopingCall(self.heartbeat)
+        self._heartbeat.start(self.heartbeat_interval, now=False)
+
+    def close(self, reason):
+        if self._heartbeat and self._heartbeat.running:
+            self._heartbeat.stop()
+        if self.frontier is not None:
+            # Lo que quedó en curso vuelve a la cola para otros workers
+            released = self.frontier.release(self.in_flight)
+            if released:
+                self.spider.logger.info(f"Devueltas {released} peticiones en curso a la frontier")
+            if self.local_queue:
+                self.spider.logger.warning(f"Se descartan {len(self.local_queue)} peticiones locales sin procesar")
+            self.stats.set_value('frontier/final_counts', self.frontier.counts())
+        self.client.close()
+
+    def has_pending_requests(self) -> bool:
+        return bool(self.local_queue) or (self.frontier is not None and self.frontier.has_pending())
+
+    def enqueue_request(self, request) -> bool:
+        if request.meta.get(LOCAL_META_KEY):
+            # Mayor prioridad primero; a igual prioridad, en orden de llegada
+            heapq.heappush(self.local_queue, (-request.priority, next(self._local_order), request))
+            self.stats.inc_value('frontier/local')
+            return True
+
+        fingerprint = self.crawler.request_fingerprinter.fingerprint(request).hex()
+        if request.dont_filter:
+            # Peticiones que pueden repetirse: huella única para no descartarlas
+            fingerprint = f"{fingerprint}:{uuid.uuid4().hex}"
+
+        request_dict = request.to_dict(spider=self.spider)
+        pushed = self.frontier.push(
+            fingerprint,
+            pickle.dumps(request_dict, protocol=4),
+            url=request.url,
+            callback=request_dict.get('callback'),
+            extraction_type=request.meta.get('extraction_type'),
+            priority=request.priority
+        )
+        if not pushed:
+            self.stats.inc_value('frontier/duplicates')
+            return False
+        self._empty_until = 0.0
+        self.stats.inc_value('frontier/enqueued')
+        return True
+
+    def next_request(self):
+        if self.local_queue:
+            return heapq.heappop(self.local_queue)[-1]
+        # Evita consultar MongoDB en cada vuelta del reactor cuando no hay trabajo
+        if time.monotonic() < self._empty_until:
+            return None
+        doc = self.frontier.lease()
+        if doc is None:
+            self._empty_until = time.monotonic() + self.poll_interval
+            return None
+
+        request = request_from_dict(pickle.loads(doc['request']), spider=self.spider)
+        request.meta['frontier_fingerprint'] = doc['fingerprint']
+        self.in_flight.add(doc['fingerprint'])
+        self.stats.inc_value('frontier/leased')
+        if doc['attempts'] > 1:
+            self.stats.inc_value('frontier/retried')
+        return request
+
+    def request_done(self, request, spider, failed=False, error=None):
+        """Marca como terminada una petición de este worker (la invoca `FrontierAckMiddleware`)."""
+        fingerprint = request.meta.get('frontier_fingerprint')
+        if fingerprint is None or fingerprint not in self.in_flight:
+            return
+        self.in_flight.discard(fingerprint)
+        self.frontier.ack(fingerprint, failed=failed, error=error)
+        self.stats.inc_value('frontier/failed' if failed else 'frontier/done')
+
+    def heartbeat(self):
+        """Renueva los leases propios y recupera los vencidos de otros workers."""
+        self.frontier.heartbeat(self.in_flight)
+        recovered = self.frontier.requeue_expired()
+        if recovered['requeued'] or recovered['failed']:
+            self.spider.logger.warning(
+                f"Leases vencidos: {recovered['requeued']} peticiones devueltas a la cola, {recovered['failed']} fallidas"
+            )
+            self.stats.inc_value('frontier/expired_requeued', recovered['requeued'])
+            self.stats.inc_value('frontier/expired_failed', recovered['failed'])
+            self._empty_until = 0.0
+
+
+class FrontierAckMiddleware:
+    """
+    Downloader middleware que avisa a la frontier cuando una petición termina,
+    con respuesta o con error (incluidas las `IgnoreRequest` de Selenium).
+
+    Solo se activa cuando el scheduler es `MongoFrontierScheduler`. Debe tener
+    un orden alto (cerca del descargador) para ver todas las respuestas y
+    excepciones antes que `RetryMiddleware`.
+    """
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not issubclass(load_object(crawler.settings['SCHEDULER']), MongoFrontierScheduler):
+            raise NotConfigured("El scheduler no es MongoFrontierScheduler")
+        return cls(crawler)
+
+    def process_response(self, request, response, spider):
+        self._done(request, spider, failed=False)
+        return response
+
+    def process_exception(self, request, exception, spider):
+        self._done(request, spider, failed=True, error=f"{type(exception).__name__}: {exception}")
+        return None
+
+    def _done(self, request, spider, failed, error=None):
+        if 'frontier_fingerprint' in request.meta:
+            self.crawler.signals.send_catch_log(
+                signal=frontier_request_done, request=request, spider=spider, failed=failed, error=error
+            )
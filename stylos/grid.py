@@ -0,0 +1,63 @@
+"""
+Descubrimiento de la capacidad del Selenium Grid.
+
+El endpoint `/status` del Grid (4.x) describe cada nodo registrado y sus slots
+(una sesión de navegador por slot). A partir de él se calcula cuántas sesiones
+puede usar el rastreo, de modo que escalar las réplicas de `chrome` en
+docker-compose se traduce en más sesiones sin tocar `settings.py`.
+"""
+
+from typing import Any, Dict
+
+
+def grid_status_url(hub_url: str) -> str:
+    """URL del endpoint de estado (válida con y sin el sufijo `/wd/hub`)."""
+    return f"{hub_url.rstrip('/')}/status"
+
+
+def parse_grid_status(payload: Dict[str, Any], browser_name: str = 'chrome') -> Dict[str, int]:
+    """
+    Resume la respuesta de `/status` del Grid.
+
+    Solo cuentan los nodos disponibles (`availability == 'UP'`) y los slots
+    del navegador indicado.
+
+    Returns:
+        Dict[str, int]: `nodes` (nodos disponibles), `slots` (slots totales),
+        `free` (slots sin sesión) y `ready` (1 si el Grid acepta sesiones).
+    """
+    value = payload.get('value', {})
+    nodes = slots = free = 0
+    for node in value.get('nodes', []):
+        if node.get('availability', 'UP') != 'UP':
+            continue
+        node_slots = [
+            slot for slot in node.get('slots', [])
+            if slot.get('stereotype', {}).get('browserName', browser_name) == browser_name
+        ]
+        if not node_slots:
+            continue
+        nodes += 1
+        slots += len(node_slots)
+        free += sum(1 for slot in node_slots if not slot.get('session'))
+    return {'nodes': nodes, 'slots': slots, 'free': free, 'ready': int(bool(value.get('ready')))}
+
+
+def fetch_grid_status(hub_url: str, timeout: float = 5) -> Dict[str, int]:
+    """Consulta `/status` del Grid y devuelve el resumen de `parse_grid_status`."""
+    import requests
+
+    response = requests.get(grid_status_url(hub_url), timeout=timeout)
+    response.raise_for_status()
+    return parse_grid_status(response.json())
+
+
+def target_pool_size(status: Dict[str, int], own_sessions: int, max_size: int) -> int:
+    """
+    Tamaño del pool que puede usar este rastreo.
+
+    Son las sesiones que ya tiene abiertas más los slots libres: si otros
+    trabajos comparten el Grid, cada uno solo crece hacia lo que queda libre.
+    """
+    available = own_sessions + status['free']
+    return max(1, min(available, max_size))
@@ -0,0 +1,123 @@
+"""
+Instrumentación de los comandos de WebDriver.
+
+Cada llamada de Selenium (`get`, `find_elements`, `execute_script`,
+`get_attribute`...) es un viaje de ida y vuelta al navegador. Este módulo
+envuelve el `command_executor` de cada sesión para contar y cronometrar esos
+comandos durante el render de una petición, atribuyéndolos al método del
+extractor que los emitió. Las pausas de `BaseExtractor.sleep` se registran
+igual, como el comando `sleep`.
+
+`SeleniumMiddleware` abre una `CommandTrace` por render y vuelca sus totales
+en las estadísticas de Scrapy (`webdriver/*`).
+"""
+
+import re
+import sys
+import time
+from typing import Any, Dict, Optional
+
+# Selenium ejecuta algunos comandos de elemento como scripts anotados,
+# ej. `/* getAttribute */return (...)`; se contabilizan con ese nombre.
+SCRIPT_ANNOTATION = re.compile(r'^/\* (\w+) \*/')
+
+
+class CommandTrace:
+    """
+    Conteo y tiempo de los comandos de WebDriver de un render.
+
+    Attributes:
+        commands (dict): `{comando: {'count': int, 'time': float}}`.
+        methods (dict): `{método_del_extractor: {'count': int, 'time': float}}`.
+    """
+
+    def __init__(self):
+        self.commands: Dict[str, Dict[str, float]] = {}
+        self.methods: Dict[str, Dict[str, float]] = {}
+
+    @property
+    def total_count(self) -> int:
+        return int(sum(entry['count'] for name, entry in self.commands.items() if name != 'sleep'))
+
+    @property
+    def total_time(self) -> float:
+        return sum(entry['time'] for name, entry in self.commands.items() if name != 'sleep')
+
+    def record(self, command: str, elapsed: float, method: Optional[str] = None) -> None:
+        """Suma un comando (o una pausa) al render en curso."""
+        self._add(self.commands, command, elapsed)
+        self._add(self.methods, method or 'middleware', elapsed)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Resumen serializable, con tiempos en milisegundos, para `response.meta['webdriver_trace']`."""
+        def rounded(entries):
+            return {name: {'count': int(entry['count']), 'time_ms': round(entry['time'] * 1000, 1)} for name, entry in entries.items()}
+        return {
+            'total_commands': self.total_count,
+            'total_time_ms': round(self.total_time * 1000, 1),
+            'commands': rounded(self.commands),
+            'methods': rounded(self.methods),
+        }
+
+    @staticmethod
+    def _add(entries, name, elapsed):
+        entry = entries.setdefault(name, {'count': 0, 'time': 0.0})
+        entry['count'] += 1
+        entry['time'] += elapsed
+
+
+class DriverInstrumentation:
+    """Envoltorio del `command_executor` de un WebDriver que registra cada comando en la traza activa."""
+
+    def __init__(self, driver):
+        self.trace: Optional[CommandTrace] = None
+        executor = driver.command_executor
+        self._execute = executor.execute
+        executor.execute = self._instrumented_execute
+
+    def _instrumented_execute(self, command, params):
+        trace = self.trace
+        if trace is None:
+            return self._execute(command, params)
+        started = time.perf_counter()
+        try:
+            return self._execute(command, params)
+        finally:
+            trace.record(command_name(command, params), time.perf_counter() - started, calling_extractor_method())
+
+
+def command_name(command: str, params: Optional[Dict[str, Any]]) -> str:
+    """Nombre del comando para las estadísticas; los scripts anotados usan su anotación."""
+    if params and isinstance(params.get('script'), str):
+        match = SCRIPT_ANNOTATION.match(params['script'])
+        if match:
+            return match.group(1)
+    return command
+
+
+def calling_extractor_method() -> Optional[str]:
+    """Método del extractor (el más interno en la pila) que emitió el comando, como `Clase.método`."""
+    from stylos.extractors import BaseExtractor
+
+    frame = sys._getframe(2)
+    while frame is not None:
+        owner = frame.f_locals.get('self')
+        if isinstance(owner, BaseExtractor):
+            return f"{type(owner).__name__}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+def instrument_driver(driver) -> DriverInstrumentation:
+    """Instrumenta un WebDriver (una sola vez) y devuelve su instrumentación."""
+    instrumentation = getattr(driver, 'instrumentation', None)
+    if not isinstance(instrumentation, DriverInstrumentation):
+        instrumentation = DriverInstrumentation(driver)
+        driver.instrumentation = instrumentation
+    return instrumentation
+
+
+def current_trace(driver) -> Optional[CommandTrace]:
+    """Traza activa de un WebDriver, o `None` si no está instrumentado o no hay render en curso."""
+    instrumentation = getattr(driver, 'instrumentation', None)
+    return instrumentation.trace if isinstance(instrumentation, DriverInstrumentation) else None
@@ -120,4 +120,10 @@ class ProductItem(scrapy.Item):
     # El país del producto.
     country = scrapy.Field(
         output_processor=TakeFirst()
+    )
+    # El tipo de extracción que generó el item ('product' o 'price').
+    # Permite a MongoDBPipeline actualizar solo los campos de precio en los
+    # refrescos rápidos. No se persiste en la base de datos.
+    extraction_type = scrapy.Field(
+        output_processor=TakeFirst()
     )
\ No newline at end of file
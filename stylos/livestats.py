@@ -0,0 +1,161 @@
+"""
+Estadísticas en vivo de los trabajos en curso.
+
+Cada trabajo (ver `StageMetricsExtension`) escribe periódicamente una
+instantánea JSON de sus métricas en un directorio compartido con la API
+(`STAGE_METRICS_LIVE_DIR`), un archivo por trabajo que se reemplaza de forma
+atómica. La API lee esas instantáneas y las expone en `/metrics` en el formato
+de texto de Prometheus, con las etiquetas `job`, `spider` y `country`.
+"""
+
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+# Estadísticas de Scrapy publicadas como contadores: `{clave_en_stats: (nombre, ayuda)}`
+LIVE_COUNTERS = {
+    'item_scraped_count': ('items_scraped', 'Items extraídos.'),
+    'item_dropped_count': ('items_dropped', 'Items descartados por los pipelines.'),
+    'response_received_count': ('responses', 'Respuestas recibidas.'),
+    'downloader/exception_count': ('download_exceptions', 'Errores de descarga (incluye renders fallidos).'),
+    'log_count/ERROR': ('log_errors', 'Mensajes de log con nivel ERROR.'),
+    'sessions/dead': ('dead_sessions', 'Sesiones de navegador descartadas por muertas.'),
+    'frontier/failed': ('frontier_failed', 'Peticiones de la frontier marcadas como fallidas.'),
+}
+
+# Métricas instantáneas de la corrida: `{nombre: ayuda}`
+LIVE_GAUGES = {
+    'items_per_minute': 'Items por minuto desde el inicio del trabajo.',
+    'renders_in_flight': 'Renders de Selenium en curso.',
+    'queue_depth': 'Peticiones encoladas pendientes de descargar.',
+    'slot_utilization': 'Fracción del tiempo de los slots de navegador ocupada en renders.',
+}
+
+QUANTILES = (('0.5', 'p50_ms'), ('0.95', 'p95_ms'), ('0.99', 'p99_ms'))
+
+
+def write_snapshot(directory: str, snapshot: Dict[str, Any]) -> str:
+    """Escribe la instantánea de un trabajo en `<directory>/<job>.json`, reemplazando la anterior."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{snapshot['job']}.json")
+    # Se escribe a un temporal y se renombra: la API nunca lee un archivo a medias
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_snapshots(directory: str, max_age: Optional[float] = None, now: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    Lee las instantáneas de `directory`.
+
+    Las de trabajos terminados hace más de `max_age` segundos se ignoran, igual
+    que los archivos ilegibles.
+    """
+    now = time.time() if now is None else now
+    if not os.path.isdir(directory):
+        return []
+    snapshots = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(directory, name), encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if max_age and snapshot.get('state') != 'running' and now - snapshot.get('updated_at', 0) > max_age:
+            continue
+        snapshots.append(snapshot)
+    return snapshots
+
+
+def render_prometheus(snapshots: Iterable[Dict[str, Any]], scrapyd_jobs: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+                      now: Optional[float] = None) -> str:
+    """
+    Genera el texto de `/metrics` en el formato de exposición de Prometheus.
+
+    Args:
+        snapshots: Instantáneas leídas con `read_snapshots`.
+        scrapyd_jobs: Opcional. Respuesta de `listjobs.json` de Scrapyd; si se
+            indica, decide qué trabajos siguen en ejecución. `None` significa
+            que Scrapyd no respondió.
+        now (float): Opcional. Momento actual (epoch) para la antigüedad de las instantáneas.
+    """
+    now = time.time() if now is None else now
+    snapshots = list(snapshots)
+    running_ids = {job['id'] for job in scrapyd_jobs.get('running', [])} if scrapyd_jobs is not None else None
+    lines: List[str] = []
+
+    def family(name, kind, help_text, samples):
+        if not samples:
+            return
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            lines.append(f"{name}{_labels(labels)} {_value(value)}")
+
+    family('stylos_scrapyd_up', 'gauge', 'Si Scrapyd respondió a la consulta de trabajos.',
+           [({}, int(scrapyd_jobs is not None))])
+    if scrapyd_jobs is not None:
+        family('stylos_scrapyd_jobs', 'gauge', 'Trabajos del proyecto en Scrapyd por estado.',
+               [({'state': state}, len(scrapyd_jobs.get(state, []))) for state in ('pending', 'running', 'finished')])
+
+    def running(snapshot):
+        if running_ids is not None:
+            return snapshot['job'] in running_ids
+        return snapshot.get('state') == 'running'
+
+    family('stylos_job_running', 'gauge', 'Si el trabajo sigue en ejecución.',
+           [(_job_labels(s), int(running(s))) for s in snapshots])
+    family('stylos_snapshot_age_seconds', 'gauge', 'Segundos desde la última instantánea del trabajo.',
+           [(_job_labels(s), round(now - s.get('updated_at', now), 1)) for s in snapshots])
+
+    for name, help_text in LIVE_GAUGES.items():
+        family(f'stylos_{name}', 'gauge', help_text,
+               [(_job_labels(s), s['gauges'][name]) for s in snapshots if s.get('gauges', {}).get(name) is not None])
+    for name, help_text in LIVE_COUNTERS.values():
+        family(f'stylos_{name}_total', 'counter', help_text,
+               [(_job_labels(s), s['counters'][name]) for s in snapshots if name in s.get('counters', {})])
+
+    # Resumen de Prometheus: cuantiles más `_sum` y `_count` por etapa
+    latency = []
+    for s in snapshots:
+        for stage, summary in sorted(s.get('stages', {}).items()):
+            labels = dict(_job_labels(s), stage=stage)
+            for quantile, key in QUANTILES:
+                if summary.get(key) is not None:
+                    latency.append(('', dict(labels, quantile=quantile), summary[key] / 1000))
+            latency.append(('_sum', labels, summary.get('sum', 0.0)))
+            latency.append(('_count', labels, summary.get('count', 0)))
+    if latency:
+        lines.append("# HELP stylos_stage_latency_seconds Latencia por etapa del rastreo (render, parse, pipelines).")
+        lines.append("# TYPE stylos_stage_latency_seconds summary")
+        for suffix, labels, value in latency:
+            lines.append(f"stylos_stage_latency_seconds{suffix}{_labels(labels)} {_value(value)}")
+    return '\n'.join(lines) + '\n'
+
+
+def _job_labels(snapshot: Dict[str, Any]) -> Dict[str, str]:
+    return {'job': snapshot['job'], 'spider': snapshot.get('spider', ''), 'country': snapshot.get('country') or ''}
+
+
+def _labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _value(value: Any) -> str:
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
@@ -0,0 +1,352 @@
+"""
+Histogramas de latencia por etapa y throughput del rastreo.
+
+Los contadores de Scrapy solo guardan sumas: un promedio esconde las colas
+lentas que de verdad limitan un rastreo con navegador. Este módulo registra la
+distribución de cada etapa del camino de una página:
+
+- `navigation`, `extraction`, `page_source`, `response_build` y `render`:
+  publicadas por `SeleniumMiddleware` con la señal `page_rendered`.
+- `parse`: el callback de la araña (`StageTimingSpiderMiddleware`).
+- `pipeline/<Clase>`: el `process_item` de cada pipeline decorado con
+  `timed_pipeline` (los de `stylos.pipelines`).
+
+Cada etapa usa un `LatencyHistogram` de buckets fijos (una lista de enteros),
+así que observar un valor es O(1) y la memoria no crece con el rastreo. Al
+cerrar la araña, `StageMetricsExtension` publica p50/p95/p99 en las
+estadísticas (`latency/<etapa>/p95_ms`), los items por minuto, la utilización
+de los slots de navegador, y guarda el detalle de la corrida en un JSON.
+Mientras la araña corre, publica además una instantánea periódica para la API
+(ver `stylos.livestats`).
+"""
+
+import functools
+import json
+import math
+import os
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from twisted.internet import task
+
+from stylos.livestats import LIVE_COUNTERS, write_snapshot
+from stylos.signals import page_rendered, stage_timed
+
+# Etapas del render que `SeleniumMiddleware` deja en `render_timing`
+RENDER_STAGES = ('navigation', 'extraction', 'page_source', 'response_build', 'render')
+PERCENTILES = (50, 95, 99)
+
+
+class LatencyHistogram:
+    """
+    Histograma de latencias con buckets logarítmicos fijos.
+
+    El bucket `i` cubre hasta `MIN_VALUE * 2^(i / BUCKETS_PER_DOUBLING)`
+    segundos: con 8 buckets por duplicación el error relativo de un percentil
+    es menor al 9 %, desde 1 ms hasta ~70 minutos (el último bucket acumula lo
+    que exceda ese rango).
+    """
+
+    MIN_VALUE = 0.001
+    BUCKETS_PER_DOUBLING = 8
+    BUCKET_COUNT = 176
+
+    def __init__(self):
+        self.counts = [0] * (self.BUCKET_COUNT + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    @classmethod
+    def bucket_index(cls, value: float) -> int:
+        if value <= cls.MIN_VALUE:
+            return 0
+        return min(cls.BUCKET_COUNT, math.ceil(math.log2(value / cls.MIN_VALUE) * cls.BUCKETS_PER_DOUBLING))
+
+    @classmethod
+    def upper_bound(cls, index: int) -> float:
+        return cls.MIN_VALUE * 2 ** (index / cls.BUCKETS_PER_DOUBLING)
+
+    def observe(self, value: float) -> None:
+        """Registra una duración en segundos."""
+        self.counts[self.bucket_index(value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Valor (segundos) bajo el que cae el `p` % de las observaciones, o `None` si no hay."""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(p / 100 * self.count))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return min(self.upper_bound(index), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def merge(self, other: 'LatencyHistogram') -> None:
+        """Suma las observaciones de otro histograma (ej. de otra corrida)."""
+        self.counts = [mine + theirs for mine, theirs in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Resumen serializable en milisegundos, con los buckets no vacíos para poder combinar corridas."""
+        summary = {'count': self.count, 'mean_ms': _ms(self.mean), 'max_ms': _ms(self.max if self.count else None)}
+        for p in PERCENTILES:
+            summary[f'p{p}_ms'] = _ms(self.percentile(p))
+        summary['buckets'] = {str(index): count for index, count in enumerate(self.counts) if count}
+        summary['sum'] = self.total
+        return summary
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'LatencyHistogram':
+        """Reconstruye un histograma guardado con `to_dict`."""
+        histogram = cls()
+        for index, count in data.get('buckets', {}).items():
+            histogram.counts[int(index)] = count
+        histogram.count = data.get('count', 0)
+        histogram.total = data.get('sum', 0.0)
+        histogram.max = (data.get('max_ms') or 0) / 1000.0
+        return histogram
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+
+class StageMetricsExtension:
+    """
+    Recoge la latencia por etapa y el throughput de la corrida.
+
+    La utilización de los slots de navegador es el tiempo de render sumado
+    dividido por el tiempo disponible (`tamaño del pool × duración`). Los
+    callbacks y los pipelines llegan con la señal `stage_timed`.
+
+    Con `STAGE_METRICS_LIVE_DIR`, cada `STAGE_METRICS_LIVE_INTERVAL` segundos
+    escribe una instantánea de la corrida (`live_snapshot`) para `/metrics`.
+    """
+
+    def __init__(self, crawler, metrics_dir: Optional[str] = None, live_dir: Optional[str] = None,
+                 live_interval: float = 15):
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.metrics_dir = metrics_dir
+        self.live_dir = live_dir
+        self.live_interval = live_interval
+        self.histograms: Dict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+        self.items_per_minute: Counter = Counter()
+        self.busy_time = 0.0
+        self.started_at: Optional[float] = None
+        self.run_id: Optional[str] = None
+        self._live_loop = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool('STAGE_METRICS_ENABLED'):
+            raise NotConfigured("STAGE_METRICS_ENABLED está desactivado")
+        ext = cls(
+            crawler,
+            metrics_dir=crawler.settings.get('STAGE_METRICS_DIR'),
+            live_dir=crawler.settings.get('STAGE_METRICS_LIVE_DIR'),
+            live_interval=crawler.settings.getfloat('STAGE_METRICS_LIVE_INTERVAL', 15)
+        )
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(ext.item_scraped, signal=signals.item_scraped)
+        crawler.signals.connect(ext.page_rendered, signal=page_rendered)
+        crawler.signals.connect(ext.stage_timed, signal=stage_timed)
+        return ext
+
+    def observe(self, stage: str, elapsed: float) -> None:
+        self.histograms[stage].observe(elapsed)
+
+    def spider_opened(self, spider):
+        self.started_at = time.monotonic()
+        # Scrapyd expone el id del trabajo en SCRAPY_JOB; fuera de él se usa la fecha
+        self.run_id = os.environ.get('SCRAPY_JOB') or datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')
+        if self.live_dir:
+            self._live_loop = task.LoopingCall(self.publish_live, spider)
+            self._live_loop.start(self.live_interval, now=True)
+
+    def page_rendered(self, request, spider, timing, error):
+        for stage in RENDER_STAGES:
+            if stage in timing:
+                self.observe(stage, timing[stage])
+        self.busy_time += timing.get('render', 0.0)
+
+    def stage_timed(self, stage, elapsed, spider):
+        self.observe(stage, elapsed)
+
+    def item_scraped(self, item, response, spider):
+        if self.started_at is not None:
+            self.items_per_minute[int((time.monotonic() - self.started_at) // 60)] += 1
+
+    def spider_closed(self, spider, reason):
+        if self._live_loop and self._live_loop.running:
+            self._live_loop.stop()
+        if self.live_dir:
+            self.publish_live(spider, state='finished', reason=reason)
+
+        report = self.report()
+        for stage, summary in report['stages'].items():
+            for key in ('count', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms'):
+                self.stats.set_value(f'latency/{stage}/{key}', summary[key])
+        for key, value in report['throughput'].items():
+            if value is not None:
+                self.stats.set_value(f'throughput/{key}', value)
+        self.stats.set_value('throughput/browser_seconds', round(self.busy_time, 1))
+
+        render = report['stages'].get('render')
+        if render:
+            spider.logger.info(
+                f"⏱️ Render p50 {render['p50_ms']} ms, p95 {render['p95_ms']} ms, p99 {render['p99_ms']} ms; "
+                f"{report['throughput']['items_per_minute']} items/min, "
+                f"utilización de slots {report['throughput']['slot_utilization']}"
+            )
+        if self.metrics_dir:
+            path = self.persist(spider, reason, report)
+            spider.logger.info(f"Métricas de la corrida guardadas en {path}")
+
+    def report(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """Percentiles por etapa y throughput de la corrida hasta `now`."""
+        now = time.monotonic() if now is None else now
+        elapsed = now - self.started_at if self.started_at is not None else 0.0
+        items = sum(self.items_per_minute.values())
+        pool_size = self.stats.get_value('grid/pool_size') or self.crawler.settings.getint('SELENIUM_POOL_SIZE', 1)
+        return {
+            'stages': {stage: histogram.to_dict() for stage, histogram in sorted(self.histograms.items())},
+            'throughput': {
+                'elapsed_seconds': round(elapsed, 1),
+                'items': items,
+                'items_per_minute': round(items / (elapsed / 60), 1) if elapsed > 0 else None,
+                'peak_items_per_minute': max(self.items_per_minute.values(), default=0),
+                'slot_utilization': round(self.busy_time / (pool_size * elapsed), 3) if elapsed > 0 else None,
+            },
+        }
+
+    def live_snapshot(self, spider, state: str = 'running', reason: Optional[str] = None) -> Dict[str, Any]:
+        """Instantánea de la corrida para `/metrics`: percentiles por etapa, contadores y medidas actuales."""
+        report = self.report()
+        stats = self.stats.get_stats()
+        return {
+            'job': self.run_id,
+            'spider': spider.name,
+            'country': getattr(spider, 'country', None),
+            'lang': getattr(spider, 'lang', None),
+            'state': state,
+            'reason': reason,
+            'updated_at': time.time(),
+            'stages': {
+                stage: {key: summary[key] for key in ('count', 'sum', 'p50_ms', 'p95_ms', 'p99_ms')}
+                for stage, summary in report['stages'].items()
+            },
+            'counters': {name: stats[key] for key, (name, _) in LIVE_COUNTERS.items() if key in stats},
+            'gauges': {
+                'items_per_minute': report['throughput']['items_per_minute'],
+                'slot_utilization': report['throughput']['slot_utilization'],
+                'renders_in_flight': self._renders_in_flight(),
+                'queue_depth': self._queue_depth(stats),
+            },
+        }
+
+    def publish_live(self, spider, state: str = 'running', reason: Optional[str] = None) -> None:
+        try:
+            write_snapshot(self.live_dir, self.live_snapshot(spider, state, reason))
+        except OSError as e:
+            spider.logger.warning(f"No se pudo publicar la instantánea de métricas en {self.live_dir}: {e}")
+
+    def _renders_in_flight(self) -> int:
+        engine = self.crawler.engine
+        return len(engine.downloader.active) if engine is not None and engine.downloader is not None else 0
+
+    @staticmethod
+    def _queue_depth(stats: Dict[str, Any]) -> int:
+        # Peticiones encoladas y aún no entregadas al descargador, según el planificador en uso
+        if 'frontier/enqueued' in stats:
+            return max(0, stats.get('frontier/enqueued', 0) - stats.get('frontier/leased', 0))
+        return max(0, stats.get('scheduler/enqueued', 0) - stats.get('scheduler/dequeued', 0))
+
+    def persist(self, spider, reason, report: Dict[str, Any]) -> str:
+        """Guarda el informe de la corrida en `<STAGE_METRICS_DIR>/<araña>-<job>.json`."""
+        finished_at = datetime.now(timezone.utc)
+        run_id = self.run_id or finished_at.strftime('%Y%m%dT%H%M%S')
+        os.makedirs(self.metrics_dir, exist_ok=True)
+        path = os.path.join(self.metrics_dir, f"{spider.name}-{run_id}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'spider': spider.name,
+                'run_id': run_id,
+                'finished_at': finished_at.isoformat(),
+                'reason': reason,
+                **report,
+            }, f, ensure_ascii=False, indent=2)
+        return path
+
+
+def timed_pipeline(process_item):
+    """
+    Decorador del `process_item` de un pipeline: publica su duración como
+    etapa `pipeline/<Clase>` con la señal `stage_timed`, también si el item
+    se descarta. El pipeline sigue siendo síncrono para Scrapy.
+    """
+    @functools.wraps(process_item)
+    def timed(self, item, spider):
+        started = time.perf_counter()
+        try:
+            return process_item(self, item, spider)
+        finally:
+            crawler = getattr(spider, 'crawler', None)
+            if crawler is not None:
+                crawler.signals.send_catch_log(
+                    signal=stage_timed, stage=f'pipeline/{type(self).__name__}',
+                    elapsed=time.perf_counter() - started, spider=spider
+                )
+    return timed
+
+
+class StageTimingSpiderMiddleware:
+    """
+    Cronometra los callbacks de la araña (etapa `parse`).
+
+    Los callbacks son generadores: se suma el tiempo de cada `next()` sobre su
+    salida, sin contar lo que hacen con ella los middlewares posteriores. Debe
+    ir lo más cerca posible de la araña (orden alto en `SPIDER_MIDDLEWARES`).
+    """
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool('STAGE_METRICS_ENABLED'):
+            raise NotConfigured("STAGE_METRICS_ENABLED está desactivado")
+        return cls(crawler)
+
+    def process_spider_output(self, response, result, spider):
+        elapsed = 0.0
+        iterator = iter(result)
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    output = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    elapsed += time.perf_counter() - started
+                yield output
+        finally:
+            self.crawler.signals.send_catch_log(signal=stage_timed, stage='parse', elapsed=elapsed, spider=spider)
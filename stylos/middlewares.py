@@ -1,18 +1,88 @@
+import itertools
+import os
+import random
+import threading
+import time
+from typing import TYPE_CHECKING, Optional
+
 from scrapy import signals
 from scrapy.http import HtmlResponse
-from scrapy.exceptions import IgnoreRequest
-import sentry_sdk
+from scrapy.exceptions import IgnoreRequest, NotConfigured
+from twisted.internet import task, threads
 
 # --- Importaciones para Selenium ---
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options as ChromeOptions
-# webdriver-manager automatiza la gestión de chromedriver en modo local
-from selenium.webdriver.chrome.service import Service as ChromeService
-from webdriver_manager.chrome import ChromeDriverManager
-from fake_useragent import UserAgent
+# Solo las excepciones se importan al cargar el módulo: el resto de Selenium,
+# webdriver-manager y sentry_sdk se importan al usarse por primera vez, para
+# que `scrapy list` y cada proceso de Scrapyd arranquen rápido.
+from selenium.common.exceptions import TimeoutException
 
 # --- Importaciones del Proyecto ---
-from stylos.extractors.registry import ExtractorRegistry
+from stylos.extractors import ExtractorRegistry
+from stylos.cache import ImageSetCache, RenderedPageCache
+from stylos.sessions import BrowserSessionPool, SessionRecyclePolicy, is_session_dead
+from stylos.grid import fetch_grid_status, target_pool_size
+from stylos.signals import page_rendered
+from stylos.broker import BrokerClient, attach_remote_session
+from stylos.drivers import DriverCache
+from stylos.instrumentation import CommandTrace, instrument_driver
+from stylos.profiles import BrowserProfileStore, apply_snapshot, capture_snapshot
+from stylos.tracing import scrub_headers, scrub_meta, span
+
+if TYPE_CHECKING:
+    from selenium.webdriver.chrome.options import Options as ChromeOptions
+
+
+def build_chrome_options(country: str, lang: str, disk_cache_dir: Optional[str] = None, headless: bool = False) -> 'ChromeOptions':
+    """
+    Opciones de Chrome de todas las sesiones del scraper para un país/idioma.
+
+    Las comparten `SeleniumMiddleware` y el broker de sesiones (`stylos.broker`),
+    de modo que una sesión prestada por el broker es igual a una creada localmente.
+    Con `disk_cache_dir`, los recursos estáticos (JS, CSS, fuentes) se guardan en
+    ese directorio y las sesiones siguientes no los vuelven a descargar.
+    Con `headless`, Chrome corre sin ventana (benchmarks locales, CI).
+    """
+    from selenium.webdriver.chrome.options import Options as ChromeOptions
+
+    options = ChromeOptions()
+    if headless:
+        options.add_argument('--headless=new')
+    options.add_argument('--window-size=1920x1080')
+    options.add_argument("--start-maximized")
+    
+    # User Agent consistente y moderno (evitar user agents aleatorios)
+    user_agent = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+    options.add_argument(f'user-agent={user_agent}')
+    
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-blink-features=AutomationControlled')
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+    options.add_argument("--disable-features=LazyImageLoading,LazyFrameLoading") # Deshabilitar la carga perezosa de imágenes y frames
+    
+    # Configuraciones adicionales para sitios modernos
+    options.add_argument('--disable-web-security')
+    options.add_argument('--allow-running-insecure-content')
+    options.add_argument('--disable-extensions')
+    options.add_argument('--disable-plugins')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--disable-background-timer-throttling')
+    options.add_argument('--disable-backgrounding-occluded-windows')
+    options.add_argument('--disable-renderer-backgrounding')
+    options.add_argument("--disable-translate")
+    
+    # Configuraciones de idioma para consistencia
+    lang_code = f"{lang}-{country.upper()}"
+    options.add_argument(f'--lang={lang_code}')
+    options.add_experimental_option('prefs', {
+        'intl.accept_languages': lang_code,
+        'profile.managed_default_content_settings.images': 1
+    })
+    if disk_cache_dir:
+        options.add_argument(f'--disk-cache-dir={disk_cache_dir}')
+    return options
+
 
 class SeleniumMiddleware:
     """
@@ -20,22 +90,129 @@ class SeleniumMiddleware:
     Funciona en dos modos, configurables desde `settings.py`:
     - 'remote': Se conecta a un Selenium Grid (ideal para Docker/producción).
     - 'local': Lanza una instancia de Chrome local (ideal para depuración).
+
+    Mantiene un pool de hasta `SELENIUM_POOL_SIZE` sesiones de navegador. Cada
+    petición se renderiza en un hilo del reactor con una sesión libre del pool,
+    así que varias páginas (por ejemplo, las variantes de color de un producto)
+    se procesan en paralelo sin bloquear a Scrapy.
+
+    En modo remoto con `SELENIUM_GRID_AUTOSCALE`, el tamaño del pool y
+    `CONCURRENT_REQUESTS` se calculan a partir de los slots del Grid al iniciar
+    y se reajustan cada `SELENIUM_GRID_POLL_INTERVAL` segundos, a medida que
+    se agregan o retiran nodos.
+
+    Las sesiones se reciclan tras `SELENIUM_SESSION_MAX_PAGES` páginas,
+    `SELENIUM_SESSION_MAX_AGE` segundos o `SELENIUM_SESSION_MAX_MEMORY_MB` de
+    memoria, para que la latencia por página no se degrade en rastreos largos.
+
+    Con `SELENIUM_BROKER_URL`, las sesiones se piden prestadas al broker de
+    sesiones calentadas (`stylos.broker`) en lugar de crearlas, y se le
+    devuelven al terminar.
+
+    Con `BROWSER_PROFILE_ENABLED`, cada sesión nueva recibe las cookies y el
+    `localStorage` guardados para su `(sitio, país, idioma)` (ver `stylos.profiles`),
+    y con `BROWSER_DISK_CACHE_DIR` reutiliza los recursos estáticos descargados.
+
+    Con `PAGE_CACHE_MODE`, graba cada render en una `RenderedPageCache` y lo
+    reproduce después sin navegador ('record', 'replay' o 'auto').
     """
 
-    def __init__(self, selenium_mode: str, selenium_hub_url: str):
+    PAGE_CACHE_MODES = ('off', 'record', 'replay', 'auto')
+
+    def __init__(self, selenium_mode: str, selenium_hub_url: str, pool_size: int = 1, image_cache=None,
+                 crawler=None, grid_autoscale: bool = False, grid_poll_interval: float = 60, pool_max_size: int = 16,
+                 recycle_policy=None, dead_session_retries: int = 1, broker_url: Optional[str] = None,
+                 profile_store=None, disk_cache_dir: Optional[str] = None, driver_cache=None,
+                 instrument_commands: bool = True, trace_in_meta: bool = False, page_cache=None,
+                 page_cache_mode: str = 'off', headless: bool = False):
         """Inicializa el middleware con la configuración del modo de ejecución."""
         self.selenium_mode = selenium_mode
         self.selenium_hub_url = selenium_hub_url
-        self.driver = None
+        self.pool_size = pool_size
+        self.image_cache = image_cache
+        self.crawler = crawler
+        self.grid_autoscale = grid_autoscale and selenium_mode == 'remote'
+        self.grid_poll_interval = grid_poll_interval
+        self.pool_max_size = pool_max_size
+        self.recycle_policy = recycle_policy or SessionRecyclePolicy()
+        self.dead_session_retries = dead_session_retries
+        # El broker solo presta sesiones del Selenium Grid
+        self.broker = BrokerClient(broker_url) if broker_url and selenium_mode == 'remote' else None
+        self.profile_store = profile_store
+        self.disk_cache_dir = disk_cache_dir
+        self.driver_cache = driver_cache
+        self.instrument_commands = instrument_commands
+        self.trace_in_meta = trace_in_meta
+        if page_cache_mode not in self.PAGE_CACHE_MODES:
+            raise ValueError(f"PAGE_CACHE_MODE inválido: {page_cache_mode!r} (opciones: {', '.join(self.PAGE_CACHE_MODES)})")
+        self.page_cache = page_cache if page_cache_mode != 'off' else None
+        self.page_cache_mode = page_cache_mode if page_cache is not None else 'off'
+        self.headless = headless
+        self._cache_slots = set()
+        self._cache_slots_lock = threading.Lock()
+        self.pool = None
+        self._grid_poll = None
 
     @classmethod
     def from_crawler(cls, crawler):
         """
         Método de fábrica de Scrapy. Lee la configuración y conecta las señales.
         """
+        image_cache = None
+        if crawler.settings.getbool('IMAGE_CACHE_ENABLED'):
+            image_cache = ImageSetCache(
+                path=crawler.settings.get('IMAGE_CACHE_PATH'),
+                ttl=crawler.settings.getfloat('IMAGE_CACHE_TTL'),
+                stats=crawler.stats
+            )
+
+        profile_store = None
+        if crawler.settings.getbool('BROWSER_PROFILE_ENABLED'):
+            profile_store = BrowserProfileStore(
+                path=crawler.settings.get('BROWSER_PROFILE_PATH'),
+                ttl=crawler.settings.getfloat('BROWSER_PROFILE_TTL'),
+                stats=crawler.stats
+            )
+
+        page_cache = None
+        page_cache_mode = crawler.settings.get('PAGE_CACHE_MODE', 'off')
+        if page_cache_mode != 'off':
+            page_cache = RenderedPageCache(
+                path=crawler.settings.get('PAGE_CACHE_PATH'),
+                ttl=crawler.settings.getfloat('PAGE_CACHE_TTL'),
+                stats=crawler.stats
+            )
+
         s = cls(
             selenium_mode=crawler.settings.get('SELENIUM_MODE', 'remote'),
-            selenium_hub_url=crawler.settings.get('SELENIUM_HUB_URL')
+            selenium_hub_url=crawler.settings.get('SELENIUM_HUB_URL'),
+            pool_size=crawler.settings.getint('SELENIUM_POOL_SIZE', 1),
+            image_cache=image_cache,
+            crawler=crawler,
+            grid_autoscale=crawler.settings.getbool('SELENIUM_GRID_AUTOSCALE'),
+            grid_poll_interval=crawler.settings.getfloat('SELENIUM_GRID_POLL_INTERVAL', 60),
+            pool_max_size=crawler.settings.getint('SELENIUM_POOL_MAX_SIZE', 16),
+            recycle_policy=SessionRecyclePolicy(
+                max_pages=crawler.settings.getint('SELENIUM_SESSION_MAX_PAGES', 0),
+                max_age=crawler.settings.getfloat('SELENIUM_SESSION_MAX_AGE', 0),
+                max_memory_mb=crawler.settings.getfloat('SELENIUM_SESSION_MAX_MEMORY_MB', 0),
+                memory_check_every=crawler.settings.getint('SELENIUM_SESSION_MEMORY_CHECK_EVERY', 20)
+            ),
+            dead_session_retries=crawler.settings.getint('SELENIUM_SESSION_DEAD_RETRIES', 1),
+            broker_url=crawler.settings.get('SELENIUM_BROKER_URL'),
+            profile_store=profile_store,
+            disk_cache_dir=crawler.settings.get('BROWSER_DISK_CACHE_DIR'),
+            driver_cache=DriverCache(
+                root=crawler.settings.get('SELENIUM_DRIVER_CACHE_DIR'),
+                offline=crawler.settings.getbool('SELENIUM_DRIVER_OFFLINE'),
+                pinned_version=crawler.settings.get('SELENIUM_CHROMEDRIVER_VERSION'),
+                chrome_binary=crawler.settings.get('SELENIUM_CHROME_BINARY')
+            ),
+            instrument_commands=crawler.settings.getbool('WEBDRIVER_INSTRUMENTATION_ENABLED', True),
+            trace_in_meta=crawler.settings.getbool('WEBDRIVER_TRACE_IN_META'),
+            page_cache=page_cache,
+            page_cache_mode=page_cache_mode,
+            headless=crawler.settings.getbool('SELENIUM_HEADLESS')
         )
         # Conectar ambas señales: apertura y cierre del spider
         crawler.signals.connect(s.spider_opened, signal=signals.spider_opened)
@@ -43,121 +220,494 @@ class SeleniumMiddleware:
         return s
 
     def spider_opened(self, spider):
-        """Se ejecuta cuando la araña empieza. Inicializa el driver de Selenium."""
+        """
+        Se ejecuta cuando la araña empieza. Crea el pool de sesiones y abre la
+        primera sesión para fallar rápido si el navegador no está disponible.
+        En modo replay de la caché de páginas no se abre ningún navegador.
+        """
+        if self.page_cache is not None:
+            purged = self.page_cache.purge_expired()
+            spider.logger.info(f"📼 Caché de páginas en modo '{self.page_cache_mode}' ({purged} renders expirados eliminados)")
+            if self.page_cache_mode == 'replay':
+                return
         spider.logger.info(f"Configuración recibida - Modo: {self.selenium_mode}, Hub URL: {self.selenium_hub_url}")
-        
+        if self.grid_autoscale:
+            try:
+                status = fetch_grid_status(self.selenium_hub_url)
+                self.pool_size = target_pool_size(status, own_sessions=0, max_size=self.pool_max_size)
+                self._record_grid_status(status)
+                spider.logger.info(f"🧮 Grid con {status['nodes']} nodos y {status['slots']} slots ({status['free']} libres)")
+            except Exception as e:
+                spider.logger.warning(f"No se pudo consultar la capacidad del Grid, se usa SELENIUM_POOL_SIZE={self.pool_size}: {e}")
+            self._set_concurrency(self.pool_size)
+        spider.logger.info(f"Tamaño del pool de sesiones de navegador: {self.pool_size}")
+
+        # Cada render ocupa un hilo del reactor mientras dura
+        from twisted.internet import reactor
+        reactor.suggestThreadPoolSize(max(self.pool_size + 4, 10))
+
+        self.pool = BrowserSessionPool(
+            factory=lambda: self._create_driver(spider),
+            max_size=self.pool_size,
+            logger=spider.logger,
+            closer=self._close_driver
+        )
         try:
-            spider.logger.info("Configurando opciones de Chrome...")
-            options = ChromeOptions()
-            options.add_argument('--window-size=1920x1080')
-            options.add_argument("--start-maximized")
-            
-            # User Agent consistente y moderno (evitar user agents aleatorios)
-            user_agent = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-            options.add_argument(f'user-agent={user_agent}')
-            
-            options.add_argument('--no-sandbox')
-            options.add_argument('--disable-dev-shm-usage')
-            options.add_argument('--disable-blink-features=AutomationControlled')
-            options.add_experimental_option("excludeSwitches", ["enable-automation"])
-            options.add_experimental_option('useAutomationExtension', False)
-            options.add_argument("--disable-features=LazyImageLoading,LazyFrameLoading") # Deshabilitar la carga perezosa de imágenes y frames
-            
-            # Configuraciones adicionales para sitios modernos
-            options.add_argument('--disable-web-security')
-            options.add_argument('--allow-running-insecure-content')
-            options.add_argument('--disable-extensions')
-            options.add_argument('--disable-plugins')
-            options.add_argument('--disable-gpu')
-            options.add_argument('--disable-background-timer-throttling')
-            options.add_argument('--disable-backgrounding-occluded-windows')
-            options.add_argument('--disable-renderer-backgrounding')
-            options.add_argument("--disable-translate")
-            
-            # Configuraciones de idioma para consistencia
-            country = getattr(spider, 'country', 'co')
-            lang = getattr(spider, 'lang', 'es')
-            lang_code = f"{lang}-{country.upper()}"
-            spider.logger.info(f"Configuración regional: {lang_code}")
-            options.add_argument(f'--lang={lang_code}')
-            options.add_experimental_option('prefs', {
-                'intl.accept_languages': lang_code,
-                'profile.managed_default_content_settings.images': 1
-            })  
-            
-            spider.logger.info(f"Modo Selenium: {self.selenium_mode}")
-            if self.selenium_mode == 'remote':
-                # MODO DOCKER: Conectarse al Selenium Grid
-                spider.logger.info(f"Modo Remoto: Conectando a Selenium Grid en {self.selenium_hub_url}")
-                if not self.selenium_hub_url:
-                    raise ValueError("SELENIUM_HUB_URL no está definido en settings.py para el modo remoto.")
-                # options.add_argument("--headless")
-                spider.logger.info("Creando driver remoto...")
-                self.driver = webdriver.Remote(command_executor=self.selenium_hub_url, options=options)
-            else:
-                # MODO LOCAL: Iniciar un navegador en tu propia máquina
-                spider.logger.info("Modo Local: Iniciando instancia local de Chrome.")
-                spider.logger.info("Instalando ChromeDriver...")
-                service = ChromeService(ChromeDriverManager().install())
-                spider.logger.info("Creando driver local...")
-                # options.add_argument("--headless") # descomentar para que no se vea el navegador
-                self.driver = webdriver.Chrome(service=service, options=options)
-                
-            spider.logger.info(f"✅ Driver de Selenium inicializado correctamente en modo '{self.selenium_mode}'")
-            
+            started = time.monotonic()
+            self.pool.prewarm(1)
+            startup_time = time.monotonic() - started
+            self.crawler.stats.set_value('selenium/startup_time', round(startup_time, 3))
+            spider.logger.info(f"✅ Driver de Selenium inicializado correctamente en modo '{self.selenium_mode}' ({startup_time:.1f}s)")
         except Exception as e:
             spider.logger.error(f"❌ Error crítico inicializando el driver de Selenium: {e}")
             spider.logger.error(f"Tipo de error: {type(e).__name__}")
             import traceback
             spider.logger.error(f"Traceback completo: {traceback.format_exc()}")
-            self.driver = None
+            self.pool = None
+            raise
+
+        if self.grid_autoscale:
+            self._grid_poll = task.LoopingCall(self._poll_grid, spider)
+            self._grid_poll.start(self.grid_poll_interval, now=False)
+
+    def _poll_grid(self, spider):
+        """Consulta el Grid en un hilo y reajusta el pool con el resultado."""
+        d = threads.deferToThread(fetch_grid_status, self.selenium_hub_url)
+        d.addCallback(self._apply_grid_status, spider)
+        d.addErrback(lambda failure: spider.logger.warning(f"No se pudo consultar la capacidad del Grid: {failure.value}"))
+        return d
+
+    def _apply_grid_status(self, status, spider):
+        """Ajusta el pool y la concurrencia de Scrapy a los slots disponibles del Grid."""
+        if self.pool is None:
+            return
+        self._record_grid_status(status)
+        target = target_pool_size(status, own_sessions=self.pool.size, max_size=self.pool_max_size)
+        if target == self.pool.max_size:
+            return
+        spider.logger.info(f"🧮 Capacidad del Grid: {status['nodes']} nodos, {status['free']} slots libres. Pool {self.pool.max_size} → {target}")
+        self.pool.resize(target)
+        self._set_concurrency(target)
+
+    def _set_concurrency(self, size):
+        """Alinea `CONCURRENT_REQUESTS` y los hilos del reactor con el tamaño del pool."""
+        from twisted.internet import reactor
+        reactor.suggestThreadPoolSize(max(size + 4, 10))
+        self.crawler.stats.set_value('grid/pool_size', size)
+        engine = getattr(self.crawler, 'engine', None)
+        # Con SLOT_THROTTLE_ENABLED la concurrencia la decide SlotThrottleExtension,
+        # que usa `grid/pool_size` como techo
+        if self.crawler.settings.getbool('SLOT_THROTTLE_ENABLED'):
+            return
+        if engine is not None and engine.downloader is not None:
+            # Las peticiones de Selenium no pasan por los slots por dominio del
+            # descargador: el límite efectivo es la concurrencia total.
+            engine.downloader.total_concurrency = size
+
+    def _record_grid_status(self, status):
+        for key in ('nodes', 'slots', 'free'):
+            self.crawler.stats.set_value(f'grid/{key}', status[key])
+
+    def _build_options(self, spider, disk_cache_dir: Optional[str] = None) -> 'ChromeOptions':
+        """Construye las opciones de Chrome comunes a todas las sesiones."""
+        spider.logger.info("Configurando opciones de Chrome...")
+        country = getattr(spider, 'country', 'co')
+        lang = getattr(spider, 'lang', 'es')
+        spider.logger.info(f"Configuración regional: {lang}-{country.upper()}")
+        return build_chrome_options(country, lang, disk_cache_dir, self.headless)
+
+    def _create_driver(self, spider):
+        """
+        Obtiene una sesión de navegador lista para rastrear: prestada por el
+        broker o creada según el modo configurado, con el perfil del idioma.
+        """
+        if self.broker:
+            driver = self._lease_driver(spider)
+            if driver is not None:
+                return driver
+
+        cache_slot = self._acquire_cache_slot()
+        try:
+            driver = self._start_driver(spider, self._build_options(spider, self._disk_cache_path(spider, cache_slot)))
+        except Exception:
+            self._release_cache_slot(cache_slot)
             raise
+        driver.cache_slot = cache_slot
+
+        if self.profile_store:
+            try:
+                self._apply_profile(driver, spider)
+            except Exception as e:
+                spider.logger.warning(f"No se pudo aplicar el perfil del navegador: {e}")
+        return driver
+
+    def _start_driver(self, spider, options):
+        """Crea una nueva sesión de navegador según el modo configurado."""
+        from selenium import webdriver
+
+        spider.logger.info(f"Modo Selenium: {self.selenium_mode}")
+        if self.selenium_mode == 'remote':
+            # MODO DOCKER: Conectarse al Selenium Grid
+            spider.logger.info(f"Modo Remoto: Conectando a Selenium Grid en {self.selenium_hub_url}")
+            if not self.selenium_hub_url:
+                raise ValueError("SELENIUM_HUB_URL no está definido en settings.py para el modo remoto.")
+            # options.add_argument("--headless")
+            spider.logger.info("Creando driver remoto...")
+            return webdriver.Remote(command_executor=self.selenium_hub_url, options=options)
+
+        # MODO LOCAL: Iniciar un navegador en tu propia máquina
+        spider.logger.info("Modo Local: Iniciando instancia local de Chrome.")
+        spider.logger.info("Resolviendo ChromeDriver...")
+        from selenium.webdriver.chrome.service import Service as ChromeService
+        service = ChromeService(self._resolve_chromedriver())
+        spider.logger.info("Creando driver local...")
+        # options.add_argument("--headless") # descomentar para que no se vea el navegador
+        return webdriver.Chrome(service=service, options=options)
+
+    def _resolve_chromedriver(self):
+        """Ruta de chromedriver, desde la caché local si está configurada."""
+        if self.driver_cache is None:
+            # webdriver-manager automatiza la gestión de chromedriver en modo local
+            from webdriver_manager.chrome import ChromeDriverManager
+            return ChromeDriverManager().install()
+        started = time.monotonic()
+        path = self.driver_cache.resolve()
+        self.crawler.stats.max_value('selenium/driver_resolve_time', round(time.monotonic() - started, 3))
+        if self.driver_cache.downloaded:
+            self.crawler.stats.set_value('selenium/driver_downloaded', True)
+        return path
+
+    def _apply_profile(self, driver, spider):
+        """
+        Inyecta el perfil guardado del idioma en una sesión nueva. Si no hay uno
+        vigente, calienta la sesión con el extractor y guarda su estado.
+        """
+        site = spider.name
+        country = getattr(spider, 'country', 'co')
+        lang = getattr(spider, 'lang', 'es')
+        snapshot = self.profile_store.lookup(site, country, lang)
+        if snapshot:
+            apply_snapshot(driver, snapshot)
+            return
+        ExtractorRegistry.get_extractor(site, driver, spider).warm_up(country, lang)
+        self.profile_store.store(site, country, lang, capture_snapshot(driver))
+        spider.logger.info(f"🍪 Perfil de navegador guardado para {site}/{country}/{lang}")
+
+    def _acquire_cache_slot(self):
+        """Reserva el índice libre más bajo para la caché de disco de una sesión local."""
+        if not self.disk_cache_dir or self.selenium_mode == 'remote':
+            return None
+        with self._cache_slots_lock:
+            slot = next(index for index in itertools.count() if index not in self._cache_slots)
+            self._cache_slots.add(slot)
+        return slot
+
+    def _release_cache_slot(self, slot):
+        if slot is not None:
+            with self._cache_slots_lock:
+                self._cache_slots.discard(slot)
+
+    def _disk_cache_path(self, spider, slot):
+        """
+        Directorio de la caché de disco de Chrome para una sesión.
+
+        En el Grid cada nodo aloja una sola sesión, así que la ruta (dentro del
+        nodo) se comparte tal cual. En modo local, cada sesión simultánea usa
+        su propio subdirectorio: Chrome no admite dos procesos sobre la misma caché.
+        """
+        if not self.disk_cache_dir:
+            return None
+        if self.selenium_mode == 'remote':
+            return self.disk_cache_dir
+        locale = f"{spider.name}-{getattr(spider, 'country', 'co')}-{getattr(spider, 'lang', 'es')}"
+        return os.path.join(os.path.abspath(self.disk_cache_dir), locale, f"slot-{slot}")
+
+    def _lease_driver(self, spider):
+        """Pide una sesión calentada al broker. Devuelve `None` si el broker no responde."""
+        country = getattr(spider, 'country', 'co')
+        lang = getattr(spider, 'lang', 'es')
+        try:
+            lease = self.broker.lease(spider.name, country, lang)
+            driver = attach_remote_session(self.selenium_hub_url, lease['session_id'], country, lang)
+        except Exception as e:
+            spider.logger.warning(f"Broker de sesiones no disponible, se crea una sesión propia: {e}")
+            self._inc_stat('broker/errors')
+            return None
+        driver.broker_lease_id = lease['lease_id']
+        self._inc_stat('broker/warm_leases' if lease.get('warm') else 'broker/cold_leases')
+        spider.logger.info(f"🔥 Sesión {lease['session_id']} prestada por el broker ({'caliente' if lease.get('warm') else 'en frío'})")
+        return driver
+
+    def _close_driver(self, driver, reusable):
+        """Devuelve al broker las sesiones prestadas; cierra las propias."""
+        lease_id = getattr(driver, 'broker_lease_id', None)
+        if lease_id is None:
+            try:
+                driver.quit()
+            finally:
+                self._release_cache_slot(getattr(driver, 'cache_slot', None))
+            return
+        try:
+            self.broker.release(lease_id, reusable=reusable)
+        except Exception:
+            # El broker cerrará la sesión cuando venza el préstamo
+            driver.quit()
 
     def process_request(self, request, spider):
-        """Procesa las peticiones marcadas con `meta['selenium'] = True`."""
+        """
+        Procesa las peticiones marcadas con `meta['selenium'] = True`.
+
+        El render se ejecuta en un hilo del reactor; Scrapy recibe un Deferred
+        que se resuelve con el `HtmlResponse` cuando el render termina.
+        """
         if not request.meta.get('selenium'):
             return None
 
-        # Verificar que el driver esté inicializado
-        if self.driver is None:
+        if self.page_cache_mode in ('replay', 'auto'):
+            cached = self._cached_response(request)
+            if cached is not None:
+                return cached
+            if self.page_cache_mode == 'replay':
+                raise IgnoreRequest(f"Render no disponible en la caché de páginas (modo replay): {request.url}")
+
+        # Verificar que el pool esté inicializado
+        if self.pool is None:
             spider.logger.error("El driver de Selenium no está inicializado")
             raise IgnoreRequest(f"Driver no inicializado para {request.url}")
 
+        d = threads.deferToThread(self._render, request, spider)
+        d.addBoth(self._render_finished, request, spider)
+        return d
+
+    # Tiempos de la navegación según la Navigation Timing API del navegador:
+    # tiempo hasta el primer byte (latencia del servidor) y código HTTP.
+    NAVIGATION_TIMING_SCRIPT = """
+        const nav = performance.getEntriesByType('navigation')[0];
+        return nav ? [nav.responseStart - nav.requestStart, nav.responseStatus || null] : null;
+    """
+
+    def _render(self, request, spider):
+        """
+        Renderiza una petición con una sesión prestada del pool (se ejecuta en un hilo).
+
+        Si la sesión murió durante el render (navegador caído, nodo del Grid
+        reiniciado), se descarta y la petición se reintenta en una sesión nueva
+        hasta `SELENIUM_SESSION_DEAD_RETRIES` veces.
+        """
         spider.logger.debug(f"Procesando con Selenium: {request.url}")
-        
+
+        attempt = 0
+        while True:
+            session = None
+            # Se separa la latencia del servidor (navegación) del tiempo de extracción
+            # (esperas y scrolls propios), para que el throttle solo reaccione a la primera.
+            timing = request.meta['render_timing'] = {}
+            try:
+                session = self.pool.acquire()
+                return self._render_with_session(session, request, spider, timing)
+            except Exception as e:
+                if session is not None and is_session_dead(e):
+                    self._discard_dead_session(session, spider, e)
+                    session = None
+                    if attempt < self.dead_session_retries:
+                        attempt += 1
+                        spider.logger.warning(f"🔁 Reintentando {request.url} en una sesión nueva ({attempt}/{self.dead_session_retries})")
+                        continue
+                request.meta['render_error'] = 'timeout' if isinstance(e, TimeoutException) else type(e).__name__
+                spider.logger.error(f"Error fatal en SeleniumMiddleware para {request.url}: {e}")
+                raise IgnoreRequest(f"Selenium falló al procesar {request.url}")
+            finally:
+                if session is not None:
+                    self._return_session(session, spider)
+
+    def _render_with_session(self, session, request, spider, timing):
+        """
+        Navega y extrae los datos de `request` con la sesión indicada, contando
+        los comandos de WebDriver que emite el render (ver `stylos.instrumentation`).
+        """
+        if not self.instrument_commands:
+            return self._navigate_and_extract(session, request, spider, timing)
+        instrumentation = instrument_driver(session.driver)
+        trace = instrumentation.trace = CommandTrace()
         try:
-            self.driver.get(request.url)
+            return self._navigate_and_extract(session, request, spider, timing)
+        finally:
+            instrumentation.trace = None
+            self._record_trace(trace, request)
 
-            # Usa el sistema de registro para obtener el extractor correcto
-            extractor = ExtractorRegistry.get_extractor(spider.name, self.driver, spider)
-            extraction_type = request.meta.get('extraction_type', 'default')
-            extracted_data = {}
+    def _navigate_and_extract(self, session, request, spider, timing):
+        """
+        Navega a la URL de la petición y ejecuta el método de extracción de su tipo.
 
-            # Enruta la petición a la función de extracción correcta
-            if hasattr(extractor, f"extract_{extraction_type}_data"):
-                extraction_method = getattr(extractor, f"extract_{extraction_type}_data")
+        Con Sentry activo, el render es una transacción muestreada con spans de
+        navegación y extracción (ver `stylos.tracing`).
+        """
+        extraction_type = request.meta.get('extraction_type', 'default')
+        with span('browser.render', f"{spider.name} {extraction_type}", url=request.url):
+            return self._render_page(session, request, spider, extraction_type, timing)
+
+    def _render_page(self, session, request, spider, extraction_type, timing):
+        driver = session.driver
+        started = time.monotonic()
+        with span('browser.navigation', request.url):
+            driver.get(request.url)
+        timing['navigation'] = time.monotonic() - started
+        timing['server_latency'], timing['status'] = self._navigation_timing(driver, timing['navigation'])
+        session.pages += 1
+        extraction_started = time.monotonic()
+
+        # Usa el sistema de registro para obtener el extractor correcto
+        extractor = ExtractorRegistry.get_extractor(
+            spider.name, driver, spider, image_cache=self.image_cache, meta=request.meta
+        )
+        extracted_data = {}
+
+        # Enruta la petición a la función de extracción correcta
+        if hasattr(extractor, f"extract_{extraction_type}_data"):
+            extraction_method = getattr(extractor, f"extract_{extraction_type}_data")
+            with span('browser.extraction', extraction_type):
                 extracted_data = extraction_method()
-            else:
-                spider.logger.warning(f"Tipo de extracción '{extraction_type}' no definido.")
-
-            body = self.driver.page_source
-            response = HtmlResponse(
-                self.driver.current_url,
-                body=body,
-                encoding='utf-8',
-                request=request
-            )
-            response.meta.update(extracted_data)
-            return response
-        except Exception as e:
-            spider.logger.error(f"Error fatal en SeleniumMiddleware para {request.url}: {e}")
-            raise IgnoreRequest(f"Selenium falló al procesar {request.url}")
+        else:
+            spider.logger.warning(f"Tipo de extracción '{extraction_type}' no definido.")
+
+        timing['extraction'] = time.monotonic() - extraction_started
+        page_source_started = time.monotonic()
+        body = driver.page_source
+        timing['page_source'] = time.monotonic() - page_source_started
+        response_started = time.monotonic()
+        response = HtmlResponse(
+            driver.current_url,
+            body=body,
+            encoding='utf-8',
+            request=request
+        )
+        response.meta.update(extracted_data)
+        timing['response_build'] = time.monotonic() - response_started
+        timing['render'] = time.monotonic() - started
+        if self.page_cache_mode in ('record', 'auto'):
+            self._store_page(request, response.url, body, extracted_data, spider)
+        return response
+
+    def _page_cache_key(self, request) -> str:
+        """Huella de la petición, la misma que usan el filtro de duplicados y la frontier."""
+        fingerprinter = getattr(self.crawler, 'request_fingerprinter', None)
+        if fingerprinter is not None:
+            return fingerprinter.fingerprint(request).hex()
+        from scrapy.utils.request import fingerprint
+        return fingerprint(request).hex()
+
+    @staticmethod
+    def _page_cache_variant(request) -> Optional[str]:
+        """Color de la petición: las peticiones por color de un producto comparten URL y huella."""
+        variant = request.meta.get('color_key', request.meta.get('color_index'))
+        return None if variant is None else str(variant)
+
+    def _cached_response(self, request):
+        """Arma la respuesta de un render guardado, o devuelve `None` si no hay uno vigente."""
+        extraction_type = request.meta.get('extraction_type', 'default')
+        entry = self.page_cache.lookup(self._page_cache_key(request), extraction_type, self._page_cache_variant(request))
+        if entry is None:
+            return None
+        response = HtmlResponse(entry['url'], body=entry['body'], encoding='utf-8', request=request)
+        response.meta.update(entry['meta'])
+        return response
+
+    def _store_page(self, request, url, body, extracted_data, spider):
+        """Guarda el render en la caché de páginas (se ejecuta en el hilo del render)."""
+        extraction_type = request.meta.get('extraction_type', 'default')
+        if not self.page_cache.store(self._page_cache_key(request), extraction_type, url, body, extracted_data,
+                                     variant=self._page_cache_variant(request)):
+            spider.logger.warning(f"No se pudo guardar en la caché de páginas (datos no serializables): {request.url}")
+
+    def _record_trace(self, trace, request):
+        """Suma los comandos del render a las estadísticas y, si se pidió, los deja en `meta`."""
+        extraction_type = request.meta.get('extraction_type', 'default')
+        if self.trace_in_meta or request.meta.get('webdriver_trace') is True:
+            request.meta['webdriver_trace'] = trace.to_dict()
+        if self.crawler is None:
+            return
+        stats = self.crawler.stats
+        for scope, entries in (('commands', trace.commands), ('methods', trace.methods)):
+            for name, entry in entries.items():
+                stats.inc_value(f'webdriver/{scope}/{name}/count', int(entry['count']))
+                stats.inc_value(f'webdriver/{scope}/{name}/time', round(entry['time'], 3))
+        stats.inc_value(f'webdriver/{extraction_type}/renders')
+        stats.inc_value(f'webdriver/{extraction_type}/commands', trace.total_count)
+        stats.inc_value(f'webdriver/{extraction_type}/time', round(trace.total_time, 3))
+        # El máximo por render delata regresiones como "la PDP ahora hace 300 viajes"
+        stats.max_value(f'webdriver/{extraction_type}/max_commands', trace.total_count)
+
+    def _record_trace_averages(self):
+        """Publica los comandos promedio por render de cada tipo de extracción."""
+        stats = self.crawler.stats.get_stats()
+        for key, renders in list(stats.items()):
+            if key.startswith('webdriver/') and key.endswith('/renders') and renders:
+                prefix = key[:-len('/renders')]
+                self.crawler.stats.set_value(f'{prefix}/commands_per_render', round(stats.get(f'{prefix}/commands', 0) / renders, 1))
+
+    def _return_session(self, session, spider):
+        """Devuelve la sesión al pool, o la recicla si superó algún límite de uso."""
+        reason = self.recycle_policy.reason(session)
+        if reason is None:
+            self.pool.release(session)
+            return
+        spider.logger.info(f"♻️ Reciclando sesión #{session.session_id} ({reason}: {session.pages} páginas, {session.age:.0f}s)")
+        self._inc_stat(f'sessions/recycled/{reason}')
+        self.pool.discard(session)
+
+    def _discard_dead_session(self, session, spider, error):
+        """Retira una sesión cuyo navegador ya no responde; el pool creará otra bajo demanda."""
+        spider.logger.warning(f"💀 Sesión #{session.session_id} muerta tras {session.pages} páginas: {error}")
+        self._inc_stat('sessions/dead')
+        self.pool.discard(session)
+
+    def _inc_stat(self, key):
+        if self.crawler is not None:
+            self.crawler.stats.inc_value(key)
+
+    def _navigation_timing(self, driver, navigation_time):
+        """Devuelve `(latencia_del_servidor, status)`; si no hay datos, usa el tiempo de `driver.get`."""
+        try:
+            result = driver.execute_script(self.NAVIGATION_TIMING_SCRIPT)
+        except Exception:
+            result = None
+        if not result:
+            return navigation_time, None
+        ttfb_ms, status = result
+        return (ttfb_ms / 1000.0 if ttfb_ms is not None else navigation_time), status
+
+    def _render_finished(self, result, request, spider):
+        """Publica los tiempos del render (en el hilo del reactor) y devuelve el resultado intacto."""
+        if self.crawler is None:
+            return result
+        self.crawler.signals.send_catch_log(
+            signal=page_rendered,
+            request=request,
+            spider=spider,
+            timing=request.meta.get('render_timing', {}),
+            error=request.meta.get('render_error')
+        )
+        return result
 
     def spider_closed(self, spider):
-        """Se ejecuta cuando la araña finaliza. Cierra el navegador."""
-        spider.logger.info("Cerrando el driver de Selenium.")
-        if self.driver:
-            self.driver.quit()
+        """Se ejecuta cuando la araña finaliza. Cierra los navegadores del pool."""
+        spider.logger.info("Cerrando las sesiones de Selenium.")
+        if self.instrument_commands and self.crawler is not None:
+            self._record_trace_averages()
+        if self._grid_poll and self._grid_poll.running:
+            self._grid_poll.stop()
+        if self.pool:
+            self.pool.close()
+        if self.profile_store:
+            self.profile_store.close()
+        if self.image_cache:
+            stats = self.image_cache.stats
+            spider.logger.info(f"Caché de imágenes: {stats.get('hits', 0)} aciertos, {stats.get('misses', 0)} fallos.")
+            self.image_cache.close()
+        if self.page_cache:
+            stats = self.page_cache.stats
+            spider.logger.info(f"Caché de páginas: {stats.get('hits', 0)} aciertos, {stats.get('misses', 0)} fallos, {stats.get('stores', 0)} renders guardados.")
+            self.page_cache.close()
 
 class BlocklistMiddleware:
     BLOCKLIST_TERMS = [
@@ -179,9 +729,34 @@ class BlocklistMiddleware:
 class SentryContextMiddleware:
     """
     Añade contexto de la request/response a Sentry y captura excepciones.
+
+    Solo una fracción de las peticiones (`SENTRY_BREADCRUMB_SAMPLE_RATE`) deja
+    un breadcrumb, y el contexto de cada excepción lleva el `meta` y las
+    cabeceras depurados y recortados (ver `stylos.tracing`).
+
+    Sin `SENTRY_DSN` se desactiva (y `sentry_sdk` ni siquiera se importa).
     """
+    def __init__(self, breadcrumb_sample_rate: float = 1.0, max_meta_keys: int = 30, max_value_length: int = 256):
+        self.breadcrumb_sample_rate = breadcrumb_sample_rate
+        self.max_meta_keys = max_meta_keys
+        self.max_value_length = max_value_length
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.get('SENTRY_DSN'):
+            raise NotConfigured("SENTRY_DSN no está definido")
+        return cls(
+            breadcrumb_sample_rate=settings.getfloat('SENTRY_BREADCRUMB_SAMPLE_RATE', 1.0),
+            max_meta_keys=settings.getint('SENTRY_MAX_META_KEYS', 30),
+            max_value_length=settings.getint('SENTRY_MAX_VALUE_LENGTH', 256),
+        )
+
     def process_request(self, request, spider):
-        # Añade un "breadcrumb" para trazar el camino que sigue el scraper
+        # Añade un "breadcrumb" para trazar el camino que sigue el scraper (muestreado)
+        if self.breadcrumb_sample_rate < 1.0 and random.random() >= self.breadcrumb_sample_rate:
+            return None
+        import sentry_sdk
         sentry_sdk.add_breadcrumb(
             category='scrapy',
             message=f'Procesando request para {request.url}',
@@ -192,14 +767,15 @@ class SentryContextMiddleware:
     def process_exception(self, request, exception, spider):
         # Esta es la forma más profesional de capturar la mayoría de los errores
         # de Scrapy (errores de red, HTTP 4xx/5xx, errores en otros middlewares).
-        with sentry_sdk.push_scope() as scope:
+        import sentry_sdk
+        with sentry_sdk.new_scope() as scope:
             scope.set_context("scrapy_request", {
                 "url": request.url,
                 "method": request.method,
-                "headers": dict(request.headers),
-                "meta": request.meta,
+                "headers": scrub_headers(request.headers, self.max_value_length),
+                "meta": scrub_meta(request.meta, self.max_meta_keys, self.max_value_length),
             })
             sentry_sdk.capture_exception(exception)
         
         # Permite que Scrapy continúe con su manejo de errores normal
-        return None
\ No newline at end of file
+        return None
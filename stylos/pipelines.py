@@ -8,8 +8,10 @@ from itemadapter import ItemAdapter
 from scrapy import Item, Spider
 from scrapy.crawler import Crawler
 from scrapy.exceptions import DropItem
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+from stylos.metrics import timed_pipeline
 from stylos.processors import normalize_price
+from stylos.tracing import span
 
 def get_currency_by_country(country: str) -> str:
     """
@@ -58,6 +60,7 @@ class PricePipeline:
     Esta pipeline debe ejecutarse ANTES de las pipelines de base de datos.
     Procesa la lista raw_prices y determina precio original vs actual.
     """
+    @timed_pipeline
     def process_item(self, item, spider):
         adapter = ItemAdapter(item)
         
@@ -258,8 +261,20 @@ class MongoDBPipeline(MongoPipelineBase):
     5. Si no existe, lo inserta como un nuevo documento.
     6. Añade metadatos al `item` para que pipelines posteriores (como HistoryPipeline)
        puedan actuar en consecuencia.
+
+    Los items del modo de refresco rápido (`extraction_type == 'price'`) solo
+    actualizan los campos de `PRICE_FIELDS`; `images_by_color` y el resto del
+    documento quedan intactos. Si el producto aún no existe no se inserta: un
+    documento con solo precios aparecería como "cambiado" en el siguiente
+    rastreo completo.
     """
 
+    # Campos que un refresco de precios puede modificar en un producto existente.
+    PRICE_FIELDS = [
+        'raw_prices', 'original_price', 'current_price', 'currency',
+        'has_discount', 'discount_amount', 'discount_percentage'
+    ]
+
     def open_spider(self, spider: Spider) -> None:
         """
         Extiende el método base para configurar la colección específica de productos.
@@ -269,6 +284,7 @@ class MongoDBPipeline(MongoPipelineBase):
         self.collection = self.db[collection_name]
         spider.logger.info(f"Pipeline principal configurada para usar la colección: '{collection_name}'")
 
+    @timed_pipeline
     def process_item(self, item: Item, spider: Spider) -> Item:
         """
         Procesa, compara y guarda cada item en la colección principal.
@@ -285,27 +301,46 @@ class MongoDBPipeline(MongoPipelineBase):
         """
         adapter = ItemAdapter(item)
         item_dict = adapter.asdict()
+        # El tipo de extracción es un metadato de control, no se persiste
+        price_only = item_dict.pop('extraction_type', None) == 'price'
 
         try:
-            existing_item = self.collection.find_one({'url': item_dict['url']})
-
-            if existing_item:
-                changes_list = self._detect_changes(existing_item, item_dict)
-                if changes_list:
-                    # Actualiza el documento completo si se detectan cambios
-                    self.collection.update_one({'_id': existing_item['_id']}, {'$set': item_dict})
-                    spider.logger.info(f"✅ Producto actualizado (cambios detectados): {item_dict['url']}")
-                    # Añade metadatos para la pipeline de historial
-                    adapter['changes_detected'] = True
-                    adapter['changes_list'] = changes_list
-                else:
-                    # Actualiza solo la fecha de visita si no hay cambios
-                    self.collection.update_one({'_id': existing_item['_id']}, {'$set': {'last_visited': item_dict['last_visited']}})
+            # Lectura y escritura del item: el tramo de MongoDB que se traza en Sentry
+            with span('db.mongodb', f"{self.collection.name} upsert", url=item_dict['url']):
+                existing_item = self.collection.find_one({'url': item_dict['url']})
+
+                if existing_item:
+                    if price_only:
+                        changes_list = self._detect_changes(existing_item, item_dict, self.PRICE_FIELDS)
+                        update = {field: item_dict.get(field) for field in self.PRICE_FIELDS if field in item_dict}
+                        update['last_visited'] = item_dict.get('last_visited')
+                    else:
+                        changes_list = self._detect_changes(existing_item, item_dict)
+                        update = item_dict
+
+                    if changes_list:
+                        # Actualiza el documento (o solo los precios) si se detectan cambios
+                        self.collection.update_one({'_id': existing_item['_id']}, {'$set': update})
+                        spider.logger.info(f"✅ Producto actualizado (cambios detectados): {item_dict['url']}")
+                        # Añade metadatos para la pipeline de historial
+                        adapter['changes_detected'] = True
+                        adapter['changes_list'] = changes_list
+                        spider.crawler.stats.inc_value('mongodb/items_changed')
+                    else:
+                        # Actualiza solo la fecha de visita si no hay cambios
+                        self.collection.update_one({'_id': existing_item['_id']}, {'$set': {'last_visited': item_dict['last_visited']}})
+                        adapter['changes_detected'] = False
+                        spider.crawler.stats.inc_value('mongodb/items_unchanged')
+                elif price_only:
+                    # Sin descripción ni imágenes no hay producto que guardar
                     adapter['changes_detected'] = False
-            else:
-                # Inserta un nuevo documento si el producto no existe
-                self.collection.insert_one(item_dict)
-                spider.logger.info(f"🆕 Producto nuevo guardado: {item_dict['url']}")
+                    spider.crawler.stats.inc_value('mongodb/price_unknown_product')
+                    spider.logger.warning(f"Precio de un producto que no está en la base de datos, se omite: {item_dict['url']}")
+                else:
+                    # Inserta un nuevo documento si el producto no existe
+                    self.collection.insert_one(item_dict)
+                    spider.crawler.stats.inc_value('mongodb/items_new')
+                    spider.logger.info(f"🆕 Producto nuevo guardado: {item_dict['url']}")
 
         except Exception as e:
             spider.logger.error(f"❌ Error en MongoDBPipeline para {item_dict.get('url')}: {e}")
@@ -313,19 +348,21 @@ class MongoDBPipeline(MongoPipelineBase):
         
         return item
 
-    def _detect_changes(self, existing_item: Dict[str, Any], new_item: Dict[str, Any]) -> List[str]:
+    def _detect_changes(self, existing_item: Dict[str, Any], new_item: Dict[str, Any],
+                        fields: Optional[List[str]] = None) -> List[str]:
         """
         Compara un item existente con uno nuevo para detectar cambios significativos.
 
         Args:
             existing_item: El documento actual en la base de datos.
             new_item: El item recién scrapeado.
+            fields: Campos a comparar. Por defecto, los campos clave del producto.
 
         Returns:
             Una lista de strings describiendo los cambios, o una lista vacía si no hay cambios.
         """
         # Campos clave a monitorizar para detectar cambios.
-        important_fields = [
+        important_fields = fields or [
             'name', 'description', 'original_price_amount', 'current_price_amount',
             'currency', 'has_discount', 'images_by_color'
         ]
@@ -353,6 +390,7 @@ class HistoryPipeline(MongoPipelineBase):
         self.collection = self.db[collection_name]
         spider.logger.info(f"Pipeline de historial configurada para usar la colección: '{collection_name}'")
 
+    @timed_pipeline
     def process_item(self, item: Item, spider: Spider) -> Item:
         """Si el item fue modificado, crea y guarda un registro de historial."""
         adapter = ItemAdapter(item)
@@ -385,6 +423,7 @@ class DuplicatesPipeline:
     def __init__(self):
         self.urls_seen = set()
 
+    @timed_pipeline
     def process_item(self, item: Item, spider: Spider) -> Item:
         adapter = ItemAdapter(item)
         url = adapter.get('url')
@@ -404,5 +443,6 @@ class StylosPipeline:
     En su estado actual, no realiza ninguna acción. Puede ser utilizada como
     base para futuras pipelines o eliminada si no es necesaria.
     """
+    @timed_pipeline
     def process_item(self, item, spider):
         return item
\ No newline at end of file
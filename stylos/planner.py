@@ -0,0 +1,165 @@
+"""
+Planificador de duración y capacidad de un lote de rastreos.
+
+Estima, a partir del historial de corridas (`stylos.runs`), cuánto tarda un
+lote de `(araña, país, idioma)` con un número de nodos de Chrome dado y, para
+un plazo, cuántos nodos y shards hacen falta.
+
+El modelo es deliberadamente simple:
+
+- Productos por rastreo: la suma de los productos de cada categoría vista en
+  las corridas recientes (la última cifra por categoría, de todos sus shards),
+  o los items de la mayor corrida sin shards si no hay conteos por categoría.
+- Trabajo: productos × segundos de navegador por item (mediana), que ya
+  incluye la parte proporcional de menús y categorías.
+- Duración: trabajo / (slots en paralelo × utilización de los slots) más el
+  arranque de un trabajo. Los slots en paralelo son el mínimo entre los nodos
+  y lo que pueden ocupar los trabajos (`trabajos × slots_por_trabajo`).
+"""
+
+import math
+import statistics
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Utilización de los slots si el historial no la registra, y límites razonables
+DEFAULT_UTILIZATION = 0.7
+MIN_UTILIZATION = 0.1
+DEFAULT_STARTUP_SECONDS = 30.0
+
+Target = Tuple[str, str, Optional[str]]
+
+
+def parse_targets(spiders: Iterable[str], countries: Iterable[str]) -> List[Target]:
+    """
+    Combina arañas y países en objetivos `(araña, país, idioma)`.
+
+    Cada país puede llevar su idioma como 'us:en'; sin él, vale cualquier
+    idioma del historial.
+    """
+    targets = []
+    for spider in spiders:
+        for country in countries:
+            code, _, lang = country.partition(':')
+            targets.append((spider, code, lang or None))
+    return targets
+
+
+def estimate_target(runs: List[Dict[str, Any]], window: int = 5) -> Optional[Dict[str, Any]]:
+    """
+    Estima el tamaño y el costo de un rastreo completo a partir de sus corridas.
+
+    Args:
+        runs: Corridas terminadas del objetivo, de la más reciente a la más antigua.
+        window (int): Corridas recientes a considerar.
+
+    Returns:
+        Dict con 'products', 'browser_seconds', 'utilization', 'startup_seconds'
+        y 'runs', o `None` si el historial no alcanza para estimar.
+    """
+    recent = runs[:window * 4]
+    category_counts: Dict[str, int] = {}
+    # De la más antigua a la más reciente: gana el último conteo de cada categoría
+    for run in reversed(recent):
+        for entry in run.get('categories') or []:
+            category_counts[entry['category']] = entry['products']
+    unsharded = [run for run in recent if int(run.get('args', {}).get('shards', 1)) == 1]
+    if category_counts:
+        products = sum(category_counts.values())
+    elif unsharded:
+        products = max(run.get('items', {}).get('scraped', 0) for run in unsharded)
+    else:
+        return None
+
+    per_item = _median(run.get('throughput', {}).get('browser_seconds_per_item') for run in recent[:window])
+    if not products or per_item is None:
+        return None
+    utilization = _median(run.get('throughput', {}).get('slot_utilization') for run in recent[:window])
+    startup = _median(run.get('startup_seconds') for run in recent[:window])
+    return {
+        'products': products,
+        'browser_seconds': round(products * per_item, 1),
+        'browser_seconds_per_item': per_item,
+        'utilization': max(MIN_UTILIZATION, min(1.0, utilization if utilization is not None else DEFAULT_UTILIZATION)),
+        'startup_seconds': startup if startup is not None else DEFAULT_STARTUP_SECONDS,
+        'runs': len(recent[:window]),
+    }
+
+
+def predict_seconds(estimates: List[Dict[str, Any]], nodes: int, shards: int = 1, slots_per_job: int = 4) -> float:
+    """Duración estimada (s) del lote con `nodes` slots de Chrome y `shards` trabajos por objetivo."""
+    if not estimates:
+        return 0.0
+    work = sum(estimate['browser_seconds'] for estimate in estimates)
+    # Capacidad efectiva ponderada por la utilización de cada objetivo
+    utilization = sum(e['browser_seconds'] * e['utilization'] for e in estimates) / work if work else DEFAULT_UTILIZATION
+    parallel = max(1, min(nodes, len(estimates) * shards * slots_per_job))
+    startup = max(estimate['startup_seconds'] for estimate in estimates)
+    return work / (parallel * utilization) + startup
+
+
+def plan(estimates: List[Dict[str, Any]], nodes: Optional[int] = None, deadline_seconds: Optional[float] = None,
+         shards: int = 1, slots_per_job: int = 4, max_nodes: int = 64) -> Dict[str, Any]:
+    """
+    Predice la duración con `nodes` nodos y, con `deadline_seconds`, recomienda
+    la menor cantidad de nodos (y los shards por objetivo para ocuparlos) que
+    termina a tiempo, hasta `max_nodes`.
+    """
+    result: Dict[str, Any] = {}
+    if nodes:
+        result['predicted_seconds'] = round(predict_seconds(estimates, nodes, shards, slots_per_job), 1)
+    if deadline_seconds:
+        recommendation = None
+        for candidate in range(1, max_nodes + 1):
+            candidate_shards = max(1, math.ceil(candidate / (max(1, len(estimates)) * slots_per_job)))
+            seconds = predict_seconds(estimates, candidate, candidate_shards, slots_per_job)
+            if seconds <= deadline_seconds:
+                recommendation = {'nodes': candidate, 'shards': candidate_shards, 'predicted_seconds': round(seconds, 1)}
+                break
+        result['recommendation'] = recommendation
+        result['feasible'] = recommendation is not None
+    return result
+
+
+def _median(values: Iterable[Optional[float]]) -> Optional[float]:
+    values = [value for value in values if value is not None]
+    return statistics.median(values) if values else None
+
+
+class CapacityPlanner:
+    """Planifica lotes de rastreos con el historial de `RunLedger`."""
+
+    def __init__(self, ledger, window: int = 5, slots_per_job: int = 4, max_nodes: int = 64):
+        """
+        Args:
+            ledger: `RunLedger` con las corridas registradas.
+            window (int): Corridas recientes por objetivo en que se basa la estimación.
+            slots_per_job (int): Sesiones de navegador por trabajo (`SELENIUM_POOL_SIZE`).
+            max_nodes (int): Máximo de nodos a recomendar.
+        """
+        self.ledger = ledger
+        self.window = window
+        self.slots_per_job = slots_per_job
+        self.max_nodes = max_nodes
+
+    def plan(self, targets: List[Target], nodes: Optional[int] = None, deadline_seconds: Optional[float] = None,
+             shards: int = 1) -> Dict[str, Any]:
+        """
+        Returns:
+            Dict con la estimación por objetivo ('targets'), los objetivos sin
+            historial ('unknown'), y la predicción y/o recomendación del lote.
+        """
+        estimates, per_target, unknown = [], [], []
+        for spider, country, lang in targets:
+            runs = self.ledger.finished_runs(spider, country, lang, limit=self.window * 4)
+            estimate = estimate_target(runs, self.window)
+            label = {'spider': spider, 'country': country, 'lang': lang}
+            if estimate is None:
+                unknown.append(label)
+                continue
+            estimates.append(estimate)
+            per_target.append(dict(label, **estimate))
+
+        result = {'targets': per_target, 'unknown': unknown, 'nodes': nodes, 'shards': shards,
+                  'slots_per_job': self.slots_per_job}
+        result.update(plan(estimates, nodes, deadline_seconds, shards, self.slots_per_job, self.max_nodes))
+        return result
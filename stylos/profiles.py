@@ -0,0 +1,104 @@
+"""
+Perfiles de navegador reutilizables por `(sitio, país, idioma)`.
+
+Una sesión nueva llega a la tienda sin cookies: aparece el diálogo de
+geolocalización, hay que aceptar el consentimiento y el navegador vuelve a
+descargar todos los bundles de JS/CSS. Este módulo guarda una instantánea del
+estado del navegador (cookies y `localStorage`) tras calentar la primera
+sesión, y la inyecta en las siguientes para que empiecen ya localizadas.
+
+Las instantáneas se guardan en SQLite (`BrowserProfileStore`) y se renuevan
+solas cuando vence su TTL o alguna de sus cookies.
+"""
+
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+from stylos.cache import SqliteCache
+
+# Lee todo el localStorage del origen actual como un objeto plano
+READ_LOCAL_STORAGE_SCRIPT = """
+    const items = {};
+    for (let i = 0; i < localStorage.length; i++) {
+        const key = localStorage.key(i);
+        items[key] = localStorage.getItem(key);
+    }
+    return items;
+"""
+WRITE_LOCAL_STORAGE_SCRIPT = """
+    const items = arguments[0];
+    for (const key in items) { localStorage.setItem(key, items[key]); }
+"""
+# Documento pequeño del mismo origen donde se inyecta el estado sin cargar la tienda
+BOOTSTRAP_PATH = '/robots.txt'
+
+
+def capture_snapshot(driver) -> Dict[str, Any]:
+    """
+    Toma una instantánea de las cookies y el `localStorage` del origen actual.
+
+    La instantánea expira con la primera de sus cookies persistentes, para no
+    inyectar un consentimiento o una tienda ya vencidos.
+    """
+    parts = urlsplit(driver.current_url)
+    cookies = driver.get_cookies()
+    expiries = [cookie['expiry'] for cookie in cookies if cookie.get('expiry')]
+    return {
+        'origin': f"{parts.scheme}://{parts.netloc}",
+        'cookies': cookies,
+        'local_storage': driver.execute_script(READ_LOCAL_STORAGE_SCRIPT) or {},
+        'expires_at': min(expiries) if expiries else None,
+    }
+
+
+def apply_snapshot(driver, snapshot: Dict[str, Any]) -> None:
+    """
+    Inyecta una instantánea en una sesión nueva.
+
+    WebDriver solo permite escribir cookies y `localStorage` del origen abierto,
+    así que primero se abre un documento ligero de ese origen.
+    """
+    driver.get(snapshot['origin'] + BOOTSTRAP_PATH)
+    for cookie in snapshot['cookies']:
+        cookie = {key: value for key, value in cookie.items() if key != 'sameSite' or value in ('Strict', 'Lax', 'None')}
+        try:
+            driver.add_cookie(cookie)
+        except Exception:
+            # Cookies de otros subdominios: no se pueden escribir desde este origen
+            continue
+    if snapshot.get('local_storage'):
+        driver.execute_script(WRITE_LOCAL_STORAGE_SCRIPT, snapshot['local_storage'])
+
+
+class BrowserProfileStore(SqliteCache):
+    """
+    Instantáneas del estado del navegador por `(sitio, país, idioma)`.
+
+    Además del TTL de la caché, una instantánea se considera vencida si ya
+    pasó la expiración de alguna de sus cookies (`profiles/expired`).
+    """
+
+    def __init__(self, path: str, ttl: float, stats=None):
+        super().__init__(path, table='profiles', ttl=ttl, stats=stats, stats_prefix='profiles')
+
+    def lookup(self, site: str, country: str, lang: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Devuelve la instantánea vigente del idioma, o `None` si no hay o venció."""
+        status, snapshot = self._fetch(self._key(site, country, lang))
+        now = time.time() if now is None else now
+        if status == 'hit' and snapshot.get('expires_at') and snapshot['expires_at'] <= now:
+            status, snapshot = 'expired', None
+        if status == 'expired':
+            self._count('expired')
+        self._count('hits' if snapshot is not None else 'misses')
+        return snapshot
+
+    def store(self, site: str, country: str, lang: str, snapshot: Dict[str, Any]) -> None:
+        """Guarda la instantánea. Sin cookies no se guarda (el calentamiento falló)."""
+        if not snapshot.get('cookies'):
+            return
+        self.set(self._key(site, country, lang), snapshot)
+
+    @staticmethod
+    def _key(site: str, country: str, lang: str) -> str:
+        return f"{site}|{country}|{lang}"
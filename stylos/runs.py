@@ -0,0 +1,230 @@
+"""
+Historial de corridas en MongoDB (`crawl_runs`).
+
+Al cerrar cada araña, `RunLedgerExtension` guarda un documento con el trabajo,
+sus argumentos, duraciones, throughput, latencias por etapa y conteos de
+items y cambios. `RunLedger` consulta ese historial y compara la última
+corrida de un `(araña, país, idioma)` con las anteriores para detectar
+regresiones de throughput tras un despliegue (ver `compare_runs`).
+"""
+
+import os
+import statistics
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import pymongo
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+
+from stylos.__version__ import __version__
+
+# Argumentos de la araña que identifican una corrida
+RUN_ARGS = ('country', 'lang', 'mode', 'url', 'shard', 'shards', 'crawl_id')
+
+# Métricas comparadas entre corridas: `{métrica: True si más alto es mejor}`
+COMPARED_METRICS = {
+    'items_per_minute': True,
+    'browser_seconds_per_item': False,
+    'renders_per_item': False,
+    'render_p95_ms': False,
+}
+
+
+def build_run_document(job_id: str, spider, stats: Dict[str, Any], reason: str,
+                       release: Optional[str] = None) -> Dict[str, Any]:
+    """Arma el documento de una corrida a partir de las estadísticas finales de Scrapy."""
+    finished_at = stats.get('finish_time') or datetime.now(timezone.utc)
+    items = stats.get('item_scraped_count', 0)
+    renders = sum(value for key, value in stats.items() if key.startswith('webdriver/') and key.endswith('/renders'))
+    renders = renders or stats.get('latency/render/count', 0)
+    browser_seconds = stats.get('throughput/browser_seconds')
+
+    stages = {}
+    for key, value in stats.items():
+        if key.startswith('latency/'):
+            stage, _, metric = key[len('latency/'):].rpartition('/')
+            stages.setdefault(stage, {})[metric] = value
+
+    return {
+        'job_id': job_id,
+        'spider': spider.name,
+        'country': getattr(spider, 'country', None),
+        'lang': getattr(spider, 'lang', None),
+        'args': {name: getattr(spider, name) for name in RUN_ARGS if getattr(spider, name, None) is not None},
+        'release': release or __version__,
+        'reason': reason,
+        'started_at': stats.get('start_time'),
+        'finished_at': finished_at,
+        'duration_seconds': stats.get('elapsed_time_seconds'),
+        'startup_seconds': stats.get('selenium/startup_time'),
+        'items': {
+            'scraped': items,
+            'dropped': stats.get('item_dropped_count', 0),
+            'new': stats.get('mongodb/items_new', 0),
+            'changed': stats.get('mongodb/items_changed', 0),
+            'unchanged': stats.get('mongodb/items_unchanged', 0),
+        },
+        'throughput': {
+            'renders': renders,
+            'items_per_minute': stats.get('throughput/items_per_minute'),
+            'slot_utilization': stats.get('throughput/slot_utilization'),
+            'browser_seconds': browser_seconds,
+            'browser_seconds_per_item': round(browser_seconds / items, 2) if browser_seconds is not None and items else None,
+            'renders_per_item': round(renders / items, 2) if items else None,
+            'render_p95_ms': stages.get('render', {}).get('p95_ms'),
+        },
+        'stages': stages,
+        # Productos enlazados por cada categoría visitada (las rutas tienen '.', no sirven de clave)
+        'categories': [
+            {'category': category, 'products': products}
+            for category, products in sorted((getattr(spider, 'category_products', None) or {}).items())
+        ],
+        # MongoDB no admite '.' en los nombres de campo
+        'stats': {key.replace('.', '_'): value for key, value in stats.items()},
+    }
+
+
+def compare_runs(runs: List[Dict[str, Any]], window: int = 5, threshold: float = 0.2) -> Dict[str, Any]:
+    """
+    Compara la última corrida con su línea base.
+
+    La línea base son hasta `window` corridas anteriores de la versión previa
+    (para aislar el efecto de un despliegue) o, si la última versión no tiene
+    antecesora en el historial, las anteriores de la misma versión. Se marca
+    regresión en cada métrica que empeore más de `threshold` respecto a la
+    mediana de la línea base.
+
+    Args:
+        runs: Corridas del mismo `(araña, país, idioma)`, de la más reciente a la más antigua.
+    """
+    if not runs:
+        return {'latest': None, 'baseline': [], 'metrics': {}, 'regressions': []}
+    latest, previous = runs[0], runs[1:]
+    baseline = [run for run in previous if run.get('release') != latest.get('release')][:window]
+    if baseline:
+        baseline = [run for run in baseline if run.get('release') == baseline[0].get('release')]
+    else:
+        baseline = previous[:window]
+
+    metrics, regressions = {}, []
+    for metric, higher_is_better in COMPARED_METRICS.items():
+        current = latest.get('throughput', {}).get(metric)
+        values = [run['throughput'][metric] for run in baseline if run.get('throughput', {}).get(metric) is not None]
+        if current is None or not values:
+            continue
+        reference = statistics.median(values)
+        change = (current - reference) / reference if reference else 0.0
+        regressed = (change < -threshold) if higher_is_better else (change > threshold)
+        metrics[metric] = {'latest': current, 'baseline': reference, 'change': round(change, 3), 'regression': regressed}
+        if regressed:
+            regressions.append(metric)
+
+    return {
+        'latest': _summary(latest),
+        'baseline': [_summary(run) for run in baseline],
+        'metrics': metrics,
+        'regressions': regressions,
+    }
+
+
+def _summary(run: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: run.get(key) for key in ('job_id', 'release', 'finished_at', 'duration_seconds')}
+
+
+class RunLedger:
+    """Acceso a la colección `crawl_runs`."""
+
+    def __init__(self, collection):
+        """
+        Args:
+            collection: Colección de pymongo (o mongomock) del historial.
+        """
+        self.collection = collection
+
+    def ensure_indexes(self) -> None:
+        """Crea los índices: un documento por trabajo y consultas por rango de fechas."""
+        self.collection.create_index([('job_id', pymongo.ASCENDING)], unique=True)
+        self.collection.create_index([('finished_at', pymongo.DESCENDING)])
+        self.collection.create_index([
+            ('spider', pymongo.ASCENDING), ('country', pymongo.ASCENDING),
+            ('lang', pymongo.ASCENDING), ('finished_at', pymongo.DESCENDING)
+        ])
+
+    def record(self, run: Dict[str, Any]) -> None:
+        """Guarda (o reemplaza, si el trabajo se reanudó) el documento de una corrida."""
+        self.collection.replace_one({'job_id': run['job_id']}, run, upsert=True)
+
+    def find(self, spider: Optional[str] = None, country: Optional[str] = None, lang: Optional[str] = None,
+             since: Optional[datetime] = None, until: Optional[datetime] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """Corridas que cumplen los filtros, de la más reciente a la más antigua."""
+        query: Dict[str, Any] = {}
+        for field, value in (('spider', spider), ('country', country), ('lang', lang)):
+            if value is not None:
+                query[field] = value
+        if since or until:
+            query['finished_at'] = {}
+            if since:
+                query['finished_at']['$gte'] = since
+            if until:
+                query['finished_at']['$lt'] = until
+        cursor = self.collection.find(query, {'_id': 0, 'stats': 0}).sort('finished_at', pymongo.DESCENDING).limit(limit)
+        return list(cursor)
+
+    def finished_runs(self, spider: str, country: Optional[str] = None, lang: Optional[str] = None,
+                      limit: int = 50) -> List[Dict[str, Any]]:
+        """Corridas terminadas con éxito de un `(araña, país, idioma)`, de la más reciente a la más antigua."""
+        query: Dict[str, Any] = {'spider': spider, 'reason': 'finished'}
+        if country is not None:
+            query['country'] = country
+        if lang is not None:
+            query['lang'] = lang
+        return list(self.collection.find(query, {'_id': 0, 'stats': 0}).sort('finished_at', pymongo.DESCENDING).limit(limit))
+
+    def compare(self, spider: str, country: Optional[str] = None, lang: Optional[str] = None,
+                window: int = 5, threshold: float = 0.2) -> Dict[str, Any]:
+        """Compara la última corrida terminada con éxito con su línea base (ver `compare_runs`)."""
+        # Suficientes corridas para cubrir la versión actual y la previa
+        runs = self.finished_runs(spider, country, lang, limit=window * 10)
+        return compare_runs(runs, window=window, threshold=threshold)
+
+
+class RunLedgerExtension:
+    """
+    Guarda un documento por corrida en `RUN_LEDGER_COLLECTION` al cerrar la araña.
+
+    Debe ir después de `StageMetricsExtension` en `EXTENSIONS` para que las
+    latencias y el throughput ya estén en las estadísticas.
+    """
+
+    def __init__(self, crawler, ledger: RunLedger, release: Optional[str] = None):
+        self.crawler = crawler
+        self.ledger = ledger
+        self.release = release
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool('RUN_LEDGER_ENABLED'):
+            raise NotConfigured("RUN_LEDGER_ENABLED está desactivado")
+        uri = settings.get('MONGO_URI')
+        if not uri:
+            raise NotConfigured("MONGO_URI no está definido")
+        client = pymongo.MongoClient(uri, serverSelectionTimeoutMS=5000)
+        collection = client[settings.get('MONGO_DATABASE', 'stylos_scrapers')][settings.get('RUN_LEDGER_COLLECTION', 'crawl_runs')]
+        ext = cls(crawler, RunLedger(collection), release=settings.get('SENTRY_RELEASE'))
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        return ext
+
+    def spider_closed(self, spider, reason):
+        stats = self.crawler.stats.get_stats()
+        # Scrapyd expone el id del trabajo en SCRAPY_JOB; fuera de él se usa la fecha de inicio
+        started_at = stats.get('start_time') or datetime.now(timezone.utc)
+        job_id = os.environ.get('SCRAPY_JOB') or f"{spider.name}-{started_at:%Y%m%dT%H%M%S}"
+        run = build_run_document(job_id, spider, stats, reason, release=self.release)
+        try:
+            self.ledger.ensure_indexes()
+            self.ledger.record(run)
+            spider.logger.info(f"📒 Corrida {job_id} registrada en el historial ({run['items']['scraped']} items)")
+        except pymongo.errors.PyMongoError as e:
+            spider.logger.warning(f"No se pudo registrar la corrida {job_id} en el historial: {e}")
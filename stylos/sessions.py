@@ -0,0 +1,280 @@
+"""
+Pool de sesiones de navegador para `SeleniumMiddleware`.
+
+Cada sesión es un WebDriver independiente (un slot del Selenium Grid o una
+instancia local de Chrome). El middleware renderiza cada petición en un hilo
+del reactor y toma prestada una sesión libre del pool mientras dura el render,
+de modo que hasta `max_size` páginas se procesan en paralelo.
+"""
+
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, List, Optional
+
+from selenium.common.exceptions import InvalidSessionIdException, NoSuchWindowException, WebDriverException
+
+# Mensajes de WebDriver que indican que el navegador o la sesión ya no existen
+DEAD_SESSION_MARKERS = (
+    'invalid session id',
+    'session deleted',
+    'no such session',
+    'chrome not reachable',
+    'disconnected',
+    'target window already closed',
+    'session not created',
+)
+
+# Lectura de memoria del navegador sin CDP (Chrome expone `performance.memory`)
+JS_HEAP_SCRIPT = "return window.performance && performance.memory ? performance.memory.usedJSHeapSize : null;"
+
+
+class BrowserSession:
+    """
+    Una sesión de navegador del pool y sus metadatos de uso.
+
+    Attributes:
+        driver: La instancia de WebDriver.
+        session_id (int): Identificador local y secuencial de la sesión.
+        created_at (float): Momento de creación (epoch).
+        pages (int): Número de páginas renderizadas con esta sesión.
+    """
+
+    def __init__(self, driver, session_id: int):
+        self.driver = driver
+        self.session_id = session_id
+        self.created_at = time.time()
+        self.pages = 0
+        self.memory_mb: Optional[float] = None
+
+    @property
+    def age(self) -> float:
+        """Segundos desde que se creó la sesión."""
+        return time.time() - self.created_at
+
+    def __repr__(self):
+        return f"<BrowserSession #{self.session_id} pages={self.pages}>"
+
+
+def is_session_dead(error: Exception) -> bool:
+    """Indica si `error` significa que el navegador de la sesión murió o se desconectó."""
+    if isinstance(error, (InvalidSessionIdException, NoSuchWindowException)):
+        return True
+    if isinstance(error, (ConnectionError, OSError)):
+        # El nodo del Grid o el chromedriver local dejaron de responder
+        return True
+    if isinstance(error, WebDriverException):
+        message = (error.msg or str(error)).lower()
+        return any(marker in message for marker in DEAD_SESSION_MARKERS)
+    return type(error).__name__ in ('MaxRetryError', 'NewConnectionError', 'ProtocolError')
+
+
+def read_browser_memory_mb(driver) -> Optional[float]:
+    """
+    Memoria del heap de JavaScript de la pestaña, en MB.
+
+    Usa `Performance.getMetrics` por CDP cuando el driver lo permite (Chrome
+    local) y `performance.memory` en otro caso (sesiones remotas del Grid).
+    """
+    try:
+        if hasattr(driver, 'execute_cdp_cmd'):
+            driver.execute_cdp_cmd('Performance.enable', {})
+            metrics = driver.execute_cdp_cmd('Performance.getMetrics', {})
+            for metric in metrics.get('metrics', []):
+                if metric.get('name') == 'JSHeapUsedSize':
+                    return metric['value'] / (1024 * 1024)
+        used = driver.execute_script(JS_HEAP_SCRIPT)
+        return used / (1024 * 1024) if used else None
+    except Exception:
+        return None
+
+
+class SessionRecyclePolicy:
+    """
+    Decide cuándo reemplazar una sesión sana para evitar que se degrade
+    (fugas de memoria, pestañas huérfanas, cookies viejas).
+
+    Un límite en `0` está desactivado.
+    """
+
+    def __init__(self, max_pages: int = 0, max_age: float = 0, max_memory_mb: float = 0, memory_check_every: int = 20):
+        """
+        Args:
+            max_pages (int): Páginas renderizadas tras las que se recicla la sesión.
+            max_age (float): Segundos de vida tras los que se recicla la sesión.
+            max_memory_mb (float): Memoria del navegador (MB) a partir de la cual se recicla.
+            memory_check_every (int): Cada cuántas páginas se consulta la memoria.
+        """
+        self.max_pages = max_pages
+        self.max_age = max_age
+        self.max_memory_mb = max_memory_mb
+        self.memory_check_every = max(1, memory_check_every)
+
+    def reason(self, session: BrowserSession) -> Optional[str]:
+        """Devuelve el motivo para reciclar la sesión ('pages', 'age', 'memory') o `None`."""
+        if self.max_pages and session.pages >= self.max_pages:
+            return 'pages'
+        if self.max_age and session.age >= self.max_age:
+            return 'age'
+        if self.max_memory_mb and session.pages and session.pages % self.memory_check_every == 0:
+            session.memory_mb = read_browser_memory_mb(session.driver)
+            if session.memory_mb is not None and session.memory_mb >= self.max_memory_mb:
+                return 'memory'
+        return None
+
+
+class BrowserSessionPool:
+    """
+    Pool thread-safe de sesiones de navegador con creación perezosa.
+
+    Las sesiones se crean bajo demanda con `factory` hasta alcanzar `max_size`.
+    Cuando todas están ocupadas, `acquire` bloquea hasta que alguna se libere.
+    """
+
+    def __init__(self, factory: Callable[[], object], max_size: int, logger: Optional[logging.Logger] = None,
+                 closer: Optional[Callable[[object, bool], None]] = None):
+        """
+        Args:
+            factory (Callable): Función sin argumentos que crea un nuevo WebDriver.
+            max_size (int): Número máximo de sesiones simultáneas.
+            logger: Opcional. Logger para los eventos del pool.
+            closer (Callable): Opcional. Función `(driver, reusable)` que cierra un
+                WebDriver en lugar de `driver.quit()` (ej. devolverlo al broker).
+                `reusable` es `False` si la sesión se descartó por muerta o gastada.
+        """
+        self.factory = factory
+        self.closer = closer
+        self.max_size = max(1, max_size)
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+        self._idle: List[BrowserSession] = []
+        self._in_use: List[BrowserSession] = []
+        self._creating = 0
+        self._closed = False
+        self._ids = itertools.count(1)
+        self._condition = threading.Condition()
+
+    @property
+    def size(self) -> int:
+        """Número de sesiones existentes (libres + ocupadas + en creación)."""
+        with self._condition:
+            return len(self._idle) + len(self._in_use) + self._creating
+
+    @property
+    def in_use(self) -> int:
+        """Número de sesiones prestadas en este momento."""
+        with self._condition:
+            return len(self._in_use)
+
+    def resize(self, max_size: int) -> None:
+        """
+        Cambia el número máximo de sesiones.
+
+        Al crecer, las peticiones en espera pueden crear sesiones nuevas de
+        inmediato. Al reducirse, se cierran las sesiones libres sobrantes y las
+        prestadas se retiran al devolverse.
+        """
+        with self._condition:
+            self.max_size = max(1, max_size)
+            surplus = len(self._idle) + len(self._in_use) + self._creating - self.max_size
+            retired = []
+            while surplus > 0 and self._idle:
+                retired.append(self._idle.pop(0))
+                surplus -= 1
+            self._condition.notify_all()
+        for session in retired:
+            self._quit(session)
+
+    def prewarm(self, count: int = 1) -> None:
+        """Crea `count` sesiones por adelantado (falla rápido si el navegador no arranca)."""
+        for _ in range(min(count, self.max_size)):
+            session = self.acquire()
+            self.release(session)
+
+    def acquire(self, timeout: Optional[float] = None) -> BrowserSession:
+        """
+        Toma prestada una sesión libre, creándola si hay capacidad.
+
+        Args:
+            timeout (float): Opcional. Segundos máximos de espera por una sesión.
+
+        Returns:
+            BrowserSession: La sesión prestada. Debe devolverse con `release` o `discard`.
+
+        Raises:
+            TimeoutError: Si no se obtuvo una sesión dentro del `timeout`.
+            RuntimeError: Si el pool ya está cerrado.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("El pool de sesiones está cerrado")
+                if self._idle:
+                    session = self._idle.pop()
+                    self._in_use.append(session)
+                    return session
+                if len(self._in_use) + self._creating < self.max_size:
+                    self._creating += 1
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError("No hay sesiones de navegador libres")
+                self._condition.wait(remaining)
+
+        # La creación se hace fuera del lock: arrancar un navegador tarda segundos.
+        try:
+            driver = self.factory()
+        except Exception:
+            with self._condition:
+                self._creating -= 1
+                self._condition.notify()
+            raise
+
+        with self._condition:
+            self._creating -= 1
+            session = BrowserSession(driver, next(self._ids))
+            self._in_use.append(session)
+        self.logger.info(f"Nueva sesión de navegador #{session.session_id} ({self.size}/{self.max_size})")
+        return session
+
+    def release(self, session: BrowserSession) -> None:
+        """Devuelve una sesión sana al pool."""
+        with self._condition:
+            if session in self._in_use:
+                self._in_use.remove(session)
+            # El pool se cerró o se redujo mientras la sesión estaba prestada.
+            retire = self._closed or len(self._idle) + len(self._in_use) + self._creating >= self.max_size
+            if not retire:
+                self._idle.append(session)
+            self._condition.notify()
+        if retire:
+            self._quit(session)
+
+    def discard(self, session: BrowserSession) -> None:
+        """Retira una sesión del pool y cierra su navegador (ej. si murió)."""
+        with self._condition:
+            if session in self._in_use:
+                self._in_use.remove(session)
+            if session in self._idle:
+                self._idle.remove(session)
+            self._condition.notify()
+        self._quit(session, reusable=False)
+
+    def close(self) -> None:
+        """Cierra todas las sesiones libres; las prestadas se cierran al devolverse."""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._condition.notify_all()
+        for session in idle:
+            self._quit(session)
+
+    def _quit(self, session: BrowserSession, reusable: bool = True) -> None:
+        try:
+            if self.closer is not None:
+                self.closer(session.driver, reusable)
+            else:
+                session.driver.quit()
+        except Exception as e:
+            self.logger.warning(f"Error cerrando la sesión #{session.session_id}: {e}")
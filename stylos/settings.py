@@ -29,11 +29,57 @@ ROBOTSTXT_OBEY = False
 # Lee la URL del hub desde la variable de entorno
 SELENIUM_HUB_URL = os.getenv('SELENIUM_HUB_URL', 'http://localhost:4444')
 SELENIUM_MODE = os.getenv('SELENIUM_MODE', 'remote') # 'remote' es el valor por defecto, local si no queremos usar el hub
+# Modo local: caché de chromedriver por versión mayor de Chrome. Solo se
+# descarga cuando falta el binario; con SELENIUM_DRIVER_OFFLINE nunca se usa la red.
+SELENIUM_DRIVER_CACHE_DIR = os.getenv('SELENIUM_DRIVER_CACHE_DIR', '.stylos_cache/drivers')
+SELENIUM_DRIVER_OFFLINE = os.getenv('SELENIUM_DRIVER_OFFLINE', 'false').lower() == 'true'
+# Versión fija de chromedriver (ej. '126.0.6478.126'); por defecto, la del Chrome instalado
+SELENIUM_CHROMEDRIVER_VERSION = os.getenv('SELENIUM_CHROMEDRIVER_VERSION')
+# Ejecutable de Chrome a consultar para detectar su versión
+SELENIUM_CHROME_BINARY = os.getenv('SELENIUM_CHROME_BINARY')
+# Modo local: Chrome sin ventana (ej. benchmarks contra `benchmarks/mock_retailer.py`)
+SELENIUM_HEADLESS = os.getenv('SELENIUM_HEADLESS', 'false').lower() == 'true'
+# Número máximo de sesiones de navegador simultáneas del pool del middleware.
+# Debe coincidir con CONCURRENT_REQUESTS y con las sesiones disponibles en el Grid.
+# Con SELENIUM_GRID_AUTOSCALE solo se usa si el Grid no responde.
+SELENIUM_POOL_SIZE = int(os.getenv('SELENIUM_POOL_SIZE', 4))
+# En modo remoto, consulta /status del Grid al iniciar y periódicamente, y ajusta
+# el pool y CONCURRENT_REQUESTS a los slots disponibles. Así, escalar los nodos
+# (docker-compose up --scale chrome=N) aumenta el rendimiento sin editar settings.
+SELENIUM_GRID_AUTOSCALE = os.getenv('SELENIUM_GRID_AUTOSCALE', 'true').lower() == 'true'
+# Segundos entre consultas de capacidad del Grid
+SELENIUM_GRID_POLL_INTERVAL = 60
+# Límite superior del pool, aunque el Grid tenga más slots libres
+SELENIUM_POOL_MAX_SIZE = int(os.getenv('SELENIUM_POOL_MAX_SIZE', 16))
+
+# Reciclaje de sesiones de navegador: una sesión se reemplaza al superar
+# cualquiera de estos límites (0 = desactivado). Evita que los rastreos largos
+# se vuelvan lentos por fugas de memoria del navegador.
+SELENIUM_SESSION_MAX_PAGES = int(os.getenv('SELENIUM_SESSION_MAX_PAGES', 200))
+SELENIUM_SESSION_MAX_AGE = 30 * 60  # segundos
+SELENIUM_SESSION_MAX_MEMORY_MB = int(os.getenv('SELENIUM_SESSION_MAX_MEMORY_MB', 1024))
+# Cada cuántas páginas se consulta la memoria (Performance.getMetrics por CDP)
+SELENIUM_SESSION_MEMORY_CHECK_EVERY = 20
+# Reintentos de una petición cuando su sesión muere a mitad del render
+SELENIUM_SESSION_DEAD_RETRIES = 1
+
+# URL del broker de sesiones calentadas (app/session_broker.py). Si se define,
+# las sesiones del Grid se piden prestadas al broker en lugar de crearse.
+SELENIUM_BROKER_URL = os.getenv('SELENIUM_BROKER_URL')
+
+# Cuenta y cronometra cada comando de WebDriver (get, findElements, executeScript,
+# getAttribute, pausas...) por tipo de extracción y por método del extractor.
+# Los totales quedan en las estadísticas `webdriver/*` al final de cada rastreo.
+WEBDRIVER_INSTRUMENTATION_ENABLED = True
+# Deja el detalle de cada render en `response.meta['webdriver_trace']`. También
+# se puede pedir por petición con `meta={'webdriver_trace': True}`.
+WEBDRIVER_TRACE_IN_META = False
 
 # Configure maximum concurrent requests performed by Scrapy (default: 16)
 # Número máximo de peticiones que Scrapy puede tener activas a la vez.
 # Un buen punto de partida es (NÚMERO_DE_NODES_CHROME * NODE_MAX_SESSIONS)
 # Con 4 nodos chrome con 1 sesión cada uno, ponemos 4 para aprovechar todos.
+# Con SELENIUM_GRID_AUTOSCALE el middleware lo recalcula a partir del Grid.
 CONCURRENT_REQUESTS = 4
 
 # Configure a delay for requests for the same website (default: 0)
@@ -62,9 +108,10 @@ CONCURRENT_REQUESTS_PER_DOMAIN = 4
 
 # Enable or disable spider middlewares
 # See https://docs.scrapy.org/en/latest/topics/spider-middleware.html
-#SPIDER_MIDDLEWARES = {
-#    "stylos.middlewares.StylosSpiderMiddleware": 543,
-#}
+SPIDER_MIDDLEWARES = {
+    # "stylos.middlewares.StylosSpiderMiddleware": 543,
+    "stylos.metrics.StageTimingSpiderMiddleware": 990,  # Junto a la araña; solo activa con STAGE_METRICS_ENABLED
+}
 
 # Enable or disable downloader middlewares
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
@@ -73,12 +120,92 @@ DOWNLOADER_MIDDLEWARES = {
     "stylos.middlewares.SeleniumMiddleware": 543,
     "stylos.middlewares.BlocklistMiddleware": 544,
     "stylos.middlewares.SentryContextMiddleware": 545,
+    "stylos.frontier.FrontierAckMiddleware": 950,  # Solo activa con MongoFrontierScheduler
 }
 
+# =============================================================================
+# CACHÉ DE IMÁGENES POR COLOR
+# =============================================================================
+
+# Reutiliza las imágenes de cada variante de color entre rastreos cuando la
+# huella de la galería (primera imagen + número de miniaturas) no ha cambiado.
+IMAGE_CACHE_ENABLED = os.getenv('IMAGE_CACHE_ENABLED', 'true').lower() == 'true'
+# Archivo SQLite donde se guarda la caché (relativo al directorio de ejecución)
+IMAGE_CACHE_PATH = os.getenv('IMAGE_CACHE_PATH', '.stylos_cache/cache.sqlite3')
+# Validez de cada entrada en segundos (7 días por defecto)
+IMAGE_CACHE_TTL = int(os.getenv('IMAGE_CACHE_TTL', 7 * 24 * 3600))
+
+# =============================================================================
+# CACHÉ DEL MENÚ DE CATEGORÍAS
+# =============================================================================
+
+# Reutiliza las URLs de subcategorías del menú por (sitio, país, idioma) para
+# ir directo a las categorías. `-a refresh_menu=true` fuerza una nueva extracción.
+MENU_CACHE_ENABLED = os.getenv('MENU_CACHE_ENABLED', 'true').lower() == 'true'
+MENU_CACHE_PATH = os.getenv('MENU_CACHE_PATH', '.stylos_cache/cache.sqlite3')
+# Validez del menú en caché en segundos (3 días por defecto)
+MENU_CACHE_TTL = int(os.getenv('MENU_CACHE_TTL', 3 * 24 * 3600))
+# Con el menú en caché, vuelve a extraerlo con baja prioridad para detectar cambios
+MENU_CACHE_VALIDATE = True
+
+# =============================================================================
+# CACHÉ DE PÁGINAS RENDERIZADAS (GRABAR Y REPRODUCIR)
+# =============================================================================
+
+# Guarda el HTML, la URL final y los datos extraídos de cada render de Selenium
+# para iterar sobre el parseo y las pipelines sin volver a abrir el navegador:
+# - 'off': sin caché.
+# - 'record': renderiza siempre y guarda cada resultado.
+# - 'replay': solo responde desde la caché; no abre el navegador y descarta
+#   las peticiones que no estén guardadas.
+# - 'auto': responde desde la caché si hay una entrada vigente; si no, renderiza y guarda.
+# Ej.: `scrapy crawl zara -s PAGE_CACHE_MODE=record` y luego `-s PAGE_CACHE_MODE=replay`.
+PAGE_CACHE_MODE = os.getenv('PAGE_CACHE_MODE', 'off')
+# Archivo propio: los renders ocupan mucho más que las demás cachés
+PAGE_CACHE_PATH = os.getenv('PAGE_CACHE_PATH', '.stylos_cache/pages.sqlite3')
+# Validez de cada render en segundos (7 días; 0 = sin expiración)
+PAGE_CACHE_TTL = int(os.getenv('PAGE_CACHE_TTL', 7 * 24 * 3600))
+
+# =============================================================================
+# PERFILES DE NAVEGADOR
+# =============================================================================
+
+# Guarda las cookies y el localStorage (consentimiento, tienda elegida) de la
+# primera sesión de cada (sitio, país, idioma) y los inyecta en las siguientes,
+# para que no vuelvan a pasar por el diálogo de geolocalización.
+BROWSER_PROFILE_ENABLED = os.getenv('BROWSER_PROFILE_ENABLED', 'true').lower() == 'true'
+BROWSER_PROFILE_PATH = os.getenv('BROWSER_PROFILE_PATH', '.stylos_cache/cache.sqlite3')
+# Validez del perfil en segundos (1 día); también vence con la primera cookie que expire
+BROWSER_PROFILE_TTL = int(os.getenv('BROWSER_PROFILE_TTL', 24 * 3600))
+# Caché de disco de Chrome para JS/CSS/fuentes. En modo remoto la ruta es
+# dentro de cada nodo del Grid; en modo local, cada sesión usa un subdirectorio.
+BROWSER_DISK_CACHE_DIR = os.getenv('BROWSER_DISK_CACHE_DIR', '/tmp/stylos-chrome-cache')
+
+# =============================================================================
+# REPARTO DE VARIANTES DE COLOR
+# =============================================================================
+
+# Procesa cada color de un producto como una petición independiente, de modo
+# que varias sesiones del pool trabajan en paralelo sobre el mismo producto.
+# Desactivado por defecto: cada color vuelve a cargar y recorrer la página
+# completa, así que N colores cuestan N renders en lugar de uno (más
+# segundos de navegador por producto). Solo acorta la latencia por producto
+# cuando sobran sesiones libres en el pool.
+COLOR_FANOUT_ENABLED = os.getenv('COLOR_FANOUT_ENABLED', 'false').lower() == 'true'
+# Segundos máximos de espera por los colores de un producto antes de emitirlo
+# con los que hayan llegado
+COLOR_FANOUT_TIMEOUT = 300
+# Cada cuántos segundos se buscan productos que ya superaron ese plazo
+COLOR_FANOUT_CHECK_INTERVAL = 30
+
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
 EXTENSIONS = {
     "stylos.extensions.SentryLoggingExtension": 100,
+    "stylos.extensions.ResumableCrawlExtension": 200,  # Solo activa con JOBDIR
+    "stylos.throttle.SlotThrottleExtension": 300,      # Solo activa con SLOT_THROTTLE_ENABLED
+    "stylos.metrics.StageMetricsExtension": 400,       # Solo activa con STAGE_METRICS_ENABLED
+    "stylos.runs.RunLedgerExtension": 500,             # Después de las métricas; solo activa con MONGO_URI
 }
 
 # Configure item pipelines
@@ -90,11 +217,50 @@ ITEM_PIPELINES = {
     "stylos.pipelines.StylosPipeline": 400,       # Procesamiento general
 }
 
+# =============================================================================
+# THROTTLE POR SLOTS DE NAVEGADOR
+# =============================================================================
+
+# Ajusta el número de peticiones renderizadas simultáneas según la ocupación de
+# los slots del pool y las señales del servidor (bloqueos, timeouts, latencia),
+# separando la latencia de navegación del tiempo de extracción. Reemplaza a
+# AutoThrottle, que para Selenium mide nuestras propias esperas y scrolls.
+SLOT_THROTTLE_ENABLED = True
+# Límite mínimo de peticiones simultáneas al retroceder
+SLOT_THROTTLE_MIN_CONCURRENCY = 1
+# Latencia del servidor (segundos, media móvil) a partir de la cual se retrocede
+SLOT_THROTTLE_MAX_LATENCY = 5.0
+# Segundos sin aumentar la concurrencia después de un retroceso
+SLOT_THROTTLE_COOLDOWN = 30
+# Códigos HTTP de la navegación que indican bloqueo o sobrecarga
+SLOT_THROTTLE_BLOCK_STATUSES = [403, 429, 503]
+# Textos que delatan una página de bloqueo. Se buscan en el título y en el texto
+# visible (sin scripts), este último solo si el estado no es 200 o si el texto
+# no supera SLOT_THROTTLE_BLOCK_MAX_TEXT caracteres: las páginas de bloqueo son cortas
+SLOT_THROTTLE_BLOCK_MARKERS = ['access denied', 'captcha', 'request unsuccessful', 'too many requests']
+SLOT_THROTTLE_BLOCK_MAX_TEXT = 2000
+
+# =============================================================================
+# MÉTRICAS POR ETAPA
+# =============================================================================
+
+# Histogramas de latencia (p50/p95/p99) de navegación, extracción, lectura del
+# HTML, construcción de la respuesta, parse de la araña y cada pipeline, más
+# items por minuto y utilización de los slots de navegador (ver stylos.metrics).
+STAGE_METRICS_ENABLED = os.getenv('STAGE_METRICS_ENABLED', 'true').lower() == 'true'
+# Directorio donde se guarda un JSON con el detalle de cada corrida (vacío = no se guarda)
+STAGE_METRICS_DIR = os.getenv('STAGE_METRICS_DIR', '.stylos_cache/metrics')
+# Directorio compartido con la API donde cada trabajo publica sus métricas en
+# vivo para `/metrics` (vacío = no se publican) y cada cuántos segundos
+STAGE_METRICS_LIVE_DIR = os.getenv('STAGE_METRICS_LIVE_DIR', '.stylos_cache/live')
+STAGE_METRICS_LIVE_INTERVAL = 15
+
 # Activa el AutoThrottle para ajustar la velocidad dinámicamente según la carga
 # del servidor de destino y el de Scrapy. Es un "control de crucero" inteligente.
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
-AUTOTHROTTLE_ENABLED = True
+# Desactivado: las peticiones de Selenium las regula SLOT_THROTTLE_ENABLED.
+AUTOTHROTTLE_ENABLED = False
 # The initial download delay - reducido para ser más agresivo
 AUTOTHROTTLE_START_DELAY = 1
 # The maximum download delay to be set in case of high latencies
@@ -106,7 +272,7 @@ AUTOTHROTTLE_MAX_DELAY = 10
 AUTOTHROTTLE_TARGET_CONCURRENCY = 4.0
 # Enable showing throttling stats for every response received:
 # Habilita el debug para ver cómo se distribuyen las peticiones
-AUTOTHROTTLE_DEBUG = True
+AUTOTHROTTLE_DEBUG = False
 
 # Enable and configure HTTP caching (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html#httpcache-middleware-settings
@@ -141,10 +307,42 @@ MONGO_COLLECTION = os.getenv("MONGO_COLLECTION", "products")
 # Nombre de la colección para el historial de cambios (opcional)
 MONGO_HISTORY_COLLECTION = os.getenv("MONGO_HISTORY_COLLECTION", "product_history")
 
+# Historial de corridas: un documento por trabajo con duraciones, throughput,
+# latencias por etapa y conteos de items (ver stylos.runs). Requiere MONGO_URI.
+RUN_LEDGER_ENABLED = os.getenv("RUN_LEDGER_ENABLED", "true").lower() == "true"
+RUN_LEDGER_COLLECTION = os.getenv("RUN_LEDGER_COLLECTION", "crawl_runs")
+
+# =============================================================================
+# FRONTIER COMPARTIDA EN MONGODB
+# =============================================================================
+
+# Para que varios workers vacíen juntos un mismo rastreo, cada uno se lanza con:
+#   -s SCHEDULER=stylos.frontier.MongoFrontierScheduler -a crawl_id=<id común>
+# URI de MongoDB de la frontier (usa MONGO_URI si no se define)
+FRONTIER_MONGO_URI = os.getenv("FRONTIER_MONGO_URI")
+FRONTIER_COLLECTION = os.getenv("FRONTIER_COLLECTION", "frontier")
+# Segundos que un worker conserva una petición sin renovar su lease
+FRONTIER_LEASE_TIMEOUT = 600
+# Cada cuánto se renuevan los leases propios y se recuperan los vencidos
+FRONTIER_HEARTBEAT_INTERVAL = 60
+# Intentos máximos por petición (leases vencidos incluidos)
+FRONTIER_MAX_ATTEMPTS = 3
+
 # =============================================================================
 # SENTRY CONFIGURATION
 # =============================================================================
 
 SENTRY_DSN = os.getenv('SENTRY_DSN', '')
 SENTRY_ENVIRONMENT = os.getenv('SCRAPY_ENV', 'development')
-SENTRY_RELEASE = __version__
\ No newline at end of file
+SENTRY_RELEASE = __version__
+# Fracción de renders e items que se envían como transacciones (0 = sin trazas)
+SENTRY_TRACES_SAMPLE_RATE = float(os.getenv('SENTRY_TRACES_SAMPLE_RATE', '0.01'))
+# Fracción de peticiones que dejan un breadcrumb
+SENTRY_BREADCRUMB_SAMPLE_RATE = float(os.getenv('SENTRY_BREADCRUMB_SAMPLE_RATE', '0.05'))
+# Breadcrumbs por evento y nivel mínimo de log que se guarda como breadcrumb
+SENTRY_MAX_BREADCRUMBS = 30
+SENTRY_LOG_BREADCRUMB_LEVEL = 'WARNING'
+# Límites del contexto de cada excepción: claves de `meta`, largo de cada texto y tamaño del evento
+SENTRY_MAX_META_KEYS = 30
+SENTRY_MAX_VALUE_LENGTH = 256
+SENTRY_MAX_EVENT_BYTES = 64 * 1024
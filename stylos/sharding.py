@@ -0,0 +1,50 @@
+"""
+Reparto estático de un rastreo entre varios trabajos de Scrapyd.
+
+Cada trabajo (shard) recibe `-a shard=i -a shards=n` y solo procesa la parte
+del sitio que le corresponde según un hash estable (MD5, no el `hash()` de
+Python, que cambia entre procesos). Así, n procesos con n pools de navegador
+recorren un país completo en paralelo sin coordinarse entre sí.
+
+Hay dos criterios de reparto (`-a shard_by=...`):
+- 'category' (por defecto): cada shard recorre solo sus subcategorías y todos
+  los productos que encuentre en ellas. Es el más eficiente; un producto que
+  aparece en subcategorías de shards distintos se extrae más de una vez (el
+  pipeline de MongoDB lo actualiza, no lo duplica).
+- 'product': todos los shards recorren todas las subcategorías, pero cada uno
+  solo extrae los productos cuyo ID le corresponden. Ningún producto se
+  extrae dos veces, a cambio de repetir el scroll de cada categoría.
+"""
+
+import hashlib
+import re
+from urllib.parse import urlparse
+
+SHARD_BY_CHOICES = ('category', 'product')
+
+# IDs de producto en las URLs de cada sitio: Zara (-p01234567.html), Mango (_87054036)
+PRODUCT_ID_PATTERNS = [
+    re.compile(r'-p(\d+)\.html'),
+    re.compile(r'_(\d+)/?$'),
+]
+
+
+def stable_shard(key: str, shards: int) -> int:
+    """Devuelve el shard (0..shards-1) de `key`; es el mismo en cualquier proceso."""
+    digest = hashlib.md5(key.encode('utf-8')).hexdigest()
+    return int(digest[:8], 16) % shards
+
+
+def category_key(url: str) -> str:
+    """Clave de reparto de una subcategoría: su ruta, sin dominio ni parámetros."""
+    return urlparse(url).path.rstrip('/') or url
+
+
+def product_key(url: str) -> str:
+    """Clave de reparto de un producto: su ID si la URL lo contiene, o su ruta."""
+    path = urlparse(url).path
+    for pattern in PRODUCT_ID_PATTERNS:
+        match = pattern.search(path)
+        if match:
+            return match.group(1)
+    return path.rstrip('/') or url
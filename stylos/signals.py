@@ -0,0 +1,21 @@
+"""
+Señales propias de Stylos.
+
+Se envían con `crawler.signals.send_catch_log(signal=..., **kwargs)` y se
+conectan igual que las señales de Scrapy.
+"""
+
+# Una petición servida por la frontier compartida terminó de descargarse.
+# Argumentos: request, spider, failed (bool), error (str o None)
+frontier_request_done = object()
+
+# Una petición de Selenium terminó de renderizarse, con o sin éxito.
+# Argumentos: request, spider, timing (dict con 'navigation', 'server_latency',
+# 'extraction', 'page_source', 'response_build' y 'render' (total) en segundos
+# y 'status'), error (str o None; 'timeout' si la navegación agotó su tiempo)
+page_rendered = object()
+
+# Una etapa del rastreo fuera del render terminó (ej. el callback de la araña o
+# el `process_item` de un pipeline, ver `stylos.metrics.timed_pipeline`).
+# Argumentos: stage (str), elapsed (float, segundos), spider
+stage_timed = object()
@@ -1,38 +1,37 @@
 import scrapy
 from scrapy.loader import ItemLoader
 from stylos.items import ProductItem, ImagenItem
+from stylos.spiders.mixins import BaseUrlMixin, ColorFanoutMixin, MenuCacheMixin, ShardingMixin
 from datetime import datetime
 
-class MangoSpider(scrapy.Spider):
+class MangoSpider(MenuCacheMixin, ColorFanoutMixin, ShardingMixin, BaseUrlMixin, scrapy.Spider):
     name = "mango"
     allowed_domains = ["shop.mango.com"]
-    start_urls = [
-        "https://shop.mango.com/co/es/h/mujer",
-        "https://shop.mango.com/co/es/h/hombre",
-    ]
+    BASE_URL = "https://shop.mango.com"
+    # Secciones del menú desde las que arranca el rastreo
+    START_PATHS = ["co/es/h/mujer", "co/es/h/hombre"]
+    # 'full' extrae todo el producto, 'price' solo refresca los precios (-a mode=price)
+    mode = 'full'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # -a base_url=http://127.0.0.1:8765 apunta la araña a otro origen (ver `BaseUrlMixin`)
+        self.start_urls = [self.site_url(path) for path in self.START_PATHS]
 
     def start_requests(self):
         if hasattr(self, 'url'):
             self.logger.info(f"Ejecutando en modo de prueba para una sola URL: {self.url}")
             yield scrapy.Request(
                 url=self.url,
-                callback=self.parse_product,
+                callback=self._product_callback(),
                 meta={
                     'selenium': True,
-                    'extraction_type': 'product'
+                    'extraction_type': self._product_extraction_type()
                 }
             )
         else:
             self.logger.info("Iniciando rastreo completo desde el menú principal.")
-            for url in self.start_urls:
-                yield scrapy.Request(
-                    url=url,
-                    callback=self.parse_menu,
-                    meta={
-                    'selenium': True,
-                    'extraction_type': 'menu'
-                    }
-                )
+            yield from self.menu_requests()
 
     def parse_menu(self, response):
         self.logger.info(f"Procesando URLs de menú desde: {response.url}")
@@ -41,36 +40,25 @@ class MangoSpider(scrapy.Spider):
         unique_urls = set(extracted_urls)
         self.logger.info(f"URLs únicas después de eliminar duplicados: {len(unique_urls)}")
         
-        # Inicializar conjunto de URLs procesadas si no existe
-        if not hasattr(self, 'processed_urls'):
-            self.processed_urls = set()
-        
-        # Procesar URLs únicas
-        for url in unique_urls:
-            if url not in self.processed_urls:
-                self.processed_urls.add(url)
-                yield response.follow(
-                    url, 
-                    callback=self.parse_category,
-                    meta={
-                        'selenium': True,
-                        'extraction_type': 'category'  # Especifica scroll infinito
-                    }
-                )
-                
+        self.store_menu_urls(response.meta.get('menu_url', response.url), list(unique_urls))
+        yield from self.follow_category_urls(response.url, unique_urls)
+            
     def parse_category(self, response):
         self.logger.info(f"Extrayendo productos de: {response.url}")
         
         products_xpath = "//ul[@class='Grid_grid__fLhp5 Grid_standard__xt7_3']/li//a[@href]"
         product_urls = response.xpath(products_xpath).css('::attr(href)').getall()
+        self.count_category_products(response.url, product_urls)
         
         for href in set(product_urls):  # Eliminar duplicados
+            if not self.owns_product(response.urljoin(href)):
+                continue
             yield response.follow(
                 href, 
-                callback=self.parse_product,
+                callback=self._product_callback(),
                 meta={
                     'selenium': True,
-                    'extraction_type': 'product'  # Especifica extracción de producto
+                    'extraction_type': self._product_extraction_type()  # 'product', 'variants' o 'price'
                 }
             )
             
@@ -80,10 +68,13 @@ class MangoSpider(scrapy.Spider):
         product_data = response.meta.get('product_data', {})
         extracted_images = response.meta.get('extracted_images', [])
         
+        yield self._build_product_item(response, product_data, extracted_images)
+        
+    def _build_product_item(self, response, product_data, extracted_images, url=None):
         loader = ItemLoader(item=ProductItem(), selector=response)
         
         # Datos básicos del producto (del middleware o fallback al response)
-        loader.add_value('url', response.url)
+        loader.add_value('url', url or response.url)
         loader.add_value('name', product_data.get('name', ''))
         loader.add_value('description', product_data.get('description', ''))
         
@@ -100,13 +91,46 @@ class MangoSpider(scrapy.Spider):
         loader.add_value('datetime', datetime.now().isoformat())
         loader.add_value('last_visited', datetime.now().isoformat())
         
+        return loader.load_item()
+        
+    def parse_price(self, response):
+        self.logger.info(f"Refrescando precios del producto: {response.url}")
+        
+        product_data = response.meta.get('product_data', {})
+        
+        loader = ItemLoader(item=ProductItem(), selector=response)
+        loader.add_value('url', response.url)
+        loader.add_value('name', product_data.get('name', ''))
+        loader.add_value('raw_prices', product_data.get('prices', []))
+        loader.add_value('currency', product_data.get('currency', ''))
+        
+        loader.add_value('site', 'MANGO')
+        loader.add_value('datetime', datetime.now().isoformat())
+        loader.add_value('last_visited', datetime.now().isoformat())
+        loader.add_value('extraction_type', 'price')
+        
         yield loader.load_item()
         
+    def _product_extraction_type(self):
+        if self.mode == 'price':
+            return 'price'
+        if self.settings.getbool('COLOR_FANOUT_ENABLED'):
+            return 'variants'
+        return 'product'
+    
+    def _product_callback(self):
+        return {
+            'price': self.parse_price,
+            'variants': self.parse_variants,
+        }.get(self._product_extraction_type(), self.parse_product)
+        
     def _process_images(self, extracted_images, response, product_data):
         images_by_color = []
         
         if extracted_images:
-            for color_name, images in extracted_images.items():
+            # Dict por nombre de color o, con el reparto de colores, lista de pares
+            color_pairs = extracted_images.items() if isinstance(extracted_images, dict) else extracted_images
+            for color_name, images in color_pairs:
                 if images:
                     imagen_items = []
                     for img_data in images:
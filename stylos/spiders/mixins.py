@@ -0,0 +1,413 @@
+"""
+Comportamientos compartidos por las arañas de Stylos.
+
+Las arañas concretas (`ZaraSpider`, `MangoSpider`) heredan de estos mixins para
+reutilizar la lógica que no depende del sitio.
+"""
+
+from typing import List, Optional
+from urllib.parse import urljoin, urlsplit
+
+import scrapy
+from scrapy import signals
+from scrapy.exceptions import DontCloseSpider
+from twisted.internet import task
+
+from stylos.aggregation import ColorAggregator, color_images
+from stylos.cache import MenuCache
+from stylos.frontier import LOCAL_META_KEY
+from stylos.sharding import SHARD_BY_CHOICES, category_key, product_key, stable_shard
+
+
+class ShardingMixin:
+    """
+    Limita la araña a su parte del sitio cuando el rastreo se reparte en shards.
+
+    Argumentos: `-a shard=i -a shards=n` (0 <= i < n) y, opcionalmente,
+    `-a shard_by=category|product` (ver `stylos.sharding`). Sin ellos la araña
+    procesa todo el sitio.
+
+    También registra cuántos productos enlaza cada categoría visitada
+    (`category_products`), que el historial de corridas guarda para estimar el
+    tamaño de los próximos rastreos (ver `stylos.planner`).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.category_products = {}
+        self.shards = int(getattr(self, 'shards', 1))
+        self.shard = int(getattr(self, 'shard', 0))
+        self.shard_by = getattr(self, 'shard_by', 'category')
+        if self.shards < 1 or not 0 <= self.shard < self.shards:
+            raise ValueError(f"Shard inválido: shard={self.shard}, shards={self.shards}")
+        if self.shard_by not in SHARD_BY_CHOICES:
+            raise ValueError(f"shard_by debe ser uno de {SHARD_BY_CHOICES}, no '{self.shard_by}'")
+
+    def owns_category(self, url: str) -> bool:
+        """Indica si la subcategoría `url` corresponde a este shard."""
+        return self._owns('category', category_key(url))
+
+    def owns_product(self, url: str) -> bool:
+        """Indica si el producto `url` corresponde a este shard."""
+        return self._owns('product', product_key(url))
+
+    def count_category_products(self, url: str, product_urls) -> None:
+        """Registra los productos distintos que enlaza la categoría `url`, de todos los shards."""
+        self.category_products[category_key(url)] = len(set(product_urls))
+
+    def _owns(self, kind: str, key: str) -> bool:
+        if self.shards == 1 or self.shard_by != kind:
+            return True
+        if stable_shard(key, self.shards) == self.shard:
+            return True
+        self.crawler.stats.inc_value(f'sharding/skipped_{kind}')
+        return False
+
+
+class MenuCacheMixin:
+    """
+    Reutiliza las URLs del menú descubiertas en rastreos anteriores.
+
+    Con la caché vigente, `menu_requests` va directo a las categorías guardadas
+    y agenda una petición de menú de baja prioridad que valida en segundo plano
+    si el menú cambió: las diferencias se registran en el log y en las
+    estadísticas (`menu_cache/drift_*`), la caché se actualiza y las categorías
+    nuevas se siguen normalmente.
+
+    Con `-a refresh_menu=true` se ignora la caché y se vuelve a extraer el menú.
+
+    La araña debe implementar `parse_menu` (que llama a `store_menu_urls` y a
+    `follow_category_urls`) y `parse_category`, y heredar de `ShardingMixin`.
+    """
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        crawler.signals.connect(spider._close_menu_cache, signal=signals.spider_closed)
+        return spider
+
+    @property
+    def menu_cache(self) -> Optional[MenuCache]:
+        """Caché de menús (se crea al primer uso), o `None` si está deshabilitada."""
+        if not hasattr(self, '_menu_cache'):
+            self._menu_cache = None
+            if self.settings.getbool('MENU_CACHE_ENABLED'):
+                self._menu_cache = MenuCache(
+                    path=self.settings.get('MENU_CACHE_PATH'),
+                    ttl=self.settings.getfloat('MENU_CACHE_TTL'),
+                    stats=self.crawler.stats
+                )
+        return self._menu_cache
+
+    def menu_requests(self):
+        """Genera las peticiones iniciales del menú, usando la caché cuando es posible."""
+        for menu_url in self.start_urls:
+            cached_urls = self._cached_menu_urls(menu_url)
+            if cached_urls is None:
+                yield self._menu_request(menu_url)
+                continue
+
+            self.logger.info(f"🗂️ Menú en caché para {menu_url}: {len(cached_urls)} subcategorías")
+            self._menu_snapshot[menu_url] = cached_urls
+            yield from self.follow_category_urls(menu_url, cached_urls)
+
+            if self.settings.getbool('MENU_CACHE_VALIDATE'):
+                # Validación en segundo plano: se procesa cuando no hay otro trabajo
+                yield self._menu_request(menu_url, priority=-100)
+
+    def store_menu_urls(self, menu_url: str, urls: List[str]) -> None:
+        """Guarda las URLs extraídas del menú y registra los cambios frente a la caché."""
+        if self.menu_cache is None:
+            return
+
+        previous = self._menu_snapshot.get(menu_url)
+        if previous is not None:
+            added = set(urls) - set(previous)
+            removed = set(previous) - set(urls)
+            if added or removed:
+                self.logger.warning(f"⚠️ El menú de {menu_url} cambió: {len(added)} subcategorías nuevas, {len(removed)} eliminadas")
+                self.crawler.stats.inc_value('menu_cache/drift_added', len(added))
+                self.crawler.stats.inc_value('menu_cache/drift_removed', len(removed))
+            else:
+                self.logger.info(f"✅ Menú en caché vigente para {menu_url}")
+
+        self.menu_cache.store(*self._menu_key(), menu_url, list(urls))
+
+    @property
+    def processed_urls(self) -> set:
+        """
+        URLs de subcategorías ya agendadas.
+
+        Con `JOBDIR` se guardan en `spider.state` y sobreviven a un reinicio.
+        """
+        state = getattr(self, 'state', None)
+        if state is not None:
+            return state.setdefault('processed_urls', set())
+        if not hasattr(self, '_processed_urls'):
+            self._processed_urls = set()
+        return self._processed_urls
+
+    def follow_category_urls(self, base_url: str, urls):
+        """Genera las peticiones de categoría que aún no se han procesado."""
+        for url in urls:
+            if url not in self.processed_urls and self.owns_category(urljoin(base_url, url)):
+                self.processed_urls.add(url)
+                yield scrapy.Request(
+                    urljoin(base_url, url),
+                    callback=self.parse_category,
+                    meta={
+                        'selenium': True,
+                        'extraction_type': 'category'  # Especifica scroll infinito
+                    }
+                )
+
+    @property
+    def _menu_snapshot(self):
+        # URLs tomadas de la caché al iniciar, para detectar cambios en la validación
+        if not hasattr(self, '_menu_snapshot_urls'):
+            self._menu_snapshot_urls = {}
+        return self._menu_snapshot_urls
+
+    def _menu_key(self):
+        return self.name, getattr(self, 'country', 'co'), getattr(self, 'lang', 'es')
+
+    def _menu_refresh_forced(self) -> bool:
+        return str(getattr(self, 'refresh_menu', '')).lower() in ('1', 'true', 'yes')
+
+    def _cached_menu_urls(self, menu_url: str) -> Optional[List[str]]:
+        if self.menu_cache is None or self._menu_refresh_forced():
+            return None
+        return self.menu_cache.lookup(*self._menu_key(), menu_url)
+
+    def _menu_request(self, menu_url: str, priority: int = 0):
+        return scrapy.Request(
+            url=menu_url,
+            callback=self.parse_menu,
+            priority=priority,
+            dont_filter=True,
+            meta={
+                'selenium': True,
+                'extraction_type': 'menu',
+                'menu_url': menu_url
+            }
+        )
+
+    def _close_menu_cache(self, spider):
+        if getattr(self, '_menu_cache', None) is not None:
+            self._menu_cache.close()
+
+
+class ColorFanoutMixin:
+    """
+    Reparte las variantes de color de un producto en peticiones independientes.
+
+    Flujo:
+    1. `parse_variants` recibe los datos básicos y la lista de variantes que
+       descubrió el extractor (`extraction_type='variants'`).
+    2. Por cada variante emite una petición ligera (`extraction_type='color'`)
+       que cualquier sesión libre del pool puede procesar.
+    3. `parse_color` / `color_failed` van agregando los resultados parciales.
+       Cuando llegan todos los colores, o vence `COLOR_FANOUT_TIMEOUT`, se emite
+       un único `ProductItem`.
+
+    Con el reparto activo (`COLOR_FANOUT_ENABLED`), cada
+    `COLOR_FANOUT_CHECK_INTERVAL` segundos se buscan productos vencidos, de
+    modo que un color atascado no retiene su producto hasta el final.
+    Si la araña se queda inactiva con productos incompletos (peticiones perdidas),
+    se emiten con los colores recibidos hasta ese momento. Si no llegó ninguno,
+    el producto se vuelve a pedir como extracción completa.
+
+    Las peticiones por color y la de vaciado se marcan con `frontier_local`: con
+    `MongoFrontierScheduler` las procesa el mismo worker que guarda la agregación.
+
+    La araña debe implementar `_product_extraction_type()` y
+    `_build_product_item(response, product_data, extracted_images, url=None)`;
+    aquí `extracted_images` llega como lista de pares `(nombre_color, imágenes)`,
+    porque dos variantes pueden compartir nombre.
+    """
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        crawler.signals.connect(spider._flush_colors_on_idle, signal=signals.spider_idle)
+        crawler.signals.connect(spider._start_color_timeouts, signal=signals.spider_opened)
+        crawler.signals.connect(spider._stop_color_timeouts, signal=signals.spider_closed)
+        return spider
+
+    @property
+    def color_aggregator(self) -> ColorAggregator:
+        """
+        Agregador de colores pendientes (se crea al primer uso).
+
+        Con `JOBDIR` las entradas pendientes viven en `spider.state`, de modo que
+        un rastreo reanudado sigue esperando los colores que quedaron en la cola.
+        """
+        if not hasattr(self, '_color_aggregator'):
+            timeout = self.settings.getfloat('COLOR_FANOUT_TIMEOUT', 300)
+            state = getattr(self, 'state', None)
+            pending = state.setdefault('pending_colors', {}) if state is not None else None
+            self._color_aggregator = ColorAggregator(timeout, state=pending)
+        return self._color_aggregator
+
+    def parse_variants(self, response):
+        """Reparte las variantes de color descubiertas en peticiones independientes."""
+        product_data = response.meta.get('product_data', {})
+        variants = response.meta.get('color_variants', [])
+
+        if len(variants) <= 1:
+            # Un solo color: el extractor ya recolectó las imágenes
+            yield from self.parse_product(response)
+            return
+
+        product_url = response.url
+        color_keys = [str(variant['index']) for variant in variants]
+        self.color_aggregator.start(product_url, product_data, color_keys)
+        self.logger.info(f"Repartiendo {len(variants)} colores de: {product_url}")
+
+        for variant, color_key in zip(variants, color_keys):
+            yield scrapy.Request(
+                url=variant.get('url') or product_url,
+                callback=self.parse_color,
+                errback=self.color_failed,
+                dont_filter=True,  # Todas las variantes pueden compartir URL
+                priority=response.request.priority + 1,  # Terminar productos empezados primero
+                meta={
+                    'selenium': True,
+                    'extraction_type': 'color',
+                    'color_index': variant['index'],
+                    'variant_url': variant.get('url'),
+                    'product_url': product_url,
+                    'color_key': color_key,
+                    # La agregación vive en este proceso: con la frontier compartida
+                    # el color no debe ir a otro worker
+                    LOCAL_META_KEY: True,
+                }
+            )
+
+    def parse_color(self, response):
+        """Agrega las imágenes de un color y emite el producto si ya está completo."""
+        entry = self.color_aggregator.add(
+            response.meta['product_url'],
+            response.meta['color_key'],
+            response.meta.get('extracted_images', {})
+        )
+        entries = [entry] if entry else []
+        entries += self.color_aggregator.pop_expired()
+        yield from self._emit_color_entries(entries, response)
+
+    def color_failed(self, failure):
+        """Errback de las peticiones por color: cuenta el color como fallido."""
+        request = failure.request
+        self.logger.warning(f"Falló la extracción del color {request.meta.get('color_index')} de {request.meta.get('product_url')}: {failure.value}")
+        entry = self.color_aggregator.fail(request.meta['product_url'], request.meta['color_key'])
+        entries = [entry] if entry else []
+        entries += self.color_aggregator.pop_expired()
+        yield from self._emit_color_entries(entries)
+
+    def flush_pending_colors(self, response):
+        """Emite todos los productos pendientes (se invoca cuando la araña está inactiva)."""
+        yield from self._emit_color_entries(self.color_aggregator.pop_all())
+
+    def flush_expired_colors(self, response):
+        """Emite los productos que superaron `COLOR_FANOUT_TIMEOUT`."""
+        self._expiry_flush_scheduled = False
+        yield from self._emit_color_entries(self.color_aggregator.pop_expired())
+
+    def _emit_color_entries(self, entries, response=None):
+        """
+        Emite los productos de `entries`. La respuesta de color solo sirve de
+        respaldo a su propio producto: los vencidos que salen con ella son de
+        otras páginas y se arman sin selector.
+        """
+        own_url = response.meta.get('product_url') if response is not None else None
+        for entry in entries:
+            product_url = entry['product_url']
+            if entry['images']:
+                missing = len(entry['expected']) - len(entry['done'])
+                if missing:
+                    self.logger.warning(f"Producto emitido con {missing} colores incompletos: {product_url}")
+                    self.crawler.stats.inc_value('color_fanout/incomplete_products')
+                self.crawler.stats.inc_value('color_fanout/products')
+                source = response if product_url == own_url else None
+                yield self._build_product_item(source, entry['product_data'], color_images(entry), url=product_url)
+            else:
+                # Ningún color llegó: recurrir a la extracción completa en una sola sesión
+                self.logger.warning(f"Sin colores recibidos, se reintenta como extracción completa: {product_url}")
+                self.crawler.stats.inc_value('color_fanout/fallback_full_product')
+                yield scrapy.Request(
+                    url=product_url,
+                    callback=self.parse_product,
+                    dont_filter=True,
+                    meta={
+                        'selenium': True,
+                        'extraction_type': 'product'
+                    }
+                )
+
+    def _start_color_timeouts(self, spider):
+        # Sin reparto de colores (el valor por defecto) no hay plazos que vigilar
+        if self._product_extraction_type() != 'variants':
+            return
+        interval = self.settings.getfloat('COLOR_FANOUT_CHECK_INTERVAL', 30)
+        self._color_timeouts = task.LoopingCall(self._check_color_timeouts)
+        self._color_timeouts.start(interval, now=False)
+
+    def _stop_color_timeouts(self, spider):
+        loop = getattr(self, '_color_timeouts', None)
+        if loop is not None and loop.running:
+            loop.stop()
+
+    def _check_color_timeouts(self):
+        """
+        Agenda una petición local (`data:`) que emite los productos vencidos. Los
+        items solo pueden salir de un callback, no de este temporizador.
+        """
+        if getattr(self, '_expiry_flush_scheduled', False) or not self.color_aggregator.has_expired():
+            return
+        self._expiry_flush_scheduled = True
+        self.crawler.engine.crawl(
+            scrapy.Request('data:,', callback=self.flush_expired_colors, dont_filter=True, priority=100,
+                           meta={LOCAL_META_KEY: True})
+        )
+
+    def _flush_colors_on_idle(self, spider):
+        """
+        Al quedar inactiva, la araña no tiene peticiones en vuelo: los productos
+        pendientes ya no recibirán más colores. Se agenda una petición local
+        (`data:`) que los emite y se evita el cierre hasta entonces.
+        """
+        if not self.color_aggregator.pending:
+            return
+        self.crawler.engine.crawl(
+            scrapy.Request('data:,', callback=self.flush_pending_colors, dont_filter=True,
+                           meta={LOCAL_META_KEY: True})
+        )
+        raise DontCloseSpider
+
+
+class BaseUrlMixin:
+    """
+    Permite apuntar la araña a otro origen que el sitio real.
+
+    Con `-a base_url=http://127.0.0.1:8765`, todas las URLs que arma la araña
+    (y la página de inicio del extractor) usan ese origen en lugar de `BASE_URL`,
+    y su host se agrega a `allowed_domains`. Sirve para rastrear el sitio falso
+    de `benchmarks/mock_retailer.py` o una réplica de staging.
+
+    La araña declara `BASE_URL` y arma sus URLs con `site_url(path)`.
+    """
+
+    BASE_URL = ''
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.base_url = (getattr(self, 'base_url', None) or self.BASE_URL).rstrip('/')
+        if self.base_url != self.BASE_URL.rstrip('/'):
+            parts = urlsplit(self.base_url)
+            if parts.scheme not in ('http', 'https') or not parts.hostname:
+                raise ValueError(f"base_url inválida: '{self.base_url}' (ej. http://127.0.0.1:8765)")
+            self.allowed_domains = [*getattr(self, 'allowed_domains', []), parts.hostname]
+
+    def site_url(self, path: str) -> str:
+        """URL absoluta de `path` en el origen de la araña."""
+        return f"{self.base_url}/{path.lstrip('/')}"
@@ -4,25 +4,40 @@ import re
 import scrapy
 from itemloaders import ItemLoader
 from stylos.items import ProductItem, ImagenItem
+from stylos.pipelines import get_currency_by_country
+from stylos.spiders.mixins import BaseUrlMixin, ColorFanoutMixin, MenuCacheMixin, ShardingMixin
 
-class ZaraSpider(scrapy.Spider):
+class ZaraSpider(MenuCacheMixin, ColorFanoutMixin, ShardingMixin, BaseUrlMixin, scrapy.Spider):
     """
     Spider refactorizado que solo procesa datos estructurados del middleware.
     No tiene dependencias directas con Selenium ni lógica de extracción compleja.
     """
     name = "zara"
     allowed_domains = ["zara.com", "www.zara.com", "zara.net", "static.zara.net"]
+    BASE_URL = "https://www.zara.com"
     
     def __init__(self, *args, **kwargs):
         """
         Inicializa la araña con soporte para internacionalización.
         Permite especificar 'country' y 'lang' como argumentos.
         Ej: scrapy crawl zara -a country=us -a lang=en
+
+        El argumento 'mode' selecciona el tipo de extracción de producto:
+        'full' (por defecto) extrae todo, 'price' solo refresca los precios.
+        Ej: scrapy crawl zara -a mode=price
+
+        Los argumentos 'shard' y 'shards' reparten el rastreo entre varios
+        trabajos (ver `ShardingMixin`).
+        Ej: scrapy crawl zara -a shard=0 -a shards=4
+
+        El argumento 'base_url' cambia el origen del sitio (ver `BaseUrlMixin`).
+        Ej: scrapy crawl zara -a base_url=http://127.0.0.1:8765
         """
         super(ZaraSpider, self).__init__(*args, **kwargs)
         self.country = getattr(self, 'country', 'co')  # 'co' por defecto
         self.lang = getattr(self, 'lang', 'es')      # 'es' por defecto
-        self.start_urls = [f"https://www.zara.com/{self.country}/{self.lang}/"]
+        self.mode = getattr(self, 'mode', 'full')    # 'full' por defecto
+        self.start_urls = [self.site_url(f"{self.country}/{self.lang}/")]
     
     def start_requests(self):
         """
@@ -37,24 +52,17 @@ class ZaraSpider(scrapy.Spider):
             self.logger.info(f"Ejecutando en modo de prueba para una sola URL: {self.url}")
             yield scrapy.Request(
                 url=self.url,
-                callback=self.parse_product, # Llama directamente al parser de producto
+                callback=self._product_callback(), # Llama directamente al parser de producto
                 meta={
                     'selenium': True,
-                    'extraction_type': 'product'
+                    'extraction_type': self._product_extraction_type()
                 }
             )
         # --- MODO NORMAL ---
         else:
             self.logger.info("Iniciando rastreo completo desde el menú principal.")
-            for url in self.start_urls:
-                yield scrapy.Request(
-                    url=url,
-                    callback=self.parse_menu,
-                    meta={
-                        'selenium': True,
-                        'extraction_type': 'menu'
-                    }
-                )
+            # Usa el menú en caché si está vigente (-a refresh_menu=true lo fuerza)
+            yield from self.menu_requests()
         
     def parse_menu(self, response):
         """
@@ -71,21 +79,9 @@ class ZaraSpider(scrapy.Spider):
         unique_urls = set(extracted_urls)
         self.logger.info(f"URLs únicas después de eliminar duplicados: {len(unique_urls)}")
         
-        # Inicializar conjunto de URLs procesadas si no existe
-        if not hasattr(self, 'processed_urls'):
-            self.processed_urls = set()
-        
-        for url in unique_urls:
-            if url not in self.processed_urls:
-                self.processed_urls.add(url)
-                yield response.follow(
-                    url, 
-                    callback=self.parse_category,
-                    meta={
-                        'selenium': True,
-                        'extraction_type': 'category'  # Especifica scroll infinito
-                    }
-                )
+        # Actualizar la caché del menú y seguir las subcategorías nuevas
+        self.store_menu_urls(response.meta.get('menu_url', response.url), list(unique_urls))
+        yield from self.follow_category_urls(response.url, unique_urls)
             
     def parse_category(self, response):
         """
@@ -97,28 +93,26 @@ class ZaraSpider(scrapy.Spider):
         # Extraer URLs de productos usando selectores estándar
         products_xpath = "//div[contains(@class, 'zds-carousel-item')]//a[@href] | //li[contains(@class, 'products-category-grid-block')]//a[@href]"
         product_urls = response.xpath(products_xpath).css('::attr(href)').getall()
+        self.count_category_products(response.url, [href for href in product_urls if re.search(r'-p\d+\.html', href)])
 
         for href in set(product_urls):  # Eliminar duplicados
             if re.search(r'-p\d+\.html', href):
-                # Es una página de producto
+                # Es una página de producto (solo si corresponde a este shard)
+                if not self.owns_product(response.urljoin(href)):
+                    continue
                 yield response.follow(
                     href, 
-                    callback=self.parse_product,
+                    callback=self._product_callback(),
                     meta={
                         'selenium': True,
-                        'extraction_type': 'product'  # Especifica extracción de producto
-                    }
-                )
-            elif re.search(r'-l\d+\.html', href):
-                # Es otra página de categoría
-                yield response.follow(
-                    href, 
-                    callback=self.parse_category,
-                    meta={
-                        'selenium': True, 
-                        'extraction_type': 'category'
+                        'extraction_type': self._product_extraction_type()  # 'product', 'variants' o 'price'
                     }
                 )
+
+        # Otras páginas de categoría: pasan por el mismo filtro de shard y de
+        # URLs ya agendadas que las subcategorías del menú
+        nested_urls = {response.urljoin(href) for href in product_urls if re.search(r'-l\d+\.html', href)}
+        yield from self.follow_category_urls(response.url, sorted(nested_urls))
             
     def parse_product(self, response):
         """
@@ -131,16 +125,26 @@ class ZaraSpider(scrapy.Spider):
         product_data = response.meta.get('product_data', {})
         extracted_images = response.meta.get('extracted_images', {})
         
+        yield self._build_product_item(response, product_data, extracted_images)
+
+    def _build_product_item(self, response, product_data, extracted_images, url=None):
+        """
+        Construye el `ProductItem` a partir de los datos del middleware.
+
+        `response` se usa como fallback para los campos que falten; puede ser
+        `None` cuando el producto se arma con colores agregados y no hay página.
+        `url` permite fijar la URL del producto si difiere de la de `response`.
+        """
         # Crear ItemLoader para manejo automático de datos
         loader = ItemLoader(item=ProductItem(), selector=response)
         
         # Datos básicos del producto (del middleware o fallback al response)
-        loader.add_value('url', response.url)
+        loader.add_value('url', url or response.url)
         
         # Nombre: priorizar middleware, fallback a response
         if product_data.get('name'):
             loader.add_value('name', product_data['name'])
-        else:
+        elif response is not None:
             try:
                 loader.add_xpath('name', "//h1[contains(@class, 'product-detail-info__header-name')]/text()")
             except Exception as e:
@@ -153,7 +157,7 @@ class ZaraSpider(scrapy.Spider):
         # Descripción: priorizar middleware, fallback a response
         if product_data.get('description'):
             loader.add_value('description', product_data['description'])
-        else:
+        elif response is not None:
             try:
                 description_texts = response.css("div[class='expandable-text__inner-content'] p::text").getall()
                 if description_texts:
@@ -163,13 +167,14 @@ class ZaraSpider(scrapy.Spider):
         
         # Precios: extraer como lista simple, el pipeline se encarga del resto
         prices = product_data.get('prices', [])
-        if not prices:
+        if not prices and response is not None:
             # Fallback a extracción del response
             prices = response.css("div.product-detail-info__price-amount.price span.money-amount__main::text").getall()
             prices = [p.strip() for p in prices if p.strip()]
         
         # Enviar precios como lista simple al pipeline
         loader.add_value('raw_prices', prices)
+        loader.add_value('currency', self._currency(product_data))
         
         # Procesar imágenes extraídas por el middleware
         images_by_color = self._process_images(extracted_images, response, product_data)
@@ -183,8 +188,60 @@ class ZaraSpider(scrapy.Spider):
         loader.add_value('country', self.country)
         
         # Generar item final con todos los procesadores aplicados
-        yield loader.load_item()
+        return loader.load_item()
     
+    def parse_price(self, response):
+        """
+        Procesa los datos del modo de refresco rápido de precios.
+        Solo carga nombre y precios; las imágenes no se tocan.
+        """
+        self.logger.info(f"Refrescando precios del producto: {response.url}")
+
+        product_data = response.meta.get('product_data', {})
+
+        loader = ItemLoader(item=ProductItem(), selector=response)
+        loader.add_value('url', response.url)
+        loader.add_value('name', product_data.get('name'))
+
+        prices = product_data.get('prices', [])
+        if not prices:
+            prices = response.css("div.product-detail-info__price-amount.price span.money-amount__main::text").getall()
+            prices = [p.strip() for p in prices if p.strip()]
+        loader.add_value('raw_prices', prices)
+        loader.add_value('currency', self._currency(product_data))
+
+        loader.add_value('site', 'ZARA')
+        loader.add_value('datetime', datetime.now().isoformat())
+        loader.add_value('last_visited', datetime.now().isoformat())
+        loader.add_value('lang', self.lang)
+        loader.add_value('country', self.country)
+        loader.add_value('extraction_type', 'price')
+
+        yield loader.load_item()
+
+    def _currency(self, product_data):
+        """Moneda del extractor o, si no la trae, la del país del rastreo."""
+        return product_data.get('currency') or get_currency_by_country(self.country)
+
+    def _product_extraction_type(self):
+        """
+        Tipo de extracción para las páginas de producto según el modo:
+        'price' (solo precios), 'variants' (colores repartidos entre sesiones)
+        o 'product' (todos los colores en una sola sesión).
+        """
+        if self.mode == 'price':
+            return 'price'
+        if self.settings.getbool('COLOR_FANOUT_ENABLED'):
+            return 'variants'
+        return 'product'
+
+    def _product_callback(self):
+        """Callback para las páginas de producto según el tipo de extracción."""
+        return {
+            'price': self.parse_price,
+            'variants': self.parse_variants,
+        }.get(self._product_extraction_type(), self.parse_product)
+
     def _process_images(self, extracted_images, response, product_data):
         """
         Procesa imágenes extraídas por el middleware con fallback al response.
@@ -193,7 +250,9 @@ class ZaraSpider(scrapy.Spider):
         
         # Procesar imágenes del middleware si están disponibles
         if extracted_images:
-            for color_name, images in extracted_images.items():
+            # Dict por nombre de color o, con el reparto de colores, lista de pares
+            color_pairs = extracted_images.items() if isinstance(extracted_images, dict) else extracted_images
+            for color_name, images in color_pairs:
                 if images:  # Solo incluir colores que tienen imágenes
                     imagen_items = []
                     for img_data in images:
@@ -209,7 +268,7 @@ class ZaraSpider(scrapy.Spider):
                     })
         
         # Fallback: extraer imágenes del response si no hay datos del middleware
-        if not images_by_color:
+        if not images_by_color and response is not None:
             current_color = (
                 product_data.get('current_color') or
                 response.css(".product-color-extended-name.product-detail-color-selector__selected-color-name::text").get() or
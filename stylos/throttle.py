@@ -0,0 +1,216 @@
+"""
+Control de concurrencia por slots de navegador para peticiones renderizadas.
+
+AutoThrottle mide la latencia de descarga, pero en una petición de Selenium ese
+tiempo incluye las esperas y scrolls del extractor: se frenaría por nuestro
+propio trabajo y no por la presión del servidor. `SlotThrottle` separa ambos
+tiempos (ver `SeleniumMiddleware`) y decide con otras señales:
+
+- Retrocede (reduce a la mitad el límite de peticiones simultáneas) ante
+  señales del servidor: códigos HTTP de bloqueo, páginas de bloqueo/captcha,
+  navegaciones agotadas o latencia del servidor por encima del máximo.
+- Avanza (suma uno al límite) cuando todos los slots permitidos están ocupados
+  y no hubo retrocesos recientes, hasta el tamaño del pool de sesiones.
+
+Cada decisión se publica en las estadísticas con el prefijo `throttle/`.
+"""
+
+import time
+from typing import Iterable, Optional
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+
+from stylos.signals import page_rendered
+
+# Texto visible del cuerpo: el código de los scripts (reCAPTCHA, gestores de
+# bots) aparece también en páginas normales y no delata un bloqueo
+VISIBLE_TEXT_XPATH = '//body//text()[not(ancestor::script) and not(ancestor::style) and not(ancestor::noscript)]'
+
+INCREASE = 'increase'
+HOLD = 'hold'
+
+
+class SlotThrottle:
+    """
+    Decide el límite de peticiones renderizadas simultáneas (AIMD).
+
+    No depende de Scrapy: recibe observaciones y devuelve la decisión tomada,
+    lo que permite probarlo de forma aislada.
+    """
+
+    def __init__(self, initial: int, ceiling: int, minimum: int = 1, max_latency: float = 5.0,
+                 cooldown: float = 30.0, block_statuses: Iterable[int] = (403, 429, 503), smoothing: float = 0.2):
+        """
+        Args:
+            initial (int): Límite inicial.
+            ceiling (int): Límite máximo (normalmente el tamaño del pool).
+            minimum (int): Límite mínimo.
+            max_latency (float): Latencia del servidor (s) a partir de la cual se retrocede.
+            cooldown (float): Segundos sin avanzar después de un retroceso.
+            block_statuses: Códigos HTTP que indican bloqueo o sobrecarga.
+            smoothing (float): Peso de cada observación en la media móvil de latencias.
+        """
+        self.minimum = max(1, minimum)
+        self.ceiling = max(self.minimum, ceiling)
+        self.limit = min(max(initial, self.minimum), self.ceiling)
+        self.max_latency = max_latency
+        self.cooldown = cooldown
+        self.block_statuses = set(block_statuses)
+        self.smoothing = smoothing
+        self.server_latency: Optional[float] = None
+        self.extraction_time: Optional[float] = None
+        self._last_backoff = float('-inf')
+
+    def set_ceiling(self, ceiling: int) -> None:
+        """Actualiza el techo (ej. cuando el pool cambia de tamaño)."""
+        self.ceiling = max(self.minimum, ceiling)
+        self.limit = min(self.limit, self.ceiling)
+
+    def observe(self, in_flight: int, server_latency: Optional[float] = None, extraction_time: Optional[float] = None,
+                status: Optional[int] = None, blocked: bool = False, timeout: bool = False,
+                now: Optional[float] = None) -> str:
+        """
+        Registra el resultado de un render y ajusta el límite.
+
+        Returns:
+            str: 'backoff_<motivo>', 'increase' o 'hold'.
+        """
+        now = time.monotonic() if now is None else now
+        if server_latency is not None:
+            self.server_latency = self._smooth(self.server_latency, server_latency)
+        if extraction_time is not None:
+            self.extraction_time = self._smooth(self.extraction_time, extraction_time)
+
+        reason = self._backoff_reason(status, blocked, timeout, now)
+        if reason:
+            self.limit = max(self.minimum, self.limit // 2)
+            self._last_backoff = now
+            return f'backoff_{reason}'
+
+        if in_flight >= self.limit and self.limit < self.ceiling and now - self._last_backoff >= self.cooldown:
+            self.limit += 1
+            return INCREASE
+        return HOLD
+
+    def _backoff_reason(self, status, blocked, timeout, now) -> Optional[str]:
+        if blocked:
+            return 'blocked'
+        if status in self.block_statuses:
+            return 'status'
+        if timeout:
+            return 'timeout'
+        # La media de latencias tarda en bajar: se retrocede por ella una vez por cooldown
+        latency_high = self.server_latency is not None and self.server_latency > self.max_latency
+        if latency_high and now - self._last_backoff >= self.cooldown:
+            return 'latency'
+        return None
+
+    def _smooth(self, average, value):
+        return value if average is None else average + self.smoothing * (value - average)
+
+
+class SlotThrottleExtension:
+    """
+    Aplica las decisiones de `SlotThrottle` a la concurrencia total del descargador.
+
+    Reemplaza a AutoThrottle para las peticiones de Selenium (`AUTOTHROTTLE_ENABLED`
+    debe estar desactivado). Escucha la señal `page_rendered` del middleware.
+
+    Una respuesta es una página de bloqueo si su título contiene alguno de los
+    `SLOT_THROTTLE_BLOCK_MARKERS` o, cuando el estado no es 200 o el texto
+    visible es corto (hasta `SLOT_THROTTLE_BLOCK_MAX_TEXT` caracteres), si ese
+    texto los contiene. Las páginas de bloqueo son cortas; una página de
+    producto que carga reCAPTCHA no lo es.
+    """
+
+    def __init__(self, crawler):
+        settings = crawler.settings
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.block_markers = [marker.lower() for marker in settings.getlist('SLOT_THROTTLE_BLOCK_MARKERS')]
+        self.block_max_text = settings.getint('SLOT_THROTTLE_BLOCK_MAX_TEXT', 2000)
+        pool_size = settings.getint('SELENIUM_POOL_SIZE', 1)
+        self.throttle = SlotThrottle(
+            initial=settings.getint('SLOT_THROTTLE_START_CONCURRENCY', pool_size),
+            ceiling=pool_size,
+            minimum=settings.getint('SLOT_THROTTLE_MIN_CONCURRENCY', 1),
+            max_latency=settings.getfloat('SLOT_THROTTLE_MAX_LATENCY', 5.0),
+            cooldown=settings.getfloat('SLOT_THROTTLE_COOLDOWN', 30.0),
+            block_statuses=[int(status) for status in settings.getlist('SLOT_THROTTLE_BLOCK_STATUSES', [403, 429, 503])],
+        )
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool('SLOT_THROTTLE_ENABLED'):
+            raise NotConfigured("SLOT_THROTTLE_ENABLED está desactivado")
+        ext = cls(crawler)
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.page_rendered, signal=page_rendered)
+        crawler.signals.connect(ext.response_received, signal=signals.response_received)
+        return ext
+
+    def spider_opened(self, spider):
+        self._apply(spider, HOLD)
+
+    def page_rendered(self, request, spider, timing, error):
+        """Observa los tiempos del render; las respuestas exitosas se evalúan en `response_received`."""
+        if error is None:
+            return
+        decision = self.throttle.observe(
+            in_flight=self._in_flight(),
+            server_latency=timing.get('server_latency'),
+            timeout=error == 'timeout'
+        )
+        self._apply(spider, decision)
+
+    def response_received(self, response, request, spider):
+        timing = response.meta.get('render_timing')
+        if timing is None:
+            return  # No es una petición renderizada
+        decision = self.throttle.observe(
+            in_flight=self._in_flight(),
+            server_latency=timing.get('server_latency'),
+            extraction_time=timing.get('extraction'),
+            status=timing.get('status'),
+            blocked=self._is_block_page(response, timing.get('status'))
+        )
+        self._apply(spider, decision)
+
+    def _is_block_page(self, response, status: Optional[int] = None) -> bool:
+        if not self.block_markers:
+            return False
+        title = (response.css('title::text').get() or '').lower()
+        if any(marker in title for marker in self.block_markers):
+            return True
+        text = ' '.join(' '.join(response.xpath(VISIBLE_TEXT_XPATH).getall()).split()).lower()
+        if status in (None, 200) and len(text) > self.block_max_text:
+            return False
+        return any(marker in text for marker in self.block_markers)
+
+    def _in_flight(self) -> int:
+        engine = self.crawler.engine
+        return len(engine.downloader.active) if engine is not None else 0
+
+    def _apply(self, spider, decision):
+        # El pool puede haber cambiado de tamaño por la capacidad del Grid
+        pool_size = self.stats.get_value('grid/pool_size')
+        if pool_size:
+            self.throttle.set_ceiling(pool_size)
+
+        if decision != HOLD:
+            self.stats.inc_value(f'throttle/decisions/{decision}')
+            if decision.startswith('backoff'):
+                spider.logger.warning(f"🐢 Throttle: {decision}, límite de peticiones simultáneas → {self.throttle.limit}")
+            else:
+                spider.logger.debug(f"Throttle: {decision}, límite → {self.throttle.limit}")
+
+        self.stats.set_value('throttle/limit', self.throttle.limit)
+        if self.throttle.server_latency is not None:
+            self.stats.set_value('throttle/server_latency_ms', round(self.throttle.server_latency * 1000))
+        if self.throttle.extraction_time is not None:
+            self.stats.set_value('throttle/extraction_time_ms', round(self.throttle.extraction_time * 1000))
+
+        engine = self.crawler.engine
+        if engine is not None and engine.downloader is not None:
+            engine.downloader.total_concurrency = self.throttle.limit
@@ -0,0 +1,205 @@
+"""
+Integración con Sentry de bajo costo.
+
+Con miles de renders por corrida, lo que cuesta CPU y tráfico no es reportar
+errores sino todo lo demás: una transacción por petición, un breadcrumb por
+petición, por cada línea de log y por cada comando HTTP de WebDriver, y el
+`request.meta` completo en cada excepción. Este módulo concentra la
+configuración para que el costo sea acotado:
+
+- Trazas muestreadas (`SENTRY_TRACES_SAMPLE_RATE`) y solo de las rutas que
+  importan: `span()` abre transacciones y spans explícitos para la navegación,
+  la extracción (por tipo) y la escritura en MongoDB. No se activan las
+  integraciones automáticas (pymongo, http.client) que instrumentan cada llamada
+  ni la que adjunta los paquetes instalados a cada evento.
+- Breadcrumbs de peticiones muestreados (`SENTRY_BREADCRUMB_SAMPLE_RATE`) y de
+  logs solo desde `SENTRY_LOG_BREADCRUMB_LEVEL`.
+- `request.meta` y cabeceras depurados (`scrub_meta`, `scrub_headers`) y eventos
+  recortados a `SENTRY_MAX_EVENT_BYTES` antes de enviarse (`cap_event`).
+
+`sentry_sdk` se importa solo en `configure()`; sin DSN, `span()` no hace nada.
+"""
+
+import json
+import logging
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+# Claves de `meta` y cabeceras que nunca se envían
+SENSITIVE_KEYS = ('cookie', 'authorization', 'token', 'password', 'secret', 'proxy')
+FILTERED = '[Filtered]'
+
+# True cuando `configure()` inicializó Sentry en este proceso
+_active = False
+_traces_sample_rate = 0.0
+# True dentro de una transacción descartada por el muestreo: sus spans no se crean
+_unsampled = ContextVar('stylos_tracing_unsampled', default=False)
+
+
+def is_active() -> bool:
+    """Indica si Sentry está inicializado (y, por lo tanto, si `span()` registra algo)."""
+    return _active
+
+
+def configure(dsn: str, environment: Optional[str] = None, release: Optional[str] = None,
+              traces_sample_rate: float = 0.0, max_breadcrumbs: int = 30, log_breadcrumb_level: str = 'WARNING',
+              max_value_length: int = 256, max_event_bytes: int = 64 * 1024, transport=None) -> None:
+    """
+    Inicializa `sentry_sdk` con muestreo y límites de tamaño.
+
+    Args:
+        dsn (str): DSN del proyecto de Sentry.
+        traces_sample_rate (float): Fracción de transacciones (renders, items) que se envían.
+        max_breadcrumbs (int): Breadcrumbs que se conservan por evento.
+        log_breadcrumb_level (str): Nivel mínimo de log que se guarda como breadcrumb.
+        max_value_length (int): Largo máximo de cada texto de un evento.
+        max_event_bytes (int): Tamaño máximo (JSON) de un evento; ver `cap_event`.
+        transport: Transporte alternativo de `sentry_sdk` (benchmarks y pruebas).
+    """
+    global _active, _traces_sample_rate
+    import sentry_sdk
+    from sentry_sdk.integrations.logging import LoggingIntegration
+    from sentry_sdk.integrations.modules import ModulesIntegration
+    from sentry_sdk.integrations.stdlib import StdlibIntegration
+
+    sentry_sdk.init(
+        dsn=dsn,
+        environment=environment,
+        release=release,
+        traces_sample_rate=traces_sample_rate,
+        max_breadcrumbs=max_breadcrumbs,
+        max_value_length=max_value_length,
+        # Sin integraciones que instrumentan cada consulta a MongoDB o comando de WebDriver,
+        # ni la lista de paquetes instalados en cada evento
+        auto_enabling_integrations=False,
+        disabled_integrations=[StdlibIntegration(), ModulesIntegration()],
+        integrations=[LoggingIntegration(level=logging.getLevelName(log_breadcrumb_level), event_level=logging.ERROR)],
+        before_send=lambda event, hint: cap_event(event, max_event_bytes),
+        transport=transport,
+    )
+    _active = True
+    _traces_sample_rate = traces_sample_rate
+
+
+def shutdown(timeout: float = 2.0) -> None:
+    """Envía los eventos pendientes y desactiva Sentry en este proceso."""
+    global _active
+    if not _active:
+        return
+    import sentry_sdk
+    sentry_sdk.get_client().close(timeout=timeout)
+    _active = False
+
+
+@contextmanager
+def span(op: str, name: Optional[str] = None, **data):
+    """
+    Mide un tramo de una ruta crítica como span de Sentry.
+
+    Dentro de una transacción abre un span hijo; fuera de ella abre una
+    transacción nueva con probabilidad `SENTRY_TRACES_SAMPLE_RATE`. El
+    muestreo se decide aquí y no en `sentry_sdk`, para que una transacción
+    descartada (y sus spans) no cree ningún objeto. Sin Sentry inicializado
+    no hace nada.
+
+    Args:
+        op (str): Operación ('browser.render', 'browser.navigation', 'db.mongodb', ...).
+        name (str): Descripción del tramo (URL, tipo de extracción, colección).
+        **data: Datos adicionales del span.
+    """
+    if not _active or _unsampled.get():
+        yield None
+        return
+    import sentry_sdk
+    if sentry_sdk.get_current_span() is None:
+        if random.random() >= _traces_sample_rate:
+            token = _unsampled.set(True)
+            try:
+                yield None
+            finally:
+                _unsampled.reset(token)
+            return
+        context = sentry_sdk.start_transaction(op=op, name=name or op, sampled=True)
+    else:
+        context = sentry_sdk.start_span(op=op, name=name)
+    with context as current:
+        for key, value in data.items():
+            current.set_data(key, value)
+        yield current
+
+
+def scrub_value(value: Any, max_length: int = 256) -> Any:
+    """Reduce un valor a algo pequeño y serializable: escalares recortados, contenedores resumidos."""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, bytes):
+        value = value.decode('utf-8', errors='replace')
+    if isinstance(value, str):
+        return value if len(value) <= max_length else value[:max_length] + '…'
+    if isinstance(value, (list, tuple, set, dict)):
+        return f"<{type(value).__name__} de {len(value)} elementos>"
+    return f"<{type(value).__name__}>"
+
+
+def _is_sensitive(key: str) -> bool:
+    key = key.lower()
+    return any(word in key for word in SENSITIVE_KEYS)
+
+
+def scrub_meta(meta: Dict[str, Any], max_keys: int = 30, max_length: int = 256) -> Dict[str, Any]:
+    """
+    Versión segura de `request.meta` para un evento de Sentry.
+
+    Omite las claves internas (con prefijo '_'), oculta las sensibles, resume
+    los contenedores y conserva como máximo `max_keys` claves.
+    """
+    public = [key for key in meta if not key.startswith('_')]
+    scrubbed = {key: FILTERED if _is_sensitive(key) else scrub_value(meta[key], max_length) for key in public[:max_keys]}
+    if len(public) > max_keys:
+        scrubbed['…'] = f"{len(public) - max_keys} claves omitidas"
+    return scrubbed
+
+
+def scrub_headers(headers, max_length: int = 256) -> Dict[str, str]:
+    """Cabeceras de Scrapy como texto, con las sensibles ocultas."""
+    scrubbed = {}
+    for key, values in headers.items():
+        name = key.decode('latin-1') if isinstance(key, bytes) else str(key)
+        value = values[-1] if isinstance(values, (list, tuple)) and values else values
+        scrubbed[name] = FILTERED if _is_sensitive(name) else scrub_value(value, max_length)
+    return scrubbed
+
+
+def event_size(event: Dict[str, Any]) -> int:
+    """Tamaño aproximado (bytes) de un evento serializado."""
+    return len(json.dumps(event, default=str).encode('utf-8'))
+
+
+def cap_event(event: Dict[str, Any], max_bytes: int) -> Dict[str, Any]:
+    """
+    Recorta un evento que supera `max_bytes`.
+
+    Descarta primero los breadcrumbs más antiguos, luego el `meta` de la
+    petición y por último los demás contextos; marca el evento con
+    `truncated=true` para que se note en Sentry.
+    """
+    if event_size(event) <= max_bytes:
+        return event
+    event.setdefault('tags', {})['truncated'] = 'true'
+
+    breadcrumbs = event.get('breadcrumbs')
+    if isinstance(breadcrumbs, dict):
+        values = breadcrumbs.get('values') or []
+        while values and event_size(event) > max_bytes:
+            values.pop(0)
+    contexts = event.get('contexts') or {}
+    request_context = contexts.get('scrapy_request')
+    if isinstance(request_context, dict) and event_size(event) > max_bytes:
+        request_context.pop('meta', None)
+    for name in [name for name in contexts if name not in ('trace', 'scrapy_request')]:
+        if event_size(event) <= max_bytes:
+            break
+        contexts.pop(name)
+    return event
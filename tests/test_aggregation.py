@@ -0,0 +1,157 @@
+"""
+Suite de pruebas unitarias para 'stylos.aggregation'.
+
+Verifica que `ColorAggregator` emite cada producto una sola vez: cuando han
+llegado (o fallado) todos sus colores, o cuando vence el tiempo de espera, y
+cómo `ColorFanoutMixin` arma los productos agregados.
+"""
+
+import pytest
+from unittest.mock import MagicMock
+from scrapy import Request
+from scrapy.http import HtmlResponse
+from scrapy.settings import Settings
+
+from stylos.aggregation import ColorAggregator, color_images
+from stylos.spiders.zara import ZaraSpider
+
+# --- Fixtures de Pytest ---
+
+@pytest.fixture
+def aggregator():
+    """Agregador con un producto de dos colores pendiente."""
+    aggregator = ColorAggregator(timeout=60)
+    aggregator.start('https://www.zara.com/co/es/camisa-p1.html', {'name': 'CAMISA'}, ['0', '1'])
+    return aggregator
+
+@pytest.fixture
+def spider():
+    """Araña de Zara con el reparto de colores y un plazo de espera de 60 s."""
+    crawler = MagicMock()
+    crawler.settings = Settings({'MENU_CACHE_ENABLED': False, 'COLOR_FANOUT_TIMEOUT': 60})
+    return ZaraSpider.from_crawler(crawler)
+
+def color_response(product_url, color_key, images, body=''):
+    """Respuesta de una petición por color con las imágenes de ese color."""
+    request = Request(product_url, meta={'product_url': product_url, 'color_key': color_key})
+    response = HtmlResponse(product_url, body=f'<html><body>{body}</body></html>'.encode(), request=request)
+    response.meta['extracted_images'] = images
+    return response
+
+
+class TestColorAggregator:
+    """Pruebas para la agregación de imágenes por color."""
+
+    def test_entry_is_returned_when_all_colors_arrive(self, aggregator):
+        """El producto se completa con el último color y sale de los pendientes."""
+        # Arrange
+        url = 'https://www.zara.com/co/es/camisa-p1.html'
+
+        # Act
+        first = aggregator.add(url, '0', {'AZUL': [{'src': 'a.jpg'}]})
+        second = aggregator.add(url, '1', {'ROJO': [{'src': 'b.jpg'}]})
+
+        # Assert
+        assert first is None
+        assert second['images'] == {'0': [{'src': 'a.jpg'}], '1': [{'src': 'b.jpg'}]}
+        assert second['colors'] == {'0': 'AZUL', '1': 'ROJO'}
+        assert second['product_data'] == {'name': 'CAMISA'}
+        assert aggregator.pending == {}
+
+    def test_failed_color_still_completes_the_product(self, aggregator):
+        """Un color fallido cuenta como terminado; solo se conservan las imágenes recibidas."""
+        # Arrange
+        url = 'https://www.zara.com/co/es/camisa-p1.html'
+        aggregator.add(url, '0', {'AZUL': [{'src': 'a.jpg'}]})
+
+        # Act
+        entry = aggregator.fail(url, '1')
+
+        # Assert
+        assert entry['done'] == ['0']
+        assert entry['failed'] == ['1']
+        assert entry['colors'] == {'0': 'AZUL'}
+
+    def test_colors_with_the_same_name_do_not_overwrite_each_other(self, aggregator):
+        """Dos variantes con el mismo nombre conservan sus imágenes, en el orden de las variantes."""
+        # Arrange
+        url = 'https://www.zara.com/co/es/camisa-p1.html'
+
+        # Act
+        aggregator.add(url, '1', {'NEGRO': [{'src': 'lino.jpg'}]})
+        entry = aggregator.add(url, '0', {'NEGRO': [{'src': 'algodon.jpg'}]})
+
+        # Assert
+        assert color_images(entry) == [('NEGRO', [{'src': 'algodon.jpg'}]), ('NEGRO', [{'src': 'lino.jpg'}])]
+
+    def test_expired_entries_are_popped(self, aggregator):
+        """Los productos que superan el tiempo de espera se retiran con `pop_expired`."""
+        # Arrange
+        started_at = aggregator.pending['https://www.zara.com/co/es/camisa-p1.html']['started_at']
+
+        # Act
+        not_yet = aggregator.pop_expired(now=started_at + 30)
+        expired = aggregator.pop_expired(now=started_at + 61)
+
+        # Assert
+        assert not_yet == []
+        assert len(expired) == 1
+        assert aggregator.pending == {}
+
+
+class TestColorFanout:
+    """Pruebas de la emisión de productos repartidos por color en la araña."""
+
+    def test_expired_products_do_not_borrow_fields_from_another_page(self, spider):
+        """Un producto vencido que sale con el color de otro no toma su nombre del HTML ajeno."""
+        # Arrange
+        stale, fresh = 'https://www.zara.com/co/es/falda-p1.html', 'https://www.zara.com/co/es/camisa-p2.html'
+        spider.color_aggregator.start(stale, {}, ['0', '1'])
+        spider.color_aggregator.add(stale, '0', {'NEGRO': [{'src': 'falda.jpg'}]})
+        spider.color_aggregator.pending[stale]['started_at'] -= 61
+        spider.color_aggregator.start(fresh, {}, ['0'])
+        response = color_response(fresh, '0', {'AZUL': [{'src': 'camisa.jpg'}]},
+                                  body='<h1 class="product-detail-info__header-name">CAMISA</h1>')
+
+        # Act
+        items = {item['url']: item for item in spider.parse_color(response)}
+
+        # Assert
+        assert items[fresh]['name'] == 'CAMISA'
+        assert 'name' not in items[stale]
+
+    def test_stalled_product_is_emitted_by_the_periodic_check(self, spider):
+        """Sin más respuestas de color, el chequeo periódico emite el producto vencido una sola vez."""
+        # Arrange
+        url = 'https://www.zara.com/co/es/falda-p1.html'
+        spider.color_aggregator.start(url, {'name': 'FALDA'}, ['0', '1'])
+        spider.color_aggregator.add(url, '0', {'NEGRO': [{'src': 'falda.jpg'}]})
+        spider.color_aggregator.pending[url]['started_at'] -= 61
+
+        # Act
+        spider._check_color_timeouts()
+        spider._check_color_timeouts()  # La petición anterior aún no se procesa
+        flush = spider.crawler.engine.crawl.call_args.args[0]
+        items = list(flush.callback(HtmlResponse(flush.url, body=b'', request=flush)))
+
+        # Assert
+        assert spider.crawler.engine.crawl.call_count == 1
+        assert flush.meta['frontier_local'] is True
+        assert [item['name'] for item in items] == ['FALDA']
+        assert spider.color_aggregator.pending == {}
+
+    @pytest.mark.parametrize('enabled, running', [(False, False), (True, True)])
+    def test_timeout_check_runs_only_with_color_fanout(self, monkeypatch, enabled, running):
+        """El chequeo periódico de plazos solo se inicia si el reparto de colores está activo."""
+        # Arrange
+        loop = MagicMock()
+        monkeypatch.setattr('stylos.spiders.mixins.task.LoopingCall', lambda *args: loop)
+        crawler = MagicMock()
+        crawler.settings = Settings({'MENU_CACHE_ENABLED': False, 'COLOR_FANOUT_ENABLED': enabled})
+        spider = ZaraSpider.from_crawler(crawler)
+
+        # Act
+        spider._start_color_timeouts(spider)
+
+        # Assert
+        assert loop.start.called is running
@@ -0,0 +1,135 @@
+"""
+Suite de pruebas unitarias para el broker de sesiones calentadas.
+
+Verifica el inventario de `stylos.broker.SessionBroker` (préstamos calientes y
+en frío, devolución y vencimiento), la API de `app/session_broker.py` y el uso
+del broker desde `SeleniumMiddleware`. Los navegadores se simulan con `MagicMock`.
+"""
+
+import pytest
+from unittest.mock import MagicMock, PropertyMock
+
+from fastapi.testclient import TestClient
+
+import app.session_broker as session_broker
+from stylos.broker import SessionBroker
+from stylos.middlewares import SeleniumMiddleware
+
+# --- Fixtures de Pytest ---
+
+@pytest.fixture
+def factory():
+    """Fábrica de sesiones calentadas que crea un `MagicMock` por llamada."""
+    counter = iter(range(1, 100))
+
+    def create(site, country, lang):
+        return MagicMock(session_id=f"s{next(counter)}")
+    return MagicMock(side_effect=create)
+
+@pytest.fixture
+def broker(factory):
+    """Broker con una sesión calentada por idioma."""
+    return SessionBroker(factory=factory, warm_per_locale=1, lease_ttl=60)
+
+
+class TestSessionBroker:
+    """Pruebas del inventario de sesiones del broker."""
+
+    def test_warm_lease_then_cold_lease(self, broker, factory):
+        """La primera sesión sale del inventario; sin libres se crea una en el momento."""
+        # Arrange
+        broker.add_locale('zara', 'co', 'es')
+        broker.refill()
+
+        # Act
+        first = broker.lease('zara', 'co', 'es')
+        second = broker.lease('zara', 'co', 'es')
+
+        # Assert
+        assert first['warm'] is True
+        assert second['warm'] is False
+        assert factory.call_count == 2
+        assert broker.status()['locales']['zara/co/es'] == {'idle': 0, 'leased': 2}
+
+    def test_released_session_is_reused_only_if_healthy(self, broker):
+        """Una sesión sana vuelve al inventario; una muerta o no reutilizable se cierra."""
+        # Arrange
+        healthy = broker.lease('zara', 'co', 'es')
+        worn = broker.lease('zara', 'co', 'es')
+
+        # Act
+        broker.release(healthy['lease_id'])
+        broker.release(worn['lease_id'], reusable=False)
+        reused = broker.lease('zara', 'co', 'es')
+
+        # Assert
+        assert reused['warm'] is True
+        assert reused['session_id'] == healthy['session_id']
+        assert broker.stats['retired'] == 1
+        assert broker.release(worn['lease_id']) is False
+
+    def test_keepalive_reclaims_expired_leases_and_dead_sessions(self, broker, factory):
+        """Los préstamos vencidos y las sesiones libres que no responden se cierran."""
+        # Arrange
+        broker.add_locale('zara', 'co', 'es')
+        broker.refill()
+        broker.lease('zara', 'co', 'es')
+        broker.refill()
+        dead = broker._idle[('zara', 'co', 'es')][0]
+        type(dead.driver).current_url = PropertyMock(side_effect=ConnectionError())
+
+        # Act
+        broker.keepalive(now=broker.lease_ttl * 10 ** 9)
+
+        # Assert
+        status = broker.status()
+        assert status['locales']['zara/co/es'] == {'idle': 0, 'leased': 0}
+        assert status['stats']['expired'] == 1
+        assert status['stats']['retired'] == 2
+
+
+class TestBrokerApi:
+    """Pruebas de la API HTTP del broker."""
+
+    def test_lease_and_release_endpoints(self, broker, monkeypatch):
+        """Un préstamo se pide con POST y se devuelve con DELETE."""
+        # Arrange
+        monkeypatch.setattr(session_broker, 'broker', broker)
+        client = TestClient(session_broker.app)
+
+        # Act
+        leased = client.post('/leases', json={'site': 'zara', 'country': 'co', 'lang': 'es'})
+        released = client.delete(f"/leases/{leased.json()['lease_id']}")
+        missing = client.delete(f"/leases/{leased.json()['lease_id']}")
+
+        # Assert
+        assert leased.status_code == 200
+        assert released.json() == {'status': 'released'}
+        assert missing.status_code == 404
+        assert client.get('/').json()['locales']['zara/co/es']['idle'] == 1
+
+
+class TestMiddlewareWithBroker:
+    """Pruebas del uso del broker desde `SeleniumMiddleware`."""
+
+    def test_leased_driver_is_returned_to_the_broker(self, monkeypatch):
+        """Una sesión prestada se adjunta al Grid y se devuelve al broker en vez de cerrarse."""
+        # Arrange
+        attached = MagicMock()
+        monkeypatch.setattr('stylos.middlewares.attach_remote_session', lambda *args: attached)
+        middleware = SeleniumMiddleware('remote', 'http://selenium-hub:4444/wd/hub', crawler=MagicMock(),
+                                        broker_url='http://session-broker:8100')
+        middleware.broker = MagicMock()
+        middleware.broker.lease.return_value = {'lease_id': 'l1', 'session_id': 's1', 'warm': True}
+        spider = MagicMock(country='co', lang='es')
+        spider.name = 'zara'
+
+        # Act
+        driver = middleware._create_driver(spider)
+        middleware._close_driver(driver, reusable=False)
+
+        # Assert
+        assert driver is attached
+        middleware.broker.release.assert_called_once_with('l1', reusable=False)
+        attached.quit.assert_not_called()
+        middleware.crawler.stats.inc_value.assert_any_call('broker/warm_leases')
@@ -0,0 +1,283 @@
+"""
+Suite de pruebas unitarias para las cachés locales de 'stylos.cache'.
+
+Las cachés usan un archivo SQLite real dentro del directorio temporal que
+proporciona pytest (`tmp_path`), por lo que las pruebas no dejan residuos.
+El paso del tiempo se simula con `monkeypatch` sobre `time.time`. La caché de
+páginas se prueba grabando un render con un WebDriver falso y reproduciéndolo
+sin navegador.
+"""
+
+import sqlite3
+
+import pytest
+from unittest.mock import MagicMock
+
+from scrapy import Request
+from scrapy.exceptions import IgnoreRequest
+from scrapy.settings import Settings
+
+from stylos.cache import SqliteCache, ImageSetCache, MenuCache, RenderedPageCache
+from stylos.middlewares import SeleniumMiddleware
+from stylos.sessions import BrowserSession
+from stylos.spiders.zara import ZaraSpider
+
+# --- Fixtures de Pytest ---
+
+@pytest.fixture
+def cache_path(tmp_path):
+    """Ruta de un archivo SQLite aislado para cada prueba."""
+    return str(tmp_path / 'cache' / 'test.sqlite3')
+
+@pytest.fixture
+def sample_images():
+    """Lista de imágenes tal como la produce un extractor."""
+    return [
+        {'src': 'https://static.zara.net/photos/a.jpg', 'alt': 'AZUL 1', 'img_type': 'product_image'},
+        {'src': 'https://static.zara.net/photos/b.jpg', 'alt': 'AZUL 2', 'img_type': 'product_image'},
+    ]
+
+
+class TestSqliteCache:
+    """Pruebas para la caché clave→valor genérica."""
+
+    def test_roundtrip_and_persistence(self, cache_path):
+        """Un valor guardado se recupera, incluso desde otra instancia del mismo archivo."""
+        # Arrange
+        cache = SqliteCache(cache_path, table='entries', ttl=60)
+
+        # Act
+        cache.set('clave', {'urls': ['a', 'b']})
+        cache.close()
+        reopened = SqliteCache(cache_path, table='entries', ttl=60)
+
+        # Assert
+        assert reopened.get('clave') == {'urls': ['a', 'b']}
+        assert reopened.get('otra') is None
+        assert reopened.stats['hits'] == 1
+        assert reopened.stats['misses'] == 1
+        reopened.close()
+
+    def test_expired_entries_are_ignored(self, cache_path, monkeypatch):
+        """Una entrada más vieja que el TTL cuenta como expirada y no se devuelve."""
+        # Arrange
+        cache = SqliteCache(cache_path, table='entries', ttl=60)
+        monkeypatch.setattr('stylos.cache.time.time', lambda: 1000.0)
+        cache.set('clave', 'valor')
+
+        # Act
+        monkeypatch.setattr('stylos.cache.time.time', lambda: 1061.0)
+        value = cache.get('clave')
+
+        # Assert
+        assert value is None
+        assert cache.stats['expired'] == 1
+        cache.close()
+
+
+class TestImageSetCache:
+    """Pruebas para la caché de imágenes por variante de color."""
+
+    def test_hit_when_fingerprint_matches(self, cache_path, sample_images):
+        """Con la misma huella se reutilizan las imágenes y se publica el acierto."""
+        # Arrange
+        stats = MagicMock()
+        cache = ImageSetCache(cache_path, ttl=3600, stats=stats)
+        cache.store('www.zara.com/co/es/camisa-p123.html', 'AZUL', '2|a.jpg', sample_images)
+
+        # Act
+        images = cache.lookup('www.zara.com/co/es/camisa-p123.html', 'AZUL', '2|a.jpg')
+
+        # Assert
+        assert images == sample_images
+        assert cache.stats['hits'] == 1
+        stats.inc_value.assert_any_call('image_cache/hits')
+        cache.close()
+
+    def test_miss_when_fingerprint_changes(self, cache_path, sample_images):
+        """Si la galería cambió (otra huella), la búsqueda falla y se debe recolectar de nuevo."""
+        # Arrange
+        cache = ImageSetCache(cache_path, ttl=3600)
+        cache.store('www.zara.com/co/es/camisa-p123.html', 'AZUL', '2|a.jpg', sample_images)
+
+        # Act
+        images = cache.lookup('www.zara.com/co/es/camisa-p123.html', 'AZUL', '3|c.jpg')
+
+        # Assert
+        assert images is None
+        assert cache.stats['hits'] == 0
+        assert cache.stats['misses'] == 1
+        assert cache.stats['fingerprint_mismatch'] == 1
+        cache.close()
+
+    def test_without_fingerprint_nothing_is_cached(self, cache_path, sample_images):
+        """Sin huella no se guarda ni se reutiliza nada."""
+        # Arrange
+        cache = ImageSetCache(cache_path, ttl=3600)
+
+        # Act
+        cache.store('producto', 'AZUL', None, sample_images)
+
+        # Assert
+        assert cache.lookup('producto', 'AZUL', None) is None
+        assert cache.stats['stores'] == 0
+        cache.close()
+
+
+class TestMenuCache:
+    """Pruebas para la caché del menú y su uso desde la araña."""
+
+    def test_lookup_is_scoped_by_site_country_and_lang(self, cache_path):
+        """El menú de un país/idioma no se reutiliza para otro."""
+        # Arrange
+        cache = MenuCache(cache_path, ttl=3600)
+        cache.store('zara', 'co', 'es', 'https://www.zara.com/co/es/', ['/co/es/b-l1.html', '/co/es/a-l2.html'])
+
+        # Act
+        same = cache.lookup('zara', 'co', 'es', 'https://www.zara.com/co/es/')
+        other = cache.lookup('zara', 'us', 'en', 'https://www.zara.com/co/es/')
+
+        # Assert
+        assert same == ['/co/es/a-l2.html', '/co/es/b-l1.html']
+        assert other is None
+        cache.close()
+
+    def test_spider_skips_menu_and_detects_drift(self, cache_path):
+        """Con caché vigente la araña va directo a las categorías y valida el menú en segundo plano."""
+        # Arrange
+        crawler = MagicMock()
+        crawler.settings = Settings({
+            'MENU_CACHE_ENABLED': True,
+            'MENU_CACHE_PATH': cache_path,
+            'MENU_CACHE_TTL': 3600,
+            'MENU_CACHE_VALIDATE': True,
+        })
+        spider = ZaraSpider.from_crawler(crawler)
+        spider.menu_cache.store('zara', 'co', 'es', spider.start_urls[0], ['/co/es/a-l1.html'])
+
+        # Act
+        requests = list(spider.menu_requests())
+        spider.store_menu_urls(spider.start_urls[0], ['/co/es/a-l1.html', '/co/es/b-l2.html'])
+        followed = list(spider.follow_category_urls(spider.start_urls[0], ['/co/es/a-l1.html', '/co/es/b-l2.html']))
+
+        # Assert
+        assert [r.meta['extraction_type'] for r in requests] == ['category', 'menu']
+        assert requests[1].priority < 0
+        assert [r.url for r in followed] == ['https://www.zara.com/co/es/b-l2.html']
+        crawler.stats.inc_value.assert_any_call('menu_cache/drift_added', 1)
+        assert spider.menu_cache.lookup('zara', 'co', 'es', spider.start_urls[0]) == ['/co/es/a-l1.html', '/co/es/b-l2.html']
+        spider.menu_cache.close()
+
+
+class TestRenderedPageCache:
+    """Pruebas para la caché de renders de Selenium (grabar y reproducir)."""
+
+    def test_renders_are_stored_compressed_per_extraction_type(self, cache_path):
+        # Arrange
+        cache = RenderedPageCache(cache_path, ttl=0)
+        body = '<html>' + '<div class="product">CAMISA</div>' * 500 + '</html>'
+
+        # Act
+        cache.store('abc', 'product', 'https://www.zara.com/co/es/camisa-p1.html', body, {'name': 'CAMISA'})
+        stored_size = len(sqlite3.connect(cache_path).execute("SELECT value FROM rendered_pages").fetchone()[0])
+
+        # Assert
+        assert cache.lookup('abc', 'product') == {
+            'url': 'https://www.zara.com/co/es/camisa-p1.html', 'body': body, 'meta': {'name': 'CAMISA'}
+        }
+        assert cache.lookup('abc', 'price') is None
+        assert stored_size < len(body) / 10
+        cache.close()
+
+    def test_expired_renders_are_purged(self, cache_path, monkeypatch):
+        # Arrange
+        cache = RenderedPageCache(cache_path, ttl=60)
+        monkeypatch.setattr('stylos.cache.time.time', lambda: 1000.0)
+        cache.store('old', 'product', 'https://a.b/1', '<html></html>', {})
+        monkeypatch.setattr('stylos.cache.time.time', lambda: 1100.0)
+        cache.store('new', 'product', 'https://a.b/2', '<html></html>', {})
+
+        # Act
+        purged = cache.purge_expired()
+
+        # Assert
+        assert purged == 1
+        assert cache.lookup('new', 'product') is not None
+        cache.close()
+
+    def test_unserializable_extracted_data_is_not_stored(self, cache_path):
+        cache = RenderedPageCache(cache_path, ttl=0)
+
+        assert cache.store('abc', 'product', 'https://a.b/1', '<html></html>', {'driver': object()}) is False
+        assert cache.stats['unserializable'] == 1
+        cache.close()
+
+    def test_replay_returns_recorded_render_without_a_browser(self, cache_path, monkeypatch):
+        """Lo grabado en modo 'record' se reproduce en modo 'replay' sin crear sesiones."""
+        # Arrange
+        extractor = MagicMock()
+        extractor.extract_product_data.return_value = {'name': 'CAMISA', 'price': 119900}
+        monkeypatch.setattr('stylos.middlewares.ExtractorRegistry.get_extractor', lambda *args, **kwargs: extractor)
+        driver = MagicMock(current_url='https://www.zara.com/co/es/camisa-p1.html', page_source='<html>CAMISA</html>')
+        driver.execute_script.return_value = None
+        spider = MagicMock(country='co', lang='es')
+        spider.name = 'zara'
+        crawler = MagicMock(request_fingerprinter=None)
+        request = lambda url: Request(url, meta={'selenium': True, 'extraction_type': 'product'})
+
+        recorder = SeleniumMiddleware('local', None, crawler=crawler, page_cache_mode='record',
+                                      page_cache=RenderedPageCache(cache_path, ttl=0))
+        recorder._render_with_session(BrowserSession(driver, 1), request('https://www.zara.com/co/es/camisa-p1.html'), spider, {})
+        recorder.page_cache.close()
+        player = SeleniumMiddleware('local', None, crawler=crawler, page_cache_mode='replay',
+                                    page_cache=RenderedPageCache(cache_path, ttl=0))
+
+        # Act
+        player.spider_opened(spider)
+        response = player.process_request(request('https://www.zara.com/co/es/camisa-p1.html'), spider)
+
+        # Assert
+        assert player.pool is None
+        assert response.url == 'https://www.zara.com/co/es/camisa-p1.html'
+        assert response.text == '<html>CAMISA</html>'
+        assert response.meta['price'] == 119900
+        with pytest.raises(IgnoreRequest):
+            player.process_request(request('https://www.zara.com/co/es/otra-p2.html'), spider)
+        player.page_cache.close()
+
+    def test_colors_of_one_product_are_recorded_and_replayed_separately(self, cache_path, monkeypatch):
+        """Las peticiones por color comparten URL: cada una debe reproducir sus propias imágenes."""
+        # Arrange
+        def get_extractor(*args, meta=None, **kwargs):
+            extractor = MagicMock()
+            name = 'NEGRO' if meta['color_key'] == '0' else 'BLANCO'
+            extractor.extract_color_data.return_value = {'extracted_images': {name: [{'src': f'{name}.jpg'}]}}
+            return extractor
+
+        monkeypatch.setattr('stylos.middlewares.ExtractorRegistry.get_extractor', get_extractor)
+        driver = MagicMock(current_url='https://www.zara.com/co/es/camisa-p1.html', page_source='<html>CAMISA</html>')
+        driver.execute_script.return_value = None
+        spider = MagicMock(country='co', lang='es')
+        spider.name = 'zara'
+        crawler = MagicMock(request_fingerprinter=None)
+        request = lambda key: Request('https://www.zara.com/co/es/camisa-p1.html', dont_filter=True, meta={
+            'selenium': True, 'extraction_type': 'color', 'color_index': int(key), 'color_key': key
+        })
+
+        recorder = SeleniumMiddleware('local', None, crawler=crawler, page_cache_mode='record',
+                                      page_cache=RenderedPageCache(cache_path, ttl=0))
+        for key in ('0', '1'):
+            recorder._render_with_session(BrowserSession(driver, 1), request(key), spider, {})
+        recorder.page_cache.close()
+        player = SeleniumMiddleware('local', None, crawler=crawler, page_cache_mode='replay',
+                                    page_cache=RenderedPageCache(cache_path, ttl=0))
+
+        # Act
+        player.spider_opened(spider)
+        black = player.process_request(request('0'), spider)
+        white = player.process_request(request('1'), spider)
+
+        # Assert
+        assert black.meta['extracted_images'] == {'NEGRO': [{'src': 'NEGRO.jpg'}]}
+        assert white.meta['extracted_images'] == {'BLANCO': [{'src': 'BLANCO.jpg'}]}
+        player.page_cache.close()
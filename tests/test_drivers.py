@@ -0,0 +1,83 @@
+"""
+Suite de pruebas unitarias para la caché de chromedriver de 'stylos.drivers'.
+
+Los binarios de Chrome y chromedriver se simulan con `monkeypatch` sobre la
+detección de versiones y sobre `ChromeDriverManager`, de modo que las pruebas
+nunca usan la red ni requieren un navegador instalado.
+"""
+
+import pytest
+from unittest.mock import MagicMock
+
+from stylos.drivers import DRIVER_NAME, DriverCache, detect_chrome_version
+
+# --- Fixtures de Pytest ---
+
+@pytest.fixture
+def chrome_126(monkeypatch):
+    """Simula un Chrome 126 instalado."""
+    monkeypatch.setattr('stylos.drivers.detect_chrome_version', lambda binary=None: '126.0.6478.126')
+
+@pytest.fixture
+def driver_manager(monkeypatch, tmp_path):
+    """Sustituye a `ChromeDriverManager` por uno que 'descarga' un binario local."""
+    downloaded = tmp_path / 'wdm' / DRIVER_NAME
+    downloaded.parent.mkdir()
+    downloaded.write_text('binario')
+    manager = MagicMock()
+    manager.return_value.install.return_value = str(downloaded)
+    monkeypatch.setattr('webdriver_manager.chrome.ChromeDriverManager', manager)
+    return manager
+
+
+class TestDriverCache:
+    """Pruebas de la resolución de chromedriver con caché local."""
+
+    def test_downloads_once_then_serves_from_cache(self, tmp_path, chrome_126, driver_manager):
+        """El primer arranque descarga y guarda el binario; los siguientes no usan la red."""
+        # Arrange
+        root = tmp_path / 'drivers'
+
+        # Act
+        first = DriverCache(str(root)).resolve()
+        second_cache = DriverCache(str(root))
+        second = second_cache.resolve()
+
+        # Assert
+        assert first == second == str(root / 'chromedriver-126' / DRIVER_NAME)
+        assert driver_manager.return_value.install.call_count == 1
+        assert second_cache.downloaded is False
+
+    def test_offline_mode_fails_without_touching_the_network(self, tmp_path, chrome_126, driver_manager):
+        """En modo offline, si falta el binario de la versión se falla con un mensaje claro."""
+        # Arrange
+        cache = DriverCache(str(tmp_path / 'drivers'), offline=True)
+
+        # Act / Assert
+        with pytest.raises(RuntimeError, match='offline'):
+            cache.resolve()
+        driver_manager.assert_not_called()
+
+    def test_offline_mode_uses_latest_cached_driver_if_chrome_is_unknown(self, tmp_path, monkeypatch):
+        """Sin versión de Chrome detectable, el modo offline usa el binario más reciente en caché."""
+        # Arrange
+        monkeypatch.setattr('stylos.drivers.detect_chrome_version', lambda binary=None: None)
+        for major in ('99', '126'):
+            path = tmp_path / f'chromedriver-{major}' / DRIVER_NAME
+            path.parent.mkdir()
+            path.write_text('binario')
+
+        # Act
+        resolved = DriverCache(str(tmp_path), offline=True).resolve()
+
+        # Assert
+        assert resolved == str(tmp_path / 'chromedriver-126' / DRIVER_NAME)
+
+    def test_detects_version_from_binary_output(self, monkeypatch):
+        """La versión se toma de la salida de `--version` del ejecutable de Chrome."""
+        # Arrange
+        monkeypatch.setattr('stylos.drivers.shutil.which', lambda name: f'/usr/bin/{name}')
+        monkeypatch.setattr('stylos.drivers.subprocess.run', lambda *args, **kwargs: MagicMock(stdout='Google Chrome 126.0.6478.126 \n'))
+
+        # Act / Assert
+        assert detect_chrome_version() == '126.0.6478.126'
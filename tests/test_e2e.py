@@ -0,0 +1,67 @@
+"""
+Pruebas del benchmark de extremo a extremo ('benchmarks/e2e.py').
+
+Generan un corpus sintético pequeño y lo reproducen en un proceso limpio a
+través de cada araña, sus ItemLoaders y la cadena completa de pipelines
+contra `mongomock`, sin navegador ni red.
+"""
+
+import pytest
+
+from benchmarks.e2e import compare, run_once, summarize, synthesize_corpus
+
+# --- Fixtures de Pytest ---
+
+@pytest.fixture(scope='module')
+def corpus(tmp_path_factory):
+    """Corpus sintético de ambas arañas: 2 categorías de 5 productos cada una."""
+    path = str(tmp_path_factory.mktemp('corpus') / 'pages.sqlite3')
+    for spider in ('zara', 'mango'):
+        synthesize_corpus(path, spider, categories=2, products=5, page_kb=5)
+    return path
+
+
+class TestReplay:
+    """Pruebas del rastreo reproducido."""
+
+    @pytest.mark.parametrize('spider', ['zara', 'mango'])
+    def test_corpus_flows_through_spider_and_pipelines(self, corpus, spider):
+        # Act
+        report = run_once(spider, corpus)
+        summary = summarize([report])
+
+        # Assert
+        stats = report['stats']
+        assert stats['item_scraped_count'] == 10
+        assert stats['mongodb/items_new'] == 10
+        assert stats.get('log_count/ERROR', 0) == 0
+        assert 'pipeline/MongoDBPipeline/p50_ms' in summary['stages']
+        assert summary['items_per_second'] > 0
+
+    def test_color_fanout_replays_each_color(self, corpus):
+        """Con el reparto de colores, cada color se reproduce desde su propio render grabado."""
+        # Act
+        report = run_once('zara', corpus, settings={'COLOR_FANOUT_ENABLED': True})
+
+        # Assert
+        stats = report['stats']
+        assert stats['item_scraped_count'] == 10
+        assert stats['color_fanout/products'] == 4  # Los productos impares reparten sus colores
+        assert 'color_fanout/incomplete_products' not in stats
+
+
+class TestBaselineComparison:
+    """Pruebas de la comparación con la línea base."""
+
+    def test_flags_only_changes_beyond_tolerance_in_the_wrong_direction(self):
+        # Arrange
+        baseline = {'spiders': {'zara': {'items_per_second': 100.0, 'cpu_ms_per_item': 5.0, 'peak_rss_mb': 100.0}}}
+        current = {'zara': {'items_per_second': 120.0, 'cpu_ms_per_item': 6.0, 'peak_rss_mb': 105.0}}
+
+        # Act
+        rows = compare(current, baseline, tolerance=0.1)
+
+        # Assert
+        assert {metric: regressed for _, metric, _, _, _, regressed in rows} == {
+            'items_per_second': False, 'cpu_ms_per_item': True, 'peak_rss_mb': False
+        }
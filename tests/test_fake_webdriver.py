@@ -0,0 +1,126 @@
+"""
+Pruebas de `FakeWebDriver` y de los presupuestos de los extractors
+('benchmarks/fake_webdriver.py', 'benchmarks/extractors.py').
+
+El driver falso interpreta los HTML de 'tests/samples/' con lxml y cobra una
+latencia virtual por comando; con el reloj virtual, las pausas de los
+extractors y de `WebDriverWait` no bloquean. Así se verifica cuántos viajes de
+ida y vuelta y cuánto tiempo le cuesta a cada extractor un render.
+"""
+
+import time
+
+import pytest
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from benchmarks.extractors import BUDGETS, SAMPLES_DIR, over_budget, run_scenario
+from benchmarks.fake_webdriver import FakeWebDriver, VirtualClock
+
+# --- Fixtures de Pytest ---
+
+@pytest.fixture
+def clock():
+    return VirtualClock()
+
+
+@pytest.fixture
+def menu_driver(clock):
+    """Driver sobre el menú guardado de Zara, con 10 ms por comando."""
+    html = (SAMPLES_DIR / 'zara_menu.html').read_text(encoding='utf-8')
+    return FakeWebDriver(html, 'https://www.zara.com/co/es/', clock=clock, latency=0.01)
+
+
+class TestFakeWebDriver:
+    """Pruebas del comportamiento del driver falso."""
+
+    def test_finds_elements_by_css_and_xpath(self, menu_driver):
+        # Act
+        button = menu_driver.find_element(By.CSS_SELECTOR, "button[aria-label='Abrir Menú']")
+        links = menu_driver.find_elements(By.XPATH, "(//ul[@class='layout-categories-category__subcategory-main'])[2]//a")
+
+        # Assert
+        assert button.tag_name == 'button'
+        assert [link.get_attribute('href') for link in links] == [
+            'https://www.zara.com/co/es/hombre-chaquetas-l640.html',
+            'https://www.zara.com/co/es/hombre-pantalones-l838.html',
+        ]
+
+    def test_hidden_elements_have_no_text(self, menu_driver):
+        panel = menu_driver.find_element(By.XPATH, "//div[@aria-label='Menú de categorías']")
+
+        assert panel.is_displayed() is False
+        assert panel.text == ''
+
+    def test_every_command_costs_its_latency(self, menu_driver, clock):
+        # Arrange
+        menu_driver.command_latency['getPageSource'] = 0.5
+
+        # Act
+        menu_driver.find_elements(By.CSS_SELECTOR, 'a')
+        menu_driver.page_source
+
+        # Assert
+        assert clock.now == pytest.approx(0.51)
+
+    def test_waits_time_out_in_virtual_time(self, menu_driver, clock):
+        # Arrange
+        started = time.monotonic()
+
+        # Act
+        with clock.patched(), pytest.raises(TimeoutException):
+            WebDriverWait(menu_driver, 15).until(EC.presence_of_element_located((By.CSS_SELECTOR, 'h1')))
+
+        # Assert
+        assert clock.now > 15
+        assert time.monotonic() - started < 1
+
+    def test_unsupported_scripts_fail_loudly(self, menu_driver):
+        with pytest.raises(WebDriverException):
+            menu_driver.execute_script("return window.localStorage.length")
+
+
+class TestExtractorBudgets:
+    """Pruebas de los presupuestos de comandos y tiempo virtual de los extractors."""
+
+    @pytest.mark.parametrize('scenario', sorted(BUDGETS))
+    def test_scenario_is_within_budget(self, scenario):
+        report = run_scenario(scenario)
+
+        assert over_budget(report) == {}
+
+    def test_product_extraction_reads_every_color(self):
+        # Act
+        report = run_scenario('zara/product')
+
+        # Assert
+        result = report['result']
+        assert result['product_data']['name'] == 'CAMISA OVERSIZE'
+        assert result['product_data']['prices'] == ['$ 259.900', '$ 159.900']
+        assert list(result['extracted_images']) == ['BLANCO ROTO', 'AZUL MARINO', 'NEGRO']
+        assert len(result['extracted_images']['NEGRO']) == 4
+        # Por color: buscar los botones, el clic y la pausa de 1.8 s
+        assert report['methods']['ZaraExtractor._select_color']['count'] == 9
+
+    def test_infinite_scroll_stops_when_the_page_stops_growing(self):
+        # Act
+        report = run_scenario('zara/category')
+
+        # Assert
+        assert report['result'] == {'scroll_completed': True, 'scroll_attempts': 2}
+        assert report['slept'] == 6.0
+
+    def test_menu_is_read_without_clicks_or_waits(self):
+        # Act
+        report = run_scenario('zara/menu')
+
+        # Assert
+        assert len(report['result']['extracted_urls']) == 5
+        assert set(report['commands']) == {'getPageSource', 'getCurrentUrl'}
+
+    def test_over_budget_reports_the_excess(self):
+        report = {'scenario': 'zara/menu', 'round_trips': 5, 'virtual_seconds': 0.01}
+
+        assert over_budget(report, {'round_trips': 2, 'virtual_seconds': 0.05}) == {'round_trips': 3}
@@ -0,0 +1,173 @@
+"""
+Suite de pruebas unitarias para la frontier compartida de 'stylos.frontier'.
+
+Usa `mongomock` en lugar de un servidor MongoDB real. Se simulan varios
+workers sobre la misma colección para verificar los leases atómicos, la
+recuperación de leases vencidos y el ciclo completo del scheduler.
+"""
+
+import mongomock
+import pytest
+from unittest.mock import MagicMock
+from scrapy import Request
+from scrapy.exceptions import DontCloseSpider
+from scrapy.http import HtmlResponse
+from scrapy.settings import Settings
+from scrapy.utils.request import RequestFingerprinter
+
+import stylos.frontier as frontier_module
+from stylos.frontier import MongoFrontier, MongoFrontierScheduler, FrontierAckMiddleware, DONE, FAILED, PENDING
+from stylos.spiders.zara import ZaraSpider
+
+# --- Fixtures de Pytest ---
+
+@pytest.fixture
+def collection():
+    """Colección de frontier en una base de datos simulada."""
+    return mongomock.MongoClient()['stylos_test']['frontier']
+
+@pytest.fixture
+def crawler(monkeypatch):
+    """Crawler simulado con el scheduler de la frontier configurado."""
+    monkeypatch.setattr(frontier_module.task, 'LoopingCall', MagicMock())
+    crawler = MagicMock()
+    crawler.settings = Settings({'MENU_CACHE_ENABLED': False, 'COLOR_FANOUT_TIMEOUT': 300,
+                                 'SCHEDULER': 'stylos.frontier.MongoFrontierScheduler'})
+    crawler.request_fingerprinter = RequestFingerprinter()
+    return crawler
+
+def make_worker(collection, worker_id, **kwargs):
+    """Crea un worker de la frontier para el rastreo 'crawl-1' con índices creados."""
+    frontier = MongoFrontier(collection, crawl_id='crawl-1', worker_id=worker_id, **kwargs)
+    frontier.ensure_indexes()
+    return frontier
+
+
+class TestMongoFrontier:
+    """Pruebas de las operaciones atómicas de la frontier."""
+
+    def test_workers_lease_disjoint_requests_by_priority(self, collection):
+        """Dos workers nunca reciben la misma petición y se respeta la prioridad."""
+        # Arrange
+        a, b = make_worker(collection, 'a'), make_worker(collection, 'b')
+        a.push('fp-low', b'', 'https://x/1', 'parse_category', 'category', priority=0)
+        a.push('fp-high', b'', 'https://x/2', 'parse_product', 'product', priority=10)
+
+        # Act
+        first = b.lease()
+        second = a.lease()
+        third = a.lease()
+
+        # Assert
+        assert first['fingerprint'] == 'fp-high'
+        assert first['worker'] == 'b'
+        assert second['fingerprint'] == 'fp-low'
+        assert third is None
+        assert a.push('fp-low', b'', 'https://x/1', 'parse_category', 'category', priority=0) is False
+
+    def test_expired_leases_are_requeued_until_max_attempts(self, collection, monkeypatch):
+        """Un lease vencido vuelve a la cola y, agotados los intentos, se marca como fallido."""
+        # Arrange
+        clock = [1000.0]
+        monkeypatch.setattr(frontier_module.time, 'time', lambda: clock[0])
+        dead = make_worker(collection, 'muerto', lease_timeout=60, max_attempts=2)
+        alive = make_worker(collection, 'vivo', lease_timeout=60, max_attempts=2)
+        dead.push('fp', b'', 'https://x/1', 'parse_product', 'product', priority=0)
+        dead.lease()
+
+        # Act
+        clock[0] += 61
+        first_recovery = alive.requeue_expired()
+        alive.lease()
+        clock[0] += 61
+        second_recovery = alive.requeue_expired()
+
+        # Assert
+        assert first_recovery == {'requeued': 1, 'failed': 0}
+        assert second_recovery == {'requeued': 0, 'failed': 1}
+        assert alive.counts()[FAILED] == 1
+        assert alive.has_pending() is False
+
+    def test_heartbeat_keeps_lease_alive(self, collection, monkeypatch):
+        """Renovar el lease evita que otro worker lo recupere."""
+        # Arrange
+        clock = [1000.0]
+        monkeypatch.setattr(frontier_module.time, 'time', lambda: clock[0])
+        worker = make_worker(collection, 'a', lease_timeout=60)
+        worker.push('fp', b'', 'https://x/1', 'parse_product', 'product', priority=0)
+        worker.lease()
+
+        # Act
+        clock[0] += 50
+        worker.heartbeat(['fp'])
+        clock[0] += 50
+        recovered = worker.requeue_expired()
+
+        # Assert
+        assert recovered == {'requeued': 0, 'failed': 0}
+        assert worker.counts()['leased'] == 1
+
+
+class TestMongoFrontierScheduler:
+    """Pruebas del scheduler de Scrapy sobre la frontier."""
+
+    def test_request_roundtrip_and_ack(self, crawler):
+        """Una petición de Selenium se guarda, se presta con su callback y se marca como terminada."""
+        # Arrange
+        spider = ZaraSpider.from_crawler(crawler)
+        scheduler = MongoFrontierScheduler(crawler, mongomock.MongoClient(), 'stylos_test', 'frontier', crawl_id='crawl-1')
+        scheduler.open(spider)
+        crawler.signals.send_catch_log.side_effect = lambda signal, **kwargs: scheduler.request_done(**kwargs)
+        middleware = FrontierAckMiddleware.from_crawler(crawler)
+        request = Request('https://www.zara.com/co/es/vestidos-l1066.html', callback=spider.parse_category,
+                          meta={'selenium': True, 'extraction_type': 'category'})
+
+        # Act
+        enqueued = scheduler.enqueue_request(request)
+        duplicate = scheduler.enqueue_request(request.copy())
+        leased = scheduler.next_request()
+        middleware.process_response(leased, MagicMock(), spider)
+
+        # Assert
+        assert enqueued is True
+        assert duplicate is False
+        assert leased.callback == spider.parse_category
+        assert leased.meta['extraction_type'] == 'category'
+        assert scheduler.frontier.counts()[DONE] == 1
+        assert scheduler.has_pending_requests() is False
+        assert scheduler.frontier.counts()[PENDING] == 0
+
+    def test_color_requests_stay_with_the_worker_that_aggregates_them(self, crawler):
+        """Los colores repartidos y el vaciado no se publican en la frontier: otro worker no los recibe."""
+        # Arrange
+        client = mongomock.MongoClient()
+        spider_a, spider_b = ZaraSpider.from_crawler(crawler), ZaraSpider.from_crawler(crawler)
+        worker_a = MongoFrontierScheduler(crawler, client, 'stylos_test', 'frontier', crawl_id='crawl-1')
+        worker_b = MongoFrontierScheduler(crawler, client, 'stylos_test', 'frontier', crawl_id='crawl-1')
+        worker_a.open(spider_a)
+        worker_b.open(spider_b)
+        product_url = 'https://www.zara.com/co/es/camisa-p01.html'
+        worker_a.enqueue_request(Request(product_url, callback=spider_a.parse_variants,
+                                         meta={'selenium': True, 'extraction_type': 'variants'}))
+        leased = worker_a.next_request()
+        response = HtmlResponse(product_url, body=b'<html></html>', request=leased)
+        response.meta.update({'product_data': {'name': 'CAMISA'}, 'color_variants': [
+            {'index': 0, 'color': 'NEGRO', 'url': None}, {'index': 1, 'color': 'BLANCO', 'url': None}
+        ]})
+
+        # Act
+        for request in spider_a.parse_variants(response):
+            worker_a.enqueue_request(request)
+        crawler.engine.crawl.side_effect = worker_a.enqueue_request
+        with pytest.raises(DontCloseSpider):
+            spider_a._flush_colors_on_idle(spider_a)  # A queda inactiva con el producto incompleto
+        stolen = worker_b.next_request()
+        local = [worker_a.next_request() for _ in range(3)]
+
+        # Assert
+        assert stolen is None
+        assert worker_b.has_pending_requests() is True  # el producto sigue en curso en A
+        assert [request.meta.get('color_key') for request in local] == ['0', '1', None]
+        assert local[2].callback == spider_a.flush_pending_colors
+        assert worker_a.local_queue == []
+        assert worker_a.frontier.counts() == {PENDING: 0, 'leased': 1, DONE: 0, FAILED: 0}
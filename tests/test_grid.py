@@ -0,0 +1,69 @@
+"""
+Suite de pruebas unitarias para el descubrimiento de capacidad del Grid.
+
+Verifica el resumen de la respuesta de `/status` de Selenium Grid 4, el
+cálculo del tamaño del pool y el redimensionamiento de `BrowserSessionPool`.
+"""
+
+import pytest
+from unittest.mock import MagicMock
+
+from stylos.grid import grid_status_url, parse_grid_status, target_pool_size
+from stylos.sessions import BrowserSessionPool
+
+# --- Fixtures de Pytest ---
+
+@pytest.fixture
+def grid_status():
+    """Respuesta de `/status` con dos nodos Chrome (uno ocupado) y un nodo caído."""
+    chrome = {'browserName': 'chrome'}
+    return {
+        'value': {
+            'ready': True,
+            'nodes': [
+                {'availability': 'UP', 'slots': [{'stereotype': chrome, 'session': {'sessionId': 'abc'}}]},
+                {'availability': 'UP', 'slots': [{'stereotype': chrome, 'session': None},
+                                                 {'stereotype': chrome, 'session': None}]},
+                {'availability': 'DOWN', 'slots': [{'stereotype': chrome, 'session': None}]},
+            ]
+        }
+    }
+
+
+class TestGridStatus:
+    """Pruebas del resumen de capacidad del Grid."""
+
+    def test_counts_only_available_chrome_slots(self, grid_status):
+        """Los nodos caídos no cuentan; los slots con sesión no están libres."""
+        # Act
+        status = parse_grid_status(grid_status)
+
+        # Assert
+        assert status == {'nodes': 2, 'slots': 3, 'free': 2, 'ready': 1}
+        assert grid_status_url('http://selenium-hub:4444/wd/hub/') == 'http://selenium-hub:4444/wd/hub/status'
+
+    def test_target_size_uses_own_sessions_plus_free_slots(self):
+        """El pool crece hacia los slots libres, sin pasar del máximo configurado."""
+        # Act / Assert
+        assert target_pool_size({'free': 2}, own_sessions=1, max_size=16) == 3
+        assert target_pool_size({'free': 40}, own_sessions=4, max_size=16) == 16
+        assert target_pool_size({'free': 0}, own_sessions=0, max_size=16) == 1
+
+
+class TestPoolResize:
+    """Pruebas del redimensionamiento del pool de sesiones."""
+
+    def test_shrinking_quits_idle_sessions(self):
+        """Al reducir el pool se cierran las sesiones libres sobrantes."""
+        # Arrange
+        pool = BrowserSessionPool(factory=MagicMock, max_size=3)
+        sessions = [pool.acquire() for _ in range(3)]
+        for session in sessions:
+            pool.release(session)
+
+        # Act
+        pool.resize(1)
+
+        # Assert
+        assert pool.size == 1
+        assert sum(session.driver.quit.called for session in sessions) == 2
@@ -0,0 +1,121 @@
+"""
+Suite de pruebas unitarias para la instrumentación de comandos de WebDriver.
+
+Usa un WebDriver falso cuyos métodos pasan por `command_executor.execute`,
+igual que Selenium, para verificar el conteo por comando y por método del
+extractor, y las estadísticas que publica `SeleniumMiddleware`.
+"""
+
+import pytest
+from unittest.mock import MagicMock
+
+from scrapy import Request
+
+from stylos.extractors import BaseExtractor
+from stylos.instrumentation import instrument_driver, CommandTrace
+from stylos.middlewares import SeleniumMiddleware
+from stylos.sessions import BrowserSession
+
+# --- Dobles de prueba ---
+
+class FakeExecutor:
+    """`command_executor` que responde a todo con un valor vacío."""
+
+    def execute(self, command, params):
+        return {'value': []}
+
+
+class FakeDriver:
+    """WebDriver mínimo: cada método emite un comando por el executor, como Selenium."""
+
+    def __init__(self):
+        self.command_executor = FakeExecutor()
+        self.current_url = 'https://www.zara.com/co/es/camisa-p1.html'
+        self.page_source = '<html></html>'
+
+    def execute(self, command, params=None):
+        return self.command_executor.execute(command, params or {})
+
+    def get(self, url):
+        self.execute('get', {'url': url})
+
+    def find_elements(self, by, value):
+        return self.execute('findElements', {'using': by, 'value': value})['value']
+
+    def execute_script(self, script, *args):
+        self.execute('executeScript', {'script': script, 'args': list(args)})
+        return None
+
+
+class CountingExtractor(BaseExtractor):
+    """Extractor que emite una cantidad conocida de comandos."""
+
+    def extract_menu_data(self):
+        return {}
+
+    def extract_category_data(self):
+        return {}
+
+    def extract_product_data(self):
+        self._collect_images()
+        self.sleep(0)
+        return {'name': 'CAMISA'}
+
+    def _collect_images(self):
+        self.driver.find_elements('css selector', 'img')
+        self.driver.execute_script('/* getAttribute */return arguments[0];', 'src')
+
+# --- Fixtures de Pytest ---
+
+@pytest.fixture
+def spider():
+    spider = MagicMock(lang='es')
+    spider.name = 'zara'
+    return spider
+
+
+class TestCommandTrace:
+    """Pruebas del registro de comandos de una sesión instrumentada."""
+
+    def test_commands_are_attributed_to_extractor_methods(self, spider):
+        """Cada comando se cuenta por nombre y por el método del extractor que lo emitió."""
+        # Arrange
+        driver = FakeDriver()
+        trace = instrument_driver(driver).trace = CommandTrace()
+        extractor = CountingExtractor(driver, spider)
+
+        # Act
+        extractor.extract_product_data()
+        driver.get('https://www.zara.com/co/es/')
+
+        # Assert
+        assert set(trace.commands) == {'findElements', 'getAttribute', 'sleep', 'get'}
+        assert trace.methods['CountingExtractor._collect_images']['count'] == 2
+        assert trace.methods['CountingExtractor.extract_product_data']['count'] == 1
+        assert trace.methods['middleware']['count'] == 1
+        assert trace.total_count == 3
+
+
+class TestMiddlewareInstrumentation:
+    """Pruebas de las estadísticas por tipo de extracción."""
+
+    def test_render_publishes_stats_and_meta_trace(self, spider, monkeypatch):
+        """El render suma sus comandos a `webdriver/*` y deja la traza en `meta` si se pide."""
+        # Arrange
+        monkeypatch.setattr('stylos.middlewares.ExtractorRegistry.get_extractor',
+                            lambda name, driver, spider, **kwargs: CountingExtractor(driver, spider))
+        crawler = MagicMock()
+        middleware = SeleniumMiddleware('local', None, crawler=crawler)
+        request = Request('https://www.zara.com/co/es/camisa-p1.html',
+                          meta={'selenium': True, 'extraction_type': 'product', 'webdriver_trace': True})
+
+        # Act
+        response = middleware._render_with_session(BrowserSession(FakeDriver(), 1), request, spider, {})
+
+        # Assert
+        # get + script de Navigation Timing + findElements + getAttribute
+        assert response.meta['webdriver_trace']['total_commands'] == 4
+        assert response.meta['webdriver_trace']['commands']['sleep']['count'] == 1
+        crawler.stats.inc_value.assert_any_call('webdriver/product/commands', 4)
+        crawler.stats.inc_value.assert_any_call('webdriver/methods/CountingExtractor._collect_images/count', 2)
+        crawler.stats.max_value.assert_any_call('webdriver/product/max_commands', 4)
@@ -0,0 +1,159 @@
+"""
+Suite de pruebas para las métricas en vivo y el endpoint `/metrics`.
+
+Los trabajos publican instantáneas en un directorio temporal y la API se
+prueba contra un Scrapyd falso: un servidor HTTP local que responde a
+`listjobs.json` con una lista de trabajos controlada por la prueba.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+from scrapy.settings import Settings
+from scrapy.statscollectors import MemoryStatsCollector
+
+import app.api_server as api_server
+from stylos.livestats import read_snapshots, render_prometheus, write_snapshot
+from stylos.metrics import StageMetricsExtension
+
+# --- Fixtures de Pytest ---
+
+@pytest.fixture
+def fake_scrapyd(monkeypatch):
+    """Scrapyd falso en un puerto libre; `jobs` es la respuesta de `listjobs.json`."""
+    jobs = {'status': 'ok', 'pending': [], 'running': [], 'finished': []}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = json.dumps(jobs).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(api_server, 'SCRAPYD_URL', f"http://127.0.0.1:{server.server_address[1]}")
+    yield jobs
+    server.shutdown()
+    server.server_close()
+
+
+def snapshot(job, state='running', **overrides):
+    data = {
+        'job': job, 'spider': 'zara', 'country': 'co', 'lang': 'es', 'state': state, 'updated_at': 1000.0,
+        'stages': {'navigation': {'count': 4, 'sum': 6.0, 'p50_ms': 1400.0, 'p95_ms': 2100.0, 'p99_ms': 2100.0}},
+        'counters': {'items_scraped': 12, 'log_errors': 1},
+        'gauges': {'items_per_minute': 24.0, 'renders_in_flight': 2, 'queue_depth': 30, 'slot_utilization': 0.8},
+    }
+    data.update(overrides)
+    return data
+
+
+class TestLiveSnapshots:
+    """Pruebas de la publicación de instantáneas por la extensión."""
+
+    def test_extension_publishes_gauges_and_counters(self, tmp_path):
+        # Arrange
+        crawler = MagicMock()
+        crawler.settings = Settings({'SELENIUM_POOL_SIZE': 2})
+        crawler.stats = MemoryStatsCollector(crawler)
+        crawler.stats.set_value('item_scraped_count', 5)
+        crawler.stats.set_value('scheduler/enqueued', 40)
+        crawler.stats.set_value('scheduler/dequeued', 25)
+        crawler.engine.downloader.active = {'a', 'b'}
+        spider = MagicMock(country='co', lang='es')
+        spider.name = 'zara'
+        ext = StageMetricsExtension(crawler, live_dir=str(tmp_path))
+        ext.started_at, ext.run_id = 0.0, 'job1'
+        ext.observe('pipeline/MongoDBPipeline', 0.03)
+
+        # Act
+        ext.publish_live(spider)
+        [published] = read_snapshots(str(tmp_path))
+
+        # Assert
+        assert published['job'] == 'job1' and published['country'] == 'co'
+        assert published['counters'] == {'items_scraped': 5}
+        assert published['gauges']['renders_in_flight'] == 2
+        assert published['gauges']['queue_depth'] == 15
+        assert published['stages']['pipeline/MongoDBPipeline']['count'] == 1
+
+    def test_finished_snapshots_expire(self, tmp_path):
+        # Arrange
+        write_snapshot(str(tmp_path), snapshot('old', state='finished', updated_at=0.0))
+        write_snapshot(str(tmp_path), snapshot('live', updated_at=0.0))
+
+        # Act
+        jobs = [s['job'] for s in read_snapshots(str(tmp_path), max_age=60, now=1000.0)]
+
+        # Assert
+        assert jobs == ['live']
+
+
+class TestPrometheusFormat:
+    """Pruebas del texto de exposición."""
+
+    def test_renders_labelled_gauges_counters_and_summaries(self):
+        # Act
+        text = render_prometheus([snapshot('job1')], {'running': [{'id': 'job1'}]}, now=1010.0)
+
+        # Assert
+        labels = 'job="job1",spider="zara",country="co"'
+        assert '# TYPE stylos_items_scraped_total counter' in text
+        assert f'stylos_items_scraped_total{{{labels}}} 12' in text
+        assert f'stylos_renders_in_flight{{{labels}}} 2' in text
+        assert f'stylos_job_running{{{labels}}} 1' in text
+        assert f'stylos_snapshot_age_seconds{{{labels}}} 10.0' in text
+        assert f'stylos_stage_latency_seconds{{{labels},stage="navigation",quantile="0.95"}} 2.1' in text
+        assert f'stylos_stage_latency_seconds_count{{{labels},stage="navigation"}} 4' in text
+        assert 'stylos_scrapyd_jobs{state="running"} 1' in text
+
+    def test_label_values_are_escaped(self):
+        text = render_prometheus([snapshot('a"b\\c')], None)
+
+        assert 'job="a\\"b\\\\c"' in text
+
+
+class TestMetricsEndpoint:
+    """Pruebas de `/metrics` contra un Scrapyd falso."""
+
+    def test_scrapyd_decides_which_jobs_are_running(self, fake_scrapyd, tmp_path, monkeypatch):
+        # Arrange
+        monkeypatch.setattr(api_server, 'LIVE_STATS_DIR', str(tmp_path))
+        write_snapshot(str(tmp_path), snapshot('job1'))
+        write_snapshot(str(tmp_path), snapshot('job2'))  # Murió sin publicar su cierre
+        fake_scrapyd['running'] = [{'id': 'job1', 'spider': 'zara'}]
+        fake_scrapyd['finished'] = [{'id': 'job2', 'spider': 'zara'}]
+
+        # Act
+        response = TestClient(api_server.app).get('/metrics')
+
+        # Assert
+        assert response.status_code == 200
+        assert response.headers['content-type'].startswith('text/plain')
+        assert 'stylos_scrapyd_up 1' in response.text
+        assert 'stylos_job_running{job="job1",spider="zara",country="co"} 1' in response.text
+        assert 'stylos_job_running{job="job2",spider="zara",country="co"} 0' in response.text
+
+    def test_serves_snapshots_when_scrapyd_is_down(self, tmp_path, monkeypatch):
+        # Arrange
+        monkeypatch.setattr(api_server, 'LIVE_STATS_DIR', str(tmp_path))
+        monkeypatch.setattr(api_server, 'SCRAPYD_URL', 'http://127.0.0.1:9')
+        write_snapshot(str(tmp_path), snapshot('job1'))
+
+        # Act
+        text = TestClient(api_server.app).get('/metrics').text
+
+        # Assert
+        assert 'stylos_scrapyd_up 0' in text
+        assert 'stylos_job_running{job="job1",spider="zara",country="co"} 1' in text
@@ -0,0 +1,174 @@
+"""
+Suite de pruebas unitarias para 'stylos.metrics'.
+
+Verifica la precisión de los percentiles del histograma de buckets fijos, la
+combinación de corridas, y lo que publica `StageMetricsExtension` a partir
+de las señales del render, los pipelines y el callback de la araña.
+"""
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from scrapy.exceptions import DropItem
+from scrapy.settings import Settings
+from scrapy.statscollectors import MemoryStatsCollector
+
+from stylos.metrics import LatencyHistogram, StageMetricsExtension, StageTimingSpiderMiddleware, timed_pipeline
+from stylos.signals import stage_timed
+
+# --- Fixtures de Pytest ---
+
+@pytest.fixture
+def crawler():
+    """Crawler simulado con configuración y estadísticas reales."""
+    crawler = MagicMock()
+    crawler.settings = Settings({'STAGE_METRICS_ENABLED': True, 'SELENIUM_POOL_SIZE': 2})
+    crawler.stats = MemoryStatsCollector(crawler)
+    return crawler
+
+
+@pytest.fixture
+def spider():
+    spider = MagicMock()
+    spider.name = 'zara'
+    return spider
+
+
+class TestLatencyHistogram:
+    """Pruebas del histograma de latencias."""
+
+    def test_percentiles_are_within_bucket_error(self):
+        """Con 1..1000 ms, p50/p95/p99 quedan a menos del 9 % del valor exacto."""
+        # Arrange
+        histogram = LatencyHistogram()
+
+        # Act
+        for ms in range(1, 1001):
+            histogram.observe(ms / 1000)
+
+        # Assert
+        for p, exact in ((50, 0.5), (95, 0.95), (99, 0.99)):
+            assert abs(histogram.percentile(p) - exact) / exact < 0.09
+        assert histogram.percentile(100) == pytest.approx(1.0)
+        assert histogram.count == 1000
+
+    def test_empty_histogram_has_no_percentiles(self):
+        assert LatencyHistogram().percentile(50) is None
+
+    def test_merge_and_round_trip_through_dict(self):
+        """Un histograma guardado se puede reconstruir y combinar con otra corrida."""
+        # Arrange
+        first, second = LatencyHistogram(), LatencyHistogram()
+        for value in (0.1, 0.2, 0.3):
+            first.observe(value)
+        second.observe(5.0)
+
+        # Act
+        restored = LatencyHistogram.from_dict(json.loads(json.dumps(first.to_dict())))
+        restored.merge(second)
+
+        # Assert
+        assert restored.count == 4
+        assert restored.max == pytest.approx(5.0)
+        assert restored.percentile(50) == pytest.approx(first.percentile(50))
+
+
+class TestStageMetricsExtension:
+    """Pruebas de la extensión de métricas por etapa."""
+
+    def test_disabled_without_setting(self):
+        from scrapy.exceptions import NotConfigured
+        crawler = MagicMock()
+        crawler.settings = Settings({'STAGE_METRICS_ENABLED': False})
+
+        with pytest.raises(NotConfigured):
+            StageMetricsExtension.from_crawler(crawler)
+
+    def test_render_stages_and_throughput_are_reported(self, crawler, spider):
+        """Las etapas del render llegan a los percentiles y el render ocupado a la utilización."""
+        # Arrange
+        ext = StageMetricsExtension(crawler)
+        ext.started_at = 0.0
+        timing = {'navigation': 1.2, 'extraction': 3.0, 'page_source': 0.05, 'response_build': 0.01, 'render': 4.26, 'status': 200}
+
+        # Act
+        for _ in range(10):
+            ext.page_rendered(request=None, spider=spider, timing=timing, error=None)
+        ext.items_per_minute.update({0: 30, 1: 10})
+        report = ext.report(now=120.0)
+
+        # Assert
+        assert set(report['stages']) == {'navigation', 'extraction', 'page_source', 'response_build', 'render'}
+        assert report['stages']['navigation']['count'] == 10
+        assert report['throughput']['items_per_minute'] == 20.0
+        assert report['throughput']['peak_items_per_minute'] == 30
+        # 42.6 s de render sobre 2 slots × 120 s
+        assert report['throughput']['slot_utilization'] == pytest.approx(0.1775, abs=1e-3)
+
+    def test_spider_closed_sets_stats_and_persists_run(self, crawler, spider, tmp_path):
+        # Arrange
+        ext = StageMetricsExtension(crawler, metrics_dir=str(tmp_path))
+        ext.started_at = 0.0
+        ext.run_id = 'job123'
+        ext.observe('parse', 0.02)
+
+        # Act
+        ext.spider_closed(spider, 'finished')
+
+        # Assert
+        assert crawler.stats.get_value('latency/parse/count') == 1
+        assert crawler.stats.get_value('latency/parse/p95_ms') == pytest.approx(20, rel=0.09)
+        saved = json.loads((tmp_path / 'zara-job123.json').read_text())
+        assert saved['reason'] == 'finished'
+        assert saved['stages']['parse']['count'] == 1
+
+    def test_each_pipeline_process_item_is_timed(self, crawler, spider):
+        """`timed_pipeline` publica la duración de cada pipeline, también la de los items descartados."""
+        # Arrange
+        class FirstPipeline:
+            @timed_pipeline
+            def process_item(self, item, spider):
+                item['seen'] = True
+                return item
+
+        class DroppingPipeline:
+            @timed_pipeline
+            def process_item(self, item, spider):
+                raise DropItem("Item duplicado")
+
+        ext = StageMetricsExtension(crawler)
+        spider.crawler = crawler
+        crawler.signals.send_catch_log.side_effect = lambda signal, **kwargs: ext.stage_timed(**kwargs)
+
+        # Act
+        result = FirstPipeline().process_item({}, spider)
+        with pytest.raises(DropItem):
+            DroppingPipeline().process_item({}, spider)
+
+        # Assert
+        assert result == {'seen': True}
+        assert ext.histograms['pipeline/FirstPipeline'].count == 1
+        assert ext.histograms['pipeline/DroppingPipeline'].count == 1
+
+
+class TestStageTimingSpiderMiddleware:
+    """Pruebas del cronometraje de los callbacks de la araña."""
+
+    def test_output_is_passed_through_and_parse_time_is_signalled(self, crawler, spider):
+        # Arrange
+        middleware = StageTimingSpiderMiddleware(crawler)
+
+        def callback():
+            yield {'name': 'camisa'}
+            yield {'name': 'pantalón'}
+
+        # Act
+        output = list(middleware.process_spider_output(None, callback(), spider))
+
+        # Assert
+        assert output == [{'name': 'camisa'}, {'name': 'pantalón'}]
+        kwargs = crawler.signals.send_catch_log.call_args.kwargs
+        assert kwargs['signal'] is stage_timed
+        assert kwargs['stage'] == 'parse'
+        assert kwargs['elapsed'] >= 0
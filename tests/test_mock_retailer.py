@@ -0,0 +1,180 @@
+"""
+Pruebas de la tienda falsa local ('benchmarks/mock_retailer.py') y de
+`-a base_url`, que apunta las arañas a otro origen.
+
+La tienda se sirve en un puerto libre de 127.0.0.1; las páginas se leen con
+`urllib` y se pasan por las arañas y por los extractors sobre `FakeWebDriver`,
+sin navegador.
+"""
+
+import time
+from unittest.mock import MagicMock
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+from scrapy.http import HtmlResponse
+from scrapy.settings import Settings
+from scrapy.downloadermiddlewares.offsite import OffsiteMiddleware
+
+from benchmarks.e2e import browser_settings
+from benchmarks.fake_webdriver import FakeWebDriver
+from benchmarks.mock_retailer import MockCatalog, MockRetailer
+from stylos.extractors.mango_extractor import MangoExtractor
+from stylos.extractors.zara_extractor import ZaraExtractor
+from stylos.spiders.mango import MangoSpider
+from stylos.spiders.zara import ZaraSpider
+
+# --- Fixtures de Pytest ---
+
+@pytest.fixture(scope='module')
+def zara_shop():
+    """Tienda de Zara con 3 categorías de 20 productos y 50 ms por página."""
+    with MockRetailer(site='zara', categories=3, products=20, page_size=12, latency=0.05) as shop:
+        yield shop
+
+
+@pytest.fixture(scope='module')
+def mango_shop():
+    with MockRetailer(site='mango', categories=4, products=6) as shop:
+        yield shop
+
+
+def make_spider(spider_class, **kwargs):
+    """Araña con un crawler simulado y los argumentos dados."""
+    crawler = MagicMock()
+    crawler.settings = Settings({'MENU_CACHE_ENABLED': False})
+    return spider_class.from_crawler(crawler, **kwargs)
+
+
+def fetch(url: str) -> str:
+    return urlopen(url).read().decode('utf-8')
+
+
+def render(url: str) -> FakeWebDriver:
+    """Driver falso sobre la página servida (sin JavaScript)."""
+    return FakeWebDriver(fetch(url), url)
+
+
+class TestBaseUrlOverride:
+    """Pruebas de `-a base_url` en las arañas y los extractors."""
+
+    def test_spiders_default_to_the_real_sites(self):
+        assert make_spider(ZaraSpider).start_urls == ['https://www.zara.com/co/es/']
+        assert make_spider(MangoSpider).start_urls == ['https://shop.mango.com/co/es/h/mujer',
+                                                       'https://shop.mango.com/co/es/h/hombre']
+
+    def test_override_changes_start_urls_domains_and_home_page(self):
+        # Act
+        spider = make_spider(ZaraSpider, base_url='http://127.0.0.1:8765/', country='us', lang='en')
+
+        # Assert
+        assert spider.start_urls == ['http://127.0.0.1:8765/us/en/']
+        assert '127.0.0.1' in spider.allowed_domains
+        assert ZaraExtractor(None, spider).home_url('us', 'en') == 'http://127.0.0.1:8765/us/en/'
+
+    def test_invalid_base_url_is_rejected(self):
+        with pytest.raises(ValueError):
+            make_spider(MangoSpider, base_url='127.0.0.1:8765')
+
+
+class TestZaraShop:
+    """Pruebas de las páginas de la tienda con la forma de Zara."""
+
+    def test_menu_links_are_in_the_hidden_panel(self, zara_shop):
+        # Arrange
+        spider = make_spider(ZaraSpider, base_url=zara_shop.base_url)
+        driver = render(spider.start_urls[0])
+
+        # Act
+        result = ZaraExtractor(driver, spider).extract_menu_data()
+
+        # Assert
+        assert len(result['extracted_urls']) == 3
+        assert all(url.startswith(zara_shop.base_url) for url in result['extracted_urls'])
+        assert driver.find_elements('css selector', "[data-qa-action='stay-in-store']")
+
+    def test_category_serves_a_first_batch_and_the_spider_stays_on_the_shop(self, zara_shop):
+        # Arrange
+        spider = make_spider(ZaraSpider, base_url=zara_shop.base_url)
+        url = f"{zara_shop.base_url}/co/es/categoria-1-l1001.html"
+        response = HtmlResponse(url, body=fetch(url).encode('utf-8'), encoding='utf-8')
+
+        offsite = OffsiteMiddleware(MagicMock())
+        offsite.spider_opened(spider)
+
+        # Act
+        requests = list(spider.parse_category(response))
+
+        # Assert
+        assert len(requests) == 12
+        assert all(offsite.should_follow(request, spider) for request in requests)
+        assert spider.category_products['/co/es/categoria-1-l1001.html'] == 12
+
+    def test_product_gallery_is_lazy_until_scrolled(self, zara_shop):
+        # Arrange
+        url = f"{zara_shop.base_url}/co/es/producto-0-3-p00000003.html"
+        extractor = ZaraExtractor(render(url), MagicMock(lang='es'))
+
+        # Act
+        product = extractor._extract_basic_product_info()
+        color_name, images = extractor._extract_current_color_images(0)
+
+        # Assert
+        assert product['name'] and len(product['prices']) == 2
+        assert len(extractor._discover_color_variants()) == 3
+        # Sin JavaScript solo la primera imagen tiene URL; el resto espera al scroll
+        assert [image['src'].split('/')[-2:] for image in images] == [['w750', '0.jpg']]
+
+    def test_pages_are_deterministic_and_delayed(self, zara_shop):
+        # Arrange
+        url = f"{zara_shop.base_url}/co/es/producto-2-7-p00200007.html"
+        started = time.monotonic()
+
+        # Act
+        first, second = fetch(url), fetch(url)
+
+        # Assert
+        assert first == second
+        assert time.monotonic() - started >= 0.1
+        assert zara_shop.hits['product'] >= 2
+
+    def test_unknown_pages_are_not_found(self, zara_shop):
+        with pytest.raises(HTTPError) as error:
+            fetch(f"{zara_shop.base_url}/co/es/producto-9-0-p00900000.html")
+        assert error.value.code == 404
+
+
+class TestMangoShop:
+    """Pruebas de las páginas de la tienda con la forma de Mango."""
+
+    def test_footer_links_and_color_urls(self, mango_shop):
+        # Arrange
+        spider = make_spider(MangoSpider, base_url=mango_shop.base_url)
+        product_url = f"{mango_shop.base_url}/co/es/p/hombre/producto-1-0_00100000"
+
+        # Act
+        menu = MangoExtractor(render(spider.start_urls[1]), spider).extract_menu_data()
+        variants = MangoExtractor(render(product_url), spider)._discover_mango_color_variants()
+        selected = MangoExtractor(render(variants[2]['url']), spider)
+
+        # Assert
+        assert menu['extracted_urls'] == [f"{mango_shop.base_url}/co/es/c/hombre/categoria-1",
+                                          f"{mango_shop.base_url}/co/es/c/hombre/categoria-3"]
+        assert selected.driver.find_element('css selector', selected.PRODUCT_SELECTORS['current_color']).text == variants[2]['color']
+
+
+class TestCatalog:
+    """Pruebas del catálogo y de la configuración del benchmark con navegador."""
+
+    def test_catalog_size_and_unknown_site(self):
+        assert MockCatalog('mango', categories=5, products=30).total_products == 150
+        with pytest.raises(ValueError):
+            MockCatalog('hm')
+
+    def test_browser_settings_use_local_headless_chrome(self, tmp_path):
+        settings = browser_settings(str(tmp_path), sessions=2)
+
+        assert settings['SELENIUM_MODE'] == 'local' and settings['SELENIUM_HEADLESS'] is True
+        assert settings['PAGE_CACHE_MODE'] == 'off'
+        assert settings['SELENIUM_POOL_SIZE'] == settings['CONCURRENT_REQUESTS'] == 2
@@ -21,7 +21,9 @@ from unittest.mock import MagicMock, patch
 from scrapy.exceptions import DropItem
 from itemadapter import ItemAdapter
 import mongomock  # Para simular la conexión a MongoDB
-from scrapy import Item, Field
+from scrapy import Item, Field, Request
+from scrapy.http import HtmlResponse
+from scrapy.settings import Settings
 
 # Importación de las pipelines a probar
 from stylos.pipelines import (
@@ -31,6 +33,7 @@ from stylos.pipelines import (
     DuplicatesPipeline,
     StylosPipeline,
 )
+from stylos.spiders.zara import ZaraSpider
 
 # --- Fixtures de Pytest: Preparación de datos y objetos reutilizables ---
 
@@ -85,6 +88,7 @@ def sample_item_class():
         # --- Metadatos para comunicación entre pipelines ---
         changes_detected = Field()
         changes_list = Field()
+        extraction_type = Field()
 
     return ProductItem
 
@@ -180,6 +184,32 @@ class TestDuplicatesPipeline:
             pipeline.process_item(item3_duplicate, None)
 
 
+# --- Suite de Pruebas para los items del refresco de precios ---
+
+class TestPriceRefreshItems:
+    """Pruebas de los items que las arañas emiten en modo de refresco de precios (`-a mode=price`)."""
+
+    def test_zara_price_item_carries_currency(self):
+        """
+        Verifica que el item de precios de Zara trae la moneda, uno de los
+        `PRICE_FIELDS` que el refresco actualiza, igual que la extracción completa.
+        """
+        # Arrange
+        crawler = MagicMock()
+        crawler.settings = Settings({'MENU_CACHE_ENABLED': False})
+        spider = ZaraSpider.from_crawler(crawler, country='mx')
+        url = 'https://www.zara.com/mx/es/camisa-p1.html'
+        request = Request(url, meta={'product_data': {'name': 'CAMISA', 'prices': ['799.00 MXN']}})
+        response = HtmlResponse(url, body=b'<html></html>', request=request)
+
+        # Act
+        item = next(spider.parse_price(response))
+
+        # Assert
+        assert item['currency'] == 'MXN'
+        assert item['extraction_type'] == 'price'
+
+
 # --- Suite de Pruebas para la Interacción con MongoDB ---
 
 @patch('stylos.pipelines.pymongo.MongoClient', new=mongomock.MongoClient)
@@ -235,6 +265,59 @@ class TestMongoDBInteraction:
 
         pipeline.close_spider(mock_spider)
 
+    def test_mongodb_pipeline_price_refresh_keeps_images(self, mock_spider, sample_item_class):
+        """
+        Verifica que un item del modo de refresco de precios solo actualiza los
+        campos de precio y deja intactas las imágenes del documento existente.
+        """
+        # Arrange
+        pipeline = MongoDBPipeline.from_crawler(mock_spider)
+        pipeline.open_spider(mock_spider)
+        collection = pipeline.collection
+        images = [{'color': 'AZUL', 'images': [{'src': 'https://static.zara.net/photos/a.jpg'}]}]
+        collection.insert_one({
+            '_id': '456', 'url': 'http://priced.com', 'name': 'Camisa',
+            'current_price': 100.0, 'images_by_color': images
+        })
+        item = sample_item_class(
+            url='http://priced.com', name='Camisa', current_price=80.0,
+            last_visited='2025-06-19', extraction_type='price'
+        )
+
+        # Act
+        processed_item = pipeline.process_item(item, mock_spider)
+
+        # Assert
+        saved_item = collection.find_one({'url': 'http://priced.com'})
+        assert saved_item['current_price'] == 80.0
+        assert saved_item['images_by_color'] == images
+        assert saved_item['last_visited'] == '2025-06-19'
+        assert 'extraction_type' not in saved_item
+        assert ItemAdapter(processed_item)['changes_detected'] is True
+
+        pipeline.close_spider(mock_spider)
+
+    def test_mongodb_pipeline_price_refresh_skips_unknown_product(self, mock_spider, sample_item_class):
+        """
+        Verifica que un item de refresco de precios de un producto que no está
+        en la base de datos no crea un documento incompleto.
+        """
+        # Arrange
+        pipeline = MongoDBPipeline.from_crawler(mock_spider)
+        pipeline.open_spider(mock_spider)
+        item = sample_item_class(url='http://unknown.com', name='Camisa', current_price=80.0,
+                                 last_visited='2025-06-19', extraction_type='price')
+
+        # Act
+        processed_item = pipeline.process_item(item, mock_spider)
+
+        # Assert
+        assert pipeline.collection.find_one({'url': 'http://unknown.com'}) is None
+        assert ItemAdapter(processed_item)['changes_detected'] is False
+        mock_spider.crawler.stats.inc_value.assert_called_with('mongodb/price_unknown_product')
+
+        pipeline.close_spider(mock_spider)
+
     def test_history_pipeline_creates_record_on_change(self, mock_spider, sample_item_class):
         """
         Verifica que HistoryPipeline crea un registro de auditoría cuando un item
@@ -0,0 +1,126 @@
+"""
+Suite de pruebas unitarias para el planificador de capacidad ('stylos.planner').
+
+Las corridas de referencia se guardan en `mongomock`; se verifica la
+estimación por objetivo, la predicción de duración, la recomendación de
+nodos y shards para un plazo, el endpoint `/plan` y el subcomando `plan`.
+"""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import mongomock
+import pytest
+from fastapi.testclient import TestClient
+
+import app.api_server as api_server
+import control_scraper
+from stylos.planner import CapacityPlanner, estimate_target, parse_targets, plan, predict_seconds
+from stylos.runs import RunLedger
+
+START = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+# --- Fixtures de Pytest ---
+
+def run(job_id, day, country='co', lang='es', items=1000, shards=1, categories=None, per_item=3.6):
+    return {
+        'job_id': job_id, 'spider': 'zara', 'country': country, 'lang': lang, 'reason': 'finished',
+        'finished_at': START + timedelta(days=day), 'args': {'shards': shards}, 'startup_seconds': 20.0,
+        'items': {'scraped': items}, 'categories': categories or [],
+        'throughput': {'browser_seconds_per_item': per_item, 'slot_utilization': 0.5},
+    }
+
+
+@pytest.fixture
+def ledger():
+    ledger = RunLedger(mongomock.MongoClient()['stylos_test']['crawl_runs'])
+    ledger.record(run('co1', 0))
+    ledger.record(run('co2', 1, items=1200))
+    ledger.record(run('us1', 0, country='us', lang='en', items=500))
+    return ledger
+
+
+class TestEstimates:
+    """Pruebas de la estimación por objetivo y de la duración del lote."""
+
+    def test_parse_targets_combines_spiders_and_countries(self):
+        assert parse_targets(['zara', 'mango'], ['co:es', 'us']) == [
+            ('zara', 'co', 'es'), ('zara', 'us', None), ('mango', 'co', 'es'), ('mango', 'us', None)
+        ]
+
+    def test_category_counts_of_all_shards_size_the_crawl(self):
+        """Los conteos por categoría de cada shard se suman; gana el más reciente de cada categoría."""
+        # Arrange
+        runs = [
+            run('s1-new', 2, items=90, shards=2, categories=[{'category': '/a', 'products': 120}]),
+            run('s1-old', 1, items=80, shards=2, categories=[{'category': '/a', 'products': 100}]),
+            run('s0', 1, items=70, shards=2, categories=[{'category': '/b', 'products': 80}]),
+        ]
+
+        # Act
+        estimate = estimate_target(runs)
+
+        # Assert
+        assert estimate['products'] == 200
+        assert estimate['browser_seconds'] == 720.0
+
+    def test_sharded_runs_without_category_counts_are_not_enough(self):
+        assert estimate_target([run('s0', 0, items=300, shards=4)]) is None
+
+    def test_more_nodes_shorten_the_batch_until_jobs_cannot_use_them(self):
+        # Arrange
+        estimates = [{'browser_seconds': 3600.0, 'utilization': 0.5, 'startup_seconds': 0.0}]
+
+        # Act
+        one, four, eight = (predict_seconds(estimates, nodes, shards=1, slots_per_job=4) for nodes in (1, 4, 8))
+
+        # Assert
+        assert one == 7200.0
+        assert four == 1800.0
+        assert eight == four  # Un solo trabajo ocupa como máximo 4 slots
+
+    def test_deadline_recommends_nodes_and_shards(self):
+        estimates = [{'browser_seconds': 3600.0, 'utilization': 0.5, 'startup_seconds': 0.0}]
+
+        result = plan(estimates, deadline_seconds=1000, slots_per_job=4)
+
+        assert result['recommendation'] == {'nodes': 8, 'shards': 2, 'predicted_seconds': 900.0}
+        assert plan(estimates, deadline_seconds=10, max_nodes=16)['feasible'] is False
+
+
+class TestCapacityPlanner:
+    """Pruebas del planificador sobre el historial y sus interfaces."""
+
+    def test_plan_uses_history_and_reports_unknown_targets(self, ledger):
+        # Act
+        result = CapacityPlanner(ledger).plan(parse_targets(['zara'], ['co:es', 'us:en', 'fr']), nodes=4)
+
+        # Assert
+        assert [(t['country'], t['products']) for t in result['targets']] == [('co', 1200), ('us', 500)]
+        assert result['unknown'] == [{'spider': 'zara', 'country': 'fr', 'lang': None}]
+        # (1200 + 500) × 3.6 s / (4 slots × 0.5) + 20 s de arranque
+        assert result['predicted_seconds'] == 3080.0
+
+    def test_api_plans_a_batch(self, ledger, monkeypatch):
+        monkeypatch.setattr(api_server, 'get_run_ledger', lambda: ledger)
+        client = TestClient(api_server.app)
+
+        result = client.post('/plan', json={'spiders': ['zara'], 'countries': ['co:es'], 'deadline_minutes': 30}).json()
+        missing = client.post('/plan', json={'spiders': ['zara'], 'countries': ['co']})
+
+        assert result['feasible'] is True
+        # 1200 × 3.6 s / (5 slots × 0.5) + 20 s = 1748 s ≤ 30 min; con 4 nodos no alcanza
+        assert result['recommendation']['nodes'] == 5
+        assert missing.status_code == 422
+
+    def test_cli_exits_with_code_2_when_deadline_is_not_feasible(self, monkeypatch, capsys):
+        # Arrange
+        response = {'targets': [], 'unknown': [], 'nodes': None, 'shards': 1, 'recommendation': None, 'feasible': False}
+        monkeypatch.setattr(control_scraper.requests, 'post', lambda url, **kwargs: MagicMock(json=lambda: response))
+
+        # Act
+        code = control_scraper.plan_command(['--spiders', 'zara', '--countries', 'co:es', '--deadline', '10'])
+
+        # Assert
+        assert code == 2
+        assert 'No se llega a 10 minutos' in capsys.readouterr().out
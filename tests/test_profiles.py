@@ -0,0 +1,109 @@
+"""
+Suite de pruebas unitarias para los perfiles de navegador de 'stylos.profiles'.
+
+Verifica la instantánea de cookies y `localStorage`, su vencimiento, su
+inyección en sesiones nuevas y el uso desde `SeleniumMiddleware`. Los
+navegadores se simulan con `MagicMock` y las instantáneas se guardan en un
+SQLite dentro de `tmp_path`.
+"""
+
+import pytest
+from unittest.mock import MagicMock
+
+from stylos.middlewares import SeleniumMiddleware
+from stylos.profiles import BrowserProfileStore, apply_snapshot, capture_snapshot
+
+# --- Fixtures de Pytest ---
+
+@pytest.fixture
+def store(tmp_path):
+    """Almacén de perfiles aislado para cada prueba."""
+    store = BrowserProfileStore(str(tmp_path / 'cache.sqlite3'), ttl=3600)
+    yield store
+    store.close()
+
+@pytest.fixture
+def warmed_driver():
+    """Navegador simulado tras aceptar el consentimiento en la tienda de Colombia."""
+    driver = MagicMock()
+    driver.current_url = 'https://www.zara.com/co/es/'
+    driver.get_cookies.return_value = [
+        {'name': 'storepath', 'value': 'co/es', 'domain': '.zara.com', 'path': '/', 'expiry': 4000000000, 'sameSite': 'Lax'},
+        {'name': 'consent', 'value': '1', 'domain': '.zara.com', 'path': '/', 'expiry': 4100000000},
+    ]
+    driver.execute_script.return_value = {'geolocation-dismissed': 'true'}
+    return driver
+
+
+class TestSnapshots:
+    """Pruebas de la captura, el vencimiento y la inyección de instantáneas."""
+
+    def test_snapshot_expires_with_its_first_cookie(self, store, warmed_driver):
+        """La instantánea deja de usarse cuando vence la primera de sus cookies."""
+        # Arrange
+        snapshot = capture_snapshot(warmed_driver)
+        store.store('zara', 'co', 'es', snapshot)
+
+        # Act
+        fresh = store.lookup('zara', 'co', 'es', now=1000)
+        stale = store.lookup('zara', 'co', 'es', now=4050000000)
+
+        # Assert
+        assert snapshot['origin'] == 'https://www.zara.com'
+        assert fresh['local_storage'] == {'geolocation-dismissed': 'true'}
+        assert stale is None
+        assert store.stats['expired'] == 1
+
+    def test_apply_writes_cookies_and_storage_from_a_light_page(self, warmed_driver):
+        """La inyección abre un documento ligero del origen y escribe cookies y localStorage."""
+        # Arrange
+        snapshot = capture_snapshot(warmed_driver)
+        driver = MagicMock()
+
+        # Act
+        apply_snapshot(driver, snapshot)
+
+        # Assert
+        driver.get.assert_called_once_with('https://www.zara.com/robots.txt')
+        assert driver.add_cookie.call_count == 2
+        driver.execute_script.assert_called_once()
+        assert driver.execute_script.call_args[0][1] == {'geolocation-dismissed': 'true'}
+
+
+class TestMiddlewareProfiles:
+    """Pruebas del uso de perfiles y caché de disco desde `SeleniumMiddleware`."""
+
+    def test_first_session_warms_up_and_next_ones_reuse_the_profile(self, store, warmed_driver, monkeypatch):
+        """Sin perfil se calienta la sesión con el extractor; después se inyecta el guardado."""
+        # Arrange
+        extractor = MagicMock()
+        monkeypatch.setattr('stylos.middlewares.ExtractorRegistry.get_extractor', lambda *args, **kwargs: extractor)
+        middleware = SeleniumMiddleware('local', None, crawler=MagicMock(), profile_store=store)
+        spider = MagicMock(country='co', lang='es')
+        spider.name = 'zara'
+        second = MagicMock()
+
+        # Act
+        middleware._apply_profile(warmed_driver, spider)
+        middleware._apply_profile(second, spider)
+
+        # Assert
+        extractor.warm_up.assert_called_once_with('co', 'es')
+        second.get.assert_called_once_with('https://www.zara.com/robots.txt')
+        assert store.stats['stores'] == 1
+
+    def test_local_sessions_get_separate_disk_cache_dirs(self, tmp_path):
+        """Cada sesión local simultánea usa su propio directorio de caché, que se libera al cerrarla."""
+        # Arrange
+        middleware = SeleniumMiddleware('local', None, crawler=MagicMock(), disk_cache_dir=str(tmp_path))
+        spider = MagicMock(country='co', lang='es')
+        spider.name = 'zara'
+
+        # Act
+        first, second = middleware._acquire_cache_slot(), middleware._acquire_cache_slot()
+        middleware._close_driver(MagicMock(cache_slot=first, broker_lease_id=None), reusable=True)
+        reused = middleware._acquire_cache_slot()
+
+        # Assert
+        assert (first, second, reused) == (0, 1, 0)
+        assert middleware._disk_cache_path(spider, second) == str(tmp_path / 'zara-co-es' / 'slot-1')
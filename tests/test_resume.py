@@ -0,0 +1,100 @@
+"""
+Suite de pruebas unitarias para los rastreos reanudables (`JOBDIR`).
+
+Verifica que las peticiones de Selenium se pueden serializar en la cola en
+disco de Scrapy, que el estado de la araña vive en `spider.state` y que
+`ResumableCrawlExtension` reinicia el directorio de un rastreo ya terminado.
+"""
+
+import pickle
+
+import pytest
+from unittest.mock import MagicMock
+from scrapy.settings import Settings
+from scrapy.utils.request import request_from_dict
+
+from stylos.extensions import ResumableCrawlExtension
+from stylos.spiders.zara import ZaraSpider
+
+# --- Fixtures de Pytest ---
+
+@pytest.fixture
+def spider():
+    """Araña de Zara con `spider.state`, como la deja la extensión `SpiderState` con JOBDIR."""
+    crawler = MagicMock()
+    crawler.settings = Settings({'MENU_CACHE_ENABLED': False, 'COLOR_FANOUT_TIMEOUT': 300})
+    spider = ZaraSpider.from_crawler(crawler)
+    spider.state = {}
+    return spider
+
+
+class TestResumableSpiderState:
+    """Pruebas del estado de la araña respaldado por `spider.state`."""
+
+    def test_selenium_requests_survive_disk_queue_serialization(self, spider):
+        """Las peticiones por color conservan callback, errback y meta tras serializarse."""
+        # Arrange
+        response = MagicMock()
+        response.url = 'https://www.zara.com/co/es/camisa-p1.html'
+        response.request.priority = 0
+        response.meta = {
+            'product_data': {'name': 'CAMISA'},
+            'color_variants': [{'index': 0, 'url': None}, {'index': 1, 'url': None}],
+        }
+        request = next(spider.parse_variants(response))
+
+        # Act
+        restored = request_from_dict(pickle.loads(pickle.dumps(request.to_dict(spider=spider))), spider=spider)
+
+        # Assert
+        assert restored.callback == spider.parse_color
+        assert restored.errback == spider.color_failed
+        assert restored.meta['extraction_type'] == 'color'
+        assert restored.meta['product_url'] == response.url
+
+    def test_progress_is_kept_in_spider_state(self, spider):
+        """Las URLs procesadas y los colores pendientes se guardan en `spider.state`."""
+        # Arrange
+        category_url = '/co/es/mujer-vestidos-l1066.html'
+
+        # Act
+        list(spider.follow_category_urls(spider.start_urls[0], [category_url]))
+        spider.color_aggregator.start('https://www.zara.com/co/es/camisa-p1.html', {}, ['0', '1'])
+
+        # Assert
+        assert spider.state['processed_urls'] == {category_url}
+        assert 'https://www.zara.com/co/es/camisa-p1.html' in spider.state['pending_colors']
+
+
+class TestResumableCrawlExtension:
+    """Pruebas del ciclo de vida de `JOBDIR`."""
+
+    def test_finished_crawl_starts_from_scratch(self, tmp_path):
+        """Tras un rastreo terminado con éxito, el siguiente vacía el JOBDIR."""
+        # Arrange
+        crawler = MagicMock()
+        crawler.settings = Settings({'JOBDIR': str(tmp_path)})
+        first = ResumableCrawlExtension.from_crawler(crawler)
+        (tmp_path / 'requests.seen').write_text('abc\n')
+        first.spider_closed(MagicMock(), 'finished')
+
+        # Act
+        ResumableCrawlExtension.from_crawler(crawler)
+
+        # Assert
+        assert list(tmp_path.iterdir()) == []
+
+    def test_interrupted_crawl_keeps_its_state(self, tmp_path):
+        """Si el rastreo se detuvo antes de terminar, el JOBDIR se conserva para reanudarlo."""
+        # Arrange
+        crawler = MagicMock()
+        crawler.settings = Settings({'JOBDIR': str(tmp_path)})
+        first = ResumableCrawlExtension.from_crawler(crawler)
+        (tmp_path / 'requests.seen').write_text('abc\n')
+        first.spider_closed(MagicMock(), 'shutdown')
+
+        # Act
+        ResumableCrawlExtension.from_crawler(crawler)
+
+        # Assert
+        assert (tmp_path / 'requests.seen').exists()
@@ -0,0 +1,154 @@
+"""
+Suite de pruebas unitarias para el historial de corridas ('stylos.runs').
+
+Usa `mongomock` en lugar de un servidor MongoDB real. Cubre el documento que
+se arma a partir de las estadísticas de Scrapy, las consultas por rango de
+fechas, la detección de regresiones entre versiones, el endpoint `/runs` y
+el subcomando `runs` del cliente de línea de comandos.
+"""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import mongomock
+import pytest
+from fastapi.testclient import TestClient
+
+import app.api_server as api_server
+import control_scraper
+from stylos.runs import RunLedger, build_run_document, compare_runs
+
+START = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+# --- Fixtures de Pytest ---
+
+@pytest.fixture
+def ledger():
+    ledger = RunLedger(mongomock.MongoClient()['stylos_test']['crawl_runs'])
+    ledger.ensure_indexes()
+    return ledger
+
+
+def run(job_id, day, release, items_per_minute, reason='finished', country='us'):
+    return {
+        'job_id': job_id, 'spider': 'zara', 'country': country, 'lang': 'en', 'release': release,
+        'reason': reason, 'finished_at': START + timedelta(days=day), 'duration_seconds': 3600,
+        'items': {'scraped': 600},
+        'throughput': {'items_per_minute': items_per_minute, 'browser_seconds_per_item': 6.0,
+                       'renders_per_item': 1.2, 'render_p95_ms': 4000.0},
+    }
+
+
+class TestRunDocument:
+    """Pruebas del documento de una corrida."""
+
+    def test_builds_document_from_final_stats(self):
+        # Arrange
+        spider = SimpleNamespace(name='zara', country='us', lang='en', mode='price')
+        stats = {
+            'start_time': START, 'finish_time': START + timedelta(hours=1), 'elapsed_time_seconds': 3600.0,
+            'item_scraped_count': 300, 'mongodb/items_new': 20, 'mongodb/items_changed': 45,
+            'webdriver/product/renders': 300, 'webdriver/category/renders': 60,
+            'throughput/items_per_minute': 5.0, 'throughput/browser_seconds': 1800.0,
+            'latency/render/p95_ms': 7400.0, 'latency/pipeline/MongoDBPipeline/p50_ms': 3.1,
+            'downloader/response_status_count/200': 360,
+        }
+
+        # Act
+        doc = build_run_document('job1', spider, stats, 'finished', release='1.4.0')
+
+        # Assert
+        assert doc['args'] == {'country': 'us', 'lang': 'en', 'mode': 'price'}
+        assert doc['items'] == {'scraped': 300, 'dropped': 0, 'new': 20, 'changed': 45, 'unchanged': 0}
+        assert doc['throughput']['renders'] == 360
+        assert doc['throughput']['browser_seconds_per_item'] == 6.0
+        assert doc['throughput']['render_p95_ms'] == 7400.0
+        assert doc['stages']['pipeline/MongoDBPipeline'] == {'p50_ms': 3.1}
+        assert doc['duration_seconds'] == 3600.0
+
+
+class TestRunLedger:
+    """Pruebas de consultas y comparación de corridas."""
+
+    def test_find_filters_by_locale_and_date_range(self, ledger):
+        # Arrange
+        for day in range(5):
+            ledger.record(run(f'us{day}', day, '1.0.0', 10.0))
+        ledger.record(run('es0', 2, '1.0.0', 10.0, country='es'))
+
+        # Act
+        runs = ledger.find('zara', 'us', since=START + timedelta(days=1), until=START + timedelta(days=4))
+
+        # Assert
+        assert [r['job_id'] for r in runs] == ['us3', 'us2', 'us1']
+
+    def test_record_replaces_a_resumed_job(self, ledger):
+        ledger.record(run('job1', 0, '1.0.0', 10.0, reason='shutdown'))
+        ledger.record(run('job1', 1, '1.0.0', 12.0))
+
+        assert [r['reason'] for r in ledger.find('zara')] == ['finished']
+
+    def test_flags_throughput_regression_against_previous_release(self, ledger):
+        """La última corrida se compara con la mediana de la versión anterior."""
+        # Arrange
+        for day, ipm in enumerate((10.0, 11.0, 9.0)):
+            ledger.record(run(f'old{day}', day, '1.0.0', ipm))
+        ledger.record(run('failed', 3, '1.1.0', 1.0, reason='shutdown'))
+        ledger.record(run('new', 4, '1.1.0', 7.0))
+
+        # Act
+        comparison = ledger.compare('zara', 'us', 'en')
+
+        # Assert
+        assert comparison['latest']['job_id'] == 'new'
+        assert {r['job_id'] for r in comparison['baseline']} == {'old0', 'old1', 'old2'}
+        assert comparison['metrics']['items_per_minute']['baseline'] == 10.0
+        assert comparison['regressions'] == ['items_per_minute']
+
+    def test_without_previous_release_compares_with_same_release(self):
+        runs = [run('b', 1, '1.0.0', 10.5), run('a', 0, '1.0.0', 10.0)]
+
+        comparison = compare_runs(runs)
+
+        assert comparison['regressions'] == []
+        assert comparison['metrics']['items_per_minute']['change'] == 0.05
+
+
+class TestRunsInterfaces:
+    """Pruebas del endpoint `/runs` y del subcomando `runs`."""
+
+    def test_api_lists_and_compares_runs(self, ledger, monkeypatch):
+        # Arrange
+        monkeypatch.setattr(api_server, 'get_run_ledger', lambda: ledger)
+        ledger.record(run('old', 0, '1.0.0', 10.0))
+        ledger.record(run('new', 1, '1.1.0', 5.0))
+        client = TestClient(api_server.app)
+
+        # Act
+        runs = client.get('/runs', params={'spider': 'zara', 'since': '2026-10-02T00:00:00+00:00'}).json()['runs']
+        comparison = client.get('/runs/compare', params={'spider': 'zara', 'country': 'us'}).json()
+
+        # Assert
+        assert [r['job_id'] for r in runs] == ['new']
+        assert comparison['regressions'] == ['items_per_minute']
+
+    def test_cli_exits_with_code_2_on_regressions(self, monkeypatch, capsys):
+        # Arrange
+        responses = {
+            '/runs': {'runs': [run('new', 1, '1.1.0', 5.0)]},
+            '/runs/compare': {
+                'latest': {'job_id': 'new', 'release': '1.1.0'}, 'baseline': [{'job_id': 'old'}],
+                'metrics': {'items_per_minute': {'latest': 5.0, 'baseline': 10.0, 'change': -0.5, 'regression': True}},
+                'regressions': ['items_per_minute'],
+            },
+        }
+        fake_get = lambda url, **kwargs: MagicMock(json=lambda: responses[url[len(control_scraper.API_BASE_URL):]])
+        monkeypatch.setattr(control_scraper.requests, 'get', fake_get)
+
+        # Act
+        code = control_scraper.runs_command(['--spider', 'zara', '--country', 'us', '--compare'])
+
+        # Assert
+        assert code == 2
+        assert 'REGRESIÓN' in capsys.readouterr().out
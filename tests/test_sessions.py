@@ -0,0 +1,127 @@
+"""
+Suite de pruebas unitarias para la salud de las sesiones de navegador.
+
+Verifica la política de reciclaje de `stylos.sessions`, la detección de
+sesiones muertas y el reintento transparente de `SeleniumMiddleware` en una
+sesión nueva. Los navegadores se simulan con `MagicMock`.
+"""
+
+import pytest
+from unittest.mock import MagicMock
+
+from scrapy import Request
+from selenium.common.exceptions import InvalidSessionIdException, TimeoutException, WebDriverException
+
+from stylos.middlewares import SeleniumMiddleware
+from stylos.sessions import BrowserSession, BrowserSessionPool, SessionRecyclePolicy, is_session_dead
+
+# --- Fixtures de Pytest ---
+
+@pytest.fixture
+def spider():
+    """Araña simulada con el logger que usa el middleware."""
+    spider = MagicMock()
+    spider.name = 'zara'
+    return spider
+
+@pytest.fixture
+def middleware(monkeypatch):
+    """Middleware con un extractor vacío y estadísticas simuladas."""
+    monkeypatch.setattr('stylos.middlewares.ExtractorRegistry.get_extractor', lambda *args, **kwargs: object())
+    return SeleniumMiddleware(
+        selenium_mode='local',
+        selenium_hub_url=None,
+        crawler=MagicMock(),
+        recycle_policy=SessionRecyclePolicy(max_pages=2),
+        dead_session_retries=1
+    )
+
+
+class TestSessionRecyclePolicy:
+    """Pruebas de los límites de uso de una sesión."""
+
+    def test_recycles_by_pages_and_age(self, monkeypatch):
+        """Una sesión se recicla al llegar al máximo de páginas o de antigüedad."""
+        # Arrange
+        monkeypatch.setattr('stylos.sessions.time.time', lambda: 1000.0)
+        session = BrowserSession(MagicMock(), 1)
+        policy = SessionRecyclePolicy(max_pages=10, max_age=600)
+
+        # Act / Assert
+        session.pages = 9
+        assert policy.reason(session) is None
+        session.pages = 10
+        assert policy.reason(session) == 'pages'
+        session.pages = 1
+        monkeypatch.setattr('stylos.sessions.time.time', lambda: 1601.0)
+        assert policy.reason(session) == 'age'
+
+    def test_recycles_by_memory_from_cdp_metrics(self):
+        """La memoria se lee con `Performance.getMetrics` solo cada N páginas."""
+        # Arrange
+        driver = MagicMock()
+        driver.execute_cdp_cmd.return_value = {'metrics': [{'name': 'JSHeapUsedSize', 'value': 900 * 1024 * 1024}]}
+        session = BrowserSession(driver, 1)
+        policy = SessionRecyclePolicy(max_memory_mb=512, memory_check_every=5)
+
+        # Act
+        session.pages = 4
+        skipped = policy.reason(session)
+        session.pages = 5
+        reason = policy.reason(session)
+
+        # Assert
+        assert skipped is None
+        assert reason == 'memory'
+        assert session.memory_mb == pytest.approx(900)
+        driver.execute_cdp_cmd.assert_any_call('Performance.getMetrics', {})
+
+
+class TestDeadSessions:
+    """Pruebas de la detección y el reemplazo de sesiones muertas."""
+
+    def test_classifies_dead_session_errors(self):
+        """Solo los errores de sesión o conexión cuentan como sesión muerta."""
+        # Act / Assert
+        assert is_session_dead(InvalidSessionIdException('invalid session id'))
+        assert is_session_dead(WebDriverException('chrome not reachable'))
+        assert is_session_dead(ConnectionRefusedError())
+        assert not is_session_dead(TimeoutException('timeout'))
+        assert not is_session_dead(ValueError('selector'))
+
+    def test_request_is_retried_on_a_new_session(self, middleware, spider):
+        """Si el navegador muere a mitad del render, la petición se repite en otra sesión."""
+        # Arrange
+        dead, healthy = MagicMock(), MagicMock()
+        dead.get.side_effect = InvalidSessionIdException('invalid session id')
+        healthy.current_url = 'https://www.zara.com/co/es/'
+        healthy.page_source = '<html></html>'
+        healthy.execute_script.return_value = None
+        middleware.pool = BrowserSessionPool(factory=iter([dead, healthy]).__next__, max_size=1)
+        request = Request('https://www.zara.com/co/es/', meta={'selenium': True})
+
+        # Act
+        response = middleware._render(request, spider)
+
+        # Assert
+        assert response.url == 'https://www.zara.com/co/es/'
+        assert dead.quit.called
+        assert middleware.pool.size == 1
+        middleware.crawler.stats.inc_value.assert_any_call('sessions/dead')
+
+    def test_worn_session_is_replaced_after_render(self, middleware, spider):
+        """Al alcanzar el máximo de páginas la sesión se cierra y se publica el reciclaje."""
+        # Arrange
+        driver = MagicMock(current_url='https://www.zara.com/co/es/', page_source='<html></html>')
+        driver.execute_script.return_value = None
+        middleware.pool = BrowserSessionPool(factory=lambda: driver, max_size=1)
+        request = Request('https://www.zara.com/co/es/', meta={'selenium': True})
+
+        # Act
+        middleware._render(request, spider)
+        middleware._render(request, spider)
+
+        # Assert
+        assert driver.quit.call_count == 1
+        assert middleware.pool.size == 0
+        middleware.crawler.stats.inc_value.assert_any_call('sessions/recycled/pages')
@@ -0,0 +1,132 @@
+"""
+Suite de pruebas unitarias para el reparto de rastreos en shards.
+
+Verifica que el hash de 'stylos.sharding' es estable y reparte sin solapes,
+que las arañas respetan su shard y que la API agenda un trabajo por shard y
+reporta el estado agregado del grupo. Scrapyd se simula con `monkeypatch`.
+"""
+
+import pytest
+from unittest.mock import MagicMock
+from fastapi.testclient import TestClient
+from scrapy.http import HtmlResponse
+from scrapy.settings import Settings
+
+import app.api_server as api_server
+from stylos.sharding import category_key, product_key, stable_shard
+from stylos.spiders.zara import ZaraSpider
+
+# --- Fixtures de Pytest ---
+
+@pytest.fixture
+def category_urls():
+    """URLs de subcategorías tal como salen del menú."""
+    return [f"https://www.zara.com/co/es/categoria-{i}-l{1000 + i}.html" for i in range(40)]
+
+def make_spider(**kwargs):
+    """Crea una araña de Zara con un crawler simulado y los argumentos dados."""
+    crawler = MagicMock()
+    crawler.settings = Settings({'MENU_CACHE_ENABLED': False})
+    return ZaraSpider.from_crawler(crawler, **kwargs)
+
+
+class TestStableHash:
+    """Pruebas de las funciones de reparto."""
+
+    def test_keys_ignore_domain_and_parameters(self):
+        """La misma subcategoría o producto da la misma clave con URL absoluta, relativa o con parámetros."""
+        # Act / Assert
+        assert category_key('https://www.zara.com/co/es/vestidos-l1066.html?v1=2') == '/co/es/vestidos-l1066.html'
+        assert product_key('https://www.zara.com/co/es/camisa-p01234567.html?v1=1') == '01234567'
+        assert product_key('https://shop.mango.com/co/es/p/mujer/vestidos/vestido-lino_87054036') == '87054036'
+        assert stable_shard('01234567', 4) == stable_shard('01234567', 4)
+
+
+class TestSpiderSharding:
+    """Pruebas del filtrado de la araña por shard."""
+
+    def test_shards_partition_categories_without_overlap(self, category_urls):
+        """Cada subcategoría la recorre exactamente un shard."""
+        # Arrange
+        spiders = [make_spider(shard=str(i), shards='3') for i in range(3)]
+
+        # Act
+        owned = [
+            {request.url for request in spider.follow_category_urls(spider.start_urls[0], category_urls)}
+            for spider in spiders
+        ]
+
+        # Assert
+        assert set().union(*owned) == set(category_urls)
+        assert sum(len(urls) for urls in owned) == len(category_urls)
+        assert all(owned)
+
+    def test_nested_categories_are_followed_only_by_their_shard(self, category_urls):
+        """Una categoría enlazada desde otra la recorre el shard al que pertenece, no el que la encontró."""
+        # Arrange
+        spiders = [make_spider(shard=str(i), shards='2') for i in range(2)]
+        page_url = next(url for url in category_urls if stable_shard(category_key(url), 2) == 0)
+        nested_url = next(url for url in category_urls if stable_shard(category_key(url), 2) == 1)
+        body = (f'<li class="products-category-grid-block"><a href="{nested_url}">Ver más</a></li>'
+                '<li class="products-category-grid-block"><a href="/co/es/camisa-p01234567.html">Camisa</a></li>')
+        response = HtmlResponse(page_url, body=body.encode(), encoding='utf-8')
+
+        # Act
+        followed = [
+            {request.url for request in spider.parse_category(response) if request.meta['extraction_type'] == 'category'}
+            for spider in spiders
+        ]
+
+        # Assert
+        assert followed == [set(), {nested_url}]
+
+    def test_product_sharding_keeps_all_categories(self, category_urls):
+        """Con shard_by=product todos los shards recorren todas las categorías."""
+        # Arrange
+        spider = make_spider(shard='1', shards='3', shard_by='product')
+
+        # Act
+        requests = list(spider.follow_category_urls(spider.start_urls[0], category_urls))
+
+        # Assert
+        assert len(requests) == len(category_urls)
+        assert spider.owns_product('https://www.zara.com/co/es/camisa-p1.html') == (stable_shard('1', 3) == 1)
+
+    def test_invalid_shard_is_rejected(self):
+        """Un shard fuera de rango es un error de configuración."""
+        # Act / Assert
+        with pytest.raises(ValueError):
+            make_spider(shard='3', shards='3')
+
+
+class TestScheduleShards:
+    """Pruebas de la API para grupos de shards."""
+
+    def test_schedule_launches_one_job_per_shard_and_reports_group(self, monkeypatch):
+        """Se agenda un trabajo por shard y el grupo está terminado solo cuando todos terminan."""
+        # Arrange
+        scheduled = []
+
+        def fake_post(url, data):
+            scheduled.append(data)
+            return MagicMock(json=lambda: {'status': 'ok', 'jobid': data['_job']})
+
+        monkeypatch.setattr(api_server.requests, 'post', fake_post)
+        client = TestClient(api_server.app)
+
+        # Act
+        response = client.post('/schedule', json={'spider_name': 'zara', 'spider_args': {'country': 'es'}, 'shards': 2})
+        group = response.json()
+        job_ids = group['job_ids']
+        monkeypatch.setattr(api_server.requests, 'get', lambda url, **kwargs: MagicMock(json=lambda: {
+            'running': [{'id': job_ids[0], 'spider': 'zara'}],
+            'finished': [{'id': job_ids[1], 'spider': 'zara'}, {'id': 'otro', 'spider': 'mango'}],
+        }))
+        status = client.get(f"/groups/{group['group_id']}").json()
+
+        # Assert
+        assert [data['shard'] for data in scheduled] == ['0', '1']
+        assert all(data['shards'] == '2' and data['country'] == 'es' for data in scheduled)
+        assert status['state'] == 'running'
+        assert status['finished'] == 1
+        assert status['total'] == 2
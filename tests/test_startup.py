@@ -0,0 +1,45 @@
+"""
+Pruebas de guarda del arranque de un proceso de rastreo.
+
+Ejecutan `benchmarks/startup.py` en un proceso limpio y verifican que las
+dependencias pesadas (Selenium, webdriver-manager, Sentry, extractors) no se
+importen antes de la primera petición, y que el registro de extractors los
+cargue bajo demanda.
+"""
+
+import sys
+from unittest.mock import MagicMock
+
+from benchmarks.startup import eager_lazy_modules, run_once
+from stylos.extractors import ExtractorRegistry
+
+# Margen amplio: protege contra regresiones grandes sin depender de la máquina
+FIRST_REQUEST_BUDGET = 10.0
+
+
+class TestStartup:
+    """Pruebas del costo de arranque."""
+
+    def test_first_request_does_not_import_lazy_dependencies(self):
+        """Hasta la primera petición solo se importa lo necesario para emitirla."""
+        # Act
+        report = run_once('zara')
+
+        # Assert
+        assert report['url'] == 'https://www.zara.com/co/es/'
+        assert eager_lazy_modules(report['modules']) == []
+        assert report['first_request'] < FIRST_REQUEST_BUDGET
+
+    def test_registry_loads_extractors_on_demand(self, monkeypatch):
+        """Un extractor se importa y registra la primera vez que una araña lo pide."""
+        # Arrange
+        monkeypatch.setattr(ExtractorRegistry, '_extractors', {})
+        monkeypatch.delitem(sys.modules, 'stylos.extractors.zara_extractor', raising=False)
+        spider = MagicMock(lang='es')
+
+        # Act
+        extractor = ExtractorRegistry.get_extractor('zara', MagicMock(), spider)
+
+        # Assert
+        assert type(extractor).__name__ == 'ZaraExtractor'
+        assert ExtractorRegistry.list_registered() == ['zara']
@@ -0,0 +1,121 @@
+"""
+Suite de pruebas unitarias para 'stylos.throttle'.
+
+Prueba las decisiones de `SlotThrottle` en aislamiento: el reloj se pasa
+explícitamente en cada observación, por lo que no hay esperas reales. También
+prueba cómo `SlotThrottleExtension` reconoce las páginas de bloqueo.
+"""
+
+import pytest
+from unittest.mock import MagicMock
+from scrapy import Request
+from scrapy.http import HtmlResponse
+from scrapy.settings import Settings
+from scrapy.statscollectors import MemoryStatsCollector
+
+import stylos.settings as project_settings
+from stylos.throttle import SlotThrottle, SlotThrottleExtension, INCREASE, HOLD
+
+# --- Fixtures de Pytest ---
+
+@pytest.fixture
+def throttle():
+    """Throttle con límite inicial 2 y techo 4 (tamaño del pool)."""
+    return SlotThrottle(initial=2, ceiling=4, max_latency=2.0, cooldown=30)
+
+@pytest.fixture
+def extension():
+    """Extensión con los settings del proyecto (marcadores de bloqueo incluidos) y sin motor."""
+    crawler = MagicMock(engine=None)
+    crawler.settings = Settings()
+    crawler.settings.setmodule(project_settings)
+    crawler.settings.set('SELENIUM_POOL_SIZE', 4)
+    crawler.stats = MemoryStatsCollector(crawler)
+    return SlotThrottleExtension(crawler)
+
+def rendered_response(html, status=200):
+    """Respuesta renderizada por Selenium, con los tiempos que deja el middleware en `meta`."""
+    request = Request('https://www.zara.com/co/es/camisa-p1.html',
+                      meta={'render_timing': {'server_latency': 0.3, 'extraction': 4.0, 'status': status}})
+    return HtmlResponse(request.url, body=html.encode(), encoding='utf-8', request=request)
+
+
+class TestSlotThrottle:
+    """Pruebas del control AIMD por slots de navegador."""
+
+    def test_increases_only_when_slots_are_saturated(self, throttle):
+        """Con slots libres se mantiene; con todos ocupados suma uno hasta el techo."""
+        # Act
+        idle = throttle.observe(in_flight=1, server_latency=0.3, now=100)
+        busy = [throttle.observe(in_flight=throttle.limit, server_latency=0.3, now=100 + i) for i in range(3)]
+
+        # Assert
+        assert idle == HOLD
+        assert busy == [INCREASE, INCREASE, HOLD]
+        assert throttle.limit == 4
+
+    def test_extraction_time_does_not_trigger_backoff(self, throttle):
+        """Un extractor lento (scrolls, esperas) no es presión del servidor."""
+        # Act
+        decision = throttle.observe(in_flight=0, server_latency=0.4, extraction_time=25.0, now=100)
+
+        # Assert
+        assert decision == HOLD
+        assert throttle.limit == 2
+
+    @pytest.mark.parametrize('signals, reason', [
+        ({'blocked': True}, 'backoff_blocked'),
+        ({'status': 429}, 'backoff_status'),
+        ({'timeout': True}, 'backoff_timeout'),
+        ({'server_latency': 9.0}, 'backoff_latency'),
+    ])
+    def test_server_signals_halve_the_limit_and_pause_increases(self, signals, reason):
+        """Bloqueos, códigos de sobrecarga, timeouts y latencia alta reducen el límite a la mitad."""
+        # Arrange
+        throttle = SlotThrottle(initial=4, ceiling=4, max_latency=2.0, cooldown=30)
+
+        # Act
+        decision = throttle.observe(in_flight=4, now=100, **signals)
+        during_cooldown = throttle.observe(in_flight=4, server_latency=0.1, now=110)
+
+        # Assert
+        assert decision == reason
+        assert throttle.limit == 2
+        assert during_cooldown == HOLD
+
+
+class TestBlockPageDetection:
+    """Pruebas del reconocimiento de páginas de bloqueo en `SlotThrottleExtension`."""
+
+    def test_product_page_loading_recaptcha_is_not_a_block_page(self, extension):
+        """El código de reCAPTCHA en los scripts de una página normal no provoca un retroceso."""
+        # Arrange
+        html = (
+            '<html><head><title>CAMISA OVERSIZE - ZARA Colombia</title>'
+            '<script src="https://www.google.com/recaptcha/api.js"></script>'
+            '<script>grecaptcha.ready(function () { window.captchaLoaded = true; });</script></head>'
+            '<body><h1>CAMISA OVERSIZE</h1>'
+            + '<p>Camisa de cuello solapa y manga larga en tejido de algodón.</p>' * 50 +
+            '</body></html>'
+        )
+
+        # Act
+        extension.response_received(rendered_response(html), None, MagicMock())
+
+        # Assert
+        assert extension.stats.get_value('throttle/decisions/backoff_blocked') is None
+        assert extension.throttle.limit == 4
+
+    @pytest.mark.parametrize('html, status', [
+        ('<html><head><title>Access Denied</title></head><body>Reference #18.2f</body></html>', 200),
+        ('<html><body><p>Please complete the CAPTCHA to continue.</p></body></html>', 200),
+        ('<html><body><p>Too many requests</p>' + '<p>relleno</p>' * 500 + '</body></html>', 429),
+    ])
+    def test_block_pages_trigger_backoff(self, extension, html, status):
+        """Títulos de bloqueo, páginas cortas con el marcador y respuestas no 200 retroceden."""
+        # Act
+        extension.response_received(rendered_response(html, status), None, MagicMock())
+
+        # Assert
+        assert extension.stats.get_value('throttle/decisions/backoff_blocked') == 1
+        assert extension.throttle.limit == 2
@@ -0,0 +1,156 @@
+"""
+Suite de pruebas unitarias para la integración con Sentry ('stylos.tracing').
+
+Sentry se inicializa con un transporte en memoria, así que ningún evento sale
+del proceso. Cubre el muestreo de trazas y breadcrumbs, la depuración de
+`request.meta` y cabeceras, el recorte de eventos grandes y el benchmark de
+costo por petición.
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+import sentry_sdk
+from scrapy.http import Request
+
+from benchmarks.sentry_overhead import make_transport, run_mode
+from stylos import tracing
+from stylos.middlewares import SentryContextMiddleware
+from stylos.tracing import FILTERED, cap_event, event_size, scrub_headers, scrub_meta
+
+FAKE_DSN = 'https://public@sentry.invalid/1'
+
+# --- Fixtures de Pytest ---
+
+@pytest.fixture
+def transport():
+    """Sentry inicializado con todas las trazas y un transporte que guarda los envelopes."""
+    transport = make_transport()
+    envelopes = []
+    transport.capture_envelope = envelopes.append
+    tracing.configure(FAKE_DSN, traces_sample_rate=1.0, transport=transport)
+    yield envelopes
+    tracing.shutdown()
+
+
+class TestSpans:
+    """Pruebas de las transacciones y spans explícitos."""
+
+    def test_span_is_a_noop_without_sentry(self):
+        with tracing.span('browser.render', 'zara product') as current:
+            assert current is None
+        assert tracing.is_active() is False
+
+    def test_render_is_a_transaction_with_child_spans(self, transport):
+        # Act
+        with tracing.span('browser.render', 'zara product', url='https://www.zara.com/co/es/p1.html'):
+            with tracing.span('browser.navigation', 'https://www.zara.com/co/es/p1.html'):
+                pass
+            with tracing.span('browser.extraction', 'product'):
+                pass
+
+        # Assert
+        [envelope] = transport
+        event = envelope.get_transaction_event()
+        assert event['transaction'] == 'zara product'
+        assert [s['op'] for s in event['spans']] == ['browser.navigation', 'browser.extraction']
+
+    def test_unsampled_transaction_creates_no_spans(self, transport, monkeypatch):
+        # Arrange
+        monkeypatch.setattr(tracing, '_traces_sample_rate', 0.0)
+
+        # Act
+        with tracing.span('browser.render') as render:
+            with tracing.span('browser.navigation') as navigation:
+                pass
+
+        # Assert
+        assert render is None and navigation is None
+        assert sentry_sdk.get_current_span() is None
+        assert transport == []
+
+
+class TestSentryContextMiddleware:
+    """Pruebas del muestreo de breadcrumbs y del contexto de las excepciones."""
+
+    def test_breadcrumbs_are_sampled(self, monkeypatch):
+        # Arrange
+        add_breadcrumb = MagicMock()
+        monkeypatch.setattr(sentry_sdk, 'add_breadcrumb', add_breadcrumb)
+        middleware = SentryContextMiddleware(breadcrumb_sample_rate=0.0)
+
+        # Act
+        for index in range(50):
+            middleware.process_request(Request(f'https://www.zara.com/co/es/p{index}.html'), MagicMock())
+
+        # Assert
+        add_breadcrumb.assert_not_called()
+
+    def test_exception_context_is_scrubbed(self, transport):
+        # Arrange
+        request = Request(
+            'https://www.zara.com/co/es/p1.html', headers={'Cookie': 'session=abc'},
+            meta={'extraction_type': 'product', 'webdriver_trace': [{}] * 500, '_sharding': {'shard': 1}},
+        )
+
+        # Act
+        SentryContextMiddleware().process_exception(request, TimeoutError('timeout'), MagicMock())
+
+        # Assert
+        [envelope] = transport
+        context = envelope.get_event()['contexts']['scrapy_request']
+        assert context['headers']['Cookie'] == FILTERED
+        assert context['meta'] == {'extraction_type': 'product', 'webdriver_trace': '<list de 500 elementos>'}
+
+
+class TestScrubbing:
+    """Pruebas de la depuración y los límites de tamaño."""
+
+    def test_scrub_meta_filters_truncates_and_caps_keys(self):
+        # Arrange
+        meta = {'proxy_password': 'secreto', 'html': 'x' * 1000, '_internal': object()}
+        meta.update({f'k{index}': index for index in range(10)})
+
+        # Act
+        scrubbed = scrub_meta(meta, max_keys=5, max_length=10)
+
+        # Assert
+        assert scrubbed['proxy_password'] == FILTERED
+        assert scrubbed['html'] == 'x' * 10 + '…'
+        assert '_internal' not in scrubbed
+        assert len(scrubbed) == 6 and scrubbed['…'] == '7 claves omitidas'
+
+    def test_scrub_headers_decodes_and_hides_credentials(self):
+        headers = Request('https://a.b', headers={'Authorization': 'Bearer t', 'Accept-Language': 'es-CO'}).headers
+
+        assert scrub_headers(headers) == {'Authorization': FILTERED, 'Accept-Language': 'es-CO'}
+
+    def test_cap_event_drops_old_breadcrumbs_first(self):
+        # Arrange
+        event = {
+            'breadcrumbs': {'values': [{'message': f'{index}' * 100} for index in range(100)]},
+            'contexts': {'scrapy_request': {'url': 'https://a.b', 'meta': {'a': 'b'}}},
+        }
+
+        # Act
+        capped = cap_event(event, max_bytes=2000)
+
+        # Assert
+        assert event_size(capped) <= 2000
+        assert capped['breadcrumbs']['values'][-1]['message'].startswith('99')
+        assert capped['contexts']['scrapy_request']['meta'] == {'a': 'b'}
+        assert capped['tags']['truncated'] == 'true'
+
+
+class TestOverheadBenchmark:
+    """Prueba del benchmark de costo por petición."""
+
+    def test_sampling_sends_a_fraction_of_the_traffic(self):
+        # Act
+        sampled = run_mode('sampled', 300, 100)
+        full = run_mode('full', 300, 100)
+
+        # Assert
+        assert full['envelopes'] > 600
+        assert sampled['bytes'] < full['bytes'] / 5
+        assert tracing.is_active() is False
@@ -13,6 +13,7 @@ Las pruebas están organizadas de "abajo hacia arriba":
 4.  Se prueban los métodos públicos que orquestan a los demás.
 """
 
+import re
 import pytest
 import time
 from unittest.mock import MagicMock, PropertyMock, patch
@@ -40,6 +41,12 @@ def zara_pdp_html():
     except FileNotFoundError:
         pytest.fail("Asegúrate de tener el archivo 'zara_pdp.html' en la carpeta 'tests/samples/'")
 
+@pytest.fixture
+def zara_menu_html():
+    """Carga el HTML guardado de una página con el menú de categorías oculto en el DOM."""
+    html_path = Path(__file__).parent.parent / 'tests/samples/zara_menu.html'
+    return html_path.read_text(encoding='utf-8')
+
 @pytest.fixture
 def mock_driver():
     """
@@ -131,6 +138,67 @@ class TestZaraSimpleDataExtraction:
         assert product_data['description'] == "Cuello solapa."
         assert product_data['current_color'] == "BLANCO ROTO"
 
+class TestZaraMenuFromDom:
+    """Prueba la extracción del menú leyendo el DOM en una sola pasada."""
+
+    def test_parse_menu_links_from_saved_html(self, zara_menu_html):
+        """Se obtienen todas las subcategorías con su ruta, resolviendo enlaces relativos."""
+        # Arrange
+        extractor = ZaraExtractor(driver=None, spider=MagicMock(lang='es'))
+
+        # Act
+        menu_links = ZaraExtractor.parse_menu_links(zara_menu_html, extractor.CATEGORIES_CONFIG, 'https://www.zara.com/co/es/')
+
+        # Assert
+        assert list(menu_links) == ['MUJER', 'HOMBRE']
+        assert len(menu_links['MUJER']) == 3  # El enlace vacío se descarta
+        assert menu_links['MUJER'][1] == {
+            'url': 'https://www.zara.com/co/es/mujer-vestidos-l1066.html',
+            'path': ['MUJER', 'VESTIDOS']
+        }
+        assert menu_links['MUJER'][2]['path'] == ['MUJER', 'CAMISAS']
+        assert menu_links['HOMBRE'][0]['url'] == 'https://www.zara.com/co/es/hombre-chaquetas-l640.html'
+
+    def test_extract_menu_data_skips_clicks_when_links_are_in_dom(self, mock_driver, mock_spider, zara_menu_html, monkeypatch):
+        """Si los enlaces están en el DOM no se abre el menú ni se hace clic."""
+        # Arrange
+        mock_spider.lang = 'es'
+        type(mock_driver).page_source = PropertyMock(return_value=zara_menu_html)
+        type(mock_driver).current_url = PropertyMock(return_value='https://www.zara.com/co/es/')
+        extractor = ZaraExtractor(driver=mock_driver, spider=mock_spider)
+        click_fallback = MagicMock(return_value={})
+        monkeypatch.setattr(extractor, '_extract_menu_links_by_click', click_fallback)
+
+        # Act
+        result = extractor.extract_menu_data()
+
+        # Assert
+        assert len(result['extracted_urls']) == 5
+        assert result['menu_links'][0]['path'] == ['MUJER', 'NOVEDADES']
+        click_fallback.assert_not_called()
+        mock_driver.find_elements.assert_not_called()
+
+    def test_extract_menu_data_falls_back_to_clicks_for_missing_categories(self, mock_driver, mock_spider, zara_menu_html, monkeypatch):
+        """Solo las categorías sin enlaces en el DOM se recorren con clics."""
+        # Arrange
+        # Los enlaces de HOMBRE aún no se han renderizado en el DOM
+        html_without_man = re.sub(r'<li><a href="/co/es/hombre-[^"]+">\w+</a></li>', '', zara_menu_html)
+        mock_spider.lang = 'es'
+        type(mock_driver).page_source = PropertyMock(return_value=html_without_man)
+        type(mock_driver).current_url = PropertyMock(return_value='https://www.zara.com/co/es/')
+        extractor = ZaraExtractor(driver=mock_driver, spider=mock_spider)
+        click_fallback = MagicMock(return_value={'HOMBRE': [{'url': 'https://www.zara.com/co/es/hombre-l1.html', 'path': ['HOMBRE']}]})
+        monkeypatch.setattr(extractor, '_extract_menu_links_by_click', click_fallback)
+
+        # Act
+        result = extractor.extract_menu_data()
+
+        # Assert
+        requested = click_fallback.call_args[0][0]
+        assert [config['name'] for config in requested] == ['HOMBRE']
+        assert 'https://www.zara.com/co/es/hombre-l1.html' in result['extracted_urls']
+        assert len(result['extracted_urls']) == 4
+
 # --- Pruebas para Métodos de Interacción ---
 
 # En la clase TestZaraInteraction